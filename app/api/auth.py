@@ -0,0 +1,18 @@
+"""
+Autenticación de los endpoints de app/api.
+
+Los endpoints se montan sobre el backend de Reflex, fuera de los States, así que
+no ven la sesión del usuario. Cada pedido debe traer un token de descarga
+(?token=...) firmado para esa ruta, que solo emiten los States con un usuario
+logueado (ver app/state/auth_state.py).
+"""
+
+from fastapi import HTTPException, Query, Request
+
+from app.utils.security import verify_download_token
+
+
+def require_download_token(request: Request, token: str = Query("")) -> None:
+    """Dependencia de FastAPI: rechaza los pedidos sin un token válido para la ruta"""
+    if not token or not verify_download_token(token, request.url.path):
+        raise HTTPException(status_code=401, detail="Enlace de descarga inválido o vencido")
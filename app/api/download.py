@@ -14,17 +14,16 @@ def download_study_file(study_id: int):
     Raises:
         ValueError: Si el estudio no existe o no tiene archivo
     """
-    from app.database import get_session
+    from app.database import session_scope
     from app.services import MedicalStudyService
 
-    session = next(get_session())
-    try:
+    with session_scope() as session:
         result = MedicalStudyService.download_file(session, study_id)
 
         if not result:
             raise ValueError("El estudio no tiene archivo adjunto")
 
-        file_path, file_name = result
+        file_path, file_name, encoding = result
 
         if not file_path.exists():
             raise FileNotFoundError(f"Archivo no encontrado: {file_name}")
@@ -33,11 +32,9 @@ def download_study_file(study_id: int):
         return {
             "file_path": str(file_path),
             "file_name": file_name,
+            "content_encoding": encoding,
         }
 
-    finally:
-        session.close()
-
 
 def download_consultation_file(file_id: int):
     """
@@ -52,17 +49,16 @@ def download_consultation_file(file_id: int):
     Raises:
         ValueError: Si el archivo no existe
     """
-    from app.database import get_session
+    from app.database import session_scope
     from app.services import ConsultationFileService
 
-    session = next(get_session())
-    try:
+    with session_scope() as session:
         result = ConsultationFileService.download_file(session, file_id)
 
         if not result:
             raise ValueError("El archivo no existe")
 
-        file_path, file_name = result
+        file_path, file_name, encoding = result
 
         if not file_path.exists():
             raise FileNotFoundError(f"Archivo no encontrado: {file_name}")
@@ -71,7 +67,5 @@ def download_consultation_file(file_id: int):
         return {
             "file_path": str(file_path),
             "file_name": file_name,
+            "content_encoding": encoding,
         }
-
-    finally:
-        session.close()
@@ -0,0 +1,44 @@
+"""
+API router para exportar los archivos de un paciente.
+
+Expone GET /api/patients/{patient_id}/archive, que devuelve en streaming un ZIP
+con todos los adjuntos del paciente (documentos, estudios y consultas) más el
+PDF de historia clínica, sin armar el archivo completo en memoria. Requiere un
+token de descarga (ver app/api/auth.py).
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.api.auth import require_download_token
+from app.database import get_session
+from app.models import Patient
+from app.services import PatientArchiveService
+
+router = APIRouter(
+    prefix="/api/patients", tags=["patients"], dependencies=[Depends(require_download_token)]
+)
+
+
+@router.get("/{patient_id}/archive")
+def download_patient_archive(
+    patient_id: int, include_history: bool = True, session=Depends(get_session)
+):
+    """Descarga un ZIP con todo lo del paciente.
+
+    - Valida que el paciente exista
+    - Genera el ZIP por bloques con PatientArchiveService (sesión propia)
+    - Devuelve un StreamingResponse con Content-Disposition attachment
+    """
+    patient = session.get(Patient, patient_id)
+    if not patient:
+        raise HTTPException(status_code=404, detail="Paciente no encontrado")
+
+    file_name = PatientArchiveService.archive_filename(patient)
+    headers = {"Content-Disposition": f'attachment; filename="{file_name}"'}
+
+    return StreamingResponse(
+        PatientArchiveService.iter_patient_archive(patient_id, include_history),
+        media_type="application/zip",
+        headers=headers,
+    )
@@ -0,0 +1,62 @@
+"""
+API router para reportes grandes que se descargan en streaming.
+
+Expone GET /api/reports/consultations.pdf?start_date=&end_date=, que arma el
+reporte de consultas por bloques en un archivo temporal y lo envía por partes,
+así los reportes de un año con cientos de miles de filas no pasan por memoria.
+
+Expone también GET /api/reports/export/{dataset}?format=csv|csv.gz|parquet con
+las exportaciones para análisis de ExportService.
+
+Ambos endpoints requieren un token de descarga (ver app/api/auth.py).
+"""
+
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.api.auth import require_download_token
+from app.services import ExportService, ReportService
+from app.services.export_service import EXPORT_DATASETS, EXPORT_FORMATS
+
+router = APIRouter(prefix="/api/reports", tags=["reports"])
+
+
+@router.get("/consultations.pdf", dependencies=[Depends(require_download_token)])
+def consultations_report_pdf(start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """Descarga el reporte PDF de consultas de un rango de fechas (opcional)."""
+    file_name = f"reporte_consultas_{datetime.now().strftime('%Y%m%d')}.pdf"
+    headers = {"Content-Disposition": f'attachment; filename="{file_name}"'}
+
+    return StreamingResponse(
+        ReportService.iter_consultations_report_pdf(start_date, end_date),
+        media_type="application/pdf",
+        headers=headers,
+    )
+
+
+@router.get("/export/{dataset}", dependencies=[Depends(require_download_token)])
+def export_dataset(
+    dataset: str,
+    format: str = "csv",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+):
+    """Exporta un dataset completo (pacientes, consultas, estudios o medicaciones)."""
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(status_code=404, detail="Dataset inexistente")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Formato inválido")
+    if format == "parquet" and not ExportService.parquet_available():
+        raise HTTPException(status_code=501, detail="Exportación Parquet no disponible")
+
+    file_name = ExportService.export_filename(dataset, format)
+    headers = {"Content-Disposition": f'attachment; filename="{file_name}"'}
+
+    return StreamingResponse(
+        ExportService.iter_export(dataset, format, start_date, end_date),
+        media_type=EXPORT_FORMATS[format][1],
+        headers=headers,
+    )
@@ -3,16 +3,23 @@ API router para operaciones relacionadas con estudios médicos (descarga de arch
 
 Este módulo expone un endpoint GET /api/studies/{study_id}/download que valida
 la existencia del estudio y sirve el archivo con StreamingResponse y encabezados
-adecuados. Usa la sesión de la DB desde app.database.get_db_session().
+adecuados. Usa la sesión de la DB desde app.database.get_session() (Depends) y
+requiere un token de descarga (ver app/api/auth.py).
 """
 
+import mimetypes
+
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 
+from app.api.auth import require_download_token
 from app.database import get_session
 from app.services import MedicalStudyService
+from app.utils.compression import iter_attachment
 
-router = APIRouter(prefix="/api/studies", tags=["studies"])
+router = APIRouter(
+    prefix="/api/studies", tags=["studies"], dependencies=[Depends(require_download_token)]
+)
 
 
 @router.get("/{study_id}/download")
@@ -28,27 +35,19 @@ def download_study(study_id: int, session=Depends(get_session)):
         if not res:
             raise HTTPException(status_code=404, detail="No hay archivo para este estudio")
 
-        file_path, file_name = res
+        file_path, file_name, encoding = res
         if not file_path.exists():
             raise HTTPException(status_code=404, detail="Archivo no encontrado en disco")
 
-        # Abrir el archivo en modo binario y devolver streaming
-        def iterfile():
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(1024 * 64), b""):
-                    yield chunk
+        # Streaming por bloques (descomprime si el archivo está en almacenamiento frío)
+        iterfile = iter_attachment(file_path, encoding)
 
-        content_type = "application/octet-stream"
-        # Intentar inferir desde la extensión sencilla
-        suffix = file_path.suffix.lower()
-        if suffix in [".pdf"]:
-            content_type = "application/pdf"
-        elif suffix in [".png", ".jpg", ".jpeg", ".gif"]:
-            content_type = f"image/{suffix.lstrip('.')}"
+        # Inferir desde el nombre original (la ruta puede terminar en .gz/.zst)
+        content_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
 
         headers = {"Content-Disposition": f'attachment; filename="{file_name}"'}
 
-        return StreamingResponse(iterfile(), media_type=content_type, headers=headers)
+        return StreamingResponse(iterfile, media_type=content_type, headers=headers)
 
     except HTTPException:
         raise
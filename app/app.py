@@ -1,7 +1,12 @@
 """Aplicación principal de Reflex"""
 
 import reflex as rx
+from fastapi import FastAPI
 
+from app.api.patients import router as patients_router
+from app.api.reports import router as reports_router
+from app.api.studies import router as studies_router
+from app.pages.agenda import agenda_page
 from app.pages.consultation_detail import consultation_detail_page
 from app.pages.consultations import consultations_page
 from app.pages.dashboard import dashboard_page
@@ -11,9 +16,18 @@ from app.pages.patient_detail import patient_detail_page
 from app.pages.patients import patients_page
 from app.pages.reports import reports_page
 from app.pages.settings import settings_page
+from app.state.agenda_state import AgendaState
+from app.utils import invalidation_bus
+
+# Endpoints de descarga en streaming (se montan sobre el backend de Reflex)
+api = FastAPI()
+api.include_router(studies_router)
+api.include_router(patients_router)
+api.include_router(reports_router)
 
 # Crear la aplicación
 app = rx.App(
+    api_transformer=api,
     theme=rx.theme(
         appearance="dark",
         accent_color="blue",
@@ -25,6 +39,9 @@ app = rx.App(
     ],
 )
 
+# Escuchar las invalidaciones de cache de los demás workers
+app.register_lifespan_task(invalidation_bus.start)
+
 # Agregar páginas
 app.add_page(login_page, route="/", title="Login - Historias Clínicas")
 
@@ -68,6 +85,14 @@ app.add_page(
     title="Detalle Consulta - Historias Clínicas",
 )
 
+# Agenda de turnos (próximas visitas)
+app.add_page(
+    agenda_page,
+    route="/agenda",
+    title="Agenda - Historias Clínicas",
+    on_load=AgendaState.go_today,
+)
+
 # Página de reportes y exportación
 app.add_page(
     reports_page,
@@ -82,9 +107,7 @@ app.add_page(
     title="Configuración - Historias Clínicas",
 )
 
-# Página de estudios médicos
-
-# NOTA: Los endpoints custom de FastAPI en Reflex requieren acceso a la instancia
-# FastAPI subyacente que no está disponible en tiempo de importación.
-# Por ahora, las descargas de archivos se manejan directamente desde los States
-# usando rx.download(data=bytes), que lee los archivos y los envía al navegador.
+# NOTA: Las descargas individuales se manejan desde los States con
+# rx.download(data=bytes). Las que pueden ser muy grandes (ZIP del paciente,
+# reporte de consultas, estudios) van por los routers de app/api, montados con
+# api_transformer.
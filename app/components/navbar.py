@@ -45,6 +45,15 @@ def navbar() -> rx.Component:
                     ),
                     href="/consultations",
                 ),
+                rx.link(
+                    rx.button(
+                        rx.icon("calendar_days", size=18),
+                        "Agenda",
+                        variant="ghost",
+                        color_scheme="gray",
+                    ),
+                    href="/agenda",
+                ),
                 rx.link(
                     rx.button(
                         rx.icon("flask_conical", size=18),
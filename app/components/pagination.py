@@ -0,0 +1,36 @@
+"""Controles de paginación compartidos por los listados"""
+
+import reflex as rx
+
+from app.config import COLORS
+
+
+def pagination_controls(page, total_pages, on_prev, on_next) -> rx.Component:
+    """Controles de paginación anterior/siguiente"""
+    return rx.hstack(
+        rx.button(
+            rx.icon("chevron-left", size=16),
+            "Anterior",
+            on_click=on_prev,
+            disabled=page == 0,
+            variant="soft",
+            size="1",
+        ),
+        rx.text(
+            f"Página {page + 1} de {total_pages}",
+            size="2",
+            color=COLORS["text_secondary"],
+        ),
+        rx.button(
+            "Siguiente",
+            rx.icon("chevron-right", size=16),
+            on_click=on_next,
+            disabled=page + 1 >= total_pages,
+            variant="soft",
+            size="1",
+        ),
+        spacing="3",
+        align="center",
+        justify="center",
+        width="100%",
+    )
@@ -116,6 +116,37 @@ def category_tab(category: str, label: str, count: int) -> rx.Component:
     )
 
 
+def files_pagination() -> rx.Component:
+    """Controles de paginación de la lista de archivos"""
+    return rx.hstack(
+        rx.button(
+            rx.icon("chevron-left", size=16),
+            "Anterior",
+            on_click=PatientFilesState.prev_files_page,
+            disabled=PatientFilesState.files_page == 0,
+            variant="soft",
+            size="1",
+        ),
+        rx.text(
+            f"Página {PatientFilesState.files_page + 1} de {PatientFilesState.files_total_pages}",
+            size="2",
+            color=COLORS["text_secondary"],
+        ),
+        rx.button(
+            "Siguiente",
+            rx.icon("chevron-right", size=16),
+            on_click=PatientFilesState.next_files_page,
+            disabled=PatientFilesState.files_page + 1 >= PatientFilesState.files_total_pages,
+            variant="soft",
+            size="1",
+        ),
+        spacing="3",
+        align="center",
+        justify="center",
+        width="100%",
+    )
+
+
 def patient_files_section() -> rx.Component:
     """Sección completa de archivos del paciente"""
     return rx.box(
@@ -147,6 +178,13 @@ def patient_files_section() -> rx.Component:
                         variant="soft",
                         color_scheme="green",
                     ),
+                    rx.button(
+                        rx.icon("download", size=16),
+                        "Descargar Todo",
+                        size="2",
+                        variant="soft",
+                        on_click=PatientFilesState.download_archive,
+                    ),
                     rx.button(
                         rx.icon("upload", size=16),
                         "Subir Archivos",
@@ -162,11 +200,11 @@ def patient_files_section() -> rx.Component:
             rx.hstack(
                 category_tab("all", "Todos", PatientFilesState.total_files),
                 category_tab(
-                    "patient", "Documentos del Paciente", PatientFilesState.patient_files.length()
+                    "patient", "Documentos del Paciente", PatientFilesState.patient_files_count
                 ),
-                category_tab("study", "Estudios Médicos", PatientFilesState.study_files.length()),
+                category_tab("study", "Estudios Médicos", PatientFilesState.study_files_count),
                 category_tab(
-                    "consultation", "Consultas", PatientFilesState.consultation_files.length()
+                    "consultation", "Consultas", PatientFilesState.consultation_files_count
                 ),
                 spacing="2",
                 wrap="wrap",
@@ -179,6 +217,11 @@ def patient_files_section() -> rx.Component:
                         PatientFilesState.filtered_files,
                         file_item,
                     ),
+                    rx.cond(
+                        PatientFilesState.files_total_pages > 1,
+                        files_pagination(),
+                        rx.box(),
+                    ),
                     spacing="3",
                     width="100%",
                 ),
@@ -0,0 +1,89 @@
+"""
+Listado virtualizado para listados largos (pacientes, consultas, estudios).
+
+Solo se dibujan las filas de la ventana actual (visibles + overscan) dentro de un
+contenedor con el alto total del listado, así la barra de scroll refleja todas
+las filas. Al hacer scroll el contenedor envía su scrollTop al estado, que pide
+la ventana correspondiente al servicio (ver app/utils/virtual_window.py).
+"""
+
+from collections.abc import Callable
+
+import reflex as rx
+from reflex.components.el.elements.typography import Div
+
+# Intervalo mínimo entre eventos de scroll enviados al backend (ms)
+SCROLL_THROTTLE_MS = 150
+
+
+def _scroll_top(event: rx.Var) -> tuple[rx.Var[int]]:
+    """Del evento de scroll solo se envía la posición vertical del contenedor"""
+    return (rx.Var(_js_expr=f"{event._js_expr}.target.scrollTop", _var_type=int),)
+
+
+class ScrollContainer(Div):
+    """div cuyo on_scroll recibe el scrollTop (px)"""
+
+    on_scroll: rx.EventHandler[_scroll_top]
+
+
+def virtual_list(
+    items: rx.Var,
+    render_item: Callable[[rx.Var], rx.Component],
+    *,
+    offset: rx.Var,
+    total: rx.Var,
+    on_scroll: rx.EventHandler,
+    row_height: int,
+    columns: int = 1,
+    container_id: str = "",
+    height: str = "70vh",
+) -> rx.Component:
+    """
+    Contenedor de scroll con la ventana de filas en su posición.
+
+    Args:
+        items: Elementos de la ventana actual (lista del estado)
+        render_item: Función que dibuja un elemento (como en rx.foreach)
+        offset: Índice del primer elemento de la ventana
+        total: Cantidad total de elementos del listado
+        on_scroll: Handler del estado que recibe el scrollTop (int)
+        row_height: Alto fijo de cada fila en px (incluye la separación)
+        columns: Elementos por fila
+        container_id: id del contenedor (para volver arriba al cambiar filtros)
+        height: Alto visible del contenedor
+    """
+    total_rows = (total + columns - 1) // columns
+    offset_rows = offset // columns
+
+    return ScrollContainer.create(
+        rx.box(
+            rx.grid(
+                rx.foreach(
+                    items,
+                    lambda item: rx.box(
+                        render_item(item),
+                        height=f"{row_height}px",
+                        overflow="hidden",
+                        padding_bottom="1rem",
+                        box_sizing="border-box",
+                    ),
+                ),
+                columns=str(columns),
+                spacing_x="4",
+                spacing_y="0",
+                position="absolute",
+                top=f"{offset_rows * row_height}px",
+                left="0",
+                right="0",
+            ),
+            position="relative",
+            height=f"{total_rows * row_height}px",
+            width="100%",
+        ),
+        id=container_id,
+        on_scroll=on_scroll.throttle(SCROLL_THROTTLE_MS),
+        height=height,
+        overflow_y="auto",
+        width="100%",
+    )
@@ -1,10 +1,53 @@
 """Configuración de la base de datos con SQLModel"""
 
-from typing import Generator
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import Generator, Optional
 
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.sql.dml import UpdateBase
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.config import DATABASE_URL
+from app.config import (
+    ASYNC_DATABASE_URL,
+    DATABASE_READ_URL,
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    READ_AFTER_WRITE_SECONDS,
+    READ_REPLICA_MAX_LAG_SECONDS,
+    READ_REPLICA_RETRY_SECONDS,
+)
+from app.utils import pool_metrics
+from app.utils.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+
+# Driver async equivalente a cada backend (ver get_async_engine)
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+    "mysql": "aiomysql",
+}
+
+# Cada cuánto se vuelve a consultar el retraso de la réplica (segundos)
+REPLICA_STATUS_SECONDS = 1
+
+# Retraso de la réplica de PostgreSQL (0 si aplicó todo lo recibido) y posición
+# del WAL hasta la que aplicó. NULL si no es réplica.
+_PG_REPLICA_STATUS = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END,"
+    " pg_last_wal_replay_lsn()::text"
+)
+
+# Posición actual del WAL en la primaria (cubre todo lo confirmado hasta ahora)
+_PG_CURRENT_LSN = text("SELECT pg_current_wal_lsn()::text")
 
 # Motor de base de datos
 # echo=True para ver las queries SQL en desarrollo (útil para debugging)
@@ -12,9 +55,55 @@ engine = create_engine(
     DATABASE_URL,
     echo=True,  # Cambiar a False en producción
     pool_pre_ping=True,  # Verifica conexiones antes de usarlas
-    pool_size=5,  # Número de conexiones en el pool
-    max_overflow=10,  # Conexiones adicionales si se necesitan
+    poolclass=InstrumentedQueuePool,  # Mide esperas y fugas (ver get_pool_stats)
+    pool_size=DB_POOL_SIZE,  # Número de conexiones en el pool
+    max_overflow=DB_MAX_OVERFLOW,  # Conexiones adicionales si se necesitan
+    pool_timeout=DB_POOL_TIMEOUT,  # Espera máxima por una conexión libre
 )
+pool_metrics.instrument(engine, "sync")
+
+# Última escritura confirmada en la primaria conocida por este proceso
+# (time.time()) y posición del WAL que la cubre. La posición se pide a la
+# primaria recién cuando hace falta (ver _write_lsn).
+_last_write = 0.0
+_last_write_lsn: Optional[int] = None
+_write_lsn_pending = False
+
+# Estado de la réplica: (consultado en, retraso, posición del WAL aplicada)
+_replica_status: Optional[tuple[float, float, Optional[int]]] = None
+_replica_down_until = 0.0
+_replica_lock = threading.Lock()
+
+
+def note_write(at: Optional[float] = None) -> None:
+    """
+    Registra una escritura en la primaria: las lecturas de read_session_scope()
+    no van a la réplica hasta que la tenga.
+
+    Lo llaman el commit de los motores de este proceso, el bus de invalidación
+    (escrituras de otros workers) y los procesos de reportes (la del worker que
+    los pidió). Escrituras que no pasan por ninguno de esos caminos no se ven.
+
+    Args:
+        at: Momento de la escritura (time.time()); por defecto, ahora
+    """
+    global _last_write, _write_lsn_pending
+    at = time.time() if at is None else at
+    if not at:
+        return
+    with _replica_lock:
+        _last_write = max(_last_write, at)
+        _write_lsn_pending = True
+
+
+def last_write_time() -> float:
+    """Momento de la última escritura registrada por este proceso (0 si ninguna)"""
+    return _last_write
+
+
+@event.listens_for(engine, "commit")
+def _on_commit(conn) -> None:
+    note_write()
 
 
 def create_db_and_tables() -> None:
@@ -29,13 +118,33 @@ def create_db_and_tables() -> None:
 
 def get_session() -> Generator[Session, None, None]:
     """
-    Generador de sesiones de base de datos.
-    Asegura que la sesión se cierre correctamente después de cada uso.
+    Dependencia de FastAPI para los endpoints de app/api.
+    La sesión se cierra cuando termina el request.
 
     Uso:
-        with get_session() as session:
-            # realizar operaciones con la sesión
-            pass
+        def endpoint(session: Session = Depends(get_session)): ...
+
+    En States, servicios y scripts usar session_scope().
+
+    Yields:
+        Session: Sesión de SQLModel para interactuar con la BD
+    """
+    with Session(engine) as session:
+        yield session
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Sesión de base de datos para un handler o una tarea; se cierra (y devuelve
+    la conexión al pool) al salir del bloque, aunque haya una excepción.
+
+    Uso:
+        with session_scope() as session:
+            patient = PatientService.get_patient_by_id(session, patient_id)
+
+    Conviene abrirla solo alrededor del acceso a la base: no mantenerla abierta
+    mientras se espera E/S de archivos u otros pools.
 
     Yields:
         Session: Sesión de SQLModel para interactuar con la BD
@@ -55,15 +164,245 @@ def init_db() -> None:
     print("✅ Base de datos inicializada correctamente")
 
 
+def get_async_database_url() -> str:
+    """
+    URL de la base para el motor async.
+
+    Usa ASYNC_DATABASE_URL si está definida; si no, la de DATABASE_URL con el
+    driver async del mismo backend (postgresql → asyncpg, sqlite → aiosqlite,
+    mysql → aiomysql).
+    """
+    if ASYNC_DATABASE_URL:
+        return ASYNC_DATABASE_URL
+
+    url = make_url(DATABASE_URL)
+    backend = url.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ValueError(f"No hay driver async conocido para {backend}; definir ASYNC_DATABASE_URL")
+
+    url = url.set(drivername=f"{backend}+{driver}")
+    # asyncpg no entiende sslmode (Render/Fly la agregan a la URL): usa ssl
+    if driver == "asyncpg" and "sslmode" in url.query:
+        query = dict(url.query)
+        query["ssl"] = query.pop("sslmode")
+        url = url.set(query=query)
+    return url.render_as_string(hide_password=False)
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    """
+    Motor async de la aplicación (se crea la primera vez que se usa).
+
+    Lo usan los handlers async de los States para que las esperas de la base no
+    bloqueen el event loop del worker: mientras una consulta espera, el worker
+    atiende eventos de otros usuarios. Los scripts y servicios de escritura
+    siguen usando el motor sincrónico.
+    """
+    async_engine = create_async_engine(
+        get_async_database_url(),
+        echo=engine.echo,
+        pool_pre_ping=True,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    pool_metrics.instrument(async_engine.sync_engine, "async")
+    event.listen(async_engine.sync_engine, "commit", _on_commit)
+    return async_engine
+
+
+@asynccontextmanager
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """
+    Sesión async de base de datos; se cierra al salir del bloque.
+
+    Uso:
+        async with get_async_session() as session:
+            rows = await PatientService.get_patient_rows_async(session)
+
+    Los objetos no expiran al hacer commit, pero las relaciones no se cargan
+    en forma perezosa: las lecturas async devuelven filas o DTOs.
+
+    Yields:
+        AsyncSession: Sesión async de SQLModel
+    """
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+
 # Función auxiliar para obtener una sesión directa (sin generador)
 def get_db_session() -> Session:
     """
     Obtiene una sesión de base de datos directa.
 
     IMPORTANTE: Debes cerrar manualmente la sesión con session.close()
-    o usar dentro de un context manager.
+    o usar dentro de un context manager (preferir session_scope()).
 
     Returns:
         Session: Sesión de SQLModel
     """
     return Session(engine)
+
+
+@lru_cache(maxsize=1)
+def get_read_engine() -> Optional[Engine]:
+    """Motor de la réplica de DATABASE_READ_URL (None si no está configurada)"""
+    if not DATABASE_READ_URL:
+        return None
+    read_engine = create_engine(
+        DATABASE_READ_URL,
+        echo=engine.echo,
+        pool_pre_ping=True,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    pool_metrics.instrument(read_engine, "read")
+    return read_engine
+
+
+def _parse_lsn(lsn: str) -> int:
+    """Convierte una posición del WAL de PostgreSQL ("16/B374D848") en un entero comparable"""
+    high, low = lsn.split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+def _write_lsn() -> Optional[int]:
+    """
+    Posición del WAL de la primaria que cubre las escrituras registradas con
+    note_write() (None si la primaria no es PostgreSQL o no responde).
+
+    Se consulta después del commit, así pg_current_wal_lsn() ya incluye el
+    registro de commit; mientras no haya escrituras nuevas se reutiliza.
+    """
+    global _last_write_lsn, _write_lsn_pending
+    if engine.dialect.name != "postgresql":
+        return None
+    with _replica_lock:
+        if not _write_lsn_pending:
+            return _last_write_lsn
+        _write_lsn_pending = False
+
+    try:
+        with engine.connect() as conn:
+            lsn = _parse_lsn(conn.execute(_PG_CURRENT_LSN).scalar_one())
+    except Exception as e:
+        print(f"⚠️ No se pudo leer la posición del WAL de la primaria ({e})")
+        with _replica_lock:
+            _write_lsn_pending = True
+        return None
+
+    with _replica_lock:
+        _last_write_lsn = max(_last_write_lsn or 0, lsn)
+        return _last_write_lsn
+
+
+def _replica_state(read_engine: Engine) -> Optional[tuple[float, Optional[int]]]:
+    """
+    Retraso de la réplica en segundos y posición del WAL aplicada (None si no se
+    conoce: SQLite, MySQL o una base que no es réplica).
+
+    Se consulta como mucho cada REPLICA_STATUS_SECONDS. Si la réplica no responde
+    devuelve None y no se vuelve a intentar por READ_REPLICA_RETRY_SECONDS.
+    """
+    global _replica_status, _replica_down_until
+    now = time.monotonic()
+    with _replica_lock:
+        if now < _replica_down_until:
+            return None
+        if _replica_status and now - _replica_status[0] < REPLICA_STATUS_SECONDS:
+            return _replica_status[1:]
+
+    try:
+        with read_engine.connect() as conn:
+            if read_engine.dialect.name == "postgresql":
+                lag, replayed = conn.execute(_PG_REPLICA_STATUS).one()
+            else:
+                conn.execute(text("SELECT 1"))
+                lag, replayed = 0, None
+    except Exception as e:
+        print(f"⚠️ Réplica de lectura no disponible ({e}); se lee de la primaria")
+        with _replica_lock:
+            _replica_status = None
+            _replica_down_until = now + READ_REPLICA_RETRY_SECONDS
+        return None
+
+    state = (float(lag or 0), _parse_lsn(replayed) if replayed is not None else None)
+    with _replica_lock:
+        _replica_status = (now, *state)
+    return state
+
+
+def _use_replica() -> bool:
+    """Si las lecturas pueden ir a la réplica en este momento"""
+    read_engine = get_read_engine()
+    if read_engine is None:
+        return False
+    state = _replica_state(read_engine)
+    if state is None:
+        return False
+
+    lag, replayed = state
+    if lag > READ_REPLICA_MAX_LAG_SECONDS:
+        return False
+    # Leer lo propio: en PostgreSQL se compara la posición del WAL que cubre la
+    # última escritura con la aplicada por la réplica (sin relojes de por medio)
+    if replayed is not None:
+        write_lsn = _write_lsn()
+        if write_lsn is not None:
+            return replayed >= write_lsn
+    # Sin posiciones del WAL: se espera la ventana más el retraso (medido con el
+    # reloj de este host desde la escritura, no contra el de la base)
+    return time.time() - _last_write >= READ_AFTER_WRITE_SECONDS + lag
+
+
+class RoutingSession(Session):
+    """
+    Sesión que lee de la réplica y escribe en la primaria.
+
+    Los flush y las sentencias INSERT/UPDATE/DELETE van a la primaria; desde la
+    primera escritura la sesión sigue en la primaria, así lee lo que escribió.
+    """
+
+    def __init__(self, read_engine: Engine, **kwargs):
+        super().__init__(engine, **kwargs)
+        self._read_engine: Optional[Engine] = read_engine
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self._read_engine = None
+        if self._read_engine is None:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return self._read_engine
+
+
+def reads_from_replica(session: Session) -> bool:
+    """Si la sesión lee de la réplica: lo leído puede estar atrasado y no se cachea"""
+    return isinstance(session, RoutingSession) and session._read_engine is not None
+
+
+@contextmanager
+def read_session_scope() -> Iterator[Session]:
+    """
+    Sesión para lecturas pesadas que toleran unos segundos de retraso (reportes,
+    exportaciones, tablero y estadísticas); se cierra al salir del bloque.
+
+    Usa la réplica de DATABASE_READ_URL si está configurada, responde, su
+    retraso no supera READ_REPLICA_MAX_LAG_SECONDS y ya tiene las escrituras
+    registradas con note_write(); si no, la primaria (igual que session_scope()).
+    Con PostgreSQL eso se decide por posición del WAL; con otros motores, por
+    READ_AFTER_WRITE_SECONDS desde la escritura.
+
+    Para probar en local alcanza con dos archivos SQLite (DATABASE_READ_URL
+    apuntando a una copia) o dos instancias de PostgreSQL.
+
+    Yields:
+        Session: RoutingSession sobre la réplica o Session sobre la primaria
+    """
+    session = RoutingSession(get_read_engine()) if _use_replica() else Session(engine)
+    with session:
+        yield session
@@ -1,11 +1,13 @@
 """Modelos de base de datos"""
 
+from app.models.cache_invalidation import CacheInvalidation
 from app.models.consultation import Consultation
 from app.models.consultation_file import ConsultationFile
 from app.models.medical_study import MedicalStudy, StudyType
 from app.models.medication import Medication
 from app.models.patient import Patient
 from app.models.patient_file import FileCategory, PatientFile
+from app.models.patient_summary import PatientSummary
 from app.models.study_file import StudyFile
 
 __all__ = [
@@ -15,7 +17,9 @@ __all__ = [
     "MedicalStudy",
     "StudyType",
     "PatientFile",
+    "PatientSummary",
     "StudyFile",
     "ConsultationFile",
+    "CacheInvalidation",
     "FileCategory",
 ]
@@ -0,0 +1,31 @@
+"""Modelo del registro de invalidaciones de cache entre workers"""
+
+from datetime import UTC, datetime
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class CacheInvalidation(SQLModel, table=True):
+    """
+    Aviso de invalidación publicado por un worker (ver app/utils/invalidation_bus.py).
+
+    Solo se usa cuando la base no es PostgreSQL: los demás workers leen las filas
+    nuevas por ID y descartan sus caches locales. Las filas viejas se borran solas.
+    """
+
+    __tablename__ = "cache_invalidations"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    # Worker que publicó el aviso (no lo vuelve a aplicar)
+    origin: str = Field(max_length=32)
+
+    # Cache afectada y clave dentro de ella (ej: "patient", "42")
+    topic: str = Field(max_length=50)
+    key: Optional[str] = Field(default=None, max_length=100)
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC), index=True)
+
+    def __repr__(self) -> str:
+        return f"<CacheInvalidation {self.topic}:{self.key} from={self.origin}>"
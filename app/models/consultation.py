@@ -3,6 +3,7 @@
 from datetime import UTC, date, datetime
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
@@ -15,6 +16,10 @@ class Consultation(SQLModel, table=True):
     """
 
     __tablename__ = "consultations"
+    __table_args__ = (
+        # Última consulta por paciente (filtros tipo "última sistólica > 140")
+        Index("ix_consultations_patient_id_consultation_date", "patient_id", "consultation_date"),
+    )
 
     # ID y relación con paciente
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -32,6 +37,13 @@ class Consultation(SQLModel, table=True):
     blood_pressure: Optional[str] = Field(
         default=None, max_length=20, description="Presión arterial (ej: 120/80)"
     )
+    # Valores numéricos derivados de blood_pressure (se completan al guardar)
+    bp_systolic: Optional[int] = Field(
+        default=None, index=True, description="Presión sistólica (mmHg)"
+    )
+    bp_diastolic: Optional[int] = Field(
+        default=None, index=True, description="Presión diastólica (mmHg)"
+    )
     heart_rate: Optional[int] = Field(
         default=None, description="Frecuencia cardíaca (pulsaciones por minuto)"
     )
@@ -45,9 +57,24 @@ class Consultation(SQLModel, table=True):
 
     # Próxima visita
     next_visit: Optional[date] = Field(
-        default=None, description="Fecha programada para próxima visita"
+        default=None, index=True, description="Fecha programada para próxima visita"
     )
 
+    @staticmethod
+    def compute_bmi(weight: Optional[float], height: Optional[float]) -> Optional[float]:
+        """
+        Calcula el IMC a partir de peso (kg) y altura (cm).
+
+        Permite calcularlo también sobre filas proyectadas (sin el modelo completo).
+
+        Returns:
+            float: IMC calculado o None si no hay datos suficientes
+        """
+        if weight and height:
+            height_m = height / 100  # Convertir cm a metros
+            return round(weight / (height_m**2), 2)
+        return None
+
     @property
     def bmi(self) -> Optional[float]:
         """
@@ -56,10 +83,7 @@ class Consultation(SQLModel, table=True):
         Returns:
             float: IMC calculado o None si no hay datos suficientes
         """
-        if self.weight and self.height:
-            height_m = self.height / 100  # Convertir cm a metros
-            return round(self.weight / (height_m**2), 2)
-        return None
+        return Consultation.compute_bmi(self.weight, self.height)
 
     @property
     def bmi_category(self) -> Optional[str]:
@@ -69,7 +93,16 @@ class Consultation(SQLModel, table=True):
         Returns:
             str: Categoría del IMC o None
         """
-        bmi = self.bmi
+        return Consultation.compute_bmi_category(self.bmi)
+
+    @staticmethod
+    def compute_bmi_category(bmi: Optional[float]) -> Optional[str]:
+        """
+        Categoría OMS de un IMC ya calculado (también para filas proyectadas).
+
+        Returns:
+            str: Categoría del IMC o None
+        """
         if bmi is None:
             return None
 
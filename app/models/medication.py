@@ -3,6 +3,7 @@
 from datetime import UTC, date, datetime
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
@@ -15,6 +16,15 @@ class Medication(SQLModel, table=True):
     """
 
     __tablename__ = "medications"
+    __table_args__ = (
+        # Consultas de medicación en curso / por vencer
+        Index(
+            "ix_medications_patient_id_is_active_end_date",
+            "patient_id",
+            "is_active",
+            "end_date",
+        ),
+    )
 
     # ID y relaciones
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -44,6 +44,11 @@ class PatientFile(SQLModel, table=True):
     description: Optional[str] = Field(default=None)  # Descripción opcional
     uploaded_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
 
+    # Almacenamiento en frío: file_path apunta al archivo comprimido (.gz/.zst)
+    content_encoding: Optional[str] = Field(default=None)  # gzip, zstd o identity
+    stored_size: Optional[int] = Field(default=None)  # Tamaño en disco si está comprimido
+    last_accessed_at: Optional[datetime] = Field(default=None, index=True)
+
     # Relationship (opcional, si quieres acceso bidireccional)
     # patient: Optional["Patient"] = Relationship(back_populates="files")
 
@@ -0,0 +1,46 @@
+"""Modelo de resumen materializado por paciente"""
+
+from datetime import UTC, datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger
+from sqlmodel import Field, SQLModel
+
+
+class PatientSummary(SQLModel, table=True):
+    """
+    Resumen agregado de un paciente (una fila por paciente).
+
+    Se mantiene desde los servicios en cada escritura para que los listados
+    y el encabezado del detalle no tengan que recorrer consultas y estudios.
+    """
+
+    __tablename__ = "patient_summary"
+
+    patient_id: int = Field(foreign_key="patients.id", primary_key=True)
+
+    # Consultas
+    consultation_count: int = Field(default=0)
+    last_consultation_date: Optional[datetime] = Field(default=None, index=True)
+
+    # Estudios
+    study_count: int = Field(default=0)
+    pending_study_count: int = Field(default=0)
+    critical_study_count: int = Field(default=0)
+
+    # Archivos adjuntos (patient_files + study_files + consultation_files)
+    total_attachment_bytes: int = Field(default=0, sa_type=BigInteger)
+
+    # Metadata
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+    @property
+    def total_attachment_mb(self) -> float:
+        """Tamaño total de adjuntos en MB"""
+        return round(self.total_attachment_bytes / (1024 * 1024), 2)
+
+    def __repr__(self) -> str:
+        return (
+            f"<PatientSummary patient={self.patient_id} "
+            f"consultations={self.consultation_count} studies={self.study_count}>"
+        )
@@ -0,0 +1,180 @@
+"""Página de agenda de turnos (próximas visitas)"""
+
+import reflex as rx
+
+from app.components.navbar import navbar
+from app.config import COLORS
+from app.state.agenda_state import AgendaState
+
+
+def appointment_row(appointment: dict) -> rx.Component:
+    """Fila de turno de la agenda"""
+    return rx.card(
+        rx.hstack(
+            rx.vstack(
+                rx.text(
+                    appointment["next_visit"],
+                    font_weight="600",
+                    color=COLORS["primary"],
+                ),
+                spacing="1",
+                align_items="start",
+                min_width="110px",
+            ),
+            rx.vstack(
+                rx.hstack(
+                    rx.icon("user", size=16, color=COLORS["text_secondary"]),
+                    rx.text(
+                        appointment["patient_name"],
+                        font_weight="600",
+                        color=COLORS["text"],
+                    ),
+                    rx.cond(
+                        appointment["patient_dni"] != "",
+                        rx.text(
+                            f"(DNI: {appointment['patient_dni']})",
+                            size="2",
+                            color=COLORS["text_secondary"],
+                        ),
+                    ),
+                    spacing="2",
+                    align="center",
+                ),
+                rx.text(
+                    f"Última consulta: {appointment['last_consultation_date']} - {appointment['reason']}",
+                    size="2",
+                    color=COLORS["text_secondary"],
+                ),
+                spacing="1",
+                align_items="start",
+            ),
+            rx.spacer(),
+            rx.cond(
+                appointment["patient_phone"] != "",
+                rx.hstack(
+                    rx.icon("phone", size=16, color=COLORS["text_secondary"]),
+                    rx.text(appointment["patient_phone"], size="2"),
+                    spacing="2",
+                ),
+            ),
+            rx.link(
+                rx.button(
+                    rx.icon("eye", size=16),
+                    size="2",
+                    variant="soft",
+                ),
+                href=f"/patients/{appointment['patient_id']}",
+            ),
+            width="100%",
+            align="center",
+            spacing="4",
+        ),
+        width="100%",
+    )
+
+
+def agenda_page() -> rx.Component:
+    """Página de agenda diaria/semanal"""
+    return rx.box(
+        navbar(),
+        rx.container(
+            rx.vstack(
+                # Header
+                rx.hstack(
+                    rx.heading(
+                        "Agenda de Turnos",
+                        size="8",
+                        color=COLORS["text"],
+                    ),
+                    rx.spacer(),
+                    rx.radio(
+                        ["Día", "Semana"],
+                        default_value="Día",
+                        on_change=AgendaState.set_view_mode,
+                        direction="row",
+                    ),
+                    width="100%",
+                    align="center",
+                    margin_bottom="1rem",
+                ),
+                # Navegación de fechas
+                rx.hstack(
+                    rx.button(
+                        rx.icon("chevron_left", size=18),
+                        on_click=AgendaState.previous_period,
+                        variant="soft",
+                    ),
+                    rx.input(
+                        type="date",
+                        value=AgendaState.selected_date,
+                        on_change=AgendaState.set_selected_date,
+                        width="180px",
+                    ),
+                    rx.button(
+                        rx.icon("chevron_right", size=18),
+                        on_click=AgendaState.next_period,
+                        variant="soft",
+                    ),
+                    rx.button(
+                        "Hoy",
+                        on_click=AgendaState.go_today,
+                        variant="outline",
+                        color_scheme="gray",
+                    ),
+                    rx.spacer(),
+                    rx.text(
+                        AgendaState.period_label,
+                        font_weight="600",
+                        color=COLORS["text_secondary"],
+                    ),
+                    width="100%",
+                    align="center",
+                    spacing="3",
+                    margin_bottom="1.5rem",
+                ),
+                rx.cond(
+                    AgendaState.error_message != "",
+                    rx.callout(
+                        AgendaState.error_message,
+                        icon="triangle_alert",
+                        color_scheme="red",
+                        width="100%",
+                    ),
+                ),
+                # Lista de turnos
+                rx.cond(
+                    AgendaState.appointments.length() > 0,
+                    rx.vstack(
+                        rx.foreach(AgendaState.appointments, appointment_row),
+                        spacing="3",
+                        width="100%",
+                    ),
+                    rx.box(
+                        rx.vstack(
+                            rx.icon("calendar_x", size=48, color=COLORS["text_secondary"]),
+                            rx.heading(
+                                "No hay turnos programados",
+                                size="6",
+                                color=COLORS["text"],
+                            ),
+                            rx.text(
+                                "Las próximas visitas se cargan desde las consultas",
+                                color=COLORS["text_secondary"],
+                            ),
+                            spacing="4",
+                            align_items="center",
+                        ),
+                        padding="4rem",
+                        text_align="center",
+                        width="100%",
+                    ),
+                ),
+                spacing="4",
+                padding_y="2rem",
+                width="100%",
+            ),
+            max_width="1000px",
+        ),
+        background=COLORS["background"],
+        min_height="100vh",
+    )
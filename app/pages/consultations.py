@@ -4,11 +4,16 @@ import reflex as rx
 
 from app.components.navbar import navbar
 from app.components.patient_selector import patient_selector_with_label
+from app.components.virtual_list import virtual_list
 from app.config import COLORS
-from app.state.consultation_state import ConsultationState
+from app.state.consultation_state import (
+    CONSULTATION_ROW_HEIGHT,
+    CONSULTATIONS_CONTAINER_ID,
+    ConsultationState,
+)
 
 
-def consultation_card(consultation: dict) -> rx.Component:
+def consultation_card(consultation: rx.Var) -> rx.Component:
     """Tarjeta de consulta médica"""
     return rx.card(
         rx.vstack(
@@ -17,22 +22,22 @@ def consultation_card(consultation: dict) -> rx.Component:
                 rx.icon("calendar_check", size=24, color=COLORS["primary"]),
                 rx.vstack(
                     rx.text(
-                        consultation["consultation_date"],
+                        consultation.consultation_date,
                         font_weight="600",
                         color=COLORS["text"],
                     ),
                     rx.hstack(
                         rx.icon("user", size=14, color=COLORS["text_secondary"]),
                         rx.text(
-                            consultation["patient_name"],
+                            consultation.patient_name,
                             font_size="0.875rem",
                             color=COLORS["text_secondary"],
                             font_weight="500",
                         ),
                         rx.cond(
-                            consultation["patient_dni"] != "",
+                            consultation.patient_dni != "",
                             rx.text(
-                                f"(DNI: {consultation['patient_dni']})",
+                                f"(DNI: {consultation.patient_dni})",
                                 font_size="0.875rem",
                                 color=COLORS["text_secondary"],
                             ),
@@ -45,10 +50,10 @@ def consultation_card(consultation: dict) -> rx.Component:
                 rx.spacer(),
                 # Badge de cantidad de archivos
                 rx.cond(
-                    consultation["has_files"],
+                    consultation.has_files,
                     rx.badge(
                         rx.icon("paperclip", size=14),
-                        consultation["file_count_text"],
+                        consultation.file_count_text,
                         color_scheme="blue",
                         variant="soft",
                     ),
@@ -59,7 +64,7 @@ def consultation_card(consultation: dict) -> rx.Component:
                         rx.icon("eye", size=16),
                         size="2",
                         variant="soft",
-                        on_click=lambda: ConsultationState.view_consultation(consultation["id"]),
+                        on_click=lambda: ConsultationState.view_consultation(consultation.id),
                     ),
                     rx.button(
                         rx.icon("pencil", size=16),
@@ -67,7 +72,7 @@ def consultation_card(consultation: dict) -> rx.Component:
                         variant="soft",
                         color_scheme="blue",
                         on_click=lambda: ConsultationState.open_edit_consultation_modal(
-                            consultation["id"]
+                            consultation.id
                         ),
                     ),
                     rx.button(
@@ -75,7 +80,7 @@ def consultation_card(consultation: dict) -> rx.Component:
                         size="2",
                         variant="soft",
                         color_scheme="red",
-                        on_click=lambda: ConsultationState.delete_consultation(consultation["id"]),
+                        on_click=lambda: ConsultationState.delete_consultation(consultation.id),
                     ),
                     spacing="2",
                 ),
@@ -91,14 +96,14 @@ def consultation_card(consultation: dict) -> rx.Component:
                     font_size="0.875rem",
                 ),
                 rx.text(
-                    consultation["reason"],
+                    consultation.reason,
                     color=COLORS["text"],
                 ),
                 padding_y="0.5rem",
             ),
             # Diagnóstico si existe
             rx.cond(
-                consultation["diagnosis"] != "",
+                consultation.diagnosis != "",
                 rx.box(
                     rx.text(
                         "Diagnóstico:",
@@ -107,7 +112,7 @@ def consultation_card(consultation: dict) -> rx.Component:
                         font_size="0.875rem",
                     ),
                     rx.text(
-                        consultation["diagnosis"],
+                        consultation.diagnosis,
                         color=COLORS["text"],
                     ),
                     padding_y="0.5rem",
@@ -115,7 +120,7 @@ def consultation_card(consultation: dict) -> rx.Component:
             ),
             # Signos vitales badge
             rx.cond(
-                consultation["has_vital_signs"],
+                consultation.has_vital_signs,
                 rx.hstack(
                     rx.badge(
                         rx.icon("heart_pulse", size=14),
@@ -123,9 +128,9 @@ def consultation_card(consultation: dict) -> rx.Component:
                         color_scheme="green",
                     ),
                     rx.cond(
-                        consultation["bmi"] != "",
+                        consultation.bmi != "",
                         rx.badge(
-                            f"IMC: {consultation['bmi']} - {consultation['bmi_category']}",
+                            f"IMC: {consultation.bmi} - {consultation.bmi_category}",
                             color_scheme="blue",
                         ),
                     ),
@@ -134,10 +139,10 @@ def consultation_card(consultation: dict) -> rx.Component:
             ),
             # Próxima visita si existe
             rx.cond(
-                consultation["next_visit"] != "",
+                consultation.next_visit != "",
                 rx.box(
                     rx.text(
-                        f"Próxima visita: {consultation['next_visit']}",
+                        f"Próxima visita: {consultation.next_visit}",
                         font_size="0.875rem",
                         color=COLORS["warning"],
                         font_weight="500",
@@ -576,7 +581,7 @@ def consultations_page() -> rx.Component:
                                 spacing="2",
                             ),
                             rx.heading(
-                                ConsultationState.consultations.length().to_string(),
+                                ConsultationState.consultations_total.to_string(),
                                 size="7",
                                 color=COLORS["text"],
                             ),
@@ -608,14 +613,15 @@ def consultations_page() -> rx.Component:
                 ),
                 # Lista de consultas
                 rx.cond(
-                    ConsultationState.consultations.length() > 0,
-                    rx.vstack(
-                        rx.foreach(
-                            ConsultationState.consultations,
-                            consultation_card,
-                        ),
-                        spacing="4",
-                        width="100%",
+                    ConsultationState.consultations_total > 0,
+                    virtual_list(
+                        ConsultationState.consultations,
+                        consultation_card,
+                        offset=ConsultationState.consultations_offset,
+                        total=ConsultationState.consultations_total,
+                        on_scroll=ConsultationState.scroll_consultations,
+                        row_height=CONSULTATION_ROW_HEIGHT,
+                        container_id=CONSULTATIONS_CONTAINER_ID,
                     ),
                     rx.box(
                         rx.vstack(
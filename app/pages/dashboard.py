@@ -5,7 +5,7 @@ from sqlmodel import func, select
 
 from app.components.navbar import navbar
 from app.config import COLORS
-from app.database import get_session
+from app.database import read_session_scope
 from app.models import MedicalStudy, Patient
 
 
@@ -32,8 +32,8 @@ class DashboardState(rx.State):
         """Se ejecuta al cargar la página"""
         from datetime import datetime
 
-        session = next(get_session())
-        try:
+        # Agregados de solo lectura: pueden ir a la réplica
+        with read_session_scope() as session:
             # ===== ESTADÍSTICAS PRINCIPALES =====
 
             # Total de pacientes
@@ -143,9 +143,6 @@ class DashboardState(rx.State):
 
             self.studies_by_type = sorted(study_counts, key=lambda x: x["count"], reverse=True)
 
-        finally:
-            session.close()
-
     def _get_patient_name(self, session, patient_id: int) -> str:
         """Obtiene el nombre del paciente"""
         patient = session.get(Patient, patient_id)
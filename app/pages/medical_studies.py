@@ -4,9 +4,14 @@ import reflex as rx
 
 from app.components.navbar import navbar
 from app.components.patient_selector import patient_selector_with_label
+from app.components.virtual_list import virtual_list
 from app.config import COLORS
 from app.models import StudyType
-from app.state.medical_study_state import MedicalStudyState
+from app.state.medical_study_state import (
+    STUDIES_CONTAINER_ID,
+    STUDY_ROW_HEIGHT,
+    MedicalStudyState,
+)
 
 
 def study_type_badge(study_type: str) -> rx.Component:
@@ -29,10 +34,10 @@ def study_type_badge(study_type: str) -> rx.Component:
     )
 
 
-def file_count_badge(study) -> rx.Component:
+def file_count_badge(study: rx.Var) -> rx.Component:
     """Badge para mostrar el conteo de archivos de un estudio"""
-    # Obtener el conteo desde el diccionario del estado
-    file_count = MedicalStudyState.studies_file_count[study.id]
+    # El conteo viene en la fila del listado (StudyQueryService)
+    file_count = study.file_count
     return rx.cond(
         file_count,
         rx.badge(
@@ -123,7 +128,7 @@ def study_files_section() -> rx.Component:
     )
 
 
-def study_card(study) -> rx.Component:
+def study_card(study: rx.Var) -> rx.Component:
     """Tarjeta de estudio médico"""
     return rx.card(
         rx.vstack(
@@ -134,7 +139,7 @@ def study_card(study) -> rx.Component:
                 # Badge de cantidad de archivos
                 file_count_badge(study),
                 rx.text(
-                    study.study_date.to_string(),
+                    study.study_date,
                     size="2",
                     color=COLORS["text_secondary"],
                 ),
@@ -143,18 +148,17 @@ def study_card(study) -> rx.Component:
             # Nombre del estudio
             rx.heading(study.study_name, size="4", margin_top="0.5rem"),
             # Información del paciente
-            # Información del paciente
             rx.cond(
-                MedicalStudyState.studies_patient_info[study.id]["name"],
+                study.patient_name,
                 rx.hstack(
                     rx.icon("user", size=16, color=COLORS["primary"]),
                     rx.text(
-                        MedicalStudyState.studies_patient_info[study.id]["name"],
+                        study.patient_name,
                         size="2",
                         weight="medium",
                     ),
                     rx.text(
-                        f"(DNI: {MedicalStudyState.studies_patient_info[study.id]['dni']})",
+                        "(DNI: " + study.patient_dni + ")",
                         size="2",
                         color=COLORS["text_secondary"],
                     ),
@@ -177,7 +181,7 @@ def study_card(study) -> rx.Component:
                     rx.hstack(
                         rx.icon("user-round", size=16),
                         rx.text(
-                            f"Dr/a. {study.requesting_doctor}",
+                            "Dr/a. " + study.requesting_doctor,
                             size="2",
                         ),
                     ),
@@ -197,7 +201,7 @@ def study_card(study) -> rx.Component:
             ),
             # Resultados (preview)
             rx.cond(
-                study.results,
+                study.results_preview,
                 rx.box(
                     rx.text(
                         "Resultados:",
@@ -205,14 +209,7 @@ def study_card(study) -> rx.Component:
                         weight="bold",
                         color=COLORS["text_secondary"],
                     ),
-                    rx.text(
-                        rx.cond(
-                            study.results.length() > 150,
-                            study.results[:150] + "...",
-                            study.results,
-                        ),
-                        size="2",
-                    ),
+                    rx.text(study.results_preview, size="2"),
                     padding_top="0.5rem",
                 ),
                 rx.box(),
@@ -786,7 +783,7 @@ def medical_studies_page() -> rx.Component:
                                 ),
                             ),
                             rx.heading(
-                                MedicalStudyState.studies.length(),
+                                MedicalStudyState.studies_total,
                                 size="6",
                             ),
                             spacing="2",
@@ -842,18 +839,44 @@ def medical_studies_page() -> rx.Component:
                         placeholder="Todos",
                         on_change=MedicalStudyState.load_studies_by_type,
                     ),
+                    rx.checkbox(
+                        "Pendientes",
+                        checked=MedicalStudyState.filter_pending,
+                        on_change=MedicalStudyState.toggle_filter_pending,
+                    ),
+                    rx.checkbox(
+                        "Críticos",
+                        checked=MedicalStudyState.filter_critical,
+                        on_change=MedicalStudyState.toggle_filter_critical,
+                    ),
+                    rx.spacer(),
+                    rx.text("Desde:", size="2"),
+                    rx.input(
+                        type="date",
+                        value=MedicalStudyState.filter_date_from,
+                        on_change=MedicalStudyState.set_filter_date_from,
+                    ),
+                    rx.text("Hasta:", size="2"),
+                    rx.input(
+                        type="date",
+                        value=MedicalStudyState.filter_date_to,
+                        on_change=MedicalStudyState.set_filter_date_to,
+                    ),
                     width="100%",
                     spacing="3",
+                    align="center",
                 ),
                 # Lista de estudios
                 rx.cond(
-                    MedicalStudyState.studies.length() > 0,
-                    rx.box(
-                        rx.foreach(
-                            MedicalStudyState.studies,
-                            study_card,
-                        ),
-                        width="100%",
+                    MedicalStudyState.studies_total > 0,
+                    virtual_list(
+                        MedicalStudyState.studies,
+                        study_card,
+                        offset=MedicalStudyState.studies_offset,
+                        total=MedicalStudyState.studies_total,
+                        on_scroll=MedicalStudyState.scroll_studies,
+                        row_height=STUDY_ROW_HEIGHT,
+                        container_id=STUDIES_CONTAINER_ID,
                     ),
                     rx.callout(
                         "No hay estudios médicos registrados",
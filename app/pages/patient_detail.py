@@ -3,6 +3,7 @@
 import reflex as rx
 
 from app.components.attachments import attachments_list_component
+from app.components.pagination import pagination_controls
 from app.components.patient_files import patient_files_section, upload_modal
 from app.config import COLORS
 from app.state.patient_detail_state import PatientDetailState
@@ -235,7 +236,7 @@ def medical_info_card() -> rx.Component:
     )
 
 
-def consultation_item(consultation) -> rx.Component:
+def consultation_item(consultation: rx.Var) -> rx.Component:
     """Item de consulta en el timeline"""
     return rx.card(
         rx.vstack(
@@ -254,7 +255,7 @@ def consultation_item(consultation) -> rx.Component:
             ),
             # Diagnóstico
             rx.cond(
-                consultation.diagnosis,
+                consultation.diagnosis != "",
                 rx.vstack(
                     rx.text("Diagnóstico:", size="2", weight="bold"),
                     rx.text(consultation.diagnosis, size="2", color=COLORS["text_secondary"]),
@@ -266,7 +267,7 @@ def consultation_item(consultation) -> rx.Component:
             ),
             # Tratamiento
             rx.cond(
-                consultation.treatment,
+                consultation.treatment != "",
                 rx.vstack(
                     rx.text("Tratamiento:", size="2", weight="bold"),
                     rx.text(consultation.treatment, size="2", color=COLORS["text_secondary"]),
@@ -281,7 +282,7 @@ def consultation_item(consultation) -> rx.Component:
                 consultation.has_vital_signs,
                 rx.hstack(
                     rx.cond(
-                        consultation.blood_pressure,
+                        consultation.blood_pressure != "",
                         rx.badge(
                             f"PA: {consultation.blood_pressure}",
                             variant="soft",
@@ -290,7 +291,7 @@ def consultation_item(consultation) -> rx.Component:
                         rx.box(),
                     ),
                     rx.cond(
-                        consultation.temperature,
+                        consultation.temperature != "",
                         rx.badge(
                             f"T: {consultation.temperature}°C",
                             variant="soft",
@@ -299,7 +300,7 @@ def consultation_item(consultation) -> rx.Component:
                         rx.box(),
                     ),
                     rx.cond(
-                        consultation.bmi,
+                        consultation.bmi != "",
                         rx.badge(
                             f"IMC: {consultation.bmi}",
                             variant="soft",
@@ -328,7 +329,7 @@ def consultations_timeline() -> rx.Component:
                 rx.heading("Historial de Consultas", size="5"),
                 rx.spacer(),
                 rx.badge(
-                    f"{PatientDetailState.consultations.length()} consultas",
+                    f"{PatientDetailState.total_consultations} consultas",
                     color_scheme="blue",
                 ),
                 width="100%",
@@ -339,13 +340,23 @@ def consultations_timeline() -> rx.Component:
                 PatientDetailState.consultations.length() > 0,
                 rx.vstack(
                     rx.foreach(PatientDetailState.consultations, consultation_item),
+                    pagination_controls(
+                        PatientDetailState.consultations_page,
+                        PatientDetailState.consultations_total_pages,
+                        PatientDetailState.prev_consultations_page,
+                        PatientDetailState.next_consultations_page,
+                    ),
                     spacing="3",
                     width="100%",
                 ),
-                rx.text(
-                    "No hay consultas registradas",
-                    size="3",
-                    color=COLORS["text_secondary"],
+                rx.cond(
+                    PatientDetailState.consultations_loaded,
+                    rx.text(
+                        "No hay consultas registradas",
+                        size="3",
+                        color=COLORS["text_secondary"],
+                    ),
+                    rx.center(rx.spinner(), width="100%", padding="2rem"),
                 ),
             ),
             spacing="3",
@@ -354,7 +365,7 @@ def consultations_timeline() -> rx.Component:
     )
 
 
-def study_item(study) -> rx.Component:
+def study_item(study: rx.Var) -> rx.Component:
     """Item de estudio médico"""
     return rx.card(
         rx.vstack(
@@ -374,7 +385,7 @@ def study_item(study) -> rx.Component:
                 rx.badge(study.study_type, color_scheme="purple", variant="soft"),
                 # Botón de descarga visible si hay archivo
                 rx.cond(
-                    study.file_name.is_not_none(),
+                    study.file_name != "",
                     rx.button(
                         rx.icon("download", size=16),
                         "Descargar archivo",
@@ -389,7 +400,7 @@ def study_item(study) -> rx.Component:
                 align="center",
             ),
             rx.cond(
-                study.results,
+                study.results != "",
                 rx.text(
                     study.results,
                     size="2",
@@ -399,7 +410,7 @@ def study_item(study) -> rx.Component:
             ),
             # Mostrar información del archivo si existe
             rx.cond(
-                study.file_name.is_not_none(),
+                study.file_name != "",
                 rx.hstack(
                     rx.icon("paperclip", size=14, color=COLORS["primary"]),
                     rx.text(
@@ -413,11 +424,7 @@ def study_item(study) -> rx.Component:
                         color=COLORS["text_secondary"],
                     ),
                     rx.text(
-                        rx.cond(
-                            study.file_size,
-                            (study.file_size / 1024).to_string() + " KB",
-                            "Tamaño desconocido",
-                        ),
+                        study.file_size_label,
                         size="2",
                         color=COLORS["text_secondary"],
                     ),
@@ -433,13 +440,13 @@ def study_item(study) -> rx.Component:
     )
 
 
-def study_item_with_attachments(study) -> rx.Component:
+def study_item_with_attachments(study: rx.Var) -> rx.Component:
     """Item de estudio que incluye archivos adjuntos si existen (versión reactiva)."""
 
-    # Crear attachments Var como lista reactiva si el estudio tiene file_path
-    # Usar una lista de listas en vez de dicts para evitar problemas con TypedDict en el compilador
+    # Crear attachments Var como lista reactiva si el estudio tiene archivo
+    # Usar una lista de listas para evitar problemas con TypedDict en el compilador
     attachments_var = rx.cond(
-        (study.file_path.is_not_none()) | (study.file_name.is_not_none()),
+        (study.file_path != "") | (study.file_name != ""),
         [[study.file_name, study.file_path, study.file_type, study.file_size]],
         [],
     )
@@ -477,7 +484,7 @@ def medical_studies_section() -> rx.Component:
                 rx.heading("Estudios Médicos", size="5"),
                 rx.spacer(),
                 rx.badge(
-                    f"{PatientDetailState.studies.length()} estudios",
+                    f"{PatientDetailState.total_studies} estudios",
                     color_scheme="purple",
                 ),
                 width="100%",
@@ -488,13 +495,23 @@ def medical_studies_section() -> rx.Component:
                 PatientDetailState.studies.length() > 0,
                 rx.vstack(
                     rx.foreach(PatientDetailState.studies, study_item_with_attachments),
+                    pagination_controls(
+                        PatientDetailState.studies_page,
+                        PatientDetailState.studies_total_pages,
+                        PatientDetailState.prev_studies_page,
+                        PatientDetailState.next_studies_page,
+                    ),
                     spacing="3",
                     width="100%",
                 ),
-                rx.text(
-                    "No hay estudios médicos registrados",
-                    size="3",
-                    color=COLORS["text_secondary"],
+                rx.cond(
+                    PatientDetailState.studies_loaded,
+                    rx.text(
+                        "No hay estudios médicos registrados",
+                        size="3",
+                        color=COLORS["text_secondary"],
+                    ),
+                    rx.center(rx.spinner(), width="100%", padding="2rem"),
                 ),
             ),
             spacing="3",
@@ -503,6 +520,23 @@ def medical_studies_section() -> rx.Component:
     )
 
 
+def history_tabs() -> rx.Component:
+    """Pestañas de historial; cada una se carga la primera vez que se abre"""
+    return rx.tabs.root(
+        rx.tabs.list(
+            rx.tabs.trigger("Consultas", value="consultations"),
+            rx.tabs.trigger("Estudios", value="studies"),
+            rx.tabs.trigger("Archivos", value="files"),
+        ),
+        rx.tabs.content(consultations_timeline(), value="consultations", padding_top="1rem"),
+        rx.tabs.content(medical_studies_section(), value="studies", padding_top="1rem"),
+        rx.tabs.content(patient_files_section(), value="files", padding_top="1rem"),
+        value=PatientDetailState.active_tab,
+        on_change=PatientDetailState.set_active_tab,
+        width="100%",
+    )
+
+
 def patient_detail_page() -> rx.Component:
     """Página de detalle del paciente"""
     return rx.box(
@@ -594,16 +628,8 @@ def patient_detail_page() -> rx.Component:
                     spacing="4",
                     width="100%",
                 ),
-                # Timeline y estudios
-                rx.grid(
-                    consultations_timeline(),
-                    medical_studies_section(),
-                    columns="1",
-                    spacing="4",
-                    width="100%",
-                ),
-                # Sección de archivos unificada
-                patient_files_section(),
+                # Consultas, estudios y archivos en pestañas con carga diferida
+                history_tabs(),
                 # Modal de upload
                 upload_modal(),
                 spacing="4",
@@ -2,8 +2,14 @@
 
 import reflex as rx
 
+from app.components.virtual_list import virtual_list
 from app.config import BLOOD_TYPES, COLORS, GENDERS
-from app.state.patient_state import PatientState
+from app.state.patient_state import (
+    PATIENT_COLUMNS,
+    PATIENT_ROW_HEIGHT,
+    PATIENTS_CONTAINER_ID,
+    PatientState,
+)
 
 
 def patient_card(patient) -> rx.Component:
@@ -68,6 +74,38 @@ def patient_card(patient) -> rx.Component:
                     ),
                     rx.box(),
                 ),
+                rx.cond(
+                    patient.last_visit,
+                    rx.hstack(
+                        rx.icon("calendar_check", size=16, color=COLORS["text_secondary"]),
+                        rx.text(
+                            f"Última consulta: {patient.last_visit}",
+                            size="2",
+                        ),
+                        spacing="2",
+                    ),
+                    rx.box(),
+                ),
+                rx.cond(
+                    patient.current_medications,
+                    rx.hstack(
+                        rx.icon("pill", size=16, color=COLORS["text_secondary"]),
+                        rx.text(
+                            f"Medicación: {patient.current_medications}",
+                            size="2",
+                            # Una sola línea: el alto de la tarjeta es fijo (PATIENT_ROW_HEIGHT)
+                            style={
+                                "white_space": "nowrap",
+                                "overflow": "hidden",
+                                "text_overflow": "ellipsis",
+                            },
+                        ),
+                        spacing="2",
+                        width="100%",
+                        overflow="hidden",
+                    ),
+                    rx.box(),
+                ),
                 spacing="2",
                 align="start",
                 width="100%",
@@ -427,8 +465,7 @@ def patients_page() -> rx.Component:
                     rx.input(
                         placeholder="Buscar por nombre o DNI...",
                         value=PatientState.search_query,
-                        on_change=PatientState.set_search_query,
-                        on_blur=PatientState.search_patients,
+                        on_change=PatientState.handle_search_change,
                         width="100%",
                         size="3",
                     ),
@@ -455,15 +492,16 @@ def patients_page() -> rx.Component:
                 ),
                 # Lista de pacientes
                 rx.cond(
-                    PatientState.patients.length() > 0,
-                    rx.grid(
-                        rx.foreach(
-                            PatientState.patients,
-                            patient_card,
-                        ),
-                        columns="3",
-                        spacing="4",
-                        width="100%",
+                    PatientState.patients_total > 0,
+                    virtual_list(
+                        PatientState.patients,
+                        patient_card,
+                        offset=PatientState.patients_offset,
+                        total=PatientState.patients_total,
+                        on_scroll=PatientState.scroll_patients,
+                        row_height=PATIENT_ROW_HEIGHT,
+                        columns=PATIENT_COLUMNS,
+                        container_id=PATIENTS_CONTAINER_ID,
                     ),
                     rx.callout(
                         "No se encontraron pacientes",
@@ -5,7 +5,69 @@ Página de reportes y exportaciones
 import reflex as rx
 from app.components.navbar import navbar
 from app.components.patient_selector import patient_selector_with_label
-from app.state.report_state import ReportState
+from app.state.report_state import EXPORT_DATASET_LABELS, EXPORT_FORMAT_LABELS, ReportState
+
+
+def analytics_export_card() -> rx.Component:
+    """Tarjeta de exportación de datos crudos (CSV/Parquet) para análisis"""
+    return rx.card(
+        rx.vstack(
+            rx.hstack(
+                rx.icon("database", size=32, color="orange"),
+                rx.vstack(
+                    rx.heading("Exportación para Análisis", size="5"),
+                    rx.text(
+                        "Datos completos en CSV o Parquet; usa las fechas de los reportes",
+                        size="2",
+                        color="gray",
+                    ),
+                    align_items="start",
+                    spacing="0",
+                ),
+                align="center",
+                width="100%",
+            ),
+            rx.divider(),
+            rx.hstack(
+                rx.vstack(
+                    rx.text("Datos:", size="2", weight="bold"),
+                    rx.select(
+                        list(EXPORT_DATASET_LABELS),
+                        default_value="Consultas",
+                        on_change=ReportState.set_export_dataset_from_select,
+                        width="100%",
+                    ),
+                    spacing="1",
+                    width="100%",
+                ),
+                rx.vstack(
+                    rx.text("Formato:", size="2", weight="bold"),
+                    rx.select(
+                        list(EXPORT_FORMAT_LABELS),
+                        default_value="CSV",
+                        on_change=ReportState.set_export_format_from_select,
+                        width="100%",
+                    ),
+                    spacing="1",
+                    width="100%",
+                ),
+                rx.button(
+                    rx.icon("download", size=18),
+                    "Exportar",
+                    on_click=ReportState.export_data,
+                    color_scheme="orange",
+                    size="3",
+                ),
+                align="end",
+                spacing="3",
+                width="100%",
+            ),
+            spacing="4",
+            width="100%",
+        ),
+        size="3",
+        width="100%",
+    )
 
 
 def reports_page() -> rx.Component:
@@ -296,6 +358,7 @@ def reports_page() -> rx.Component:
                     spacing="4",
                     width="100%",
                 ),
+                analytics_export_card(),
                 # Información adicional
                 rx.card(
                     rx.vstack(
@@ -328,7 +391,7 @@ def reports_page() -> rx.Component:
                             rx.list_item(
                                 rx.text(
                                     rx.text("Formatos:", weight="bold", as_="span"),
-                                    " PDF ideal para impresión, Excel para análisis de datos",
+                                    " PDF ideal para impresión, Excel para planillas, CSV/Parquet para análisis de datos",
                                 ),
                             ),
                         ),
@@ -66,6 +66,239 @@ def backup_card(backup: dict) -> rx.Component:
     )
 
 
+def storage_row(entry: dict, label_key: str) -> rx.Component:
+    """Fila de uso de almacenamiento (categoría, tipo MIME o paciente)"""
+    return rx.hstack(
+        rx.text(entry[label_key], size="2", color=COLORS["text"]),
+        rx.spacer(),
+        rx.text(
+            f"{entry['files']} archivos",
+            size="2",
+            color=COLORS["text_secondary"],
+        ),
+        rx.text(
+            f"{entry['mb']} MB",
+            size="2",
+            weight="bold",
+            color=COLORS["text"],
+        ),
+        spacing="3",
+        width="100%",
+    )
+
+
+def storage_card() -> rx.Component:
+    """Tarjeta con el uso de almacenamiento de archivos adjuntos"""
+    return rx.card(
+        rx.vstack(
+            rx.hstack(
+                rx.heading(
+                    "🗄️ Almacenamiento de Archivos",
+                    size="5",
+                    color=COLORS["text"],
+                ),
+                rx.spacer(),
+                rx.badge(
+                    f"{SettingsState.storage_total_files} archivos • "
+                    f"{SettingsState.storage_total_mb} MB "
+                    f"(en disco: {SettingsState.storage_disk_mb} MB)",
+                    variant="soft",
+                    color_scheme="green",
+                    size="2",
+                ),
+                width="100%",
+                align="center",
+            ),
+            rx.grid(
+                rx.vstack(
+                    rx.text(
+                        "Por categoría",
+                        size="2",
+                        weight="bold",
+                        color=COLORS["text_secondary"],
+                    ),
+                    rx.foreach(
+                        SettingsState.storage_by_category,
+                        lambda entry: storage_row(entry, "label"),
+                    ),
+                    spacing="2",
+                    width="100%",
+                ),
+                rx.vstack(
+                    rx.text(
+                        "Por tipo de archivo",
+                        size="2",
+                        weight="bold",
+                        color=COLORS["text_secondary"],
+                    ),
+                    rx.foreach(
+                        SettingsState.storage_by_mime,
+                        lambda entry: storage_row(entry, "file_type"),
+                    ),
+                    spacing="2",
+                    width="100%",
+                ),
+                rx.vstack(
+                    rx.text(
+                        "Pacientes con más espacio",
+                        size="2",
+                        weight="bold",
+                        color=COLORS["text_secondary"],
+                    ),
+                    rx.foreach(
+                        SettingsState.storage_top_patients,
+                        lambda entry: storage_row(entry, "patient_name"),
+                    ),
+                    spacing="2",
+                    width="100%",
+                ),
+                columns="3",
+                spacing="5",
+                width="100%",
+            ),
+            spacing="4",
+            align="start",
+            width="100%",
+        ),
+        margin_bottom="2rem",
+    )
+
+
+def executor_row(entry: dict) -> rx.Component:
+    """Fila de métricas de un pool de trabajo"""
+    return rx.hstack(
+        rx.text(entry["kind"], size="2", weight="bold", color=COLORS["text"]),
+        rx.text(
+            f"{entry['type']} × {entry['workers']}",
+            size="2",
+            color=COLORS["text_secondary"],
+        ),
+        rx.spacer(),
+        rx.text(
+            f"en curso {entry['in_flight']} • en cola {entry['queued']} "
+            f"(máx. {entry['peak_queued']})",
+            size="2",
+            color=COLORS["text_secondary"],
+        ),
+        rx.text(
+            f"{entry['completed']} ok • {entry['failed']} con error • {entry['avg_ms']} ms",
+            size="2",
+            color=COLORS["text"],
+        ),
+        spacing="3",
+        width="100%",
+    )
+
+
+def executor_card() -> rx.Component:
+    """Tarjeta con las métricas de los pools de trabajo del worker"""
+    return rx.card(
+        rx.vstack(
+            rx.hstack(
+                rx.heading(
+                    "⚙️ Pools de Trabajo",
+                    size="5",
+                    color=COLORS["text"],
+                ),
+                rx.spacer(),
+                rx.button(
+                    "Actualizar",
+                    on_click=SettingsState.load_executor_stats,
+                    variant="soft",
+                    size="1",
+                ),
+                width="100%",
+                align="center",
+            ),
+            rx.foreach(SettingsState.executor_stats, executor_row),
+            spacing="3",
+            align="start",
+            width="100%",
+        ),
+        margin_bottom="2rem",
+    )
+
+
+def pool_row(entry: dict) -> rx.Component:
+    """Fila de métricas de un pool de conexiones a la base"""
+    return rx.vstack(
+        rx.hstack(
+            rx.text(entry["name"], size="2", weight="bold", color=COLORS["text"]),
+            rx.text(
+                f"{entry['size']} + {entry['max_overflow']} extra",
+                size="2",
+                color=COLORS["text_secondary"],
+            ),
+            rx.spacer(),
+            rx.text(
+                f"en uso {entry['checked_out']} • libres {entry['checked_in']} "
+                f"• overflow {entry['overflow']}",
+                size="2",
+                color=COLORS["text_secondary"],
+            ),
+            rx.text(
+                f"{entry['waits']} esperas ({entry['avg_wait_ms']} ms, "
+                f"máx. {entry['max_wait_ms']} ms) • {entry['timeouts']} timeouts",
+                size="2",
+                color=COLORS["text"],
+            ),
+            spacing="3",
+            width="100%",
+        ),
+        rx.cond(
+            entry["leaks_now"] > 0,
+            rx.vstack(
+                rx.text(
+                    f"⚠️ {entry['leaks_now']} conexión(es) retenida(s) ahora "
+                    f"• {entry['leaks_detected']} detectada(s) en total",
+                    size="2",
+                    color=COLORS["warning"],
+                ),
+                rx.text(
+                    entry["leak_detail"],
+                    size="1",
+                    font_family="monospace",
+                    white_space="pre-wrap",
+                    color=COLORS["text_secondary"],
+                ),
+                spacing="1",
+                width="100%",
+            ),
+        ),
+        spacing="1",
+        width="100%",
+    )
+
+
+def pool_card() -> rx.Component:
+    """Tarjeta con las métricas de los pools de conexiones a la base del worker"""
+    return rx.card(
+        rx.vstack(
+            rx.hstack(
+                rx.heading(
+                    "🔌 Conexiones a la Base",
+                    size="5",
+                    color=COLORS["text"],
+                ),
+                rx.spacer(),
+                rx.button(
+                    "Actualizar",
+                    on_click=SettingsState.load_pool_stats,
+                    variant="soft",
+                    size="1",
+                ),
+                width="100%",
+                align="center",
+            ),
+            rx.foreach(SettingsState.pool_stats, pool_row),
+            spacing="3",
+            align="start",
+            width="100%",
+        ),
+        margin_bottom="2rem",
+    )
+
+
 def settings_page() -> rx.Component:
     """Página de configuración y backups"""
     return rx.box(
@@ -164,6 +397,12 @@ def settings_page() -> rx.Component:
                     ),
                     margin_bottom="2rem",
                 ),
+                # Uso de almacenamiento de archivos
+                storage_card(),
+                # Métricas de los pools de trabajo
+                executor_card(),
+                # Métricas de los pools de conexiones a la base
+                pool_card(),
                 # Crear nuevo backup
                 rx.card(
                     rx.vstack(
@@ -270,5 +509,10 @@ def settings_page() -> rx.Component:
         background=COLORS["background"],
         min_height="100vh",
         width="100%",
-        on_mount=SettingsState.load_backups,
+        on_mount=[
+            SettingsState.load_backups,
+            SettingsState.load_storage,
+            SettingsState.load_executor_stats,
+            SettingsState.load_pool_stats,
+        ],
     )
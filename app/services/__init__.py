@@ -1,21 +1,45 @@
 """Lógica de negocio y servicios"""
 
+from app.services.agenda_service import AgendaService
 from app.services.backup_service import BackupService
 from app.services.consultation_file_service import ConsultationFileService
+from app.services.consultation_query_service import ConsultationQueryService
 from app.services.consultation_service import ConsultationService
+from app.services.export_service import ExportService
+from app.services.integrity_service import IntegrityService
 from app.services.medical_study_service import MedicalStudyService
+from app.services.medication_service import MedicationService
+from app.services.patient_archive_service import PatientArchiveService
+from app.services.patient_cache_service import PatientCacheService
 from app.services.patient_file_service import PatientFileService
+from app.services.patient_files_query_service import PatientFilesQueryService
 from app.services.patient_service import PatientService
+from app.services.patient_summary_service import PatientSummaryService
 from app.services.report_service import ReportService
+from app.services.storage_service import StorageService
+from app.services.storage_tier_service import StorageTierService
 from app.services.study_file_service import StudyFileService
+from app.services.study_query_service import StudyQueryService
 
 __all__ = [
+    "AgendaService",
     "BackupService",
+    "ConsultationQueryService",
     "ConsultationService",
+    "ExportService",
+    "IntegrityService",
     "MedicalStudyService",
+    "MedicationService",
+    "PatientArchiveService",
+    "PatientCacheService",
     "PatientService",
+    "PatientSummaryService",
     "ReportService",
+    "StorageService",
+    "StorageTierService",
     "PatientFileService",
+    "PatientFilesQueryService",
     "StudyFileService",
+    "StudyQueryService",
     "ConsultationFileService",
 ]
@@ -0,0 +1,176 @@
+"""
+Servicio de agenda de turnos basado en la próxima visita de cada consulta.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlmodel import Session, func, select
+
+from app.models import Consultation, Patient
+from app.utils import invalidation_bus
+
+# Cache en memoria de la vista diaria: {fecha: (timestamp, turnos)}
+DAY_CACHE_TTL_SECONDS = 300
+DAY_CACHE_MAX_ENTRIES = 64
+
+_day_cache: OrderedDict[date, tuple[float, list[dict]]] = OrderedDict()
+_day_cache_lock = threading.Lock()
+# Se incrementa en cada invalidación para descartar lecturas en vuelo
+_day_cache_generation = 0
+
+
+def _clear_day_cache(key: Optional[str] = None) -> None:
+    """Vacía la cache de la agenda de este proceso"""
+    global _day_cache_generation
+
+    with _day_cache_lock:
+        _day_cache_generation += 1
+        _day_cache.clear()
+
+
+invalidation_bus.subscribe("agenda", _clear_day_cache)
+
+
+class AgendaService:
+    """Servicio para consultar la agenda de próximas visitas."""
+
+    @staticmethod
+    def get_agenda(session: Session, start_date: date, end_date: date) -> list[dict]:
+        """
+        Obtiene los turnos programados entre dos fechas (inclusive).
+
+        Busca por el índice de next_visit los pacientes con algún turno en el
+        rango, ordena con ROW_NUMBER() todas las consultas de esos pacientes y
+        se queda con la última de cada uno solo si su turno cae en el rango. Así
+        un turno que una consulta posterior movió o canceló no aparece.
+
+        Args:
+            session: Sesión de base de datos
+            start_date: Fecha inicial
+            end_date: Fecha final
+
+        Returns:
+            list[dict]: Turnos ordenados por fecha y apellido del paciente
+        """
+        # Pacientes con algún turno en el rango (usa el índice de next_visit)
+        candidates = (
+            select(Consultation.patient_id)
+            .where(Consultation.next_visit >= start_date)
+            .where(Consultation.next_visit <= end_date)
+        )
+
+        # Se ordenan todas sus consultas: el rango se aplica después del ranking
+        ranked = (
+            select(
+                Consultation.id.label("consultation_id"),
+                Consultation.patient_id.label("patient_id"),
+                Consultation.next_visit.label("next_visit"),
+                Consultation.consultation_date.label("consultation_date"),
+                Consultation.reason.label("reason"),
+                func.row_number()
+                .over(
+                    partition_by=Consultation.patient_id,
+                    order_by=(Consultation.consultation_date.desc(), Consultation.id.desc()),
+                )
+                .label("row_number"),
+            )
+            .where(Consultation.patient_id.in_(candidates))
+            .subquery()
+        )
+
+        query = (
+            select(
+                ranked.c.consultation_id,
+                ranked.c.patient_id,
+                ranked.c.next_visit,
+                ranked.c.consultation_date,
+                ranked.c.reason,
+                Patient.first_name,
+                Patient.last_name,
+                Patient.dni,
+                Patient.phone,
+            )
+            .join(Patient, Patient.id == ranked.c.patient_id)
+            .where(ranked.c.row_number == 1)
+            .where(ranked.c.next_visit >= start_date)
+            .where(ranked.c.next_visit <= end_date)
+            .where(Patient.is_active == True)  # noqa: E712
+            .order_by(ranked.c.next_visit, Patient.last_name, Patient.first_name)
+        )
+
+        return [
+            {
+                "consultation_id": row.consultation_id,
+                "patient_id": row.patient_id,
+                "patient_name": f"{row.first_name} {row.last_name}",
+                "patient_dni": row.dni or "",
+                "patient_phone": row.phone or "",
+                "next_visit": row.next_visit.strftime("%Y-%m-%d"),
+                "last_consultation_date": row.consultation_date.strftime("%Y-%m-%d"),
+                "reason": row.reason or "",
+            }
+            for row in session.exec(query).all()
+        ]
+
+    @staticmethod
+    def get_day_agenda(session: Session, day: date) -> list[dict]:
+        """
+        Obtiene los turnos de un día, usando la cache en memoria si está vigente.
+
+        Args:
+            session: Sesión de base de datos
+            day: Fecha a consultar
+
+        Returns:
+            list[dict]: Turnos del día
+        """
+        now = time.monotonic()
+        with _day_cache_lock:
+            cached = _day_cache.get(day)
+            if cached and now - cached[0] < DAY_CACHE_TTL_SECONDS:
+                _day_cache.move_to_end(day)
+                return list(cached[1])
+            generation = _day_cache_generation
+
+        appointments = AgendaService.get_agenda(session, day, day)
+
+        with _day_cache_lock:
+            # No cachear si hubo una escritura mientras se consultaba
+            if generation == _day_cache_generation:
+                _day_cache[day] = (now, appointments)
+                _day_cache.move_to_end(day)
+                while len(_day_cache) > DAY_CACHE_MAX_ENTRIES:
+                    _day_cache.popitem(last=False)
+
+        return list(appointments)
+
+    @staticmethod
+    def get_week_agenda(session: Session, week_start: date) -> list[dict]:
+        """
+        Obtiene los turnos de los 7 días a partir de week_start en una sola consulta.
+
+        Args:
+            session: Sesión de base de datos
+            week_start: Primer día de la semana
+
+        Returns:
+            list[dict]: Turnos de la semana ordenados por fecha
+        """
+        week_end = week_start + timedelta(days=6)
+        return AgendaService.get_agenda(session, week_start, week_end)
+
+    @staticmethod
+    def invalidate_cache() -> None:
+        """
+        Invalida la cache de la agenda.
+
+        Se llama desde las escrituras de consultas y pacientes: un cambio puede
+        mover, agregar o quitar turnos en cualquier día. Los demás workers se
+        enteran por el bus de invalidación.
+        """
+        _clear_day_cache()
+        invalidation_bus.publish("agenda")
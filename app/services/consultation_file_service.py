@@ -1,42 +1,38 @@
 """Servicio para gestionar archivos adjuntos de consultas médicas"""
 
-from datetime import UTC, datetime
 from io import BytesIO
 from pathlib import Path
 from typing import Optional
 
-from sqlmodel import Session, select
+from sqlmodel import Session, func, select
 
 from app.config import STUDIES_PATH
 from app.models.consultation_file import ConsultationFile
+from app.services.patient_cache_service import PatientCacheService
+from app.services.patient_summary_service import PatientSummaryService
+from app.services.storage_service import StorageService
+from app.services.storage_tier_service import StorageTierService
+from app.utils.file_io import (
+    attachment_filename,
+    read_attachment_async,
+    run_in_file_pool,
+    write_attachment,
+)
 
 
 class ConsultationFileService:
     """Servicio para operaciones CRUD de archivos de consultas"""
 
     @staticmethod
-    def create_file(
+    def _prepare_file(
         session: Session,
         consultation_id: int,
         file_content: BytesIO,
         file_name: str,
         file_type: str,
-        description: Optional[str] = None,
-    ) -> ConsultationFile:
-        """
-        Guarda un archivo adjunto para una consulta médica.
-
-        Args:
-            session: Sesión de base de datos
-            consultation_id: ID de la consulta
-            file_content: Contenido del archivo (BytesIO)
-            file_name: Nombre original del archivo
-            file_type: Tipo MIME del archivo
-            description: Descripción opcional del archivo
-
-        Returns:
-            ConsultationFile creado y guardado
-        """
+        description: Optional[str],
+    ) -> tuple[ConsultationFile, Path, int]:
+        """Valida la consulta y arma el registro y la ruta en disco (sin tocar el disco)"""
         from app.models import Consultation
 
         # Verificar que la consulta existe
@@ -49,24 +45,10 @@ class ConsultationFileService:
         file_size = file_content.tell()
         file_content.seek(0)  # Volver al inicio
 
-        # Generar nombre único para el archivo
-        timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
-        safe_filename = file_name.replace(" ", "_")
-        unique_filename = f"consultation_{consultation_id}_{timestamp}_{safe_filename}"
-
-        # Crear directorio del paciente si no existe
-        patient_dir = STUDIES_PATH / f"patient_{consultation.patient_id}"
-        patient_dir.mkdir(parents=True, exist_ok=True)
-
-        # Ruta completa del archivo
-        file_absolute_path = patient_dir / unique_filename
+        # Generar nombre único para el archivo (timestamp + sufijo aleatorio)
+        unique_filename = attachment_filename(f"consultation_{consultation_id}", file_name)
         file_relative_path = f"patient_{consultation.patient_id}/{unique_filename}"
 
-        # Guardar archivo físico
-        with open(file_absolute_path, "wb") as f:
-            f.write(file_content.read())
-
-        # Crear registro en la base de datos
         consultation_file = ConsultationFile(
             consultation_id=consultation_id,
             file_path=file_relative_path,
@@ -75,11 +57,90 @@ class ConsultationFileService:
             file_size=file_size,
             description=description,
         )
+        return consultation_file, STUDIES_PATH / file_relative_path, consultation.patient_id
 
-        session.add(consultation_file)
-        session.commit()
+    @staticmethod
+    def _after_create(
+        session: Session, consultation_file: ConsultationFile, patient_id: int
+    ) -> None:
+        """Refresca el registro recién guardado e invalida resúmenes y cachés del paciente"""
         session.refresh(consultation_file)
+        PatientSummaryService.refresh_patient(session, patient_id)
+        PatientCacheService.invalidate(patient_id)
+        StorageService.invalidate_cache()
+
+    @staticmethod
+    def create_file(
+        session: Session,
+        consultation_id: int,
+        file_content: BytesIO,
+        file_name: str,
+        file_type: str,
+        description: Optional[str] = None,
+    ) -> ConsultationFile:
+        """
+        Guarda un archivo adjunto para una consulta médica.
+
+        Args:
+            session: Sesión de base de datos
+            consultation_id: ID de la consulta
+            file_content: Contenido del archivo (BytesIO)
+            file_name: Nombre original del archivo
+            file_type: Tipo MIME del archivo
+            description: Descripción opcional del archivo
+
+        Returns:
+            ConsultationFile creado y guardado
+        """
+        consultation_file, file_absolute_path, patient_id = ConsultationFileService._prepare_file(
+            session, consultation_id, file_content, file_name, file_type, description
+        )
 
+        # Fase 1: archivo completo en disco (temporal + fsync + rename atómico)
+        write_attachment(file_absolute_path, file_content)
+
+        # Fase 2: registro en la base; si falla, el archivo recién escrito sobra
+        try:
+            session.add(consultation_file)
+            session.commit()
+        except Exception:
+            session.rollback()
+            file_absolute_path.unlink(missing_ok=True)
+            raise
+
+        ConsultationFileService._after_create(session, consultation_file, patient_id)
+        return consultation_file
+
+    @staticmethod
+    async def create_file_async(
+        session: Session,
+        consultation_id: int,
+        file_content: BytesIO,
+        file_name: str,
+        file_type: str,
+        description: Optional[str] = None,
+    ) -> ConsultationFile:
+        """
+        Versión async de create_file para handlers async.
+
+        Solo la escritura a disco (y el borrado si falla el commit) va al pool
+        acotado de E/S (FILE_IO_WORKERS); la sesión se usa en el hilo del llamador.
+        """
+        consultation_file, file_absolute_path, patient_id = ConsultationFileService._prepare_file(
+            session, consultation_id, file_content, file_name, file_type, description
+        )
+
+        await run_in_file_pool(write_attachment, file_absolute_path, file_content)
+
+        try:
+            session.add(consultation_file)
+            session.commit()
+        except Exception:
+            session.rollback()
+            await run_in_file_pool(file_absolute_path.unlink, missing_ok=True)
+            raise
+
+        ConsultationFileService._after_create(session, consultation_file, patient_id)
         return consultation_file
 
     @staticmethod
@@ -98,12 +159,12 @@ class ConsultationFileService:
         return session.get(ConsultationFile, file_id)
 
     @staticmethod
-    def download_file(session: Session, file_id: int) -> Optional[tuple[Path, str]]:
+    def download_file(session: Session, file_id: int) -> Optional[tuple[Path, str, Optional[str]]]:
         """
-        Obtiene la ruta absoluta y nombre de un archivo para descarga.
+        Obtiene la ruta absoluta, el nombre y la codificación de un archivo para descarga.
 
         Returns:
-            Tupla (ruta_absoluta, nombre_archivo) o None si no existe
+            Tupla (ruta_absoluta, nombre_archivo, content_encoding) o None si no existe
         """
         consultation_file = session.get(ConsultationFile, file_id)
         if not consultation_file:
@@ -113,7 +174,22 @@ class ConsultationFileService:
         if not file_path.exists():
             return None
 
-        return file_path, consultation_file.file_name
+        StorageTierService.mark_accessed(session, consultation_file)
+        return file_path, consultation_file.file_name, consultation_file.content_encoding
+
+    @staticmethod
+    async def read_file_async(session: Session, file_id: int) -> Optional[tuple[bytes, str]]:
+        """
+        Lee el contenido de un archivo para descarga sin bloquear el event loop.
+
+        Returns:
+            Tupla (contenido, nombre_archivo) o None si no existe
+        """
+        result = ConsultationFileService.download_file(session, file_id)
+        if not result:
+            return None
+        file_path, file_name, encoding = result
+        return await read_attachment_async(file_path, encoding), file_name
 
     @staticmethod
     def delete_file(session: Session, file_id: int) -> bool:
@@ -123,10 +199,14 @@ class ConsultationFileService:
         Returns:
             True si se eliminó correctamente, False si no existe
         """
+        from app.models import Consultation
+
         consultation_file = session.get(ConsultationFile, file_id)
         if not consultation_file:
             return False
 
+        consultation = session.get(Consultation, consultation_file.consultation_id)
+
         # Eliminar archivo físico si existe
         file_path = consultation_file.file_path_absolute
         if file_path.exists():
@@ -136,6 +216,10 @@ class ConsultationFileService:
         session.delete(consultation_file)
         session.commit()
 
+        if consultation:
+            PatientSummaryService.refresh_patient(session, consultation.patient_id)
+            PatientCacheService.invalidate(consultation.patient_id)
+        StorageService.invalidate_cache()
         return True
 
     @staticmethod
@@ -154,5 +238,11 @@ class ConsultationFileService:
     @staticmethod
     def get_total_size_by_patient(session: Session, patient_id: int) -> int:
         """Calcula el tamaño total de archivos de consultas de un paciente (en bytes)"""
-        files = ConsultationFileService.get_files_by_patient(session, patient_id)
-        return sum(f.file_size for f in files)
+        from app.models import Consultation
+
+        statement = (
+            select(func.coalesce(func.sum(ConsultationFile.file_size), 0))
+            .join(Consultation, ConsultationFile.consultation_id == Consultation.id)
+            .where(Consultation.patient_id == patient_id)
+        )
+        return session.exec(statement).one()
@@ -0,0 +1,201 @@
+"""Consulta por ventanas del listado general de consultas"""
+
+from typing import Optional
+
+from sqlmodel import Session, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import Consultation, Patient
+from app.models.consultation_file import ConsultationFile
+from app.services.projections import ConsultationListRow
+from app.utils import search_cache
+from app.utils.text_utils import normalize_search_term
+
+
+class ConsultationQueryService:
+    """
+    Lista consultas por ventanas (offset/limit) para el listado virtualizado.
+
+    Cada ventana es una consulta con el paciente unido (nombre y DNI) más un
+    GROUP BY con la cantidad de archivos de las consultas de la ventana. La
+    búsqueda por texto se resuelve una vez a una lista de IDs y después se
+    recorre por ventanas igual que el listado completo.
+    """
+
+    @staticmethod
+    def search_ids(session: Session, search_term: str) -> list[int]:
+        """
+        IDs de las consultas cuyo motivo, síntomas, diagnóstico o tratamiento
+        contienen el término (sin acentos), de la más reciente a la más antigua.
+
+        SQLite no compara sin acentos, así que se filtra en Python como
+        ConsultationService.search_consultations, pero leyendo solo esas columnas.
+        El resultado queda en el cache de búsquedas recientes (ver search_cache).
+        """
+        normalized_search = normalize_search_term(search_term.strip())
+
+        def search() -> list[int]:
+            rows = session.exec(ConsultationQueryService._search_query())
+            return ConsultationQueryService._matching_ids(rows, normalized_search)
+
+        return search_cache.get_or_search("consultations", normalized_search, search)
+
+    @staticmethod
+    async def search_ids_async(session: AsyncSession, search_term: str) -> list[int]:
+        """Versión async de search_ids (comparte el cache de búsquedas)"""
+        normalized_search = normalize_search_term(search_term.strip())
+
+        async def search() -> list[int]:
+            rows = await session.exec(ConsultationQueryService._search_query())
+            return ConsultationQueryService._matching_ids(rows, normalized_search)
+
+        return await search_cache.get_or_search_async("consultations", normalized_search, search)
+
+    @staticmethod
+    def _search_query():
+        """SELECT de las columnas de texto en las que busca search_ids"""
+        return select(
+            Consultation.id,
+            Consultation.reason,
+            Consultation.symptoms,
+            Consultation.diagnosis,
+            Consultation.treatment,
+        ).order_by(Consultation.consultation_date.desc(), Consultation.id.desc())
+
+    @staticmethod
+    def _matching_ids(rows, normalized_search: str) -> list[int]:
+        """IDs de las filas de _search_query que contienen el término normalizado"""
+        return [
+            row.id
+            for row in rows
+            if any(
+                normalized_search in normalize_search_term(text or "")
+                for text in (row.reason, row.symptoms, row.diagnosis, row.treatment)
+            )
+        ]
+
+    @staticmethod
+    def count_consultations(session: Session, patient_id: Optional[int] = None) -> int:
+        """Cantidad de consultas (de un paciente o de todos)"""
+        return session.exec(ConsultationQueryService._count_query(patient_id)).one()
+
+    @staticmethod
+    async def count_consultations_async(
+        session: AsyncSession, patient_id: Optional[int] = None
+    ) -> int:
+        """Versión async de count_consultations"""
+        return (await session.exec(ConsultationQueryService._count_query(patient_id))).one()
+
+    @staticmethod
+    def _count_query(patient_id: Optional[int]):
+        """SELECT de la cantidad de consultas (de un paciente o de todos)"""
+        query = select(func.count(Consultation.id))
+        if patient_id:
+            query = query.where(Consultation.patient_id == patient_id)
+        return query
+
+    @staticmethod
+    def get_file_counts(session: Session, consultation_ids: list[int]) -> dict[int, int]:
+        """Cantidad de archivos adjuntos por consulta (un único GROUP BY)"""
+        if not consultation_ids:
+            return {}
+        statement = ConsultationQueryService._file_counts_query(consultation_ids)
+        return dict(session.exec(statement).all())
+
+    @staticmethod
+    def _file_counts_query(consultation_ids: list[int]):
+        """SELECT de la cantidad de archivos por consulta"""
+        return (
+            select(ConsultationFile.consultation_id, func.count(ConsultationFile.id))
+            .where(ConsultationFile.consultation_id.in_(consultation_ids))
+            .group_by(ConsultationFile.consultation_id)
+        )
+
+    @staticmethod
+    def get_consultation_window(
+        session: Session,
+        offset: int = 0,
+        limit: int = 20,
+        patient_id: Optional[int] = None,
+        search_ids: Optional[list[int]] = None,
+    ) -> list[ConsultationListRow]:
+        """
+        Obtiene una ventana del listado de consultas.
+
+        Args:
+            session: Sesión de base de datos
+            offset: Cantidad de filas a saltear
+            limit: Tamaño de la ventana
+            patient_id: Solo consultas de este paciente (opcional)
+            search_ids: Resultado de search_ids; si se indica, la ventana se toma
+                de esta lista (en su orden) en lugar de toda la tabla
+
+        Returns:
+            list[ConsultationListRow]: Filas ordenadas por fecha descendente
+        """
+        statement = ConsultationQueryService._window_query(offset, limit, patient_id, search_ids)
+        if statement is None:
+            return []
+        rows = session.exec(statement).all()
+        file_counts = ConsultationQueryService.get_file_counts(session, [row.id for row in rows])
+
+        return [ConsultationListRow.from_row(row, file_counts.get(row.id, 0)) for row in rows]
+
+    @staticmethod
+    async def get_consultation_window_async(
+        session: AsyncSession,
+        offset: int = 0,
+        limit: int = 20,
+        patient_id: Optional[int] = None,
+        search_ids: Optional[list[int]] = None,
+    ) -> list[ConsultationListRow]:
+        """Versión async de get_consultation_window (mismos argumentos, sesión async)"""
+        statement = ConsultationQueryService._window_query(offset, limit, patient_id, search_ids)
+        if statement is None:
+            return []
+        rows = (await session.exec(statement)).all()
+        file_counts = {}
+        if rows:
+            counts_query = ConsultationQueryService._file_counts_query([row.id for row in rows])
+            file_counts = dict((await session.exec(counts_query)).all())
+
+        return [ConsultationListRow.from_row(row, file_counts.get(row.id, 0)) for row in rows]
+
+    @staticmethod
+    def _window_query(
+        offset: int,
+        limit: int,
+        patient_id: Optional[int],
+        search_ids: Optional[list[int]],
+    ):
+        """SELECT de get_consultation_window (None si la ventana de IDs está vacía)"""
+        statement = (
+            select(
+                Consultation.id,
+                Consultation.patient_id,
+                Consultation.consultation_date,
+                Consultation.reason,
+                Consultation.diagnosis,
+                Consultation.blood_pressure,
+                Consultation.heart_rate,
+                Consultation.temperature,
+                Consultation.weight,
+                Consultation.height,
+                Consultation.next_visit,
+                Patient.first_name,
+                Patient.last_name,
+                Patient.dni,
+            )
+            .outerjoin(Patient, Patient.id == Consultation.patient_id)
+            .order_by(Consultation.consultation_date.desc(), Consultation.id.desc())
+        )
+
+        if search_ids is not None:
+            window_ids = search_ids[offset : offset + limit]
+            if not window_ids:
+                return None
+            return statement.where(Consultation.id.in_(window_ids))
+
+        if patient_id:
+            statement = statement.where(Consultation.patient_id == patient_id)
+        return statement.offset(offset).limit(limit)
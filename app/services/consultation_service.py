@@ -6,9 +6,16 @@ from datetime import date, datetime
 from typing import Optional
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models import Consultation
+from app.services.agenda_service import AgendaService
+from app.services.patient_cache_service import PatientCacheService
+from app.services.patient_summary_service import PatientSummaryService
+from app.services.storage_service import StorageService
+from app.utils import search_cache
 from app.utils.text_utils import normalize_search_term
+from app.utils.validators import parse_blood_pressure
 
 
 class ConsultationService:
@@ -53,6 +60,8 @@ class ConsultationService:
         Returns:
             Consultation: Consulta creada
         """
+        bp_systolic, bp_diastolic = parse_blood_pressure(blood_pressure)
+
         consultation = Consultation(
             patient_id=patient_id,
             reason=reason,
@@ -61,6 +70,8 @@ class ConsultationService:
             treatment=treatment,
             notes=notes,
             blood_pressure=blood_pressure,
+            bp_systolic=bp_systolic,
+            bp_diastolic=bp_diastolic,
             heart_rate=heart_rate,
             temperature=temperature,
             weight=weight,
@@ -74,6 +85,11 @@ class ConsultationService:
         session.add(consultation)
         session.commit()
         session.refresh(consultation)
+
+        AgendaService.invalidate_cache()
+        search_cache.invalidate("consultations")
+        PatientSummaryService.refresh_patient(session, consultation.patient_id)
+        PatientCacheService.invalidate(consultation.patient_id)
         return consultation
 
     @staticmethod
@@ -90,6 +106,13 @@ class ConsultationService:
         """
         return session.get(Consultation, consultation_id)
 
+    @staticmethod
+    async def get_consultation_by_id_async(
+        session: AsyncSession, consultation_id: int
+    ) -> Optional[Consultation]:
+        """Versión async de get_consultation_by_id (sin relaciones cargadas)"""
+        return await session.get(Consultation, consultation_id)
+
     @staticmethod
     def get_consultations_by_patient(
         session: Session, patient_id: int, limit: Optional[int] = None
@@ -116,6 +139,58 @@ class ConsultationService:
 
         return list(session.exec(query).all())
 
+    @staticmethod
+    def get_consultation_rows_by_patient(
+        session: Session, patient_id: int, offset: int = 0, limit: int = 20
+    ) -> list:
+        """
+        Obtiene una página de consultas de un paciente con solo las columnas del listado.
+
+        No carga notas ni síntomas (texto libre largo); el detalle se abre aparte.
+
+        Args:
+            session: Sesión de base de datos
+            patient_id: ID del paciente
+            offset: Cantidad de filas a saltear
+            limit: Tamaño de página
+
+        Returns:
+            list[Row]: Filas con id, consultation_date, reason, diagnosis, treatment,
+            blood_pressure, heart_rate, temperature, weight y height
+        """
+        query = ConsultationService._rows_by_patient_query(patient_id, offset, limit)
+        return list(session.exec(query).all())
+
+    @staticmethod
+    async def get_consultation_rows_by_patient_async(
+        session: AsyncSession, patient_id: int, offset: int = 0, limit: int = 20
+    ) -> list:
+        """Versión async de get_consultation_rows_by_patient"""
+        query = ConsultationService._rows_by_patient_query(patient_id, offset, limit)
+        return list((await session.exec(query)).all())
+
+    @staticmethod
+    def _rows_by_patient_query(patient_id: int, offset: int, limit: int):
+        """SELECT de una página de consultas del paciente (columnas del listado)"""
+        return (
+            select(
+                Consultation.id,
+                Consultation.consultation_date,
+                Consultation.reason,
+                Consultation.diagnosis,
+                Consultation.treatment,
+                Consultation.blood_pressure,
+                Consultation.heart_rate,
+                Consultation.temperature,
+                Consultation.weight,
+                Consultation.height,
+            )
+            .where(Consultation.patient_id == patient_id)
+            .order_by(Consultation.consultation_date.desc(), Consultation.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+
     @staticmethod
     def get_all_consultations(session: Session, limit: Optional[int] = None) -> list[Consultation]:
         """
@@ -208,6 +283,100 @@ class ConsultationService:
             ).all()
         )
 
+    @staticmethod
+    def get_consultations_by_blood_pressure(
+        session: Session,
+        min_systolic: Optional[int] = None,
+        max_systolic: Optional[int] = None,
+        min_diastolic: Optional[int] = None,
+        max_diastolic: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[Consultation]:
+        """
+        Obtiene consultas dentro de un rango de presión arterial.
+
+        Usa las columnas numéricas indexadas bp_systolic/bp_diastolic.
+
+        Args:
+            session: Sesión de base de datos
+            min_systolic: Sistólica mínima (inclusive)
+            max_systolic: Sistólica máxima (inclusive)
+            min_diastolic: Diastólica mínima (inclusive)
+            max_diastolic: Diastólica máxima (inclusive)
+            limit: Número máximo de resultados
+
+        Returns:
+            list[Consultation]: Consultas ordenadas por fecha descendente
+        """
+        query = select(Consultation)
+
+        if min_systolic is not None:
+            query = query.where(Consultation.bp_systolic >= min_systolic)
+        if max_systolic is not None:
+            query = query.where(Consultation.bp_systolic <= max_systolic)
+        if min_diastolic is not None:
+            query = query.where(Consultation.bp_diastolic >= min_diastolic)
+        if max_diastolic is not None:
+            query = query.where(Consultation.bp_diastolic <= max_diastolic)
+
+        query = query.order_by(Consultation.consultation_date.desc())
+
+        if limit:
+            query = query.limit(limit)
+
+        return list(session.exec(query).all())
+
+    @staticmethod
+    def get_patient_ids_by_last_blood_pressure(
+        session: Session,
+        min_systolic: Optional[int] = None,
+        min_diastolic: Optional[int] = None,
+    ) -> list[int]:
+        """
+        Obtiene los pacientes cuya última presión arterial registrada supera los umbrales.
+
+        Ejemplo: pacientes con última sistólica > 140 -> min_systolic=141
+
+        Args:
+            session: Sesión de base de datos
+            min_systolic: Sistólica mínima (inclusive) de la última medición
+            min_diastolic: Diastólica mínima (inclusive) de la última medición
+
+        Returns:
+            list[int]: IDs de pacientes que cumplen el criterio
+        """
+        from sqlmodel import and_, func
+
+        # Fecha de la última consulta con presión registrada por paciente
+        last_measurement = (
+            select(
+                Consultation.patient_id,
+                func.max(Consultation.consultation_date).label("last_date"),
+            )
+            .where(Consultation.bp_systolic.isnot(None))
+            .group_by(Consultation.patient_id)
+            .subquery()
+        )
+
+        query = (
+            select(Consultation.patient_id)
+            .join(
+                last_measurement,
+                and_(
+                    Consultation.patient_id == last_measurement.c.patient_id,
+                    Consultation.consultation_date == last_measurement.c.last_date,
+                ),
+            )
+            .distinct()
+        )
+
+        if min_systolic is not None:
+            query = query.where(Consultation.bp_systolic >= min_systolic)
+        if min_diastolic is not None:
+            query = query.where(Consultation.bp_diastolic >= min_diastolic)
+
+        return list(session.exec(query).all())
+
     @staticmethod
     def update_consultation(
         session: Session,
@@ -229,14 +398,30 @@ class ConsultationService:
         if not consultation:
             return None
 
+        previous_patient_id = consultation.patient_id
+
         for key, value in kwargs.items():
             if hasattr(consultation, key):
                 setattr(consultation, key, value)
 
+        # Mantener sincronizados los valores numéricos de presión arterial
+        if "blood_pressure" in kwargs:
+            consultation.bp_systolic, consultation.bp_diastolic = parse_blood_pressure(
+                consultation.blood_pressure
+            )
+
         consultation.updated_at = datetime.now()
         session.add(consultation)
         session.commit()
         session.refresh(consultation)
+
+        AgendaService.invalidate_cache()
+        search_cache.invalidate("consultations")
+        PatientSummaryService.refresh_patient(session, consultation.patient_id)
+        PatientCacheService.invalidate(consultation.patient_id)
+        if previous_patient_id != consultation.patient_id:
+            PatientSummaryService.refresh_patient(session, previous_patient_id)
+            PatientCacheService.invalidate(previous_patient_id)
         return consultation
 
     @staticmethod
@@ -255,8 +440,15 @@ class ConsultationService:
         if not consultation:
             return False
 
+        patient_id = consultation.patient_id
         session.delete(consultation)
         session.commit()
+
+        AgendaService.invalidate_cache()
+        search_cache.invalidate("consultations")
+        PatientSummaryService.refresh_patient(session, patient_id)
+        PatientCacheService.invalidate(patient_id)
+        StorageService.invalidate_cache()
         return True
 
     @staticmethod
@@ -0,0 +1,310 @@
+"""
+Exportación de datos para análisis (CSV y Parquet).
+
+A diferencia de los reportes PDF/Excel de ReportService, acá no hay formato de
+presentación: cada dataset (pacientes, consultas, estudios, medicaciones) se lee
+del cursor de la base por lotes y se escribe directamente, sin cargar la tabla
+completa en memoria. CSV se genera en streaming (opcionalmente con gzip);
+Parquet requiere pyarrow (dependencia opcional) y conserva los tipos.
+"""
+
+import csv
+import io
+import tempfile
+import zlib
+from collections.abc import Iterator
+from datetime import date, datetime
+from typing import Optional
+
+from sqlmodel import select
+
+from app.database import read_session_scope
+from app.models import Consultation, MedicalStudy, Medication, Patient
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Dependencia opcional: sin Parquet
+    pa = None
+    pq = None
+
+# Formatos de exportación: extensión y tipo MIME
+EXPORT_FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "csv.gz": ("csv.gz", "application/gzip"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+# Datasets exportables: (modelo, columnas, columna de fecha para filtrar)
+EXPORT_DATASETS = {
+    "patients": (
+        Patient,
+        [
+            "id",
+            "first_name",
+            "last_name",
+            "dni",
+            "birth_date",
+            "gender",
+            "blood_type",
+            "phone",
+            "email",
+            "address",
+            "allergies",
+            "chronic_conditions",
+            "family_history",
+            "is_active",
+            "created_at",
+        ],
+        "created_at",
+    ),
+    "consultations": (
+        Consultation,
+        [
+            "id",
+            "patient_id",
+            "consultation_date",
+            "reason",
+            "symptoms",
+            "diagnosis",
+            "treatment",
+            "bp_systolic",
+            "bp_diastolic",
+            "heart_rate",
+            "temperature",
+            "weight",
+            "height",
+            "next_visit",
+        ],
+        "consultation_date",
+    ),
+    "studies": (
+        MedicalStudy,
+        [
+            "id",
+            "patient_id",
+            "consultation_id",
+            "study_type",
+            "study_name",
+            "study_date",
+            "institution",
+            "requesting_doctor",
+            "results",
+            "diagnosis",
+            "is_pending",
+            "is_critical",
+            "requires_followup",
+        ],
+        "study_date",
+    ),
+    "medications": (
+        Medication,
+        [
+            "id",
+            "patient_id",
+            "consultation_id",
+            "name",
+            "dosage",
+            "frequency",
+            "duration",
+            "start_date",
+            "end_date",
+            "is_chronic",
+            "is_active",
+        ],
+        "start_date",
+    ),
+}
+
+EXPORT_BATCH_SIZE = 5000
+
+
+def _arrow_type(column):
+    """Tipo de Arrow según el tipo Python de la columna (texto si no se conoce)"""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return pa.string()
+    return {
+        int: pa.int64(),
+        float: pa.float64(),
+        bool: pa.bool_(),
+        date: pa.date32(),
+        datetime: pa.timestamp("us"),
+    }.get(python_type, pa.string())
+
+
+class ExportService:
+    """Servicio para exportar tablas completas a CSV/Parquet por lotes"""
+
+    @staticmethod
+    def parquet_available() -> bool:
+        """Indica si pyarrow está instalado"""
+        return pa is not None
+
+    @staticmethod
+    def export_filename(dataset: str, export_format: str) -> str:
+        """Nombre sugerido del archivo (ej: "consultations_20250101.csv.gz")"""
+        extension = EXPORT_FORMATS[export_format][0]
+        return f"{dataset}_{datetime.now().strftime('%Y%m%d')}.{extension}"
+
+    @staticmethod
+    def _query(dataset: str, start_date: Optional[date], end_date: Optional[date]):
+        """SELECT de las columnas del dataset, filtrado por fecha y ordenado por id"""
+        if dataset not in EXPORT_DATASETS:
+            raise ValueError(f"Dataset inválido: {dataset}")
+
+        model, columns, date_column = EXPORT_DATASETS[dataset]
+        query = select(*[getattr(model, column) for column in columns]).order_by(model.id)
+
+        if start_date:
+            query = query.where(getattr(model, date_column) >= start_date)
+        if end_date:
+            query = query.where(getattr(model, date_column) <= end_date)
+
+        return query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    @staticmethod
+    def _iter_batches(
+        dataset: str, start_date: Optional[date], end_date: Optional[date]
+    ) -> Iterator[list[tuple]]:
+        """Lotes de filas (tuplas) leídos con un cursor del lado del servidor"""
+        with read_session_scope() as session:
+            result = session.exec(ExportService._query(dataset, start_date, end_date))
+            for rows in result.partitions():
+                yield [tuple(row) for row in rows]
+
+    @staticmethod
+    def iter_csv(
+        dataset: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        compress: bool = False,
+    ) -> Iterator[bytes]:
+        """
+        Genera un CSV (UTF-8, con encabezado) por bloques, uno por lote de filas.
+
+        Args:
+            dataset: "patients", "consultations", "studies" o "medications"
+            start_date: Fecha inicio (opcional)
+            end_date: Fecha fin (opcional)
+            compress: Comprimir con gzip en streaming
+
+        Yields:
+            bytes: Bloques consecutivos del archivo
+        """
+        if dataset not in EXPORT_DATASETS:
+            raise ValueError(f"Dataset inválido: {dataset}")
+        columns = EXPORT_DATASETS[dataset][1]
+
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def flush() -> bytes:
+            data = buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            return compressor.compress(data) if compressor else data
+
+        writer.writerow(columns)
+        if chunk := flush():
+            yield chunk
+
+        for rows in ExportService._iter_batches(dataset, start_date, end_date):
+            writer.writerows(rows)
+            if chunk := flush():
+                yield chunk
+
+        if compressor:
+            yield compressor.flush()
+
+    @staticmethod
+    def write_parquet(
+        dataset: str,
+        target,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> int:
+        """
+        Escribe un Parquet con tipos de columna (fechas, números, booleanos).
+
+        Cada lote del cursor se escribe como un row group, así la memoria queda
+        acotada a EXPORT_BATCH_SIZE filas.
+
+        Args:
+            dataset: "patients", "consultations", "studies" o "medications"
+            target: Ruta o archivo binario abierto
+            start_date: Fecha inicio (opcional)
+            end_date: Fecha fin (opcional)
+
+        Returns:
+            int: Cantidad de filas escritas
+        """
+        if pa is None:
+            raise RuntimeError("pyarrow no está instalado (instalar el extra 'analytics')")
+        if dataset not in EXPORT_DATASETS:
+            raise ValueError(f"Dataset inválido: {dataset}")
+
+        model, columns, _ = EXPORT_DATASETS[dataset]
+        schema = pa.schema(
+            [(column, _arrow_type(getattr(model, column))) for column in columns]
+        )
+
+        total = 0
+        with pq.ParquetWriter(target, schema, compression="zstd") as writer:
+            for rows in ExportService._iter_batches(dataset, start_date, end_date):
+                values = list(zip(*rows))
+                writer.write_batch(
+                    pa.record_batch(
+                        [pa.array(values[i], type=field.type) for i, field in enumerate(schema)],
+                        schema=schema,
+                    )
+                )
+                total += len(rows)
+
+        return total
+
+    @staticmethod
+    def iter_parquet(
+        dataset: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        chunk_size: int = 1024 * 1024,
+    ) -> Iterator[bytes]:
+        """
+        Genera el Parquet en un temporal y lo devuelve por bloques.
+
+        Parquet escribe sus metadatos al final, así que no se puede emitir
+        mientras se genera; el temporal evita tenerlo completo en memoria.
+        """
+        with tempfile.NamedTemporaryFile(suffix=".parquet") as tmp:
+            ExportService.write_parquet(dataset, tmp, start_date, end_date)
+            tmp.flush()
+            tmp.seek(0)
+            while chunk := tmp.read(chunk_size):
+                yield chunk
+
+    @staticmethod
+    def iter_export(
+        dataset: str,
+        export_format: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> Iterator[bytes]:
+        """
+        Genera la exportación en el formato pedido (para StreamingResponse).
+
+        Args:
+            dataset: "patients", "consultations", "studies" o "medications"
+            export_format: "csv", "csv.gz" o "parquet"
+            start_date: Fecha inicio (opcional)
+            end_date: Fecha fin (opcional)
+        """
+        if export_format == "parquet":
+            return ExportService.iter_parquet(dataset, start_date, end_date)
+        if export_format in ("csv", "csv.gz"):
+            return ExportService.iter_csv(
+                dataset, start_date, end_date, compress=export_format == "csv.gz"
+            )
+        raise ValueError(f"Formato inválido: {export_format}")
@@ -0,0 +1,374 @@
+"""
+Verificador de integridad de archivos adjuntos y reconciliador de huérfanos.
+
+Compara los archivos en disco (STUDIES_PATH / PATIENTS_PATH) contra las filas de
+patient_files, study_files, consultation_files y los campos legacy de medical_studies:
+
+- dangling: filas cuyo archivo no existe en disco
+- size_mismatch: archivos cuyo tamaño no coincide con el registrado
+- corrupted: archivos con el mismo tamaño/mtime que en la corrida anterior pero
+  distinto hash (solo con verify_hashes=True)
+- orphans: archivos en disco que ninguna fila referencia
+
+El escaneo avanza por tramos de pacientes y guarda un checkpoint, de modo que un
+almacenamiento grande se puede verificar en varias corridas cortas.
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import case
+from sqlmodel import Session, func, select
+
+from app.config import INTEGRITY_CHECKPOINT_PATH, PATIENTS_PATH, STUDIES_PATH
+from app.models import Consultation, MedicalStudy, Patient
+from app.models.consultation_file import ConsultationFile
+from app.models.patient_file import PatientFile
+from app.models.study_file import StudyFile
+from app.utils.compression import ENCODING_SUFFIXES
+
+# Raíces de almacenamiento: prefijo de las claves -> directorio
+STORAGE_ROOTS = {"patients": PATIENTS_PATH, "studies": STUDIES_PATH}
+
+# No se borran huérfanos más nuevos que esto (pueden ser subidas en curso)
+ORPHAN_GRACE_SECONDS = 3600
+
+SCAN_WORKERS = 8
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _file_sha256(path: Path) -> str:
+    """Calcula el SHA-256 de un archivo leyendo por bloques"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _patient_dir_id(name: str) -> Optional[int]:
+    """Extrae el ID de un directorio 'patient_<id>' (None si no corresponde)"""
+    prefix, _, suffix = name.partition("_")
+    if prefix != "patient" or not suffix.isdigit():
+        return None
+    return int(suffix)
+
+
+class IntegrityService:
+    """Servicio para verificar y reconciliar archivos adjuntos contra la base de datos."""
+
+    @staticmethod
+    def load_checkpoint(path: Path = INTEGRITY_CHECKPOINT_PATH) -> dict:
+        """Lee el checkpoint del escaneo incremental (vacío si no existe)"""
+        if not path.exists():
+            return {"last_patient_id": 0, "hashes": {}}
+        with open(path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        checkpoint.setdefault("last_patient_id", 0)
+        checkpoint.setdefault("hashes", {})
+        return checkpoint
+
+    @staticmethod
+    def save_checkpoint(checkpoint: dict, path: Path = INTEGRITY_CHECKPOINT_PATH) -> None:
+        """Guarda el checkpoint de forma atómica (archivo temporal + rename)"""
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _disk_patient_ids() -> set[int]:
+        """IDs de paciente que tienen directorio en alguna de las raíces"""
+        ids: set[int] = set()
+        for root in STORAGE_ROOTS.values():
+            if not root.exists():
+                continue
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        patient_id = _patient_dir_id(entry.name)
+                        if patient_id is not None:
+                            ids.add(patient_id)
+        return ids
+
+    @staticmethod
+    def _next_slice(session: Session, after_id: int, max_patients: int) -> list[int]:
+        """Próximos IDs de paciente a verificar (base de datos + directorios sin paciente)"""
+        db_ids = session.exec(
+            select(Patient.id).where(Patient.id > after_id).order_by(Patient.id).limit(max_patients)
+        ).all()
+        disk_ids = {pid for pid in IntegrityService._disk_patient_ids() if pid > after_id}
+        return sorted(set(db_ids) | disk_ids)[:max_patients]
+
+    @staticmethod
+    def _scan_dir(root_name: str, patient_id: int) -> list[tuple[str, int, int]]:
+        """Lista (clave, tamaño, mtime_ns) de los archivos de un directorio de paciente"""
+        directory = STORAGE_ROOTS[root_name] / f"patient_{patient_id}"
+        files = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        key = f"{root_name}/patient_{patient_id}/{entry.name}"
+                        files.append((key, stat.st_size, stat.st_mtime_ns))
+        except FileNotFoundError:
+            pass
+        return files
+
+    @staticmethod
+    def _scan_disk(patient_ids: list[int], workers: int) -> dict[str, tuple[int, int]]:
+        """Recorre en paralelo los directorios de los pacientes indicados"""
+        tasks = [(root_name, pid) for pid in patient_ids for root_name in STORAGE_ROOTS]
+        disk: dict[str, tuple[int, int]] = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for files in executor.map(lambda task: IntegrityService._scan_dir(*task), tasks):
+                for key, size, mtime_ns in files:
+                    disk[key] = (size, mtime_ns)
+        return disk
+
+    @staticmethod
+    def _source_queries(patient_ids: list[int]) -> list[tuple[str, str, object]]:
+        """
+        (tabla, raíz, consulta id/file_path/tamaño en disco) por cada fuente.
+
+        Para adjuntos comprimidos el tamaño esperado en disco es stored_size.
+        """
+        return [
+            (
+                "patient_files",
+                "patients",
+                select(
+                    PatientFile.id,
+                    PatientFile.file_path,
+                    func.coalesce(PatientFile.stored_size, PatientFile.file_size),
+                )
+                .where(PatientFile.patient_id.in_(patient_ids))
+                .order_by(PatientFile.id),
+            ),
+            (
+                "study_files",
+                "studies",
+                select(
+                    StudyFile.id,
+                    StudyFile.file_path,
+                    func.coalesce(StudyFile.stored_size, StudyFile.file_size),
+                )
+                .join(MedicalStudy, StudyFile.study_id == MedicalStudy.id)
+                .where(MedicalStudy.patient_id.in_(patient_ids))
+                .order_by(StudyFile.id),
+            ),
+            (
+                "consultation_files",
+                "studies",
+                select(
+                    ConsultationFile.id,
+                    ConsultationFile.file_path,
+                    func.coalesce(ConsultationFile.stored_size, ConsultationFile.file_size),
+                )
+                .join(Consultation, ConsultationFile.consultation_id == Consultation.id)
+                .where(Consultation.patient_id.in_(patient_ids))
+                .order_by(ConsultationFile.id),
+            ),
+            (
+                "medical_studies",
+                "studies",
+                # Los campos legacy no guardan el tamaño comprimido: si el StudyFile
+                # del mismo archivo está comprimido, no hay tamaño que comparar
+                select(
+                    MedicalStudy.id,
+                    MedicalStudy.file_path,
+                    case(
+                        (StudyFile.content_encoding.in_(list(ENCODING_SUFFIXES)), None),
+                        else_=MedicalStudy.file_size,
+                    ),
+                )
+                .outerjoin(StudyFile, StudyFile.file_path == MedicalStudy.file_path)
+                .where(MedicalStudy.patient_id.in_(patient_ids))
+                .where(MedicalStudy.file_path.isnot(None))
+                .order_by(MedicalStudy.id),
+            ),
+        ]
+
+    @staticmethod
+    def _referenced_elsewhere(session: Session, keys: list[str]) -> set[str]:
+        """Claves de archivos sin fila en su paciente que sí están referenciadas por otra fila"""
+        referenced: set[str] = set()
+        by_root: dict[str, list[str]] = {}
+        for key in keys:
+            root_name, _, relative = key.partition("/")
+            by_root.setdefault(root_name, []).append(relative)
+
+        columns = {
+            "patients": [PatientFile.file_path],
+            "studies": [StudyFile.file_path, ConsultationFile.file_path, MedicalStudy.file_path],
+        }
+        for root_name, paths in by_root.items():
+            for start in range(0, len(paths), 500):
+                chunk = paths[start : start + 500]
+                for column in columns[root_name]:
+                    found = session.exec(select(column).where(column.in_(chunk))).all()
+                    referenced.update(f"{root_name}/{path}" for path in found)
+        return referenced
+
+    @staticmethod
+    def scan(
+        session: Session,
+        max_patients: int = 500,
+        batch_size: int = 1000,
+        verify_hashes: bool = False,
+        workers: int = SCAN_WORKERS,
+        checkpoint_path: Path = INTEGRITY_CHECKPOINT_PATH,
+    ) -> dict:
+        """
+        Verifica el próximo tramo de pacientes y avanza el checkpoint.
+
+        Args:
+            session: Sesión de base de datos
+            max_patients: Pacientes por tramo
+            batch_size: Filas leídas por lote desde la base de datos
+            verify_hashes: Si calcular SHA-256 y compararlo con la corrida anterior
+            workers: Hilos para recorrer los directorios
+            checkpoint_path: Archivo de checkpoint
+
+        Returns:
+            dict con el reporte del tramo (ver docstring del módulo) y
+            cycle_complete=True cuando se llegó al último paciente
+        """
+        checkpoint = IntegrityService.load_checkpoint(checkpoint_path)
+        patient_ids = IntegrityService._next_slice(
+            session, checkpoint["last_patient_id"], max_patients
+        )
+
+        report = {
+            "patients_scanned": len(patient_ids),
+            "files_on_disk": 0,
+            "rows_checked": 0,
+            "dangling": [],
+            "size_mismatch": [],
+            "corrupted": [],
+            "orphans": [],
+            "cycle_complete": len(patient_ids) < max_patients,
+        }
+
+        if patient_ids:
+            disk = IntegrityService._scan_disk(patient_ids, workers)
+            report["files_on_disk"] = len(disk)
+            referenced: set[str] = set()
+
+            for table, root_name, query in IntegrityService._source_queries(patient_ids):
+                rows = session.exec(query.execution_options(yield_per=batch_size))
+                for row_id, file_path, file_size in rows:
+                    report["rows_checked"] += 1
+                    key = f"{root_name}/{file_path}"
+                    referenced.add(key)
+                    entry = {"table": table, "id": row_id, "path": key}
+
+                    on_disk = disk.get(key)
+                    if on_disk is None:
+                        # Fuera del layout patient_<id>/: verificar directamente
+                        absolute = STORAGE_ROOTS[root_name] / file_path
+                        if not absolute.is_file():
+                            report["dangling"].append(entry)
+                            continue
+                        stat = absolute.stat()
+                        on_disk = (stat.st_size, stat.st_mtime_ns)
+
+                    if file_size is not None and on_disk[0] != file_size:
+                        report["size_mismatch"].append(
+                            {**entry, "expected": file_size, "actual": on_disk[0]}
+                        )
+
+            unreferenced = [key for key in disk if key not in referenced]
+            elsewhere = IntegrityService._referenced_elsewhere(session, unreferenced)
+            report["orphans"] = [
+                {"path": key, "size": disk[key][0], "mtime_ns": disk[key][1]}
+                for key in unreferenced
+                if key not in elsewhere
+            ]
+
+            if verify_hashes:
+                hashes = checkpoint["hashes"]
+                # Olvidar hashes de archivos de este tramo que ya no existen
+                prefixes = tuple(
+                    f"{root_name}/patient_{pid}/"
+                    for pid in patient_ids
+                    for root_name in STORAGE_ROOTS
+                )
+                for key in [k for k in hashes if k.startswith(prefixes) and k not in disk]:
+                    del hashes[key]
+
+                for key in referenced & disk.keys():
+                    size, mtime_ns = disk[key]
+                    root_name, _, relative = key.partition("/")
+                    digest = _file_sha256(STORAGE_ROOTS[root_name] / relative)
+                    previous = hashes.get(key)
+                    if previous and previous[:2] == [size, mtime_ns] and previous[2] != digest:
+                        report["corrupted"].append({"path": key, "size": size})
+                    hashes[key] = [size, mtime_ns, digest]
+
+        checkpoint["last_patient_id"] = 0 if report["cycle_complete"] else patient_ids[-1]
+        checkpoint["updated_at"] = datetime.now(UTC).isoformat()
+        IntegrityService.save_checkpoint(checkpoint, checkpoint_path)
+
+        return report
+
+    @staticmethod
+    def reconcile(
+        session: Session,
+        report: dict,
+        delete_orphans: bool = False,
+        delete_dangling: bool = False,
+    ) -> dict:
+        """
+        Limpia lo detectado por scan().
+
+        Los huérfanos más nuevos que ORPHAN_GRACE_SECONDS se conservan, porque
+        pueden pertenecer a una subida cuyo commit todavía no terminó. Las filas
+        colgadas se eliminan con los servicios (actualizan el resumen del paciente
+        y la cache de almacenamiento); en medical_studies solo se limpian los
+        campos legacy del archivo, sin borrar el estudio.
+
+        Args:
+            session: Sesión de base de datos
+            report: Reporte devuelto por scan()
+            delete_orphans: Si borrar archivos huérfanos
+            delete_dangling: Si borrar filas sin archivo
+
+        Returns:
+            dict con orphans_deleted y dangling_deleted
+        """
+        from app.services.consultation_file_service import ConsultationFileService
+        from app.services.medical_study_service import MedicalStudyService
+        from app.services.patient_file_service import PatientFileService
+        from app.services.study_file_service import StudyFileService
+
+        result = {"orphans_deleted": 0, "dangling_deleted": 0}
+
+        if delete_orphans:
+            cutoff_ns = time.time_ns() - ORPHAN_GRACE_SECONDS * 1_000_000_000
+            for orphan in report["orphans"]:
+                if orphan["mtime_ns"] > cutoff_ns:
+                    continue
+                root_name, _, relative = orphan["path"].partition("/")
+                (STORAGE_ROOTS[root_name] / relative).unlink(missing_ok=True)
+                result["orphans_deleted"] += 1
+
+        if delete_dangling:
+            deleters = {
+                "patient_files": PatientFileService.delete_file,
+                "study_files": StudyFileService.delete_file,
+                "consultation_files": ConsultationFileService.delete_file,
+                "medical_studies": MedicalStudyService.delete_study_file,
+            }
+            for entry in report["dangling"]:
+                deleters[entry["table"]](session, entry["id"])
+                result["dangling_deleted"] += 1
+
+        return result
@@ -8,9 +8,13 @@ from pathlib import Path
 from typing import BinaryIO
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import STUDIES_PATH
-from app.models import MedicalStudy, StudyType
+from app.models import MedicalStudy, StudyFile, StudyType
+from app.services.patient_cache_service import PatientCacheService
+from app.services.patient_summary_service import PatientSummaryService
+from app.services.storage_service import StorageService
 
 
 class MedicalStudyService:
@@ -57,6 +61,8 @@ class MedicalStudyService:
         session.commit()
         session.refresh(study)
 
+        PatientSummaryService.refresh_patient(session, study.patient_id)
+        PatientCacheService.invalidate(study.patient_id)
         return study
 
     @staticmethod
@@ -106,7 +112,44 @@ class MedicalStudyService:
             file_type=file_type or "application/octet-stream",
         )
 
-        # Actualizar campos legacy en MedicalStudy para compatibilidad
+        return MedicalStudyService._apply_legacy_file(session, study, study_file)
+
+    @staticmethod
+    async def upload_file_async(
+        session: Session,
+        study_id: int,
+        file_content: BinaryIO,
+        file_name: str,
+        file_type: str | None = None,
+    ) -> MedicalStudy:
+        """
+        Versión async de upload_file para handlers async.
+
+        Solo la escritura a disco va al pool de E/S (StudyFileService.create_file_async);
+        la sesión se usa en el hilo del llamador.
+        """
+        from io import BytesIO
+
+        from app.services.study_file_service import StudyFileService
+
+        study = session.get(MedicalStudy, study_id)
+        if not study:
+            raise ValueError(f"Estudio con ID {study_id} no encontrado")
+
+        study_file = await StudyFileService.create_file_async(
+            session=session,
+            study_id=study_id,
+            file_content=BytesIO(file_content.read()),
+            file_name=file_name,
+            file_type=file_type or "application/octet-stream",
+        )
+        return MedicalStudyService._apply_legacy_file(session, study, study_file)
+
+    @staticmethod
+    def _apply_legacy_file(
+        session: Session, study: MedicalStudy, study_file: StudyFile
+    ) -> MedicalStudy:
+        """Copia los datos del archivo a los campos legacy de MedicalStudy (compatibilidad)"""
         study.file_name = study_file.file_name
         study.file_path = study_file.file_path
         study.file_type = study_file.file_type
@@ -116,6 +159,7 @@ class MedicalStudyService:
         session.commit()
         session.refresh(study)
 
+        PatientCacheService.invalidate(study.patient_id)
         return study
 
     @staticmethod
@@ -163,6 +207,55 @@ class MedicalStudyService:
 
         return list(session.exec(statement).all())
 
+    @staticmethod
+    def get_study_rows_by_patient(
+        session: Session, patient_id: int, offset: int = 0, limit: int = 20
+    ) -> list:
+        """
+        Obtiene una página de estudios de un paciente con solo las columnas del listado.
+
+        Args:
+            session: Sesión de base de datos
+            patient_id: ID del paciente
+            offset: Cantidad de filas a saltear
+            limit: Tamaño de página
+
+        Returns:
+            list[Row]: Filas con id, study_name, study_type, study_date, results,
+            file_name, file_path, file_type y file_size
+        """
+        statement = MedicalStudyService._rows_by_patient_query(patient_id, offset, limit)
+        return list(session.exec(statement).all())
+
+    @staticmethod
+    async def get_study_rows_by_patient_async(
+        session: AsyncSession, patient_id: int, offset: int = 0, limit: int = 20
+    ) -> list:
+        """Versión async de get_study_rows_by_patient"""
+        statement = MedicalStudyService._rows_by_patient_query(patient_id, offset, limit)
+        return list((await session.exec(statement)).all())
+
+    @staticmethod
+    def _rows_by_patient_query(patient_id: int, offset: int, limit: int):
+        """SELECT de una página de estudios del paciente (columnas del listado)"""
+        return (
+            select(
+                MedicalStudy.id,
+                MedicalStudy.study_name,
+                MedicalStudy.study_type,
+                MedicalStudy.study_date,
+                MedicalStudy.results,
+                MedicalStudy.file_name,
+                MedicalStudy.file_path,
+                MedicalStudy.file_type,
+                MedicalStudy.file_size,
+            )
+            .where(MedicalStudy.patient_id == patient_id)
+            .order_by(MedicalStudy.study_date.desc(), MedicalStudy.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+
     @staticmethod
     def get_studies_by_consultation(session: Session, consultation_id: int) -> list[MedicalStudy]:
         """
@@ -200,7 +293,7 @@ class MedicalStudyService:
         return [study for study in studies if study.is_recent(days)]
 
     @staticmethod
-    def download_file(session: Session, study_id: int) -> tuple[Path, str] | None:
+    def download_file(session: Session, study_id: int) -> tuple[Path, str, str | None] | None:
         """
         Obtiene la ruta del archivo para descarga.
 
@@ -212,7 +305,7 @@ class MedicalStudyService:
             study_id: ID del estudio
 
         Returns:
-            Tupla (ruta_absoluta, nombre_archivo) o None si no hay archivo
+            Tupla (ruta_absoluta, nombre_archivo, content_encoding) o None si no hay archivo
 
         Raises:
             ValueError: Si el estudio no existe
@@ -239,7 +332,11 @@ class MedicalStudyService:
         if not file_path.exists():
             raise FileNotFoundError(f"Archivo {study.file_name} no encontrado en {file_path}")
 
-        return file_path, study.file_name
+        # Los campos legacy no guardan la codificación: es la del StudyFile del mismo archivo
+        encoding = session.exec(
+            select(StudyFile.content_encoding).where(StudyFile.file_path == study.file_path)
+        ).first()
+        return file_path, study.file_name, encoding
 
     @staticmethod
     def delete_study_file(session: Session, study_id: int) -> MedicalStudy:
@@ -274,6 +371,7 @@ class MedicalStudyService:
             session.add(study)
             session.commit()
             session.refresh(study)
+            PatientCacheService.invalidate(study.patient_id)
 
         return study
 
@@ -303,9 +401,13 @@ class MedicalStudyService:
                 file_path.unlink()
 
         # Eliminar registro de la base de datos
+        patient_id = study.patient_id
         session.delete(study)
         session.commit()
 
+        PatientSummaryService.refresh_patient(session, patient_id)
+        PatientCacheService.invalidate(patient_id)
+        StorageService.invalidate_cache()
         return True
 
     @staticmethod
@@ -355,6 +457,8 @@ class MedicalStudyService:
         session.commit()
         session.refresh(study)
 
+        PatientSummaryService.refresh_patient(session, study.patient_id)
+        PatientCacheService.invalidate(study.patient_id)
         return study
 
     @staticmethod
@@ -377,23 +481,3 @@ class MedicalStudyService:
         )
 
         return list(session.exec(statement).all())
-
-    @staticmethod
-    def get_total_storage_size(session: Session, patient_id: int | None = None) -> int:
-        """
-        Calcula el tamaño total de almacenamiento usado.
-
-        Args:
-            session: Sesión de base de datos
-            patient_id: ID del paciente (opcional, None para todos los pacientes)
-
-        Returns:
-            Tamaño total en bytes
-        """
-        statement = select(MedicalStudy).where(MedicalStudy.file_size.isnot(None))
-
-        if patient_id:
-            statement = statement.where(MedicalStudy.patient_id == patient_id)
-
-        studies = session.exec(statement).all()
-        return sum(study.file_size or 0 for study in studies)
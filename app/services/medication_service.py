@@ -0,0 +1,334 @@
+"""
+Servicio para gestionar medicación prescrita.
+"""
+
+from datetime import UTC, date, datetime, timedelta
+from typing import Optional
+
+from sqlmodel import Session, or_, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import Medication
+
+
+class MedicationService:
+    """Servicio para operaciones CRUD y consultas de medicación."""
+
+    @staticmethod
+    def _ongoing_clause(today: date):
+        """
+        Condición SQL equivalente a Medication.is_ongoing.
+
+        Args:
+            today: Fecha de referencia
+
+        Returns:
+            Expresión booleana para usar en .where()
+        """
+        return (Medication.is_active == True) & or_(  # noqa: E712
+            Medication.is_chronic == True,  # noqa: E712
+            Medication.end_date.is_(None),
+            Medication.end_date >= today,
+        )
+
+    @staticmethod
+    def create_medication(
+        session: Session,
+        patient_id: int,
+        name: str,
+        dosage: str,
+        frequency: str,
+        duration: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        notes: Optional[str] = None,
+        is_chronic: bool = False,
+        consultation_id: Optional[int] = None,
+    ) -> Medication:
+        """
+        Registra una nueva medicación para un paciente.
+
+        Args:
+            session: Sesión de base de datos
+            patient_id: ID del paciente
+            name: Nombre del medicamento
+            dosage: Dosificación (ej: "500mg")
+            frequency: Frecuencia de toma (ej: "cada 8 horas")
+            duration: Duración del tratamiento (texto libre)
+            start_date: Fecha de inicio (default: hoy)
+            end_date: Fecha de finalización (opcional)
+            notes: Notas adicionales
+            is_chronic: Si es medicación crónica
+            consultation_id: ID de la consulta que la prescribió (opcional)
+
+        Returns:
+            Medication: Medicación creada
+
+        Raises:
+            ValueError: Si la fecha de fin es anterior a la de inicio
+        """
+        start_date = start_date or date.today()
+        if end_date and end_date < start_date:
+            raise ValueError("La fecha de finalización no puede ser anterior a la de inicio")
+
+        medication = Medication(
+            patient_id=patient_id,
+            consultation_id=consultation_id,
+            name=name,
+            dosage=dosage,
+            frequency=frequency,
+            duration=duration,
+            start_date=start_date,
+            end_date=end_date,
+            notes=notes,
+            is_chronic=is_chronic,
+        )
+
+        session.add(medication)
+        session.commit()
+        session.refresh(medication)
+        return medication
+
+    @staticmethod
+    def get_medication_by_id(session: Session, medication_id: int) -> Optional[Medication]:
+        """
+        Obtiene una medicación por su ID.
+
+        Args:
+            session: Sesión de base de datos
+            medication_id: ID de la medicación
+
+        Returns:
+            Medication o None si no existe
+        """
+        return session.get(Medication, medication_id)
+
+    @staticmethod
+    def get_medications_by_patient(
+        session: Session, patient_id: int, include_inactive: bool = False
+    ) -> list[Medication]:
+        """
+        Obtiene la medicación de un paciente.
+
+        Args:
+            session: Sesión de base de datos
+            patient_id: ID del paciente
+            include_inactive: Si incluir medicación suspendida
+
+        Returns:
+            list[Medication]: Medicación ordenada por fecha de inicio descendente
+        """
+        query = select(Medication).where(Medication.patient_id == patient_id)
+
+        if not include_inactive:
+            query = query.where(Medication.is_active == True)  # noqa: E712
+
+        query = query.order_by(Medication.start_date.desc())
+        return list(session.exec(query).all())
+
+    @staticmethod
+    def get_ongoing_medications(session: Session, patient_id: int) -> list[Medication]:
+        """
+        Obtiene la medicación en curso de un paciente (filtrada en SQL).
+
+        Args:
+            session: Sesión de base de datos
+            patient_id: ID del paciente
+
+        Returns:
+            list[Medication]: Medicación activa, crónica o no vencida
+        """
+        query = (
+            select(Medication)
+            .where(Medication.patient_id == patient_id)
+            .where(MedicationService._ongoing_clause(date.today()))
+            .order_by(Medication.start_date.desc())
+        )
+        return list(session.exec(query).all())
+
+    @staticmethod
+    def get_current_medications_for_patients(
+        session: Session, patient_ids: list[int]
+    ) -> dict[int, list[Medication]]:
+        """
+        Obtiene la medicación en curso de varios pacientes en una sola consulta.
+
+        Pensado para páginas de listado (evita una consulta por paciente); el
+        listado de pacientes usa la versión async.
+
+        Args:
+            session: Sesión de base de datos
+            patient_ids: IDs de los pacientes
+
+        Returns:
+            dict[int, list[Medication]]: {patient_id: [medicación en curso]}
+        """
+        result: dict[int, list[Medication]] = {patient_id: [] for patient_id in patient_ids}
+        if not patient_ids:
+            return result
+
+        query = MedicationService._current_for_patients_query(patient_ids)
+        for medication in session.exec(query).all():
+            result[medication.patient_id].append(medication)
+
+        return result
+
+    @staticmethod
+    async def get_current_medications_for_patients_async(
+        session: AsyncSession, patient_ids: list[int]
+    ) -> dict[int, list[Medication]]:
+        """Versión async de get_current_medications_for_patients"""
+        result: dict[int, list[Medication]] = {patient_id: [] for patient_id in patient_ids}
+        if not patient_ids:
+            return result
+
+        query = MedicationService._current_for_patients_query(patient_ids)
+        for medication in (await session.exec(query)).all():
+            result[medication.patient_id].append(medication)
+
+        return result
+
+    @staticmethod
+    def _current_for_patients_query(patient_ids: list[int]):
+        """SELECT de la medicación en curso de varios pacientes"""
+        return (
+            select(Medication)
+            .where(Medication.patient_id.in_(patient_ids))
+            .where(MedicationService._ongoing_clause(date.today()))
+            .order_by(Medication.patient_id, Medication.start_date.desc())
+        )
+
+    @staticmethod
+    def get_expiring_medications(
+        session: Session, days: int = 7, patient_id: Optional[int] = None
+    ) -> list[Medication]:
+        """
+        Obtiene tratamientos en curso que finalizan dentro de los próximos días.
+
+        Ejemplo: "pacientes con tratamiento que termina esta semana" -> days=7
+
+        Args:
+            session: Sesión de base de datos
+            days: Ventana de días hacia adelante (default: 7)
+            patient_id: Filtrar por paciente (opcional)
+
+        Returns:
+            list[Medication]: Medicación ordenada por fecha de finalización
+        """
+        today = date.today()
+        query = (
+            select(Medication)
+            .where(Medication.is_active == True)  # noqa: E712
+            .where(Medication.is_chronic == False)  # noqa: E712
+            .where(Medication.end_date >= today)
+            .where(Medication.end_date <= today + timedelta(days=days))
+        )
+
+        if patient_id:
+            query = query.where(Medication.patient_id == patient_id)
+
+        query = query.order_by(Medication.end_date, Medication.patient_id)
+        return list(session.exec(query).all())
+
+    @staticmethod
+    def get_patient_ids_with_ongoing_treatment(session: Session) -> list[int]:
+        """
+        Obtiene los pacientes con al menos un tratamiento en curso.
+
+        Args:
+            session: Sesión de base de datos
+
+        Returns:
+            list[int]: IDs de pacientes
+        """
+        query = (
+            select(Medication.patient_id)
+            .where(MedicationService._ongoing_clause(date.today()))
+            .distinct()
+        )
+        return list(session.exec(query).all())
+
+    @staticmethod
+    def update_medication(
+        session: Session,
+        medication_id: int,
+        **kwargs,
+    ) -> Optional[Medication]:
+        """
+        Actualiza una medicación existente.
+
+        Args:
+            session: Sesión de base de datos
+            medication_id: ID de la medicación
+            **kwargs: Campos a actualizar
+
+        Returns:
+            Medication actualizada o None si no existe
+
+        Raises:
+            ValueError: Si la fecha de fin resultante es anterior a la de inicio
+        """
+        medication = session.get(Medication, medication_id)
+        if not medication:
+            return None
+
+        for key, value in kwargs.items():
+            if hasattr(medication, key) and key not in ["id", "created_at"]:
+                setattr(medication, key, value)
+
+        if medication.end_date and medication.end_date < medication.start_date:
+            session.rollback()
+            raise ValueError("La fecha de finalización no puede ser anterior a la de inicio")
+
+        medication.updated_at = datetime.now(UTC)
+        session.add(medication)
+        session.commit()
+        session.refresh(medication)
+        return medication
+
+    @staticmethod
+    def discontinue_medication(
+        session: Session, medication_id: int, end_date: Optional[date] = None
+    ) -> bool:
+        """
+        Suspende una medicación (la marca como inactiva sin borrarla).
+
+        Args:
+            session: Sesión de base de datos
+            medication_id: ID de la medicación
+            end_date: Fecha de suspensión (default: hoy)
+
+        Returns:
+            True si se suspendió, False si no existe
+        """
+        medication = session.get(Medication, medication_id)
+        if not medication:
+            return False
+
+        medication.is_active = False
+        medication.end_date = end_date or date.today()
+        medication.updated_at = datetime.now(UTC)
+
+        session.add(medication)
+        session.commit()
+        return True
+
+    @staticmethod
+    def delete_medication(session: Session, medication_id: int) -> bool:
+        """
+        Elimina una medicación.
+
+        Args:
+            session: Sesión de base de datos
+            medication_id: ID de la medicación
+
+        Returns:
+            True si se eliminó, False si no existe
+        """
+        medication = session.get(Medication, medication_id)
+        if not medication:
+            return False
+
+        session.delete(medication)
+        session.commit()
+        return True
@@ -0,0 +1,246 @@
+"""
+Servicio para exportar todos los archivos de un paciente en un ZIP.
+
+El ZIP se arma en streaming con zipfile sobre un destino no posicionable: cada
+adjunto se lee por bloques (descomprimiendo si está en almacenamiento frío) y los
+bytes generados se entregan a medida que se producen, así un archivo de varios GB
+nunca se carga completo en memoria.
+"""
+
+import zipfile
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import Optional
+
+from sqlmodel import Session, select
+
+from app.config import PATIENTS_PATH, STUDIES_PATH
+from app.database import engine
+from app.models import Consultation, MedicalStudy, Patient
+from app.models.consultation_file import ConsultationFile
+from app.models.patient_file import PatientFile
+from app.models.study_file import StudyFile
+from app.services.report_service import ReportService
+from app.utils.compression import is_compressible, open_attachment
+
+# Carpeta del ZIP para cada fuente de archivos
+ARCHIVE_FOLDERS = {
+    "patient": "documentos",
+    "study": "estudios",
+    "consultation": "consultas",
+}
+
+# Además de los tipos ya comprimidos, los PDF casi no ganan al volver a deflatear
+ARCHIVE_STORED_MIME_TYPES = {"application/pdf"}
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class _ZipStream:
+    """Destino de escritura no posicionable: acumula bloques hasta que se drenan"""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> list[bytes]:
+        """Devuelve lo escrito desde el último drenado (como lista para `yield from`)"""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return [data] if data else []
+
+
+def _compress_type(file_type: Optional[str]) -> int:
+    """STORED para PDF/JPEG y demás tipos ya comprimidos, DEFLATED para el resto"""
+    if file_type and file_type.lower() in ARCHIVE_STORED_MIME_TYPES:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED if is_compressible(file_type) else zipfile.ZIP_STORED
+
+
+def _zip_info(arcname: str, file_type: Optional[str], date_time: Optional[datetime]):
+    """ZipInfo con fecha y método de compresión según el tipo MIME"""
+    date_time = date_time or datetime.now()
+    # ZIP no admite fechas anteriores a 1980
+    timestamp = max(date_time.timetuple()[:6], (1980, 1, 1, 0, 0, 0))
+    info = zipfile.ZipInfo(arcname, date_time=timestamp)
+    info.compress_type = _compress_type(file_type)
+    return info
+
+
+class PatientArchiveService:
+    """Servicio para descargar en un único ZIP todo lo de un paciente"""
+
+    @staticmethod
+    def archive_filename(patient: Patient) -> str:
+        """Nombre sugerido del ZIP (ej: "paciente_12_perez_juan.zip")"""
+        name = f"{patient.last_name}_{patient.first_name}".lower().replace(" ", "_")
+        return f"paciente_{patient.id}_{name}.zip"
+
+    @staticmethod
+    def get_entries(session: Session, patient_id: int) -> list[dict]:
+        """
+        Lista los adjuntos del paciente con su ruta en disco y su nombre en el ZIP.
+
+        Solo se cargan metadatos (sin contenido). Los nombres repetidos dentro de
+        una carpeta se desambiguan con un sufijo numérico.
+
+        Args:
+            session: Sesión de base de datos
+            patient_id: ID del paciente
+
+        Returns:
+            list[dict]: arcname, path (absoluta), file_type, uploaded_at y encoding
+        """
+        sources = (
+            (
+                "patient",
+                PATIENTS_PATH,
+                select(
+                    PatientFile.file_path,
+                    PatientFile.file_name,
+                    PatientFile.file_type,
+                    PatientFile.uploaded_at,
+                    PatientFile.content_encoding,
+                )
+                .where(PatientFile.patient_id == patient_id)
+                .order_by(PatientFile.uploaded_at),
+            ),
+            (
+                "study",
+                STUDIES_PATH,
+                select(
+                    StudyFile.file_path,
+                    StudyFile.file_name,
+                    StudyFile.file_type,
+                    StudyFile.uploaded_at,
+                    StudyFile.content_encoding,
+                )
+                .join(MedicalStudy, MedicalStudy.id == StudyFile.study_id)
+                .where(MedicalStudy.patient_id == patient_id)
+                .order_by(StudyFile.uploaded_at),
+            ),
+            (
+                "consultation",
+                STUDIES_PATH,
+                select(
+                    ConsultationFile.file_path,
+                    ConsultationFile.file_name,
+                    ConsultationFile.file_type,
+                    ConsultationFile.uploaded_at,
+                    ConsultationFile.content_encoding,
+                )
+                .join(Consultation, Consultation.id == ConsultationFile.consultation_id)
+                .where(Consultation.patient_id == patient_id)
+                .order_by(ConsultationFile.uploaded_at),
+            ),
+        )
+
+        entries = []
+        used_names: set[str] = set()
+        for category, root, query in sources:
+            for file_path, file_name, file_type, uploaded_at, encoding in session.exec(query).all():
+                name = PurePosixPath(file_name.replace("\\", "/")).name or "archivo"
+                arcname = f"{ARCHIVE_FOLDERS[category]}/{name}"
+                counter = 1
+                while arcname in used_names:
+                    stem, suffix = PurePosixPath(name).stem, PurePosixPath(name).suffix
+                    arcname = f"{ARCHIVE_FOLDERS[category]}/{stem} ({counter}){suffix}"
+                    counter += 1
+                used_names.add(arcname)
+                entries.append(
+                    {
+                        "arcname": arcname,
+                        "path": root / file_path,
+                        "file_type": file_type,
+                        "uploaded_at": uploaded_at,
+                        "encoding": encoding,
+                    }
+                )
+
+        return entries
+
+    @staticmethod
+    def iter_patient_archive(
+        patient_id: int, include_history: bool = True, chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """
+        Genera el ZIP de un paciente por bloques (para StreamingResponse).
+
+        Usa su propia sesión, que se cierra antes de empezar a leer archivos: el
+        streaming puede durar mucho más que el request que lo originó.
+
+        Args:
+            patient_id: ID del paciente
+            include_history: Incluir el PDF de historia clínica
+            chunk_size: Tamaño de lectura de cada adjunto
+
+        Yields:
+            bytes: Bloques consecutivos del ZIP
+        """
+        with Session(engine) as session:
+            entries = PatientArchiveService.get_entries(session, patient_id)
+
+        stream = _ZipStream()
+        missing: list[str] = []
+
+        with zipfile.ZipFile(stream, mode="w", allowZip64=True) as zf:
+            if include_history:
+                history_pdf = ReportService.generate_patient_history_pdf(patient_id)
+                zf.writestr(
+                    _zip_info(
+                        f"historia_clinica_{patient_id}.pdf", "application/pdf", datetime.now()
+                    ),
+                    history_pdf,
+                )
+                yield from stream.drain()
+
+            for entry in entries:
+                path: Path = entry["path"]
+                try:
+                    source = open_attachment(path, entry["encoding"])
+                except FileNotFoundError:
+                    missing.append(entry["arcname"])
+                    continue
+
+                info = _zip_info(entry["arcname"], entry["file_type"], entry["uploaded_at"])
+                with source, zf.open(info, mode="w", force_zip64=True) as target:
+                    while chunk := source.read(chunk_size):
+                        target.write(chunk)
+                        yield from stream.drain()
+
+            if missing:
+                zf.writestr(
+                    "archivos_faltantes.txt",
+                    "Archivos registrados que no se encontraron en disco:\n"
+                    + "\n".join(missing)
+                    + "\n",
+                )
+
+        # Directorio central (se escribe al cerrar el ZIP)
+        yield from stream.drain()
+
+    @staticmethod
+    def write_patient_archive(patient_id: int, target: Path, include_history: bool = True) -> Path:
+        """
+        Escribe el ZIP de un paciente en disco sin armarlo en memoria.
+
+        Args:
+            patient_id: ID del paciente
+            target: Ruta del ZIP a crear
+            include_history: Incluir el PDF de historia clínica
+
+        Returns:
+            Path: Ruta del ZIP creado
+        """
+        with open(target, "wb") as f:
+            for chunk in PatientArchiveService.iter_patient_archive(patient_id, include_history):
+                f.write(chunk)
+        return target
@@ -0,0 +1,245 @@
+"""
+Cache de lectura de los datos de un paciente (detalle, consulta, historia clínica).
+
+Las vistas de un paciente activo se repiten mucho (volver al detalle, abrir una
+consulta, generar el PDF) y releen siempre el mismo paciente, su resumen y sus
+consultas/estudios. Este servicio los sirve desde el cache (ver
+app/utils/cache_backend.py) con claves versionadas por paciente:
+
+    patient:{id}:v{versión}:{nombre}
+
+Los servicios que modifican datos del paciente (paciente, consultas, estudios y
+archivos) llaman a invalidate(), que incrementa la versión: las entradas viejas
+dejan de usarse y vencen solas, sin tener que buscarlas ni borrarlas. Con un
+backend compartido la versión es la misma para todos los workers; con el cache
+en memoria cada worker incrementa su propia versión al recibir el aviso del bus
+(ver invalidation_bus). El aviso se publica siempre: además le indica a los
+demás workers que no lean de la réplica hasta que tenga la escritura.
+
+Lo leído de una réplica (read_session_scope) puede estar atrasado: se sirve
+desde el cache si ya está, pero no se guarda.
+"""
+
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional, TypeVar
+
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import PATIENT_CACHE_TTL
+from app.database import reads_from_replica
+from app.models import Consultation, MedicalStudy, Patient, PatientSummary
+from app.services.patient_summary_service import PatientSummaryService
+from app.utils import invalidation_bus
+from app.utils.cache_backend import get_cache
+
+T = TypeVar("T")
+
+# En los procesos de reportes el cache en memoria no se usa (ver bypass_local_cache)
+_bypass_local = False
+
+
+def _version_key(patient_id: int) -> str:
+    """Clave del contador de versión de un paciente"""
+    return f"patient:{patient_id}:version"
+
+
+class PatientCacheService:
+    """Lecturas cacheadas por paciente con invalidación por versión"""
+
+    @staticmethod
+    def get_version(patient_id: int) -> int:
+        """Versión actual de los datos del paciente"""
+        return get_cache().get_counter(_version_key(patient_id))
+
+    @staticmethod
+    def invalidate(patient_id: Optional[int]) -> None:
+        """Marca como desactualizado todo lo cacheado del paciente"""
+        if patient_id:
+            cache = get_cache()
+            cache.incr(_version_key(patient_id))
+            invalidation_bus.publish("patient", str(patient_id))
+
+    @staticmethod
+    def bypass_local_cache() -> None:
+        """
+        Lee siempre de la base cuando el cache es propio del proceso (memoria).
+
+        Lo llama cada proceso del pool de reportes: su cache y sus versiones solo
+        se enteran de las ediciones por el bus de invalidación, con demora o nunca
+        (INVALIDATION_BUS=off), y un PDF saldría con la historia vieja.
+        """
+        global _bypass_local
+        _bypass_local = True
+
+    @staticmethod
+    def get_or_load(
+        patient_id: int, name: str, loader: Callable[[], T], store: bool = True
+    ) -> T:
+        """
+        Devuelve el valor cacheado o lo carga con `loader` y lo guarda.
+
+        Args:
+            patient_id: ID del paciente al que pertenece el dato
+            name: Nombre del dato dentro del paciente (ej: "patient", "history")
+            loader: Función que lee el dato de la base (None = no existe, no se cachea)
+            store: Si se guarda lo cargado (False para lecturas de la réplica)
+
+        Returns:
+            El valor cacheado o recién cargado
+        """
+        cache = get_cache()
+        if _bypass_local and not cache.shared:
+            return loader()
+        version = cache.get_counter(_version_key(patient_id))
+        key = f"patient:{patient_id}:v{version}:{name}"
+
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        value = loader()
+        if not store:
+            return value
+        # No cachear si el paciente cambió mientras se leía
+        if value is not None and cache.get_counter(_version_key(patient_id)) == version:
+            cache.set(key, value, PATIENT_CACHE_TTL)
+        return value
+
+    @staticmethod
+    async def get_or_load_async(
+        patient_id: int, name: str, loader: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Versión de get_or_load con un `loader` async (mismas claves y versiones)"""
+        cache = get_cache()
+        if _bypass_local and not cache.shared:
+            return await loader()
+        version = cache.get_counter(_version_key(patient_id))
+        key = f"patient:{patient_id}:v{version}:{name}"
+
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        value = await loader()
+        if value is not None and cache.get_counter(_version_key(patient_id)) == version:
+            cache.set(key, value, PATIENT_CACHE_TTL)
+        return value
+
+    @staticmethod
+    def get_patient(session: Session, patient_id: int) -> Optional[Patient]:
+        """
+        Paciente por ID desde el cache.
+
+        Devuelve una instancia nueva, sin sesión: sirve para leer columnas y
+        propiedades (full_name, age), no para modificar ni navegar relaciones.
+        """
+        data = PatientCacheService.get_or_load(
+            patient_id,
+            "patient",
+            lambda: _dump(session.get(Patient, patient_id)),
+            store=not reads_from_replica(session),
+        )
+        return Patient(**data) if data else None
+
+    @staticmethod
+    def get_summary(session: Session, patient_id: int) -> Optional[PatientSummary]:
+        """Resumen materializado del paciente (conteos, última consulta) desde el cache"""
+        data = PatientCacheService.get_or_load(
+            patient_id,
+            "summary",
+            lambda: _dump(PatientSummaryService.get_summary(session, patient_id)),
+            store=not reads_from_replica(session),
+        )
+        return PatientSummary(**data) if data else None
+
+    @staticmethod
+    async def get_patient_async(session: AsyncSession, patient_id: int) -> Optional[Patient]:
+        """Versión async de get_patient"""
+
+        async def load() -> Optional[dict]:
+            return _dump(await session.get(Patient, patient_id))
+
+        data = await PatientCacheService.get_or_load_async(patient_id, "patient", load)
+        return Patient(**data) if data else None
+
+    @staticmethod
+    async def get_summary_async(
+        session: AsyncSession, patient_id: int
+    ) -> Optional[PatientSummary]:
+        """Versión async de get_summary"""
+
+        async def load() -> Optional[dict]:
+            summary = await session.get(PatientSummary, patient_id)
+            if summary is None:
+                # Falta el resumen: se crea con el servicio sincrónico (escritura)
+                summary = await session.run_sync(
+                    lambda sync_session: PatientSummaryService.get_summary(
+                        sync_session, patient_id
+                    )
+                )
+            return _dump(summary)
+
+        data = await PatientCacheService.get_or_load_async(patient_id, "summary", load)
+        return PatientSummary(**data) if data else None
+
+    @staticmethod
+    def get_history(
+        session: Session, patient_id: int
+    ) -> Optional[tuple[Patient, list[Consultation], list[MedicalStudy]]]:
+        """
+        Paciente con todas sus consultas y estudios (para la historia clínica).
+
+        Returns:
+            tuple: (paciente, consultas, estudios) o None si el paciente no existe
+        """
+
+        def load() -> Optional[dict[str, Any]]:
+            patient = session.get(Patient, patient_id)
+            if not patient:
+                return None
+            consultations = session.exec(
+                select(Consultation)
+                .where(Consultation.patient_id == patient_id)
+                .order_by(Consultation.consultation_date.desc())
+            ).all()
+            studies = session.exec(
+                select(MedicalStudy)
+                .where(MedicalStudy.patient_id == patient_id)
+                .order_by(MedicalStudy.study_date.desc())
+            ).all()
+            return {
+                "patient": _dump(patient),
+                "consultations": [_dump(c) for c in consultations],
+                "studies": [_dump(s) for s in studies],
+            }
+
+        data = PatientCacheService.get_or_load(
+            patient_id, "history", load, store=not reads_from_replica(session)
+        )
+        if not data:
+            return None
+        return (
+            Patient(**data["patient"]),
+            [Consultation(**c) for c in data["consultations"]],
+            [MedicalStudy(**s) for s in data["studies"]],
+        )
+
+
+def _dump(model) -> Optional[dict]:
+    """Columnas de un modelo como dict (lo que se guarda en el cache)"""
+    return model.model_dump() if model is not None else None
+
+
+def _invalidate_local(key: Optional[str]) -> None:
+    """Aplica en este worker una invalidación publicada por otro"""
+    cache = get_cache()
+    if cache.shared:
+        return
+    if key is None:
+        cache.clear()
+    else:
+        cache.incr(_version_key(int(key)))
+
+
+invalidation_bus.subscribe("patient", _invalidate_local)
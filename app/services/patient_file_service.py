@@ -1,19 +1,74 @@
 """Servicio para gestionar archivos adjuntos directos de pacientes"""
 
-from datetime import UTC, datetime
 from io import BytesIO
 from pathlib import Path
 from typing import Optional
 
-from sqlmodel import Session, select
+from sqlmodel import Session, func, select
 
 from app.config import PATIENTS_PATH
 from app.models.patient_file import FileCategory, PatientFile
+from app.services.patient_cache_service import PatientCacheService
+from app.services.patient_summary_service import PatientSummaryService
+from app.services.storage_service import StorageService
+from app.services.storage_tier_service import StorageTierService
+from app.utils.file_io import (
+    attachment_filename,
+    read_attachment_async,
+    run_in_file_pool,
+    write_attachment,
+)
 
 
 class PatientFileService:
     """Servicio para operaciones CRUD de archivos de pacientes"""
 
+    @staticmethod
+    def _prepare_file(
+        session: Session,
+        patient_id: int,
+        file_content: BytesIO,
+        file_name: str,
+        file_type: str,
+        file_category: str,
+        description: Optional[str],
+    ) -> tuple[PatientFile, Path, int]:
+        """Valida el paciente y arma el registro y la ruta en disco (sin tocar el disco)"""
+        from app.models import Patient
+
+        # Verificar que el paciente existe
+        patient = session.get(Patient, patient_id)
+        if not patient:
+            raise ValueError(f"Paciente {patient_id} no encontrado")
+
+        # Obtener el tamaño del archivo
+        file_content.seek(0, 2)  # Ir al final
+        file_size = file_content.tell()
+        file_content.seek(0)  # Volver al inicio
+
+        # Generar nombre único para el archivo (timestamp + sufijo aleatorio)
+        unique_filename = attachment_filename(f"patient_{patient_id}", file_name)
+        file_relative_path = f"patient_{patient_id}/{unique_filename}"
+
+        patient_file = PatientFile(
+            patient_id=patient_id,
+            file_category=file_category,
+            file_path=file_relative_path,
+            file_name=file_name,
+            file_type=file_type,
+            file_size=file_size,
+            description=description,
+        )
+        return patient_file, PATIENTS_PATH / file_relative_path, patient_id
+
+    @staticmethod
+    def _after_create(session: Session, patient_file: PatientFile, patient_id: int) -> None:
+        """Refresca el registro recién guardado e invalida resúmenes y cachés del paciente"""
+        session.refresh(patient_file)
+        PatientSummaryService.refresh_patient(session, patient_id)
+        PatientCacheService.invalidate(patient_id)
+        StorageService.invalidate_cache()
+
     @staticmethod
     def create_file(
         session: Session,
@@ -39,50 +94,56 @@ class PatientFileService:
         Returns:
             PatientFile creado y guardado
         """
-        from app.models import Patient
-
-        # Verificar que el paciente existe
-        patient = session.get(Patient, patient_id)
-        if not patient:
-            raise ValueError(f"Paciente {patient_id} no encontrado")
-
-        # Obtener el tamaño del archivo
-        file_content.seek(0, 2)  # Ir al final
-        file_size = file_content.tell()
-        file_content.seek(0)  # Volver al inicio
+        patient_file, file_absolute_path, patient_id = PatientFileService._prepare_file(
+            session, patient_id, file_content, file_name, file_type, file_category, description
+        )
 
-        # Generar nombre único para el archivo
-        timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
-        safe_filename = file_name.replace(" ", "_")
-        unique_filename = f"patient_{patient_id}_{timestamp}_{safe_filename}"
+        # Fase 1: archivo completo en disco (temporal + fsync + rename atómico)
+        write_attachment(file_absolute_path, file_content)
 
-        # Crear directorio del paciente si no existe
-        patient_dir = PATIENTS_PATH / f"patient_{patient_id}"
-        patient_dir.mkdir(parents=True, exist_ok=True)
+        # Fase 2: registro en la base; si falla, el archivo recién escrito sobra
+        try:
+            session.add(patient_file)
+            session.commit()
+        except Exception:
+            session.rollback()
+            file_absolute_path.unlink(missing_ok=True)
+            raise
 
-        # Ruta completa del archivo
-        file_absolute_path = patient_dir / unique_filename
-        file_relative_path = f"patient_{patient_id}/{unique_filename}"
+        PatientFileService._after_create(session, patient_file, patient_id)
+        return patient_file
 
-        # Guardar archivo físico
-        with open(file_absolute_path, "wb") as f:
-            f.write(file_content.read())
+    @staticmethod
+    async def create_file_async(
+        session: Session,
+        patient_id: int,
+        file_content: BytesIO,
+        file_name: str,
+        file_type: str,
+        file_category: str = FileCategory.DOCUMENT.value,
+        description: Optional[str] = None,
+    ) -> PatientFile:
+        """
+        Versión async de create_file para handlers async.
 
-        # Crear registro en la base de datos
-        patient_file = PatientFile(
-            patient_id=patient_id,
-            file_category=file_category,
-            file_path=file_relative_path,
-            file_name=file_name,
-            file_type=file_type,
-            file_size=file_size,
-            description=description,
+        Solo la escritura a disco (y el borrado si falla el commit) va al pool
+        acotado de E/S (FILE_IO_WORKERS); la sesión se usa en el hilo del llamador.
+        """
+        patient_file, file_absolute_path, patient_id = PatientFileService._prepare_file(
+            session, patient_id, file_content, file_name, file_type, file_category, description
         )
 
-        session.add(patient_file)
-        session.commit()
-        session.refresh(patient_file)
+        await run_in_file_pool(write_attachment, file_absolute_path, file_content)
+
+        try:
+            session.add(patient_file)
+            session.commit()
+        except Exception:
+            session.rollback()
+            await run_in_file_pool(file_absolute_path.unlink, missing_ok=True)
+            raise
 
+        PatientFileService._after_create(session, patient_file, patient_id)
         return patient_file
 
     @staticmethod
@@ -114,12 +175,12 @@ class PatientFileService:
         return session.get(PatientFile, file_id)
 
     @staticmethod
-    def download_file(session: Session, file_id: int) -> Optional[tuple[Path, str]]:
+    def download_file(session: Session, file_id: int) -> Optional[tuple[Path, str, Optional[str]]]:
         """
-        Obtiene la ruta absoluta y nombre de un archivo para descarga.
+        Obtiene la ruta absoluta, el nombre y la codificación de un archivo para descarga.
 
         Returns:
-            Tupla (ruta_absoluta, nombre_archivo) o None si no existe
+            Tupla (ruta_absoluta, nombre_archivo, content_encoding) o None si no existe
         """
         patient_file = session.get(PatientFile, file_id)
         if not patient_file:
@@ -129,7 +190,22 @@ class PatientFileService:
         if not file_path.exists():
             return None
 
-        return file_path, patient_file.file_name
+        StorageTierService.mark_accessed(session, patient_file)
+        return file_path, patient_file.file_name, patient_file.content_encoding
+
+    @staticmethod
+    async def read_file_async(session: Session, file_id: int) -> Optional[tuple[bytes, str]]:
+        """
+        Lee el contenido de un archivo para descarga sin bloquear el event loop.
+
+        Returns:
+            Tupla (contenido, nombre_archivo) o None si no existe
+        """
+        result = PatientFileService.download_file(session, file_id)
+        if not result:
+            return None
+        file_path, file_name, encoding = result
+        return await read_attachment_async(file_path, encoding), file_name
 
     @staticmethod
     def delete_file(session: Session, file_id: int) -> bool:
@@ -149,16 +225,22 @@ class PatientFileService:
             file_path.unlink()
 
         # Eliminar registro de la base de datos
+        patient_id = patient_file.patient_id
         session.delete(patient_file)
         session.commit()
 
+        PatientSummaryService.refresh_patient(session, patient_id)
+        PatientCacheService.invalidate(patient_id)
+        StorageService.invalidate_cache()
         return True
 
     @staticmethod
     def get_total_size_by_patient(session: Session, patient_id: int) -> int:
         """Calcula el tamaño total de archivos directos de un paciente (en bytes)"""
-        files = PatientFileService.get_files_by_patient(session, patient_id)
-        return sum(f.file_size for f in files)
+        statement = select(func.coalesce(func.sum(PatientFile.file_size), 0)).where(
+            PatientFile.patient_id == patient_id
+        )
+        return session.exec(statement).one()
 
     @staticmethod
     def get_files_by_category(session: Session, patient_id: int) -> dict[str, list[PatientFile]]:
@@ -0,0 +1,199 @@
+"""Consulta unificada de archivos de un paciente (paciente, estudios y consultas)"""
+
+from typing import Optional
+
+from sqlalchemy import String, case, cast, func, literal, null, union_all
+from sqlmodel import Session, select
+
+from app.models import Consultation, MedicalStudy
+from app.models.consultation_file import ConsultationFile
+from app.models.patient_file import PatientFile
+from app.models.study_file import StudyFile
+
+# Categorías de origen válidas para filtrar
+FILE_SOURCES = ("patient", "study", "consultation")
+
+
+class PatientFilesQueryService:
+    """
+    Lista los archivos de un paciente de las tres fuentes en una sola consulta.
+
+    Arma un UNION ALL de patient_files, study_files (join a medical_studies) y
+    consultation_files (join a consultations); ordena, pagina y calcula los totales
+    por categoría en SQL. Las filas se devuelven como tuplas compactas:
+    (category, file_id, file_name, file_size, file_type, uploaded_at, description,
+    source_id, source_name).
+    """
+
+    @staticmethod
+    def _union(patient_id: int):
+        """UNION ALL de las tres fuentes de archivos del paciente (subquery)"""
+        patient_files = select(
+            literal("patient").label("category"),
+            PatientFile.id.label("file_id"),
+            PatientFile.file_name,
+            PatientFile.file_size,
+            PatientFile.file_type,
+            PatientFile.uploaded_at,
+            PatientFile.description,
+            PatientFile.patient_id.label("source_id"),
+            PatientFile.file_category.label("source_label"),
+            cast(null(), Consultation.consultation_date.type).label("source_date"),
+        ).where(PatientFile.patient_id == patient_id)
+
+        study_files = (
+            select(
+                literal("study").label("category"),
+                StudyFile.id.label("file_id"),
+                StudyFile.file_name,
+                StudyFile.file_size,
+                StudyFile.file_type,
+                StudyFile.uploaded_at,
+                StudyFile.description,
+                StudyFile.study_id.label("source_id"),
+                MedicalStudy.study_name.label("source_label"),
+                cast(null(), Consultation.consultation_date.type).label("source_date"),
+            )
+            .join(MedicalStudy, MedicalStudy.id == StudyFile.study_id)
+            .where(MedicalStudy.patient_id == patient_id)
+        )
+
+        consultation_files = (
+            select(
+                literal("consultation").label("category"),
+                ConsultationFile.id.label("file_id"),
+                ConsultationFile.file_name,
+                ConsultationFile.file_size,
+                ConsultationFile.file_type,
+                ConsultationFile.uploaded_at,
+                ConsultationFile.description,
+                ConsultationFile.consultation_id.label("source_id"),
+                cast(null(), String).label("source_label"),
+                Consultation.consultation_date.label("source_date"),
+            )
+            .join(Consultation, Consultation.id == ConsultationFile.consultation_id)
+            .where(Consultation.patient_id == patient_id)
+        )
+
+        return union_all(patient_files, study_files, consultation_files).subquery("files")
+
+    @staticmethod
+    def _source_name(category: str, source_id: int, label: Optional[str], source_date) -> str:
+        """Nombre descriptivo del origen de un archivo"""
+        if category == "consultation":
+            if source_date:
+                return f"Consulta {source_date.strftime('%Y-%m-%d')}"
+            return f"Consulta #{source_id}"
+        if category == "study" and not label:
+            return f"Estudio #{source_id}"
+        return label or ""
+
+    @staticmethod
+    def get_files_page(
+        session: Session,
+        patient_id: int,
+        category: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> tuple[list[tuple], dict]:
+        """
+        Obtiene una página de archivos del paciente y los totales en un solo round-trip.
+
+        Los totales se calculan con funciones de ventana sobre el UNION completo, antes
+        de aplicar el filtro de categoría, así que no dependen de la página pedida.
+
+        Args:
+            session: Sesión de base de datos
+            patient_id: ID del paciente
+            category: "patient", "study", "consultation" o None para todas
+            offset: Cantidad de filas a saltear
+            limit: Tamaño de página
+
+        Returns:
+            tuple: (filas, totales) donde totales es un dict con total, patient, study,
+            consultation y total_bytes
+        """
+        files = PatientFilesQueryService._union(patient_id)
+
+        def _category_count(name: str):
+            return func.sum(case((files.c.category == name, 1), else_=0)).over()
+
+        ranked = select(
+            files,
+            func.count().over().label("total_count"),
+            _category_count("patient").label("patient_count"),
+            _category_count("study").label("study_count"),
+            _category_count("consultation").label("consultation_count"),
+            func.sum(files.c.file_size).over().label("total_bytes"),
+        ).subquery("ranked")
+
+        query = select(ranked)
+        if category in FILE_SOURCES:
+            query = query.where(ranked.c.category == category)
+        query = (
+            query.order_by(ranked.c.uploaded_at.desc(), ranked.c.file_id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+
+        result = session.exec(query).all()
+
+        if result:
+            first = result[0]
+            totals = {
+                "total": first.total_count,
+                "patient": first.patient_count or 0,
+                "study": first.study_count or 0,
+                "consultation": first.consultation_count or 0,
+                "total_bytes": first.total_bytes or 0,
+            }
+        elif category in FILE_SOURCES or offset > 0:
+            # Página vacía por el filtro/offset: los totales requieren una consulta aparte
+            totals = PatientFilesQueryService.get_totals(session, patient_id)
+        else:
+            totals = {"total": 0, "patient": 0, "study": 0, "consultation": 0, "total_bytes": 0}
+
+        rows = [
+            (
+                row.category,
+                row.file_id,
+                row.file_name,
+                row.file_size,
+                row.file_type,
+                row.uploaded_at,
+                row.description,
+                row.source_id,
+                PatientFilesQueryService._source_name(
+                    row.category, row.source_id, row.source_label, row.source_date
+                ),
+            )
+            for row in result
+        ]
+
+        return rows, totals
+
+    @staticmethod
+    def get_totals(session: Session, patient_id: int) -> dict:
+        """
+        Obtiene la cantidad de archivos por categoría y el total de bytes del paciente.
+
+        Args:
+            session: Sesión de base de datos
+            patient_id: ID del paciente
+
+        Returns:
+            dict: total, patient, study, consultation y total_bytes
+        """
+        files = PatientFilesQueryService._union(patient_id)
+
+        query = select(files.c.category, func.count(), func.sum(files.c.file_size)).group_by(
+            files.c.category
+        )
+
+        totals = {"total": 0, "patient": 0, "study": 0, "consultation": 0, "total_bytes": 0}
+        for category, count, size in session.exec(query).all():
+            totals[category] = count
+            totals["total"] += count
+            totals["total_bytes"] += size or 0
+
+        return totals
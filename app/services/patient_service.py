@@ -3,9 +3,15 @@
 from datetime import UTC, datetime
 from typing import Optional
 
-from sqlmodel import Session, or_, select
-
-from app.models import Patient
+from sqlmodel import Session, func, or_, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import Patient, PatientSummary
+from app.services.agenda_service import AgendaService
+from app.services.patient_cache_service import PatientCacheService
+from app.services.patient_summary_service import PatientSummaryService
+from app.services.projections import PatientRow
+from app.utils import search_cache
 from app.utils.text_utils import normalize_search_term
 from app.utils.validators import (
     normalize_dni,
@@ -75,6 +81,9 @@ class PatientService:
         session.commit()
         session.refresh(patient)
 
+        PatientSummaryService.refresh_patient(session, patient.id)
+        PatientCacheService.invalidate(patient.id)
+        search_cache.invalidate("patients")
         return patient
 
     @staticmethod
@@ -140,6 +149,18 @@ class PatientService:
         Returns:
             Lista de pacientes que coinciden
         """
+        query = (
+            select(Patient)
+            .where(PatientService._search_condition(search_term))
+            .where(Patient.is_active == True)  # noqa: E712
+            .order_by(Patient.last_name, Patient.first_name)
+        )
+
+        return list(session.exec(query).all())
+
+    @staticmethod
+    def _search_condition(search_term: str):
+        """Condición de búsqueda por nombre, apellido o DNI (sin acentos, DNI normalizado)"""
         # Normalizar término de búsqueda (sin acentos, minúsculas)
         normalized_term = normalize_search_term(search_term)
         search_pattern = f"%{normalized_term}%"
@@ -148,23 +169,191 @@ class PatientService:
         normalized_dni = normalize_dni(search_term)
         dni_pattern = f"%{normalized_dni}%"
 
-        query = (
-            select(Patient)
-            .where(
-                or_(
-                    # Comparar nombres/apellidos sin acentos
-                    Patient.first_name.ilike(search_pattern),
-                    Patient.last_name.ilike(search_pattern),
-                    # Buscar por DNI
-                    Patient.dni.ilike(search_pattern),
-                    Patient.dni.ilike(dni_pattern),
-                )
-            )
-            .where(Patient.is_active == True)  # noqa: E712
-            .order_by(Patient.last_name, Patient.first_name)
+        return or_(
+            # Comparar nombres/apellidos sin acentos
+            Patient.first_name.ilike(search_pattern),
+            Patient.last_name.ilike(search_pattern),
+            # Buscar por DNI
+            Patient.dni.ilike(search_pattern),
+            Patient.dni.ilike(dni_pattern),
         )
 
-        return list(session.exec(query).all())
+    @staticmethod
+    def get_patient_rows(
+        session: Session,
+        include_inactive: bool = False,
+        search_term: Optional[str] = None,
+        gender: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        patient_ids: Optional[list[int]] = None,
+    ) -> list[PatientRow]:
+        """
+        Filas compactas para el listado de pacientes.
+
+        Selecciona solo las columnas que muestra la tarjeta del listado (sin
+        antecedentes, notas ni dirección) y la fecha de última consulta desde
+        patient_summary en la misma consulta.
+
+        Args:
+            session: Sesión de base de datos
+            include_inactive: Si incluir pacientes inactivos
+            search_term: Término de búsqueda por nombre, apellido o DNI (opcional)
+            gender: Filtrar por género (opcional)
+            offset: Cantidad de filas a saltear (ventana del listado virtualizado)
+            limit: Cantidad máxima de filas (None = todas)
+            patient_ids: Resultado de search_patient_ids; si se indica, la ventana
+                se toma de esta lista en lugar de toda la tabla
+
+        Returns:
+            Lista de PatientRow ordenada por apellido y nombre
+        """
+        query = PatientService._rows_query(
+            include_inactive, search_term, gender, offset, limit, patient_ids
+        )
+        if query is None:
+            return []
+        return [PatientRow.from_row(row) for row in session.exec(query).all()]
+
+    @staticmethod
+    async def get_patient_rows_async(
+        session: AsyncSession,
+        include_inactive: bool = False,
+        search_term: Optional[str] = None,
+        gender: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        patient_ids: Optional[list[int]] = None,
+    ) -> list[PatientRow]:
+        """Versión async de get_patient_rows (mismos argumentos, sesión async)"""
+        query = PatientService._rows_query(
+            include_inactive, search_term, gender, offset, limit, patient_ids
+        )
+        if query is None:
+            return []
+        return [PatientRow.from_row(row) for row in (await session.exec(query)).all()]
+
+    @staticmethod
+    def _rows_query(
+        include_inactive: bool,
+        search_term: Optional[str],
+        gender: Optional[str],
+        offset: int,
+        limit: Optional[int],
+        patient_ids: Optional[list[int]],
+    ):
+        """SELECT de get_patient_rows (None si la ventana de IDs está vacía)"""
+        query = select(
+            Patient.id,
+            Patient.first_name,
+            Patient.last_name,
+            Patient.dni,
+            Patient.birth_date,
+            Patient.phone,
+            Patient.email,
+            Patient.blood_type,
+            Patient.is_active,
+            PatientSummary.last_consultation_date,
+        ).outerjoin(PatientSummary, PatientSummary.patient_id == Patient.id)
+
+        query = query.where(
+            *PatientService._row_filters(include_inactive, search_term, gender)
+        ).order_by(Patient.last_name, Patient.first_name, Patient.id)
+
+        if patient_ids is not None:
+            window_ids = patient_ids[offset : offset + limit] if limit else patient_ids[offset:]
+            if not window_ids:
+                return None
+            return query.where(Patient.id.in_(window_ids))
+
+        query = query.offset(offset)
+        if limit:
+            query = query.limit(limit)
+        return query
+
+    @staticmethod
+    def search_patient_ids(
+        session: Session, search_term: str, gender: Optional[str] = None
+    ) -> list[int]:
+        """
+        IDs de los pacientes activos que coinciden con la búsqueda, en el orden
+        del listado. El resultado queda en el cache de búsquedas recientes.
+
+        Args:
+            session: Sesión de base de datos
+            search_term: Término de búsqueda por nombre, apellido o DNI
+            gender: Filtrar por género (opcional)
+
+        Returns:
+            list[int]: IDs de pacientes ordenados por apellido y nombre
+        """
+        search_term = search_term.strip()
+        query = PatientService._search_ids_query(search_term, gender)
+
+        def search() -> list[int]:
+            return list(session.exec(query).all())
+
+        return search_cache.get_or_search("patients", (search_term.lower(), gender), search)
+
+    @staticmethod
+    async def search_patient_ids_async(
+        session: AsyncSession, search_term: str, gender: Optional[str] = None
+    ) -> list[int]:
+        """Versión async de search_patient_ids (comparte el cache de búsquedas)"""
+        search_term = search_term.strip()
+        query = PatientService._search_ids_query(search_term, gender)
+
+        async def search() -> list[int]:
+            return list((await session.exec(query)).all())
+
+        return await search_cache.get_or_search_async(
+            "patients", (search_term.lower(), gender), search
+        )
+
+    @staticmethod
+    def _search_ids_query(search_term: str, gender: Optional[str]):
+        """SELECT de los IDs de pacientes activos que coinciden con la búsqueda"""
+        return (
+            select(Patient.id)
+            .where(*PatientService._row_filters(False, search_term, gender))
+            .order_by(Patient.last_name, Patient.first_name, Patient.id)
+        )
+
+    @staticmethod
+    def count_patient_rows(
+        session: Session,
+        include_inactive: bool = False,
+        search_term: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> int:
+        """Cantidad de filas del listado con los mismos filtros que get_patient_rows"""
+        conditions = PatientService._row_filters(include_inactive, search_term, gender)
+        return session.exec(select(func.count(Patient.id)).where(*conditions)).one()
+
+    @staticmethod
+    async def count_patient_rows_async(
+        session: AsyncSession,
+        include_inactive: bool = False,
+        search_term: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> int:
+        """Versión async de count_patient_rows"""
+        conditions = PatientService._row_filters(include_inactive, search_term, gender)
+        return (await session.exec(select(func.count(Patient.id)).where(*conditions))).one()
+
+    @staticmethod
+    def _row_filters(
+        include_inactive: bool, search_term: Optional[str], gender: Optional[str]
+    ) -> list:
+        """Condiciones WHERE del listado de pacientes"""
+        conditions = []
+        if not include_inactive:
+            conditions.append(Patient.is_active == True)  # noqa: E712
+        if search_term:
+            conditions.append(PatientService._search_condition(search_term))
+        if gender:
+            conditions.append(Patient.gender == gender)
+        return conditions
 
     @staticmethod
     def update_patient(session: Session, patient_id: int, update_data: dict) -> Optional[Patient]:
@@ -234,6 +423,9 @@ class PatientService:
         session.commit()
         session.refresh(patient)
 
+        AgendaService.invalidate_cache()
+        search_cache.invalidate("patients")
+        PatientCacheService.invalidate(patient.id)
         return patient
 
     @staticmethod
@@ -261,6 +453,9 @@ class PatientService:
         session.add(patient)
         session.commit()
 
+        AgendaService.invalidate_cache()
+        search_cache.invalidate("patients")
+        PatientCacheService.invalidate(patient.id)
         return True
 
     @staticmethod
@@ -286,6 +481,9 @@ class PatientService:
         session.add(patient)
         session.commit()
 
+        AgendaService.invalidate_cache()
+        search_cache.invalidate("patients")
+        PatientCacheService.invalidate(patient.id)
         return True
 
     @staticmethod
@@ -306,3 +504,13 @@ class PatientService:
             query = query.where(Patient.is_active == True)  # noqa: E712
 
         return len(list(session.exec(query).all()))
+
+    @staticmethod
+    async def get_patient_count_async(session: AsyncSession, include_inactive: bool = False) -> int:
+        """Versión async de get_patient_count (cuenta en SQL sin cargar los pacientes)"""
+        query = select(func.count(Patient.id))
+
+        if not include_inactive:
+            query = query.where(Patient.is_active == True)  # noqa: E712
+
+        return (await session.exec(query)).one()
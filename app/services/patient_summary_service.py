@@ -0,0 +1,264 @@
+"""
+Servicio para mantener la tabla de resumen por paciente (patient_summary).
+"""
+
+from datetime import UTC, datetime
+from typing import Optional
+
+from sqlalchemy import case, delete
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlmodel import Session, func, select
+
+from app.models import (
+    Consultation,
+    ConsultationFile,
+    MedicalStudy,
+    Patient,
+    PatientFile,
+    PatientSummary,
+    StudyFile,
+)
+
+
+class PatientSummaryService:
+    """Servicio para leer y mantener el resumen materializado de pacientes."""
+
+    @staticmethod
+    def _compute(session: Session, patient_id: int) -> dict:
+        """
+        Calcula los agregados de un paciente en una sola consulta.
+
+        Args:
+            session: Sesión de base de datos
+            patient_id: ID del paciente
+
+        Returns:
+            dict con los valores de las columnas de PatientSummary
+        """
+        consultation_count = (
+            select(func.count(Consultation.id))
+            .where(Consultation.patient_id == patient_id)
+            .scalar_subquery()
+        )
+        last_consultation_date = (
+            select(func.max(Consultation.consultation_date))
+            .where(Consultation.patient_id == patient_id)
+            .scalar_subquery()
+        )
+        study_count = (
+            select(func.count(MedicalStudy.id))
+            .where(MedicalStudy.patient_id == patient_id)
+            .scalar_subquery()
+        )
+        pending_study_count = (
+            select(func.coalesce(func.sum(case((MedicalStudy.is_pending, 1), else_=0)), 0))
+            .where(MedicalStudy.patient_id == patient_id)
+            .scalar_subquery()
+        )
+        critical_study_count = (
+            select(func.coalesce(func.sum(case((MedicalStudy.is_critical, 1), else_=0)), 0))
+            .where(MedicalStudy.patient_id == patient_id)
+            .scalar_subquery()
+        )
+        patient_bytes = (
+            select(func.coalesce(func.sum(PatientFile.file_size), 0))
+            .where(PatientFile.patient_id == patient_id)
+            .scalar_subquery()
+        )
+        study_bytes = (
+            select(func.coalesce(func.sum(StudyFile.file_size), 0))
+            .join(MedicalStudy, StudyFile.study_id == MedicalStudy.id)
+            .where(MedicalStudy.patient_id == patient_id)
+            .scalar_subquery()
+        )
+        consultation_bytes = (
+            select(func.coalesce(func.sum(ConsultationFile.file_size), 0))
+            .join(Consultation, ConsultationFile.consultation_id == Consultation.id)
+            .where(Consultation.patient_id == patient_id)
+            .scalar_subquery()
+        )
+
+        row = session.exec(
+            select(
+                consultation_count,
+                last_consultation_date,
+                study_count,
+                pending_study_count,
+                critical_study_count,
+                patient_bytes + study_bytes + consultation_bytes,
+            )
+        ).one()
+
+        return {
+            "consultation_count": row[0] or 0,
+            "last_consultation_date": row[1],
+            "study_count": row[2] or 0,
+            "pending_study_count": row[3] or 0,
+            "critical_study_count": row[4] or 0,
+            "total_attachment_bytes": row[5] or 0,
+        }
+
+    @staticmethod
+    def refresh_patient(session: Session, patient_id: Optional[int]) -> Optional[PatientSummary]:
+        """
+        Recalcula y guarda el resumen de un paciente.
+
+        Los servicios lo llaman después de cada escritura que afecta al paciente.
+        Solo recorre las filas de ese paciente (columnas patient_id indexadas).
+        Se guarda con un upsert: dos primeras escrituras concurrentes del mismo
+        paciente no chocan con la clave primaria (la escritura clínica del
+        llamador ya está confirmada y no debe informarse como error).
+
+        Args:
+            session: Sesión de base de datos
+            patient_id: ID del paciente (None no hace nada)
+
+        Returns:
+            PatientSummary actualizado o None si no hay paciente
+        """
+        if not patient_id:
+            return None
+
+        values = PatientSummaryService._compute(session, patient_id)
+        values["updated_at"] = datetime.now(UTC)
+
+        statement = PatientSummaryService._upsert(
+            session.get_bind().dialect.name, {"patient_id": patient_id, **values}, values
+        )
+        session.execute(statement)
+        session.commit()
+        return session.get(PatientSummary, patient_id, populate_existing=True)
+
+    @staticmethod
+    def _upsert(dialect: str, row: dict, updates: dict):
+        """INSERT de una fila de patient_summary que, si ya existe, la actualiza"""
+        if dialect == "mysql":
+            return mysql.insert(PatientSummary).values(**row).on_duplicate_key_update(**updates)
+
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        return (
+            insert(PatientSummary)
+            .values(**row)
+            .on_conflict_do_update(index_elements=[PatientSummary.patient_id], set_=updates)
+        )
+
+    @staticmethod
+    def get_summary(session: Session, patient_id: int) -> Optional[PatientSummary]:
+        """
+        Obtiene el resumen de un paciente, creándolo si todavía no existe.
+
+        Args:
+            session: Sesión de base de datos
+            patient_id: ID del paciente
+
+        Returns:
+            PatientSummary o None si el paciente no existe
+        """
+        summary = session.get(PatientSummary, patient_id)
+        if summary:
+            return summary
+
+        if not session.get(Patient, patient_id):
+            return None
+
+        return PatientSummaryService.refresh_patient(session, patient_id)
+
+    @staticmethod
+    def get_summaries(session: Session, patient_ids: list[int]) -> dict[int, PatientSummary]:
+        """
+        Obtiene los resúmenes de varios pacientes en una sola consulta.
+
+        Args:
+            session: Sesión de base de datos
+            patient_ids: IDs de los pacientes
+
+        Returns:
+            dict {patient_id: PatientSummary} (solo los que existen)
+        """
+        if not patient_ids:
+            return {}
+
+        statement = select(PatientSummary).where(PatientSummary.patient_id.in_(patient_ids))
+        return {s.patient_id: s for s in session.exec(statement).all()}
+
+    @staticmethod
+    def rebuild_all(session: Session, batch_size: int = 1000) -> int:
+        """
+        Reconstruye la tabla completa con consultas agrupadas (una por tabla).
+
+        Útil después de cargas masivas, restauración de backups o migraciones.
+
+        Args:
+            session: Sesión de base de datos
+            batch_size: Cantidad de filas insertadas por lote
+
+        Returns:
+            int: Cantidad de pacientes resumidos
+        """
+        summaries: dict[int, dict] = {
+            patient_id: {
+                "consultation_count": 0,
+                "last_consultation_date": None,
+                "study_count": 0,
+                "pending_study_count": 0,
+                "critical_study_count": 0,
+                "total_attachment_bytes": 0,
+            }
+            for patient_id in session.exec(select(Patient.id)).all()
+        }
+
+        consultations = session.exec(
+            select(
+                Consultation.patient_id,
+                func.count(Consultation.id),
+                func.max(Consultation.consultation_date),
+            ).group_by(Consultation.patient_id)
+        ).all()
+        for patient_id, count, last_date in consultations:
+            if patient_id in summaries:
+                summaries[patient_id]["consultation_count"] = count
+                summaries[patient_id]["last_consultation_date"] = last_date
+
+        studies = session.exec(
+            select(
+                MedicalStudy.patient_id,
+                func.count(MedicalStudy.id),
+                func.sum(case((MedicalStudy.is_pending, 1), else_=0)),
+                func.sum(case((MedicalStudy.is_critical, 1), else_=0)),
+            ).group_by(MedicalStudy.patient_id)
+        ).all()
+        for patient_id, count, pending, critical in studies:
+            if patient_id in summaries:
+                summaries[patient_id]["study_count"] = count
+                summaries[patient_id]["pending_study_count"] = pending or 0
+                summaries[patient_id]["critical_study_count"] = critical or 0
+
+        attachment_queries = [
+            select(PatientFile.patient_id, func.sum(PatientFile.file_size)).group_by(
+                PatientFile.patient_id
+            ),
+            select(MedicalStudy.patient_id, func.sum(StudyFile.file_size))
+            .join(MedicalStudy, StudyFile.study_id == MedicalStudy.id)
+            .group_by(MedicalStudy.patient_id),
+            select(Consultation.patient_id, func.sum(ConsultationFile.file_size))
+            .join(Consultation, ConsultationFile.consultation_id == Consultation.id)
+            .group_by(Consultation.patient_id),
+        ]
+        for statement in attachment_queries:
+            for patient_id, total in session.exec(statement).all():
+                if patient_id in summaries:
+                    summaries[patient_id]["total_attachment_bytes"] += total or 0
+
+        # Reemplazar la tabla completa en una transacción
+        now = datetime.now(UTC)
+        session.execute(delete(PatientSummary))
+
+        rows = [
+            {"patient_id": patient_id, "updated_at": now, **values}
+            for patient_id, values in summaries.items()
+        ]
+        for start in range(0, len(rows), batch_size):
+            session.bulk_insert_mappings(PatientSummary, rows[start : start + batch_size])
+
+        session.commit()
+        return len(rows)
@@ -0,0 +1,207 @@
+"""
+Filas compactas (DTOs) para los listados de la interfaz.
+
+Reflex serializa y compara el estado en cada cambio; guardar modelos SQLModel
+completos en listas (todas las columnas de texto libre, timestamps, etc.) hace
+que cada actualización viaje y se procese de más. Estas clases tienen solo lo
+que cada listado muestra, ya formateado, y se construyen desde consultas que
+seleccionan columnas puntuales. El detalle completo se carga bajo demanda.
+"""
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.models import Consultation
+
+
+def _truncate(text: Optional[str], length: int) -> str:
+    """Recorta un texto largo agregando "..." """
+    if text and len(text) > length:
+        return text[:length] + "..."
+    return text or ""
+
+
+class PatientRow(BaseModel):
+    """Fila del listado de pacientes"""
+
+    id: int
+    full_name: str
+    dni: str
+    birth_date: str
+    phone: str = ""
+    email: str = ""
+    blood_type: str = ""
+    is_active: bool = True
+    last_visit: str = ""
+    # Nombres de la medicación en curso (ver MedicationService, consulta por lote)
+    current_medications: str = ""
+
+    @classmethod
+    def from_row(cls, row) -> "PatientRow":
+        """Desde una fila de PatientService.get_patient_rows"""
+        return cls(
+            id=row.id,
+            full_name=f"{row.first_name} {row.last_name}",
+            dni=row.dni or "",
+            birth_date=row.birth_date.isoformat() if row.birth_date else "",
+            phone=row.phone or "",
+            email=row.email or "",
+            blood_type=row.blood_type or "",
+            is_active=row.is_active,
+            last_visit=(
+                row.last_consultation_date.strftime("%Y-%m-%d")
+                if row.last_consultation_date
+                else ""
+            ),
+        )
+
+
+class ConsultationRow(BaseModel):
+    """Fila del timeline de consultas del detalle de paciente"""
+
+    id: int
+    consultation_date: str
+    reason: str
+    diagnosis: str = ""
+    treatment: str = ""
+    has_vital_signs: bool = False
+    blood_pressure: str = ""
+    temperature: str = ""
+    bmi: str = ""
+
+    @classmethod
+    def from_row(cls, row) -> "ConsultationRow":
+        """Desde una fila de ConsultationService.get_consultation_rows_by_patient"""
+        bmi = Consultation.compute_bmi(row.weight, row.height)
+        return cls(
+            id=row.id,
+            consultation_date=row.consultation_date.strftime("%Y-%m-%d %H:%M"),
+            reason=row.reason or "",
+            diagnosis=row.diagnosis or "",
+            treatment=row.treatment or "",
+            has_vital_signs=any(
+                [row.blood_pressure, row.heart_rate, row.temperature, row.weight, row.height]
+            ),
+            blood_pressure=row.blood_pressure or "",
+            temperature=str(row.temperature) if row.temperature else "",
+            bmi=str(bmi) if bmi else "",
+        )
+
+
+class ConsultationListRow(BaseModel):
+    """Fila del listado general de consultas"""
+
+    id: int
+    patient_id: int
+    patient_name: str
+    patient_dni: str = ""
+    consultation_date: str
+    reason: str
+    diagnosis: str = ""
+    has_vital_signs: bool = False
+    bmi: str = ""
+    bmi_category: str = ""
+    next_visit: str = ""
+    file_count: int = 0
+    file_count_text: str = ""
+    has_files: bool = False
+
+    @classmethod
+    def from_row(cls, row, file_count: int = 0) -> "ConsultationListRow":
+        """Desde una fila de ConsultationQueryService.get_consultation_page"""
+        bmi = Consultation.compute_bmi(row.weight, row.height)
+        return cls(
+            id=row.id,
+            patient_id=row.patient_id,
+            patient_name=(
+                f"{row.first_name} {row.last_name}" if row.first_name else "Paciente Desconocido"
+            ),
+            patient_dni=row.dni or "",
+            consultation_date=row.consultation_date.strftime("%Y-%m-%d %H:%M"),
+            reason=row.reason or "",
+            diagnosis=row.diagnosis or "",
+            has_vital_signs=any(
+                [row.blood_pressure, row.heart_rate, row.temperature, row.weight, row.height]
+            ),
+            bmi=str(bmi) if bmi else "",
+            bmi_category=Consultation.compute_bmi_category(bmi) or "",
+            next_visit=row.next_visit.strftime("%Y-%m-%d") if row.next_visit else "",
+            file_count=file_count,
+            file_count_text=f"{file_count} archivo(s)" if file_count > 0 else "",
+            has_files=file_count > 0,
+        )
+
+
+class PatientStudyRow(BaseModel):
+    """Fila de la pestaña de estudios del detalle de paciente"""
+
+    id: int
+    study_name: str
+    study_type: str
+    study_date: str
+    results: str = ""
+    file_name: str = ""
+    file_path: str = ""
+    file_type: str = ""
+    file_size: int = 0
+    file_size_label: str = ""
+
+    @classmethod
+    def from_row(cls, row) -> "PatientStudyRow":
+        """Desde una fila de MedicalStudyService.get_study_rows_by_patient"""
+        return cls(
+            id=row.id,
+            study_name=row.study_name,
+            study_type=row.study_type,
+            study_date=row.study_date.strftime("%Y-%m-%d"),
+            results=row.results or "",
+            file_name=row.file_name or "",
+            file_path=row.file_path or "",
+            file_type=row.file_type or "",
+            file_size=row.file_size or 0,
+            file_size_label=(
+                f"{row.file_size / 1024:.1f} KB" if row.file_size else "Tamaño desconocido"
+            ),
+        )
+
+
+class StudyListRow(BaseModel):
+    """Fila del listado general de estudios médicos"""
+
+    id: int
+    patient_id: int
+    study_type: str
+    study_name: str
+    study_date: str
+    institution: str = ""
+    requesting_doctor: str = ""
+    file_path: str = ""
+    file_name: str = ""
+    results_preview: str = ""
+    is_pending: bool = False
+    is_critical: bool = False
+    patient_name: str = ""
+    patient_dni: str = ""
+    file_count: int = 0
+
+    @classmethod
+    def from_row(cls, row, file_count: int = 0, preview_length: int = 150) -> "StudyListRow":
+        """Desde una fila de StudyQueryService.get_study_page"""
+        return cls(
+            id=row.id,
+            patient_id=row.patient_id,
+            study_type=row.study_type,
+            study_name=row.study_name,
+            study_date=str(row.study_date) if row.study_date else "",
+            institution=row.institution or "",
+            requesting_doctor=row.requesting_doctor or "",
+            file_path=row.file_path or "",
+            file_name=row.file_name or "",
+            results_preview=_truncate(row.results, preview_length),
+            is_pending=row.is_pending,
+            is_critical=row.is_critical,
+            patient_name=f"{row.first_name} {row.last_name}" if row.first_name else "",
+            patient_dni=row.dni or "",
+            file_count=file_count,
+        )
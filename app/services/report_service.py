@@ -3,18 +3,17 @@ Servicio de generación de reportes y exportación
 Soporta PDF y Excel
 """
 
+from collections.abc import Iterator
 from pathlib import Path
 from datetime import datetime, date
 from typing import List, Optional
 import io
+import tempfile
 
 # PDF
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, PageBreak
 
 # Excel
 from openpyxl import Workbook
@@ -22,11 +21,65 @@ from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 
 # Database
-from sqlmodel import Session, select
-from app.database import engine
+from sqlmodel import Session, func, select
+from app.database import read_session_scope
 from app.models.patient import Patient
 from app.models.consultation import Consultation
 from app.models.medical_study import MedicalStudy
+from app.services.patient_cache_service import PatientCacheService
+from app.utils.report_theme import (
+    SECTION_COL_WIDTHS,
+    get_styles,
+    listing_table_style,
+    section_table_style,
+)
+
+# Reporte de consultas: filas por tabla (aprox. una página) y filas por lote del cursor
+CONSULTATIONS_REPORT_ROWS_PER_TABLE = 35
+CONSULTATIONS_REPORT_BATCH_SIZE = 1000
+
+
+def _truncate(text: Optional[str], length: int) -> str:
+    """Recorta un texto largo agregando "..." """
+    if text and len(text) > length:
+        return text[:length] + "..."
+    return text or ""
+
+
+class _LazyStory(list):
+    """
+    Story de ReportLab que se llena desde un generador a medida que se consume
+
+    doc.build() procesa y descarta los flowables desde el principio de la lista;
+    acá solo se mantienen en memoria los próximos `prefetch` flowables.
+    """
+
+    def __init__(self, flowables: Iterator, prefetch: int = 4):
+        super().__init__()
+        self._source: Optional[Iterator] = flowables
+        self._prefetch = prefetch
+        self._fill(prefetch)
+
+    def _fill(self, size: int) -> None:
+        while self._source is not None and super().__len__() < size:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self) -> int:
+        self._fill(self._prefetch)
+        return super().__len__()
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, int) and index >= 0:
+            self._fill(max(index + 1, self._prefetch))
+        else:
+            self._fill(self._prefetch)
+        return super().__getitem__(index)
 
 
 class ReportService:
@@ -43,50 +96,40 @@ class ReportService:
         Returns:
             bytes: Contenido del PDF
         """
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        story = []
-        styles = getSampleStyleSheet()
-
-        # Estilos personalizados
-        title_style = ParagraphStyle(
-            "CustomTitle",
-            parent=styles["Heading1"],
-            fontSize=24,
-            textColor=colors.HexColor("#2563eb"),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-        )
+        # Obtener datos (cacheados por paciente, ver PatientCacheService)
+        with read_session_scope() as session:
+            history = PatientCacheService.get_history(session, patient_id)
+        if not history:
+            raise ValueError("Paciente no encontrado")
 
-        heading_style = ParagraphStyle(
-            "CustomHeading",
-            parent=styles["Heading2"],
-            fontSize=16,
-            textColor=colors.HexColor("#1e40af"),
-            spaceAfter=12,
-            spaceBefore=12,
-        )
+        return ReportService.render_patient_history_pdf(*history)
 
-        # Obtener datos
-        with Session(engine) as session:
-            patient = session.get(Patient, patient_id)
-            if not patient:
-                raise ValueError("Paciente no encontrado")
+    @staticmethod
+    def render_patient_history_pdf(
+        patient: Patient, consultations: List[Consultation], studies: List[MedicalStudy]
+    ) -> bytes:
+        """
+        Arma el PDF de historia clínica a partir de datos ya cargados
 
-            consultations = session.exec(
-                select(Consultation)
-                .where(Consultation.patient_id == patient_id)
-                .order_by(Consultation.consultation_date.desc())
-            ).all()
+        Los estilos salen del tema compartido (app.utils.report_theme), que se
+        construye una vez por proceso.
 
-            studies = session.exec(
-                select(MedicalStudy)
-                .where(MedicalStudy.patient_id == patient_id)
-                .order_by(MedicalStudy.study_date.desc())
-            ).all()
+        Args:
+            patient: Paciente
+            consultations: Consultas del paciente (más reciente primero)
+            studies: Estudios del paciente (más reciente primero)
+
+        Returns:
+            bytes: Contenido del PDF
+        """
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=letter)
+        story = []
+        styles = get_styles()
+        heading_style = styles["SectionHeading"]
 
         # Título
-        story.append(Paragraph("Historia Clínica Completa", title_style))
+        story.append(Paragraph("Historia Clínica Completa", styles["HistoryTitle"]))
         story.append(Spacer(1, 0.2 * inch))
 
         # Información del paciente
@@ -106,22 +149,8 @@ class ReportService:
             ["Dirección:", patient.address or "N/A"],
         ]
 
-        patient_table = Table(patient_data, colWidths=[2 * inch, 4 * inch])
-        patient_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#e0e7ff")),
-                    ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
-                    ("ALIGN", (0, 0), (0, -1), "RIGHT"),
-                    ("ALIGN", (1, 0), (1, -1), "LEFT"),
-                    ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 10),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-                    ("TOPPADDING", (0, 0), (-1, -1), 8),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.grey),
-                ]
-            )
-        )
+        patient_table = Table(patient_data, colWidths=SECTION_COL_WIDTHS["patient"])
+        patient_table.setStyle(section_table_style("patient"))
         story.append(patient_table)
         story.append(Spacer(1, 0.3 * inch))
 
@@ -138,23 +167,10 @@ class ReportService:
                 antecedentes_data.append(["Antecedentes Familiares:", patient.family_history])
 
             if antecedentes_data:
-                antecedentes_table = Table(antecedentes_data, colWidths=[2 * inch, 4 * inch])
-                antecedentes_table.setStyle(
-                    TableStyle(
-                        [
-                            ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#fef3c7")),
-                            ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
-                            ("ALIGN", (0, 0), (0, -1), "RIGHT"),
-                            ("ALIGN", (1, 0), (1, -1), "LEFT"),
-                            ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                            ("FONTSIZE", (0, 0), (-1, -1), 10),
-                            ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-                            ("TOPPADDING", (0, 0), (-1, -1), 8),
-                            ("GRID", (0, 0), (-1, -1), 1, colors.grey),
-                            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                        ]
-                    )
+                antecedentes_table = Table(
+                    antecedentes_data, colWidths=SECTION_COL_WIDTHS["antecedentes"]
                 )
+                antecedentes_table.setStyle(section_table_style("antecedentes"))
                 story.append(antecedentes_table)
                 story.append(Spacer(1, 0.3 * inch))
 
@@ -202,23 +218,8 @@ class ReportService:
                         ["Próxima Visita:", consultation.next_visit.strftime("%d/%m/%Y")]
                     )
 
-                consult_table = Table(consult_data, colWidths=[1.5 * inch, 4.5 * inch])
-                consult_table.setStyle(
-                    TableStyle(
-                        [
-                            ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#dbeafe")),
-                            ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
-                            ("ALIGN", (0, 0), (0, -1), "RIGHT"),
-                            ("ALIGN", (1, 0), (1, -1), "LEFT"),
-                            ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                            ("FONTSIZE", (0, 0), (-1, -1), 9),
-                            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-                            ("TOPPADDING", (0, 0), (-1, -1), 6),
-                            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                        ]
-                    )
-                )
+                consult_table = Table(consult_data, colWidths=SECTION_COL_WIDTHS["consultation"])
+                consult_table.setStyle(section_table_style("consultation"))
                 story.append(consult_table)
                 story.append(Spacer(1, 0.2 * inch))
 
@@ -261,41 +262,15 @@ class ReportService:
                 if status_items:
                     study_data.append(["Estado:", " | ".join(status_items)])
 
-                study_table = Table(study_data, colWidths=[1.5 * inch, 4.5 * inch])
-                study_table.setStyle(
-                    TableStyle(
-                        [
-                            ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#fce7f3")),
-                            ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
-                            ("ALIGN", (0, 0), (0, -1), "RIGHT"),
-                            ("ALIGN", (1, 0), (1, -1), "LEFT"),
-                            ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                            ("FONTSIZE", (0, 0), (-1, -1), 9),
-                            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-                            ("TOPPADDING", (0, 0), (-1, -1), 6),
-                            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                        ]
-                    )
-                )
+                study_table = Table(study_data, colWidths=SECTION_COL_WIDTHS["study"])
+                study_table.setStyle(section_table_style("study"))
                 story.append(study_table)
                 story.append(Spacer(1, 0.2 * inch))
 
         # Pie de página con fecha de generación
         story.append(Spacer(1, 0.5 * inch))
         footer_text = f"Reporte generado el {datetime.now().strftime('%d/%m/%Y %H:%M')}"
-        story.append(
-            Paragraph(
-                footer_text,
-                ParagraphStyle(
-                    "Footer",
-                    parent=styles["Normal"],
-                    fontSize=8,
-                    textColor=colors.grey,
-                    alignment=TA_RIGHT,
-                ),
-            )
-        )
+        story.append(Paragraph(footer_text, styles["Footer"]))
 
         # Construir PDF
         doc.build(story)
@@ -327,23 +302,12 @@ class ReportService:
             bottom=Side(style="thin"),
         )
 
-        # Obtener datos
-        with Session(engine) as session:
-            patient = session.get(Patient, patient_id)
-            if not patient:
-                raise ValueError("Paciente no encontrado")
-
-            consultations = session.exec(
-                select(Consultation)
-                .where(Consultation.patient_id == patient_id)
-                .order_by(Consultation.consultation_date.desc())
-            ).all()
-
-            studies = session.exec(
-                select(MedicalStudy)
-                .where(MedicalStudy.patient_id == patient_id)
-                .order_by(MedicalStudy.study_date.desc())
-            ).all()
+        # Obtener datos (cacheados por paciente, ver PatientCacheService)
+        with read_session_scope() as session:
+            history = PatientCacheService.get_history(session, patient_id)
+        if not history:
+            raise ValueError("Paciente no encontrado")
+        patient, consultations, studies = history
 
         # Hoja 1: Información del Paciente
         ws_patient = wb.active
@@ -540,52 +504,8 @@ class ReportService:
         return buffer.getvalue()
 
     @staticmethod
-    def generate_consultations_report_pdf(
-        start_date: Optional[date] = None, end_date: Optional[date] = None
-    ) -> bytes:
-        """
-        Genera un reporte PDF de consultas en un rango de fechas
-
-        Args:
-            start_date: Fecha inicio (opcional)
-            end_date: Fecha fin (opcional)
-
-        Returns:
-            bytes: Contenido del PDF
-        """
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        story = []
-        styles = getSampleStyleSheet()
-
-        title_style = ParagraphStyle(
-            "CustomTitle",
-            parent=styles["Heading1"],
-            fontSize=20,
-            textColor=colors.HexColor("#2563eb"),
-            spaceAfter=20,
-            alignment=TA_CENTER,
-        )
-
-        # Obtener consultas
-        with Session(engine) as session:
-            query = select(Consultation).order_by(Consultation.consultation_date.desc())
-
-            if start_date:
-                query = query.where(Consultation.consultation_date >= start_date)
-            if end_date:
-                query = query.where(Consultation.consultation_date <= end_date)
-
-            consultations = session.exec(query).all()
-
-            # Obtener pacientes
-            patient_ids = {c.patient_id for c in consultations}
-            patients = {
-                p.id: p
-                for p in session.exec(select(Patient).where(Patient.id.in_(patient_ids))).all()
-            }
-
-        # Título
+    def _consultations_report_title(start_date: Optional[date], end_date: Optional[date]) -> str:
+        """Título del reporte de consultas según el rango de fechas"""
         title = "Reporte de Consultas"
         if start_date and end_date:
             title += f"\n{start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}"
@@ -593,56 +513,146 @@ class ReportService:
             title += f"\nDesde {start_date.strftime('%d/%m/%Y')}"
         elif end_date:
             title += f"\nHasta {end_date.strftime('%d/%m/%Y')}"
+        return title
 
-        story.append(Paragraph(title, title_style))
-        story.append(Spacer(1, 0.3 * inch))
+    @staticmethod
+    def _consultations_report_flowables(
+        session: Session, start_date: Optional[date], end_date: Optional[date]
+    ) -> Iterator:
+        """
+        Genera los flowables del reporte de consultas a medida que se leen las filas
+
+        Las consultas se leen con un cursor del lado del servidor (yield_per), ya
+        unidas al nombre del paciente, y se agrupan en tablas de una página con
+        el encabezado repetido.
+        """
+        styles = get_styles()
+
+        filters = []
+        if start_date:
+            filters.append(Consultation.consultation_date >= start_date)
+        if end_date:
+            filters.append(Consultation.consultation_date <= end_date)
+
+        total = session.exec(select(func.count(Consultation.id)).where(*filters)).one()
+
+        title = ReportService._consultations_report_title(start_date, end_date)
+        yield Paragraph(title, styles["ReportTitle"])
+        yield Spacer(1, 0.3 * inch)
 
         # Estadísticas
-        story.append(Paragraph(f"Total de Consultas: {len(consultations)}", styles["Heading2"]))
-        story.append(Spacer(1, 0.2 * inch))
+        yield Paragraph(f"Total de Consultas: {total}", styles["Heading2"])
+        yield Spacer(1, 0.2 * inch)
+
+        if not total:
+            return
+
+        query = (
+            select(
+                Consultation.consultation_date,
+                Patient.first_name,
+                Patient.last_name,
+                Consultation.reason,
+                Consultation.diagnosis,
+            )
+            .outerjoin(Patient, Patient.id == Consultation.patient_id)
+            .where(*filters)
+            .order_by(Consultation.consultation_date.desc())
+            .execution_options(yield_per=CONSULTATIONS_REPORT_BATCH_SIZE)
+        )
 
-        # Tabla de consultas
-        if consultations:
-            data = [["Fecha", "Paciente", "Motivo", "Diagnóstico"]]
+        header = ["Fecha", "Paciente", "Motivo", "Diagnóstico"]
+        rows = []
+        for consultation_date, first_name, last_name, reason, diagnosis in session.exec(query):
+            rows.append(
+                [
+                    consultation_date.strftime("%d/%m/%Y"),
+                    f"{first_name} {last_name}" if first_name else "N/A",
+                    _truncate(reason, 50),
+                    _truncate(diagnosis, 50),
+                ]
+            )
+            if len(rows) == CONSULTATIONS_REPORT_ROWS_PER_TABLE:
+                yield ReportService._consultations_table(header, rows)
+                rows = []
 
-            for consultation in consultations:
-                patient = patients.get(consultation.patient_id)
-                patient_name = f"{patient.first_name} {patient.last_name}" if patient else "N/A"
+        if rows:
+            yield ReportService._consultations_table(header, rows)
 
-                data.append(
-                    [
-                        consultation.consultation_date.strftime("%d/%m/%Y"),
-                        patient_name,
-                        consultation.reason[:50] + "..."
-                        if consultation.reason and len(consultation.reason) > 50
-                        else consultation.reason or "",
-                        consultation.diagnosis[:50] + "..."
-                        if consultation.diagnosis and len(consultation.diagnosis) > 50
-                        else consultation.diagnosis or "",
-                    ]
-                )
+    @staticmethod
+    def _consultations_table(header: list[str], rows: list[list[str]]) -> Table:
+        """Tabla de una página del reporte de consultas"""
+        table = Table(
+            [header, *rows],
+            colWidths=[1.2 * inch, 2 * inch, 2.3 * inch, 2.3 * inch],
+            repeatRows=1,
+        )
+        table.setStyle(listing_table_style())
+        return table
 
-            table = Table(data, colWidths=[1.2 * inch, 2 * inch, 2.3 * inch, 2.3 * inch])
-            table.setStyle(
-                TableStyle(
-                    [
-                        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2563eb")),
-                        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                        ("FONTSIZE", (0, 0), (-1, 0), 11),
-                        ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                        ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
-                        ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                        ("FONTSIZE", (0, 1), (-1, -1), 9),
-                        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                    ]
-                )
+    @staticmethod
+    def write_consultations_report_pdf(
+        target, start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> None:
+        """
+        Escribe el reporte PDF de consultas en un archivo, por bloques
+
+        ReportLab consume el story desde el principio; con _LazyStory las tablas
+        se generan a medida que se necesitan, así la memoria se mantiene estable
+        aunque el rango tenga cientos de miles de consultas.
+
+        Args:
+            target: Ruta o archivo binario abierto donde escribir el PDF
+            start_date: Fecha inicio (opcional)
+            end_date: Fecha fin (opcional)
+        """
+        doc = SimpleDocTemplate(target, pagesize=letter)
+        with read_session_scope() as session:
+            story = _LazyStory(
+                ReportService._consultations_report_flowables(session, start_date, end_date)
             )
-            story.append(table)
+            doc.build(story)
 
-        doc.build(story)
-        buffer.seek(0)
+    @staticmethod
+    def iter_consultations_report_pdf(
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        chunk_size: int = 64 * 1024,
+    ) -> Iterator[bytes]:
+        """
+        Genera el reporte PDF de consultas en un temporal y lo devuelve por bloques
+
+        Pensado para StreamingResponse: el PDF nunca se carga completo en memoria
+        y el temporal se borra al terminar (o si se corta la descarga).
+
+        Yields:
+            bytes: Bloques consecutivos del PDF
+        """
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+            ReportService.write_consultations_report_pdf(tmp, start_date, end_date)
+            tmp.flush()
+            tmp.seek(0)
+            while chunk := tmp.read(chunk_size):
+                yield chunk
+
+    @staticmethod
+    def generate_consultations_report_pdf(
+        start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> bytes:
+        """
+        Genera un reporte PDF de consultas en un rango de fechas
+
+        Para rangos grandes conviene iter_consultations_report_pdf (streaming).
+
+        Args:
+            start_date: Fecha inicio (opcional)
+            end_date: Fecha fin (opcional)
+
+        Returns:
+            bytes: Contenido del PDF
+        """
+        buffer = io.BytesIO()
+        ReportService.write_consultations_report_pdf(buffer, start_date, end_date)
         return buffer.getvalue()
 
     @staticmethod
@@ -678,7 +688,7 @@ class ReportService:
         )
 
         # Obtener estudios
-        with Session(engine) as session:
+        with read_session_scope() as session:
             query = select(MedicalStudy).order_by(MedicalStudy.study_date.desc())
 
             if study_type:
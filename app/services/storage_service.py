@@ -0,0 +1,232 @@
+"""
+Servicio de contabilidad de almacenamiento de archivos adjuntos.
+
+Suma en SQL los tamaños de patient_files, study_files y consultation_files, por
+paciente o global, agrupados por categoría de origen y tipo MIME.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import literal, union_all
+from sqlmodel import Session, func, select
+
+from app.models import Consultation, MedicalStudy, Patient
+from app.models.consultation_file import ConsultationFile
+from app.models.patient_file import PatientFile
+from app.models.study_file import StudyFile
+from app.utils import invalidation_bus
+
+# Etiquetas de las categorías de origen
+STORAGE_CATEGORY_LABELS = {
+    "patient": "Documentos de pacientes",
+    "study": "Estudios médicos",
+    "consultation": "Consultas",
+}
+
+# Cache en memoria del uso de almacenamiento: {patient_id | None: (timestamp, uso)}
+USAGE_CACHE_TTL_SECONDS = 300
+USAGE_CACHE_MAX_ENTRIES = 128
+
+_usage_cache: OrderedDict[Optional[int], tuple[float, dict]] = OrderedDict()
+_usage_cache_lock = threading.Lock()
+# Se incrementa en cada invalidación para descartar lecturas en vuelo
+_usage_cache_generation = 0
+
+
+def _clear_usage_cache(key: Optional[str] = None) -> None:
+    """Vacía la cache de uso de este proceso"""
+    global _usage_cache_generation
+    with _usage_cache_lock:
+        _usage_cache_generation += 1
+        _usage_cache.clear()
+
+
+invalidation_bus.subscribe("storage", _clear_usage_cache)
+
+
+def _bytes_to_mb(size: int) -> float:
+    """Convierte bytes a MB con dos decimales"""
+    return round(size / (1024 * 1024), 2)
+
+
+class StorageService:
+    """Servicio para calcular el espacio ocupado por los archivos adjuntos."""
+
+    @staticmethod
+    def _files_union(patient_id: Optional[int] = None):
+        """UNION ALL (category, patient_id, file_type, file_size, disk_size) de las tres fuentes"""
+        patient_files = select(
+            literal("patient").label("category"),
+            PatientFile.patient_id.label("patient_id"),
+            PatientFile.file_type.label("file_type"),
+            PatientFile.file_size.label("file_size"),
+            func.coalesce(PatientFile.stored_size, PatientFile.file_size).label("disk_size"),
+        )
+        study_files = select(
+            literal("study").label("category"),
+            MedicalStudy.patient_id.label("patient_id"),
+            StudyFile.file_type.label("file_type"),
+            StudyFile.file_size.label("file_size"),
+            func.coalesce(StudyFile.stored_size, StudyFile.file_size).label("disk_size"),
+        ).join(MedicalStudy, StudyFile.study_id == MedicalStudy.id)
+        consultation_files = select(
+            literal("consultation").label("category"),
+            Consultation.patient_id.label("patient_id"),
+            ConsultationFile.file_type.label("file_type"),
+            ConsultationFile.file_size.label("file_size"),
+            func.coalesce(ConsultationFile.stored_size, ConsultationFile.file_size).label(
+                "disk_size"
+            ),
+        ).join(Consultation, ConsultationFile.consultation_id == Consultation.id)
+
+        if patient_id is not None:
+            patient_files = patient_files.where(PatientFile.patient_id == patient_id)
+            study_files = study_files.where(MedicalStudy.patient_id == patient_id)
+            consultation_files = consultation_files.where(Consultation.patient_id == patient_id)
+
+        return union_all(patient_files, study_files, consultation_files).subquery("files")
+
+    @staticmethod
+    def compute_usage(session: Session, patient_id: Optional[int] = None) -> dict:
+        """
+        Calcula el uso de almacenamiento con un único GROUP BY (categoría, tipo MIME).
+
+        Args:
+            session: Sesión de base de datos
+            patient_id: ID del paciente (None para todos los pacientes)
+
+        Returns:
+            dict con total_bytes/total_mb (tamaño original), disk_bytes/disk_mb (ocupado
+            en disco, con compresión), total_files, by_category y by_mime
+        """
+        files = StorageService._files_union(patient_id)
+        query = select(
+            files.c.category,
+            files.c.file_type,
+            func.count(),
+            func.coalesce(func.sum(files.c.file_size), 0),
+            func.coalesce(func.sum(files.c.disk_size), 0),
+        ).group_by(files.c.category, files.c.file_type)
+
+        by_category = {
+            category: {"category": category, "label": label, "files": 0, "bytes": 0}
+            for category, label in STORAGE_CATEGORY_LABELS.items()
+        }
+        by_mime: dict[str, dict] = {}
+
+        disk_bytes = 0
+        for category, file_type, count, size, disk_size in session.exec(query).all():
+            disk_bytes += disk_size
+            by_category[category]["files"] += count
+            by_category[category]["bytes"] += size
+
+            mime = file_type or "desconocido"
+            entry = by_mime.setdefault(mime, {"file_type": mime, "files": 0, "bytes": 0})
+            entry["files"] += count
+            entry["bytes"] += size
+
+        for entry in [*by_category.values(), *by_mime.values()]:
+            entry["mb"] = _bytes_to_mb(entry["bytes"])
+
+        total_bytes = sum(entry["bytes"] for entry in by_category.values())
+
+        return {
+            "total_bytes": total_bytes,
+            "total_mb": _bytes_to_mb(total_bytes),
+            "disk_bytes": disk_bytes,
+            "disk_mb": _bytes_to_mb(disk_bytes),
+            "total_files": sum(entry["files"] for entry in by_category.values()),
+            "by_category": list(by_category.values()),
+            "by_mime": sorted(by_mime.values(), key=lambda entry: entry["bytes"], reverse=True),
+        }
+
+    @staticmethod
+    def get_usage(session: Session, patient_id: Optional[int] = None) -> dict:
+        """
+        Obtiene el uso de almacenamiento, usando la cache en memoria si está vigente.
+
+        Args:
+            session: Sesión de base de datos
+            patient_id: ID del paciente (None para el total global)
+
+        Returns:
+            dict: Ver compute_usage
+        """
+        now = time.monotonic()
+        with _usage_cache_lock:
+            cached = _usage_cache.get(patient_id)
+            if cached and now - cached[0] < USAGE_CACHE_TTL_SECONDS:
+                _usage_cache.move_to_end(patient_id)
+                return cached[1]
+            generation = _usage_cache_generation
+
+        usage = StorageService.compute_usage(session, patient_id)
+
+        with _usage_cache_lock:
+            # No cachear si hubo una escritura mientras se consultaba
+            if generation == _usage_cache_generation:
+                _usage_cache[patient_id] = (now, usage)
+                _usage_cache.move_to_end(patient_id)
+                while len(_usage_cache) > USAGE_CACHE_MAX_ENTRIES:
+                    _usage_cache.popitem(last=False)
+
+        return usage
+
+    @staticmethod
+    def get_top_patients(session: Session, limit: int = 10) -> list[dict]:
+        """
+        Obtiene los pacientes que más espacio ocupan.
+
+        Args:
+            session: Sesión de base de datos
+            limit: Cantidad máxima de pacientes
+
+        Returns:
+            list[dict]: patient_id, patient_name, files, bytes y mb, de mayor a menor
+        """
+        files = StorageService._files_union()
+        totals = (
+            select(
+                files.c.patient_id,
+                func.count().label("files"),
+                func.sum(files.c.file_size).label("bytes"),
+            )
+            .group_by(files.c.patient_id)
+            .subquery("totals")
+        )
+        query = (
+            select(
+                totals.c.patient_id,
+                totals.c.files,
+                totals.c.bytes,
+                Patient.first_name,
+                Patient.last_name,
+            )
+            .join(Patient, Patient.id == totals.c.patient_id)
+            .order_by(totals.c.bytes.desc())
+            .limit(limit)
+        )
+
+        return [
+            {
+                "patient_id": row.patient_id,
+                "patient_name": f"{row.first_name} {row.last_name}",
+                "files": row.files,
+                "bytes": row.bytes or 0,
+                "mb": _bytes_to_mb(row.bytes or 0),
+            }
+            for row in session.exec(query).all()
+        ]
+
+    @staticmethod
+    def invalidate_cache() -> None:
+        """
+        Vacía la cache de uso; se llama al crear o eliminar archivos.
+
+        Los demás workers se enteran por el bus de invalidación.
+        """
+        _clear_usage_cache()
+        invalidation_bus.publish("storage")
@@ -0,0 +1,175 @@
+"""
+Servicio de almacenamiento en frío para archivos adjuntos.
+
+Comprime los adjuntos que no se descargan hace COLD_STORAGE_DAYS días. El archivo
+comprimido queda junto al original con sufijo .zst/.gz, la fila apunta a él y
+registra content_encoding/stored_size; las descargas lo descomprimen en streaming
+con app.utils.compression.open_attachment, sin cambiar la API de los servicios.
+"""
+
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import update
+from sqlmodel import Session, func, select
+
+from app.config import COLD_STORAGE_DAYS, COLD_STORAGE_ENCODING, PATIENTS_PATH, STUDIES_PATH
+from app.models import MedicalStudy
+from app.models.consultation_file import ConsultationFile
+from app.models.patient_file import PatientFile
+from app.models.study_file import StudyFile
+from app.services.storage_service import StorageService
+from app.utils.compression import (
+    ENCODING_SUFFIXES,
+    IDENTITY_ENCODING,
+    MIN_COMPRESSION_SAVINGS,
+    compress_file,
+    default_encoding,
+    is_compressible,
+)
+
+# No se registra más de un acceso por día y por archivo (evita un UPDATE por descarga)
+ACCESS_TOUCH_INTERVAL = timedelta(days=1)
+
+# Modelos de adjuntos y su directorio raíz
+TIERED_FILE_MODELS = (
+    (PatientFile, PATIENTS_PATH),
+    (StudyFile, STUDIES_PATH),
+    (ConsultationFile, STUDIES_PATH),
+)
+
+
+class StorageTierService:
+    """Servicio para mover adjuntos poco usados a almacenamiento comprimido."""
+
+    @staticmethod
+    def mark_accessed(session: Session, file_row) -> None:
+        """
+        Registra la descarga de un adjunto (como mucho una vez por día).
+
+        Args:
+            session: Sesión de base de datos
+            file_row: PatientFile, StudyFile o ConsultationFile descargado
+        """
+        now = datetime.now(UTC)
+        last = file_row.last_accessed_at
+        if last and last.tzinfo is None:
+            last = last.replace(tzinfo=UTC)
+        if last and now - last < ACCESS_TOUCH_INTERVAL:
+            return
+
+        file_row.last_accessed_at = now
+        session.add(file_row)
+        session.commit()
+
+    @staticmethod
+    def compress_cold_files(
+        session: Session,
+        days: int = COLD_STORAGE_DAYS,
+        encoding: str = COLD_STORAGE_ENCODING,
+        batch_size: int = 100,
+        limit: Optional[int] = None,
+    ) -> dict:
+        """
+        Comprime los adjuntos sin acceso en los últimos `days` días.
+
+        Por cada lote: comprime a un archivo nuevo, actualiza las filas y hace
+        commit, y recién después borra los originales. Si el proceso se corta en
+        el medio quedan archivos huérfanos (nunca filas apuntando a archivos
+        incompletos), que check_attachments.py detecta y limpia.
+
+        Los tipos ya comprimidos (JPEG, PNG, ZIP, docx...) y los archivos que no
+        ahorran al menos MIN_COMPRESSION_SAVINGS se marcan como 'identity' para
+        no volver a evaluarlos.
+
+        Args:
+            session: Sesión de base de datos
+            days: Días sin acceso para considerar un archivo frío
+            encoding: "zstd" (si está instalado) o "gzip"
+            batch_size: Filas por lote/commit
+            limit: Máximo de archivos a procesar (None = todos)
+
+        Returns:
+            dict con compressed, skipped, missing, bytes_before y bytes_after
+        """
+        encoding = default_encoding(encoding)
+        cutoff = datetime.now(UTC) - timedelta(days=days)
+        stats = {"compressed": 0, "skipped": 0, "missing": 0, "bytes_before": 0, "bytes_after": 0}
+        processed = 0
+
+        for model, root in TIERED_FILE_MODELS:
+            last_id = 0
+            while limit is None or processed < limit:
+                size = batch_size if limit is None else min(batch_size, limit - processed)
+                rows = session.exec(
+                    select(model)
+                    .where(model.id > last_id)
+                    .where(model.content_encoding.is_(None))
+                    .where(func.coalesce(model.last_accessed_at, model.uploaded_at) < cutoff)
+                    .order_by(model.id)
+                    .limit(size)
+                ).all()
+                if not rows:
+                    break
+
+                originals: list[Path] = []
+                for row in rows:
+                    last_id = row.id
+                    processed += 1
+                    originals.extend(
+                        StorageTierService._compress_row(session, row, root, encoding, stats)
+                    )
+
+                # Fase 1: las filas apuntan a los archivos comprimidos
+                session.commit()
+                # Fase 2: recién ahora se pueden borrar los originales
+                for original in originals:
+                    original.unlink(missing_ok=True)
+
+        if stats["compressed"]:
+            StorageService.invalidate_cache()
+        return stats
+
+    @staticmethod
+    def _compress_row(session: Session, row, root: Path, encoding: str, stats: dict) -> list[Path]:
+        """Comprime el archivo de una fila; devuelve el original a borrar tras el commit"""
+        if not is_compressible(row.file_type):
+            row.content_encoding = IDENTITY_ENCODING
+            session.add(row)
+            stats["skipped"] += 1
+            return []
+
+        source = root / row.file_path
+        if not source.is_file():
+            stats["missing"] += 1
+            return []
+
+        target = compress_file(source, encoding)
+        stored_size = target.stat().st_size
+
+        if stored_size > row.file_size * (1 - MIN_COMPRESSION_SAVINGS):
+            target.unlink(missing_ok=True)
+            row.content_encoding = IDENTITY_ENCODING
+            session.add(row)
+            stats["skipped"] += 1
+            return []
+
+        old_path = row.file_path
+        row.file_path = old_path + ENCODING_SUFFIXES[encoding]
+        row.content_encoding = encoding
+        row.stored_size = stored_size
+        session.add(row)
+
+        if isinstance(row, StudyFile):
+            # Campos legacy de MedicalStudy que apuntan al mismo archivo
+            session.execute(
+                update(MedicalStudy)
+                .where(MedicalStudy.file_path == old_path)
+                .values(file_path=row.file_path)
+            )
+
+        stats["compressed"] += 1
+        stats["bytes_before"] += row.file_size
+        stats["bytes_after"] += stored_size
+        return [source]
@@ -0,0 +1,126 @@
+"""Consulta paginada del listado de estudios médicos con sus filtros"""
+
+from datetime import date
+from typing import Optional
+
+from sqlmodel import Session, func, select
+
+from app.models import MedicalStudy, Patient
+from app.models.study_file import StudyFile
+from app.services.projections import StudyListRow
+
+# Largo máximo del preview de resultados en el listado
+RESULTS_PREVIEW_LENGTH = 150
+
+
+class StudyQueryService:
+    """
+    Lista estudios médicos por página con los filtros combinados en SQL.
+
+    Una consulta trae la página de estudios unida al paciente (nombre y DNI) y el
+    total filtrado con una función de ventana; otra cuenta los archivos de los
+    estudios de la página con un GROUP BY. El costo depende del tamaño de la
+    página, no de la tabla.
+    """
+
+    @staticmethod
+    def _filters(
+        patient_id: Optional[int] = None,
+        study_type: Optional[str] = None,
+        is_pending: Optional[bool] = None,
+        is_critical: Optional[bool] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> list:
+        """Condiciones WHERE según los filtros indicados (None = sin filtrar)"""
+        conditions = []
+        if patient_id:
+            conditions.append(MedicalStudy.patient_id == patient_id)
+        if study_type:
+            conditions.append(MedicalStudy.study_type == study_type)
+        if is_pending is not None:
+            conditions.append(MedicalStudy.is_pending == is_pending)
+        if is_critical is not None:
+            conditions.append(MedicalStudy.is_critical == is_critical)
+        if date_from:
+            conditions.append(MedicalStudy.study_date >= date_from)
+        if date_to:
+            conditions.append(MedicalStudy.study_date <= date_to)
+        return conditions
+
+    @staticmethod
+    def count_studies(session: Session, **filters) -> int:
+        """Cantidad de estudios que cumplen los filtros (ver _filters)"""
+        conditions = StudyQueryService._filters(**filters)
+        return session.exec(select(func.count(MedicalStudy.id)).where(*conditions)).one()
+
+    @staticmethod
+    def get_file_counts(session: Session, study_ids: list[int]) -> dict[int, int]:
+        """Cantidad de archivos adjuntos por estudio (un único GROUP BY)"""
+        if not study_ids:
+            return {}
+        statement = (
+            select(StudyFile.study_id, func.count(StudyFile.id))
+            .where(StudyFile.study_id.in_(study_ids))
+            .group_by(StudyFile.study_id)
+        )
+        return dict(session.exec(statement).all())
+
+    @staticmethod
+    def get_study_page(
+        session: Session, offset: int = 0, limit: int = 20, **filters
+    ) -> tuple[list[StudyListRow], int]:
+        """
+        Obtiene una página del listado de estudios.
+
+        Args:
+            session: Sesión de base de datos
+            offset: Cantidad de filas a saltear
+            limit: Tamaño de página
+            **filters: patient_id, study_type, is_pending, is_critical, date_from, date_to
+
+        Returns:
+            tuple: (filas StudyListRow, total de estudios que cumplen los filtros)
+        """
+        conditions = StudyQueryService._filters(**filters)
+        statement = (
+            select(
+                MedicalStudy.id,
+                MedicalStudy.patient_id,
+                MedicalStudy.study_type,
+                MedicalStudy.study_name,
+                MedicalStudy.study_date,
+                MedicalStudy.institution,
+                MedicalStudy.requesting_doctor,
+                MedicalStudy.file_path,
+                MedicalStudy.file_name,
+                func.substr(MedicalStudy.results, 1, RESULTS_PREVIEW_LENGTH + 1).label("results"),
+                MedicalStudy.is_pending,
+                MedicalStudy.is_critical,
+                Patient.first_name,
+                Patient.last_name,
+                Patient.dni,
+                func.count().over().label("total"),
+            )
+            .outerjoin(Patient, Patient.id == MedicalStudy.patient_id)
+            .where(*conditions)
+            .order_by(MedicalStudy.study_date.desc(), MedicalStudy.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        rows = session.exec(statement).all()
+
+        if not rows:
+            # Página fuera de rango: el total igual hace falta para la paginación
+            return [], StudyQueryService.count_studies(session, **filters)
+
+        file_counts = StudyQueryService.get_file_counts(session, [row.id for row in rows])
+
+        studies = [
+            StudyListRow.from_row(
+                row, file_counts.get(row.id, 0), preview_length=RESULTS_PREVIEW_LENGTH
+            )
+            for row in rows
+        ]
+
+        return studies, rows[0].total
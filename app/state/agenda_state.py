@@ -0,0 +1,82 @@
+"""Estado para la agenda de turnos"""
+
+from datetime import date, datetime, timedelta
+
+import reflex as rx
+
+from app.database import session_scope
+from app.services import AgendaService
+
+
+class AgendaState(rx.State):
+    """Estado para la vista diaria/semanal de próximas visitas"""
+
+    # Fecha seleccionada (YYYY-MM-DD) y modo de vista ("day" o "week").
+    # Arranca vacía: "hoy" lo fija el on_load de la página, no la importación del módulo
+    selected_date: str = ""
+    view_mode: str = "day"
+
+    # Turnos a mostrar
+    appointments: list[dict] = []
+    period_label: str = ""
+
+    # Mensajes
+    error_message: str = ""
+
+    def _current_date(self) -> date:
+        """Convierte selected_date a date (hoy si es inválida)"""
+        try:
+            return datetime.strptime(self.selected_date, "%Y-%m-%d").date()
+        except ValueError:
+            return date.today()
+
+    def load_agenda(self):
+        """Carga los turnos del día o de la semana seleccionada"""
+        current = self._current_date()
+        self.selected_date = str(current)
+        self.error_message = ""
+
+        try:
+            with session_scope() as session:
+                if self.view_mode == "week":
+                    # La semana comienza el lunes
+                    week_start = current - timedelta(days=current.weekday())
+                    week_end = week_start + timedelta(days=6)
+                    self.appointments = AgendaService.get_week_agenda(session, week_start)
+                    self.period_label = (
+                        f"Semana del {week_start.strftime('%d/%m/%Y')} "
+                        f"al {week_end.strftime('%d/%m/%Y')}"
+                    )
+                else:
+                    self.appointments = AgendaService.get_day_agenda(session, current)
+                    self.period_label = current.strftime("%d/%m/%Y")
+        except Exception as e:
+            self.appointments = []
+            self.error_message = f"Error al cargar la agenda: {str(e)}"
+
+    def set_selected_date(self, value: str):
+        """Setter para selected_date (recarga la agenda)"""
+        self.selected_date = value
+        self.load_agenda()
+
+    def set_view_mode(self, value: str):
+        """Cambia entre vista diaria y semanal"""
+        self.view_mode = "week" if value in ("week", "Semana") else "day"
+        self.load_agenda()
+
+    def go_today(self):
+        """Vuelve al día de hoy (también es el on_load de la página)"""
+        self.selected_date = str(date.today())
+        self.load_agenda()
+
+    def previous_period(self):
+        """Retrocede un día o una semana"""
+        step = 7 if self.view_mode == "week" else 1
+        self.selected_date = str(self._current_date() - timedelta(days=step))
+        self.load_agenda()
+
+    def next_period(self):
+        """Avanza un día o una semana"""
+        step = 7 if self.view_mode == "week" else 1
+        self.selected_date = str(self._current_date() + timedelta(days=step))
+        self.load_agenda()
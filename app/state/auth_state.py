@@ -1,9 +1,13 @@
 """Estado de autenticación"""
 
+from typing import Optional
+from urllib.parse import urlencode
+
 import reflex as rx
 
 from app.config import ADMIN_PASSWORD_HASH
-from app.utils.security import verify_password
+from app.utils.executors import run_in_executor
+from app.utils.security import create_download_token, verify_password
 
 
 class AuthState(rx.State):
@@ -18,7 +22,7 @@ class AuthState(rx.State):
         """Setter para login_error"""
         self.login_error = value
 
-    def login(self, password: str) -> rx.event.EventSpec | None:
+    async def login(self, password: str) -> rx.event.EventSpec | None:
         """
         Intenta hacer login con la contraseña proporcionada
 
@@ -31,8 +35,8 @@ class AuthState(rx.State):
         self.is_loading = True
         self.login_error = ""
 
-        # Verificar contraseña
-        if verify_password(password, ADMIN_PASSWORD_HASH):
+        # Verificar contraseña (argon2 corre en el pool "auth", fuera del event loop)
+        if await run_in_executor("auth", verify_password, password, ADMIN_PASSWORD_HASH):
             self.is_authenticated = True
             self.login_error = ""
             self.is_loading = False
@@ -65,3 +69,25 @@ class AuthState(rx.State):
         if not self.is_authenticated:
             return rx.redirect("/")
         return None
+
+
+async def signed_download_url(
+    state: rx.State, path: str, params: Optional[dict] = None
+) -> Optional[str]:
+    """
+    URL absoluta de un endpoint de app/api con un token de descarga de corta vida.
+
+    Args:
+        state: State que atiende el evento (para consultar la sesión del usuario)
+        path: Ruta del endpoint (ej: "/api/patients/3/archive")
+        params: Parámetros adicionales de la query string
+
+    Returns:
+        La URL firmada, o None si el usuario no inició sesión. Es absoluta: se abre
+        con rx.redirect(url, is_external=True), no con rx.download
+    """
+    auth = await state.get_state(AuthState)
+    if not auth.is_authenticated:
+        return None
+    query = urlencode({**(params or {}), "token": create_download_token(path)})
+    return f"{rx.config.get_config().api_url}{path}?{query}"
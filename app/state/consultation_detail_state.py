@@ -2,8 +2,8 @@
 
 import reflex as rx
 
-from app.database import get_session
-from app.services import ConsultationService, PatientService, ConsultationFileService
+from app.database import get_async_session, session_scope
+from app.services import ConsultationFileService, ConsultationService, PatientCacheService
 
 
 class ConsultationDetailState(rx.State):
@@ -27,7 +27,7 @@ class ConsultationDetailState(rx.State):
     bmi_value: str = ""
     bmi_category: str = ""
 
-    def load_consultation_detail(self):
+    async def load_consultation_detail(self):
         """Carga los detalles de una consulta desde el ID en la URL"""
         # Obtener ID de la URL
         consultation_id_str = self.router.page.params.get("consultation_id", "0")
@@ -41,19 +41,25 @@ class ConsultationDetailState(rx.State):
         if self.current_consultation_id <= 0:
             return
 
-        session = next(get_session())
+        async with get_async_session() as session:
+            # Cargar consulta
+            consultation = await ConsultationService.get_consultation_by_id_async(
+                session, self.current_consultation_id
+            )
 
-        # Cargar consulta
-        consultation = ConsultationService.get_consultation_by_id(
-            session, self.current_consultation_id
-        )
+            if not consultation:
+                self.consultation = {}
+                return
 
-        if not consultation:
-            self.consultation = {}
-            return
+            # Cargar paciente
+            patient = await PatientCacheService.get_patient_async(session, consultation.patient_id)
 
-        # Cargar paciente
-        patient = PatientService.get_patient_by_id(session, consultation.patient_id)
+            # Cargar archivos de la consulta (servicio sincrónico sobre la conexión async)
+            files = await session.run_sync(
+                lambda sync_session: ConsultationFileService.get_files_by_consultation(
+                    sync_session, self.current_consultation_id
+                )
+            )
 
         if patient:
             self.patient_name = patient.full_name
@@ -66,10 +72,6 @@ class ConsultationDetailState(rx.State):
         self.bmi_value = str(consultation.bmi) if consultation.bmi else ""
         self.bmi_category = consultation.bmi_category or ""
 
-        # Cargar archivos de la consulta
-        files = ConsultationFileService.get_files_by_consultation(
-            session, self.current_consultation_id
-        )
         self.consultation_files = [
             {
                 "id": f.id,
@@ -105,9 +107,9 @@ class ConsultationDetailState(rx.State):
 
     def download_consultation_file(self, file_id: int):
         """Descarga un archivo de la consulta"""
-        session = next(get_session())
         try:
-            file_path, file_name = ConsultationFileService.download_file(session, file_id)
+            with session_scope() as session:
+                file_path, file_name, _ = ConsultationFileService.download_file(session, file_id)
             print(f"🚀 Descargando: {file_name} ({file_path})")
             return rx.download(url=f"/api/files/consultation/{file_id}", filename=file_name)
         except Exception as e:
@@ -1,23 +1,80 @@
 """Estado de Reflex para gestión de consultas médicas"""
 
+import asyncio
 from datetime import datetime
+from typing import Optional
 
 import reflex as rx
-
-from app.database import get_session
-from app.services import ConsultationService, PatientService
-from app.services.consultation_file_service import ConsultationFileService
-from app.services.consultation_file_service import ConsultationFileService
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import SEARCH_DEBOUNCE_MS
+from app.database import get_async_session, session_scope
+from app.services import ConsultationQueryService, ConsultationService, PatientService
+from app.services.projections import ConsultationListRow
+from app.utils.file_io import b64decode_async, b64encode_async
+from app.utils.virtual_window import scroll_to_top, window_size, window_start
+
+# Listado virtualizado: alto fijo de cada tarjeta (px) e id del contenedor
+CONSULTATION_ROW_HEIGHT = 300
+CONSULTATIONS_CONTAINER_ID = "consultations-list"
+
+
+def _fetch_consultations(
+    session, search_term: str, patient_id: Optional[int], offset: int
+) -> tuple[Optional[list[int]], int, list[ConsultationListRow]]:
+    """
+    Resuelve la búsqueda (o cuenta el listado) y trae la ventana pedida.
+
+    Returns:
+        Tupla (ids_de_búsqueda o None, total, filas_de_la_ventana)
+    """
+    if search_term and not patient_id:
+        # La búsqueda se resuelve a IDs (cacheados); el scroll recorre esa lista
+        search_ids = ConsultationQueryService.search_ids(session, search_term)
+        total = len(search_ids)
+    else:
+        search_ids = None
+        total = ConsultationQueryService.count_consultations(session, patient_id)
+    rows = ConsultationQueryService.get_consultation_window(
+        session,
+        offset=offset,
+        limit=window_size(),
+        patient_id=patient_id,
+        search_ids=search_ids,
+    )
+    return search_ids, total, rows
+
+
+async def _fetch_consultations_async(
+    session: AsyncSession, search_term: str, patient_id: Optional[int], offset: int
+) -> tuple[Optional[list[int]], int, list[ConsultationListRow]]:
+    """Versión async de _fetch_consultations (para la búsqueda en segundo plano)"""
+    if search_term and not patient_id:
+        search_ids = await ConsultationQueryService.search_ids_async(session, search_term)
+        total = len(search_ids)
+    else:
+        search_ids = None
+        total = await ConsultationQueryService.count_consultations_async(session, patient_id)
+    rows = await ConsultationQueryService.get_consultation_window_async(
+        session,
+        offset=offset,
+        limit=window_size(),
+        patient_id=patient_id,
+        search_ids=search_ids,
+    )
+    return search_ids, total, rows
 
 
 class ConsultationState(rx.State):
     """Estado para gestión de consultas médicas"""
 
-    # Lista de consultas
-    consultations: list[dict] = []
-
-    # Conteo de archivos por consulta (cache)
-    _consultations_file_count: dict[int, int] = {}
+    # Ventana visible del listado (ver ConsultationQueryService)
+    consultations: list[ConsultationListRow] = []
+    consultations_offset: int = 0
+    consultations_total: int = 0
+    # IDs de la búsqueda actual (None = sin búsqueda) y generación de la última pedida
+    _search_ids: Optional[list[int]] = None
+    _search_generation: int = 0
 
     # Formulario
     show_new_consultation_modal: bool = False
@@ -58,11 +115,6 @@ class ConsultationState(rx.State):
     error_message: str = ""
     success_message: str = ""
 
-    @rx.var
-    def consultations_file_count(self) -> dict[int, int]:
-        """Retorna el diccionario de conteo de archivos por consulta"""
-        return self._consultations_file_count
-
     # Setters explícitos
     def set_show_new_consultation_modal(self, value: bool):
         """Setter para show_new_consultation_modal"""
@@ -149,72 +201,83 @@ class ConsultationState(rx.State):
         """Setter para form_next_visit"""
         self.form_next_visit = value
 
+    def _load_consultations_window(self, session):
+        """Carga la ventana visible del listado con el filtro/búsqueda actual"""
+        self.consultations = ConsultationQueryService.get_consultation_window(
+            session,
+            offset=self.consultations_offset,
+            limit=window_size(),
+            patient_id=self.selected_patient_id or None,
+            search_ids=self._search_ids,
+        )
+
+    def _load_consultations_list(self, session):
+        """Resuelve la búsqueda (o cuenta el listado) y carga la ventana actual"""
+        self._search_ids, self.consultations_total, self.consultations = _fetch_consultations(
+            session,
+            self.search_query.strip(),
+            self.selected_patient_id or None,
+            self.consultations_offset,
+        )
+
+    def _refresh_consultations(self):
+        """Recalcula el total y recarga la ventana actual (sin mover el scroll)"""
+        with session_scope() as session:
+            self._load_consultations_list(session)
+
     def load_consultations(self):
-        """Carga todas las consultas o filtra por búsqueda/paciente"""
-        session = next(get_session())
+        """Carga las consultas desde el inicio (todas, de un paciente o por búsqueda)"""
+        # Una búsqueda con debounce pendiente queda reemplazada por esta carga
+        self._search_generation += 1
+        self.consultations_offset = 0
+        self._refresh_consultations()
+        return scroll_to_top(CONSULTATIONS_CONTAINER_ID)
+
+    @rx.event(background=True)
+    async def run_debounced_search(self, generation: int):
+        """
+        Búsqueda mientras se escribe, con debounce y cancelación.
 
-        # Prioridad 1: Filtrar por paciente específico
-        if self.selected_patient_id > 0:
-            consultations = ConsultationService.get_consultations_by_patient(
-                session, self.selected_patient_id
-            )
-        # Prioridad 2: Buscar por término de búsqueda
-        elif self.search_query.strip():
-            consultations = ConsultationService.search_consultations(
-                session, self.search_query, limit=50
-            )
-        # Por defecto: Todas las consultas (limitadas)
-        else:
-            consultations = ConsultationService.get_all_consultations(session, limit=50)
-
-        # Cargar información de pacientes para cada consulta
-        from app.models import Patient
-
-        self.consultations = []
-        self._consultations_file_count = {}
-        for c in consultations:
-            # Obtener datos del paciente
-            patient = session.get(Patient, c.patient_id)
-            patient_name = (
-                f"{patient.first_name} {patient.last_name}" if patient else "Paciente Desconocido"
-            )
-            patient_dni = patient.dni if patient else ""
-
-            # Obtener conteo de archivos
-            files = ConsultationFileService.get_files_by_consultation(session, c.id)
-            file_count = len(files)
-            self._consultations_file_count[c.id] = file_count
-
-            self.consultations.append(
-                {
-                    "id": c.id,
-                    "patient_id": c.patient_id,
-                    "patient_name": patient_name,
-                    "patient_dni": patient_dni,
-                    "consultation_date": c.consultation_date.strftime("%Y-%m-%d %H:%M"),
-                    "reason": c.reason,
-                    "symptoms": c.symptoms or "",
-                    "diagnosis": c.diagnosis or "",
-                    "treatment": c.treatment or "",
-                    "blood_pressure": c.blood_pressure or "",
-                    "heart_rate": str(c.heart_rate) if c.heart_rate else "",
-                    "temperature": str(c.temperature) if c.temperature else "",
-                    "weight": str(c.weight) if c.weight else "",
-                    "height": str(c.height) if c.height else "",
-                    "bmi": str(c.bmi) if c.bmi else "",
-                    "bmi_category": c.bmi_category or "",
-                    "file_count": file_count,
-                    "file_count_text": f"{file_count} archivo(s)" if file_count > 0 else "",
-                    "has_files": file_count > 0,
-                    "has_vital_signs": c.has_vital_signs,
-                    "next_visit": c.next_visit.strftime("%Y-%m-%d") if c.next_visit else "",
-                }
-            )
+        Cada cambio del término incrementa _search_generation. La tarea espera
+        SEARCH_DEBOUNCE_MS y solo busca si sigue siendo la última generación; si
+        mientras buscaba llegó otra, descarta su resultado en vez de pisar uno
+        más nuevo.
+        """
+        await asyncio.sleep(SEARCH_DEBOUNCE_MS / 1000)
+        async with self:
+            if generation != self._search_generation:
+                return
+            term = self.search_query.strip()
+            patient_id = self.selected_patient_id or None
+
+        # Búsqueda, conteo y primera ventana van por la sesión async y fuera del
+        # lock del estado: ni el event loop ni las teclas siguientes esperan la base.
+        async with get_async_session() as session:
+            search_ids, total, rows = await _fetch_consultations_async(session, term, patient_id, 0)
+
+        # El lock solo se toma para publicar el resultado
+        async with self:
+            if generation != self._search_generation:
+                return
+            self.consultations_offset = 0
+            self._search_ids = search_ids
+            self.consultations_total = total
+            self.consultations = rows
+        yield scroll_to_top(CONSULTATIONS_CONTAINER_ID)
+
+    def scroll_consultations(self, scroll_top: int):
+        """Carga la ventana de consultas correspondiente a la posición de scroll"""
+        offset = window_start(scroll_top, CONSULTATION_ROW_HEIGHT)
+        if offset == self.consultations_offset:
+            return
+        self.consultations_offset = offset
+        with session_scope() as session:
+            self._load_consultations_window(session)
 
     def load_patients(self):
         """Carga lista de pacientes para el selector"""
-        session = next(get_session())
-        patients = PatientService.get_all_patients(session, include_inactive=False)
+        with session_scope() as session:
+            patients = PatientService.get_all_patients(session, include_inactive=False)
 
         self.patients_list = [
             {
@@ -247,8 +310,6 @@ class ConsultationState(rx.State):
             print("⚠️ DEBUG UPLOAD: No hay archivos en la lista")
             return
 
-        import base64
-
         uploaded_list = []
         for idx, file in enumerate(files):
             print(f"📁 DEBUG UPLOAD [{idx + 1}/{len(files)}]: Procesando {file.filename}")
@@ -259,7 +320,7 @@ class ConsultationState(rx.State):
 
                 uploaded_list.append(
                     {
-                        "data": base64.b64encode(file_data).decode("utf-8"),
+                        "data": await b64encode_async(file_data),
                         "name": file.filename,
                         "size": file.size or len(file_data),
                         "type": file.content_type or "application/octet-stream",
@@ -280,12 +341,13 @@ class ConsultationState(rx.State):
             print(f"🗑️ Archivo eliminado: {removed['name']}")
 
     def handle_search_change(self, value: str):
-        """Maneja el cambio en el campo de búsqueda y recarga las consultas"""
+        """Actualiza el término y programa la búsqueda para cuando se deje de escribir"""
         self.search_query = value
         # Resetear filtro por paciente al buscar
         if value.strip():
             self.selected_patient_id = 0
-        self.load_consultations()
+        self._search_generation += 1
+        return ConsultationState.run_debounced_search(self._search_generation)
 
     def open_new_consultation_modal(self):
         """Abre el modal de nueva consulta"""
@@ -296,8 +358,8 @@ class ConsultationState(rx.State):
 
     def open_edit_consultation_modal(self, consultation_id: int):
         """Abre el modal para editar una consulta existente"""
-        session = next(get_session())
-        consultation = ConsultationService.get_consultation_by_id(session, consultation_id)
+        with session_scope() as session:
+            consultation = ConsultationService.get_consultation_by_id(session, consultation_id)
 
         if not consultation:
             self.error_message = "Consulta no encontrada"
@@ -360,14 +422,14 @@ class ConsultationState(rx.State):
         self.error_message = ""
         self.success_message = ""
 
-    def save_consultation(self):
+    async def save_consultation(self):
         """Guarda una consulta (crea o actualiza según el modo)"""
         if self.editing_consultation_id:
-            self.update_consultation()
+            await self.update_consultation()
         else:
-            self.create_consultation()
+            await self.create_consultation()
 
-    def create_consultation(self):
+    async def create_consultation(self):
         """Crea una nueva consulta"""
         # Validación
         if not self.form_patient_id.strip():
@@ -398,91 +460,91 @@ class ConsultationState(rx.State):
         self.is_uploading = True
         self.upload_progress = "Creando consulta..."
 
-        session = next(get_session())
+        with session_scope() as session:
+            try:
+                # Convertir valores numéricos
+                heart_rate = int(self.form_heart_rate) if self.form_heart_rate.strip() else None
+                temperature = (
+                    float(self.form_temperature) if self.form_temperature.strip() else None
+                )
+                weight = float(self.form_weight) if self.form_weight.strip() else None
+                height = float(self.form_height) if self.form_height.strip() else None
+                next_visit = (
+                    datetime.strptime(self.form_next_visit, "%Y-%m-%d").date()
+                    if self.form_next_visit.strip()
+                    else None
+                )
 
-        try:
-            # Convertir valores numéricos
-            heart_rate = int(self.form_heart_rate) if self.form_heart_rate.strip() else None
-            temperature = float(self.form_temperature) if self.form_temperature.strip() else None
-            weight = float(self.form_weight) if self.form_weight.strip() else None
-            height = float(self.form_height) if self.form_height.strip() else None
-            next_visit = (
-                datetime.strptime(self.form_next_visit, "%Y-%m-%d").date()
-                if self.form_next_visit.strip()
-                else None
-            )
+                consultation = ConsultationService.create_consultation(
+                    session=session,
+                    patient_id=patient_id,
+                    reason=self.form_reason.strip(),
+                    symptoms=self.form_symptoms.strip() or None,
+                    diagnosis=self.form_diagnosis.strip() or None,
+                    treatment=self.form_treatment.strip() or None,
+                    notes=self.form_notes.strip() or None,
+                    blood_pressure=self.form_blood_pressure.strip() or None,
+                    heart_rate=heart_rate,
+                    temperature=temperature,
+                    weight=weight,
+                    height=height,
+                    next_visit=next_visit,
+                )
 
-            consultation = ConsultationService.create_consultation(
-                session=session,
-                patient_id=patient_id,
-                reason=self.form_reason.strip(),
-                symptoms=self.form_symptoms.strip() or None,
-                diagnosis=self.form_diagnosis.strip() or None,
-                treatment=self.form_treatment.strip() or None,
-                notes=self.form_notes.strip() or None,
-                blood_pressure=self.form_blood_pressure.strip() or None,
-                heart_rate=heart_rate,
-                temperature=temperature,
-                weight=weight,
-                height=height,
-                next_visit=next_visit,
-            )
+                # Subir archivos si existen (soporte para múltiples archivos)
+                if self.uploaded_files:
+                    from io import BytesIO
+                    from app.services import ConsultationFileService
+
+                    total_files = len(self.uploaded_files)
+                    print(f"📎 DEBUG CREATE CONSULTATION: Procesando {total_files} archivo(s)...")
+
+                    files_saved = 0
+                    for idx, file_info in enumerate(self.uploaded_files):
+                        # Actualizar progreso
+                        self.upload_progress = f"Subiendo archivo {idx + 1} de {total_files}..."
+
+                        try:
+                            file_data = await b64decode_async(file_info["data"])
+                            file_io = BytesIO(file_data)
+
+                            print(
+                                f"✅ DEBUG CREATE [{idx + 1}/{total_files}]: Guardando {file_info['name']}"
+                            )
+
+                            await ConsultationFileService.create_file_async(
+                                session=session,
+                                consultation_id=consultation.id,
+                                file_content=file_io,
+                                file_name=file_info["name"],
+                                file_type=file_info["type"],
+                            )
+                            files_saved += 1
+                        except Exception as e:
+                            print(f"❌ DEBUG CREATE: Error al guardar {file_info['name']}: {e}")
+
+                    if files_saved > 0:
+                        print(f"✅ {files_saved} archivo(s) guardado(s) correctamente")
+
+                self.success_message = "Consulta creada exitosamente"
+
+                # Desactivar indicador de carga
+                self.is_uploading = False
+                self.upload_progress = ""
+
+                self.close_new_consultation_modal()
+                self._refresh_consultations()
+
+            except ValueError as e:
+                self.is_uploading = False
+                self.upload_progress = ""
+                self.error_message = f"Error en los datos ingresados: {str(e)}"
+            except Exception as e:
+                self.is_uploading = False
+                self.upload_progress = ""
+                self.error_message = f"Error al crear la consulta: {str(e)}"
 
-            # Subir archivos si existen (soporte para múltiples archivos)
-            if self.uploaded_files:
-                import base64
-                from io import BytesIO
-                from app.services import ConsultationFileService
-
-                total_files = len(self.uploaded_files)
-                print(f"📎 DEBUG CREATE CONSULTATION: Procesando {total_files} archivo(s)...")
-
-                files_saved = 0
-                for idx, file_info in enumerate(self.uploaded_files):
-                    # Actualizar progreso
-                    self.upload_progress = f"Subiendo archivo {idx + 1} de {total_files}..."
-
-                    try:
-                        file_data = base64.b64decode(file_info["data"])
-                        file_io = BytesIO(file_data)
-
-                        print(
-                            f"✅ DEBUG CREATE [{idx + 1}/{total_files}]: Guardando {file_info['name']}"
-                        )
-
-                        ConsultationFileService.create_file(
-                            session=session,
-                            consultation_id=consultation.id,
-                            file_content=file_io,
-                            file_name=file_info["name"],
-                            file_type=file_info["type"],
-                        )
-                        files_saved += 1
-                    except Exception as e:
-                        print(f"❌ DEBUG CREATE: Error al guardar {file_info['name']}: {e}")
-
-                if files_saved > 0:
-                    print(f"✅ {files_saved} archivo(s) guardado(s) correctamente")
-
-            self.success_message = "Consulta creada exitosamente"
-
-            # Desactivar indicador de carga
-            self.is_uploading = False
-            self.upload_progress = ""
-
-            self.close_new_consultation_modal()
-            self.load_consultations()
-
-        except ValueError as e:
-            self.is_uploading = False
-            self.upload_progress = ""
-            self.error_message = f"Error en los datos ingresados: {str(e)}"
-        except Exception as e:
-            self.is_uploading = False
-            self.upload_progress = ""
-            self.error_message = f"Error al crear la consulta: {str(e)}"
-
-    def update_consultation(self):
+    async def update_consultation(self):
         """Actualiza una consulta existente"""
         if not self.editing_consultation_id:
             self.error_message = "No hay consulta en edición"
@@ -517,106 +579,107 @@ class ConsultationState(rx.State):
         self.is_uploading = True
         self.upload_progress = "Actualizando consulta..."
 
-        session = next(get_session())
-
-        try:
-            # Convertir valores numéricos
-            heart_rate = int(self.form_heart_rate) if self.form_heart_rate.strip() else None
-            temperature = float(self.form_temperature) if self.form_temperature.strip() else None
-            weight = float(self.form_weight) if self.form_weight.strip() else None
-            height = float(self.form_height) if self.form_height.strip() else None
-            next_visit = (
-                datetime.strptime(self.form_next_visit, "%Y-%m-%d").date()
-                if self.form_next_visit.strip()
-                else None
-            )
+        with session_scope() as session:
+            try:
+                # Convertir valores numéricos
+                heart_rate = int(self.form_heart_rate) if self.form_heart_rate.strip() else None
+                temperature = (
+                    float(self.form_temperature) if self.form_temperature.strip() else None
+                )
+                weight = float(self.form_weight) if self.form_weight.strip() else None
+                height = float(self.form_height) if self.form_height.strip() else None
+                next_visit = (
+                    datetime.strptime(self.form_next_visit, "%Y-%m-%d").date()
+                    if self.form_next_visit.strip()
+                    else None
+                )
 
-            # Preparar datos para actualización
-            update_data = {
-                "patient_id": patient_id,
-                "reason": self.form_reason.strip(),
-                "symptoms": self.form_symptoms.strip() or None,
-                "diagnosis": self.form_diagnosis.strip() or None,
-                "treatment": self.form_treatment.strip() or None,
-                "notes": self.form_notes.strip() or None,
-                "blood_pressure": self.form_blood_pressure.strip() or None,
-                "heart_rate": heart_rate,
-                "temperature": temperature,
-                "weight": weight,
-                "height": height,
-                "next_visit": next_visit,
-            }
+                # Preparar datos para actualización
+                update_data = {
+                    "patient_id": patient_id,
+                    "reason": self.form_reason.strip(),
+                    "symptoms": self.form_symptoms.strip() or None,
+                    "diagnosis": self.form_diagnosis.strip() or None,
+                    "treatment": self.form_treatment.strip() or None,
+                    "notes": self.form_notes.strip() or None,
+                    "blood_pressure": self.form_blood_pressure.strip() or None,
+                    "heart_rate": heart_rate,
+                    "temperature": temperature,
+                    "weight": weight,
+                    "height": height,
+                    "next_visit": next_visit,
+                }
 
-            ConsultationService.update_consultation(
-                session=session, consultation_id=self.editing_consultation_id, **update_data
-            )
+                ConsultationService.update_consultation(
+                    session=session, consultation_id=self.editing_consultation_id, **update_data
+                )
 
-            # Subir archivos nuevos si existen (soporte para múltiples archivos)
-            if self.uploaded_files:
-                import base64
-                from io import BytesIO
-                from app.services import ConsultationFileService
-
-                total_files = len(self.uploaded_files)
-                print(f"📤 DEBUG UPDATE CONSULTATION: Procesando {total_files} archivo(s)...")
-
-                files_saved = 0
-                for idx, file_info in enumerate(self.uploaded_files):
-                    # Actualizar progreso
-                    self.upload_progress = f"Subiendo archivo {idx + 1} de {total_files}..."
-
-                    try:
-                        file_data = base64.b64decode(file_info["data"])
-                        file_io = BytesIO(file_data)
-
-                        print(
-                            f"✅ DEBUG UPDATE [{idx + 1}/{total_files}]: Guardando {file_info['name']}"
-                        )
-
-                        ConsultationFileService.create_file(
-                            session=session,
-                            consultation_id=self.editing_consultation_id,
-                            file_content=file_io,
-                            file_name=file_info["name"],
-                            file_type=file_info["type"],
-                        )
-                        files_saved += 1
-                    except Exception as e:
-                        print(f"❌ DEBUG UPDATE: Error al guardar {file_info['name']}: {e}")
-
-                if files_saved > 0:
-                    print(f"✅ {files_saved} archivo(s) nuevo(s) agregado(s) a la consulta")
-
-            self.success_message = "Consulta actualizada exitosamente"
-
-            # Desactivar indicador de carga
-            self.is_uploading = False
-            self.upload_progress = ""
-
-            self.close_new_consultation_modal()
-            self.load_consultations()
-
-        except ValueError as e:
-            self.is_uploading = False
-            self.upload_progress = ""
-            self.error_message = f"Error en los datos ingresados: {str(e)}"
-        except Exception as e:
-            self.is_uploading = False
-            self.upload_progress = ""
-            self.error_message = f"Error al actualizar la consulta: {str(e)}"
+                # Subir archivos nuevos si existen (soporte para múltiples archivos)
+                if self.uploaded_files:
+                    from io import BytesIO
+                    from app.services import ConsultationFileService
+
+                    total_files = len(self.uploaded_files)
+                    print(f"📤 DEBUG UPDATE CONSULTATION: Procesando {total_files} archivo(s)...")
+
+                    files_saved = 0
+                    for idx, file_info in enumerate(self.uploaded_files):
+                        # Actualizar progreso
+                        self.upload_progress = f"Subiendo archivo {idx + 1} de {total_files}..."
+
+                        try:
+                            file_data = await b64decode_async(file_info["data"])
+                            file_io = BytesIO(file_data)
+
+                            print(
+                                f"✅ DEBUG UPDATE [{idx + 1}/{total_files}]: Guardando {file_info['name']}"
+                            )
+
+                            await ConsultationFileService.create_file_async(
+                                session=session,
+                                consultation_id=self.editing_consultation_id,
+                                file_content=file_io,
+                                file_name=file_info["name"],
+                                file_type=file_info["type"],
+                            )
+                            files_saved += 1
+                        except Exception as e:
+                            print(f"❌ DEBUG UPDATE: Error al guardar {file_info['name']}: {e}")
+
+                    if files_saved > 0:
+                        print(f"✅ {files_saved} archivo(s) nuevo(s) agregado(s) a la consulta")
+
+                self.success_message = "Consulta actualizada exitosamente"
+
+                # Desactivar indicador de carga
+                self.is_uploading = False
+                self.upload_progress = ""
+
+                self.close_new_consultation_modal()
+                self._refresh_consultations()
+
+            except ValueError as e:
+                self.is_uploading = False
+                self.upload_progress = ""
+                self.error_message = f"Error en los datos ingresados: {str(e)}"
+            except Exception as e:
+                self.is_uploading = False
+                self.upload_progress = ""
+                self.error_message = f"Error al actualizar la consulta: {str(e)}"
 
     def filter_by_patient(self, patient_id: str):
         """Filtra consultas por paciente"""
         self.selected_patient_id = int(patient_id) if patient_id else 0
-        self.load_consultations()
+        return self.load_consultations()
 
     def delete_consultation(self, consultation_id: int):
         """Elimina una consulta"""
-        session = next(get_session())
+        with session_scope() as session:
+            deleted = ConsultationService.delete_consultation(session, consultation_id)
 
-        if ConsultationService.delete_consultation(session, consultation_id):
+        if deleted:
             self.success_message = "Consulta eliminada exitosamente"
-            self.load_consultations()
+            self._refresh_consultations()
         else:
             self.error_message = "No se pudo eliminar la consulta"
 
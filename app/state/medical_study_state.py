@@ -6,25 +6,35 @@ from typing import Any, Optional
 import reflex as rx
 from sqlmodel import select
 
-from app.database import get_session
+from app.database import session_scope
 from app.models import MedicalStudy, Patient, StudyType
-from app.services import MedicalStudyService
-from app.services.study_file_service import StudyFileService
+from app.services import MedicalStudyService, StorageService, StudyQueryService
+from app.services.projections import StudyListRow
+from app.utils.file_io import b64decode_async, b64encode_async, read_attachment_async
+from app.utils.virtual_window import scroll_to_top, window_size, window_start
+
+# Listado virtualizado: alto fijo de cada tarjeta (px) e id del contenedor
+STUDY_ROW_HEIGHT = 400
+STUDIES_CONTAINER_ID = "studies-list"
+
+
+def _parse_date(value: str) -> Optional[date]:
+    """Convierte "YYYY-MM-DD" a date (None si está vacío o es inválido)"""
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
 
 
 class MedicalStudyState(rx.State):
     """Estado para gestión de estudios médicos"""
 
-    # Lista de estudios
-    studies: list[MedicalStudy] = []
+    # Ventana visible del listado de estudios (ver StudyQueryService)
+    studies: list[StudyListRow] = []
+    studies_offset: int = 0
+    studies_total: int = 0
     current_study: Optional[MedicalStudy] = None
 
-    # Información de pacientes para cada estudio (cache)
-    _studies_patient_info: dict[int, dict[str, str]] = {}
-
-    # Conteo de archivos por estudio (cache)
-    _studies_file_count: dict[int, int] = {}
-
     # Vista de detalle
     show_detail_modal: bool = False
     detail_study: Optional[dict] = None
@@ -36,6 +46,10 @@ class MedicalStudyState(rx.State):
     # Filtros
     selected_patient_id: Optional[int] = None
     selected_study_type: Optional[str] = None
+    filter_pending: bool = False
+    filter_critical: bool = False
+    filter_date_from: str = ""
+    filter_date_to: str = ""
 
     # Lista de pacientes para el selector
     patients_list: list[dict] = []
@@ -75,25 +89,6 @@ class MedicalStudyState(rx.State):
     message: str = ""
     message_type: str = ""  # "success" o "error"
 
-    @rx.var
-    def studies_patient_info(self) -> dict[int, dict[str, str]]:
-        """Retorna el diccionario de información de pacientes"""
-        return self._studies_patient_info
-
-    @rx.var
-    def studies_file_count(self) -> dict[int, int]:
-        """Retorna el diccionario de conteo de archivos por estudio"""
-        return self._studies_file_count
-
-    def get_file_count_text(self, study_id: int) -> str:
-        """Retorna el texto formateado del conteo de archivos para un estudio"""
-        count = self._studies_file_count.get(study_id, 0)
-        return f"{count} archivo(s)" if count > 0 else ""
-
-    def has_files(self, study_id: int) -> bool:
-        """Retorna si un estudio tiene archivos adjuntos"""
-        return self._studies_file_count.get(study_id, 0) > 0
-
     # Setters explícitos
     def set_show_new_study_modal(self, value: bool):
         """Setter para show_new_study_modal"""
@@ -169,42 +164,44 @@ class MedicalStudyState(rx.State):
         """Setter para form_diagnosis"""
         self.form_diagnosis = value
 
-    def load_studies(self, patient_id: Optional[int] = None):
-        """Carga los estudios médicos"""
-        session = next(get_session())
-        try:
-            if patient_id:
-                studies = MedicalStudyService.get_studies_by_patient(session, patient_id)
-                self.selected_patient_id = patient_id
-            else:
-                # Cargar todos los estudios
-                statement = select(MedicalStudy).order_by(MedicalStudy.study_date.desc())
-                studies = list(session.exec(statement).all())
-
-            # Limpiar cache anterior
-            self._studies_patient_info = {}
-            self._studies_file_count = {}
-
-            # Cachear información del paciente y conteo de archivos para cada estudio
-            for study in studies:
-                patient = session.get(Patient, study.patient_id)
-                if patient:
-                    self._studies_patient_info[study.id] = {
-                        "name": f"{patient.first_name} {patient.last_name}",
-                        "dni": patient.dni,
-                    }
+    def _study_filters(self) -> dict:
+        """Filtros actuales en el formato de StudyQueryService"""
+        return {
+            "patient_id": self.selected_patient_id,
+            "study_type": self.selected_study_type,
+            "is_pending": True if self.filter_pending else None,
+            "is_critical": True if self.filter_critical else None,
+            "date_from": _parse_date(self.filter_date_from),
+            "date_to": _parse_date(self.filter_date_to),
+        }
+
+    def _load_studies_window(self, session=None):
+        """Carga la ventana actual del listado con los filtros aplicados"""
+        if session is None:
+            with session_scope() as session:
+                self._load_studies_window(session)
+            return
+        self.studies, self.studies_total = StudyQueryService.get_study_page(
+            session,
+            offset=self.studies_offset,
+            limit=window_size(),
+            **self._study_filters(),
+        )
 
-                # Obtener conteo de archivos
-                files = StudyFileService.get_files_by_study(session, study.id)
-                self._studies_file_count[study.id] = len(files)
+    def load_studies(self, patient_id: Optional[int] = None):
+        """Carga los estudios médicos (primera ventana) y el uso de almacenamiento"""
+        self.selected_patient_id = patient_id or None
+        self.studies_offset = 0
 
-            self.studies = studies
+        with session_scope() as session:
+            self._load_studies_window(session)
 
-            # Cargar estadísticas de almacenamiento
-            bytes_used = MedicalStudyService.get_total_storage_size(session, patient_id)
-            self.storage_size_mb = round(bytes_used / (1024 * 1024), 2)
-        finally:
-            session.close()
+            # Cargar estadísticas de almacenamiento (archivos de estudios, cacheado)
+            usage = StorageService.get_usage(session, patient_id)
+            study_usage = next(
+                entry for entry in usage["by_category"] if entry["category"] == "study"
+            )
+            self.storage_size_mb = study_usage["mb"]
 
     def load_studies_by_type(self, study_type: str):
         """Filtra estudios por tipo"""
@@ -214,44 +211,44 @@ class MedicalStudyState(rx.State):
         else:
             self.selected_study_type = study_type
 
-        session = next(get_session())
-        try:
-            statement = select(MedicalStudy)
-
-            if self.selected_patient_id:
-                statement = statement.where(MedicalStudy.patient_id == self.selected_patient_id)
-
-            if self.selected_study_type:
-                statement = statement.where(MedicalStudy.study_type == self.selected_study_type)
-
-            statement = statement.order_by(MedicalStudy.study_date.desc())
-            studies = list(session.exec(statement).all())
-
-            # Limpiar cache anterior
-            self._studies_patient_info = {}
-            self._studies_file_count = {}
-
-            # Cachear información del paciente y conteo de archivos para cada estudio
-            for study in studies:
-                patient = session.get(Patient, study.patient_id)
-                if patient:
-                    self._studies_patient_info[study.id] = {
-                        "name": f"{patient.first_name} {patient.last_name}",
-                        "dni": patient.dni,
-                    }
-
-                # Obtener conteo de archivos
-                files = StudyFileService.get_files_by_study(session, study.id)
-                self._studies_file_count[study.id] = len(files)
-
-            self.studies = studies
-        finally:
-            session.close()
+        return self._reload_studies()
+
+    def toggle_filter_pending(self, value: bool):
+        """Filtra solo estudios pendientes"""
+        self.filter_pending = value
+        return self._reload_studies()
+
+    def toggle_filter_critical(self, value: bool):
+        """Filtra solo estudios críticos"""
+        self.filter_critical = value
+        return self._reload_studies()
+
+    def set_filter_date_from(self, value: str):
+        """Fecha desde del filtro"""
+        self.filter_date_from = value
+        return self._reload_studies()
+
+    def set_filter_date_to(self, value: str):
+        """Fecha hasta del filtro"""
+        self.filter_date_to = value
+        return self._reload_studies()
+
+    def _reload_studies(self):
+        """Vuelve al inicio del listado tras un cambio de filtros"""
+        self.studies_offset = 0
+        self._load_studies_window()
+        return scroll_to_top(STUDIES_CONTAINER_ID)
+
+    def scroll_studies(self, scroll_top: int):
+        """Carga la ventana de estudios correspondiente a la posición de scroll"""
+        offset = window_start(scroll_top, STUDY_ROW_HEIGHT)
+        if offset != self.studies_offset:
+            self.studies_offset = offset
+            self._load_studies_window()
 
     def load_patients(self):
         """Carga lista de pacientes activos para el selector"""
-        session = next(get_session())
-        try:
+        with session_scope() as session:
             statement = (
                 select(Patient)
                 .where(Patient.is_active)
@@ -282,8 +279,6 @@ class MedicalStudyState(rx.State):
 
             self.patients_options = opts
             self.patients_map = pmap
-        finally:
-            session.close()
 
     def open_new_study_modal(self):
         """Abre el modal para crear nuevo estudio"""
@@ -296,8 +291,7 @@ class MedicalStudyState(rx.State):
     def open_edit_study_modal(self, study_id: int):
         """Abre el modal para editar un estudio existente"""
         self.load_patients()
-        session = next(get_session())
-        try:
+        with session_scope() as session:
             study = session.get(MedicalStudy, study_id)
             if not study:
                 self.message = f"Estudio con ID {study_id} no encontrado"
@@ -331,8 +325,6 @@ class MedicalStudyState(rx.State):
             self.uploaded_files = []
 
             self.show_new_study_modal = True
-        finally:
-            session.close()
 
     def close_new_study_modal(self):
         """Cierra el modal de nuevo estudio"""
@@ -341,8 +333,7 @@ class MedicalStudyState(rx.State):
 
     def view_study(self, study_id: int):
         """Abre el modal de detalle del estudio"""
-        session = next(get_session())
-        try:
+        with session_scope() as session:
             study = session.get(MedicalStudy, study_id)
             if study:
                 # Obtener datos del paciente
@@ -386,8 +377,6 @@ class MedicalStudyState(rx.State):
                     }
                     for f in files
                 ]
-        finally:
-            session.close()
 
     def close_detail_modal(self):
         """Cierra el modal de detalle"""
@@ -395,19 +384,18 @@ class MedicalStudyState(rx.State):
         self.detail_study = None
         self.study_files = []  # Limpiar archivos al cerrar
 
-    def download_study_file(self, file_id: int):
-        """Descarga un archivo individual del estudio"""
-        session = next(get_session())
+    async def download_study_file(self, file_id: int):
+        """Descarga un archivo individual del estudio (la lectura corre en el pool de E/S)"""
         try:
             from app.services import StudyFileService
 
-            file_path, file_name = StudyFileService.download_file(session, file_id)
-            print(f"🚀 Descargando archivo de estudio: {file_name} ({file_path})")
-
-            # Leer archivo y enviar bytes directamente
-            with open(file_path, "rb") as f:
-                file_data = f.read()
+            with session_scope() as session:
+                result = StudyFileService.download_file(session, file_id)
+            if not result:
+                return rx.window_alert("Archivo no encontrado")
 
+            file_path, file_name, encoding = result
+            file_data = await read_attachment_async(file_path, encoding)
             return rx.download(data=file_data, filename=file_name)
         except Exception as e:
             print(f"❌ Error al descargar archivo: {e}")
@@ -439,8 +427,6 @@ class MedicalStudyState(rx.State):
             print("⚠️ DEBUG UPLOAD: No hay archivos en la lista")
             return
 
-        import base64
-
         # Procesar todos los archivos
         uploaded_list = []
         for idx, file in enumerate(files):
@@ -454,7 +440,7 @@ class MedicalStudyState(rx.State):
 
                 uploaded_list.append(
                     {
-                        "data": base64.b64encode(file_data).decode("utf-8"),
+                        "data": await b64encode_async(file_data),
                         "name": file.filename,
                         "size": file.size or len(file_data),
                         "type": file.content_type or "application/octet-stream",
@@ -475,7 +461,7 @@ class MedicalStudyState(rx.State):
             removed = self.uploaded_files.pop(index)
             print(f"🗑️ Archivo eliminado: {removed['name']}")
 
-    def create_study(self):
+    async def create_study(self):
         """Crea un nuevo estudio médico"""
         try:
             if not self.form_patient_id or not self.form_study_name:
@@ -487,8 +473,7 @@ class MedicalStudyState(rx.State):
             self.is_uploading = True
             self.upload_progress = "Creando estudio..."
 
-            session = next(get_session())
-            try:
+            with session_scope() as session:
                 # Validar que el paciente existe (resolver label a id si aplica)
                 resolved_id = self._resolve_patient_id_from_form() or int(self.form_patient_id)
                 patient = session.get(Patient, resolved_id)
@@ -522,7 +507,6 @@ class MedicalStudyState(rx.State):
 
                 # Subir archivo si existe
                 if self.uploaded_files and self.uploaded_files[0]:
-                    import base64
                     from io import BytesIO
 
                     self.upload_progress = "Subiendo archivo..."
@@ -530,17 +514,18 @@ class MedicalStudyState(rx.State):
 
                     try:
                         # Decodificar el contenido desde base64
-                        file_data = base64.b64decode(self.uploaded_files[0])
+                        file_info = self.uploaded_files[0]
+                        file_data = await b64decode_async(file_info["data"])
                         file_io = BytesIO(file_data)
 
                         print(f"✅ DEBUG CREATE: Contenido decodificado: {len(file_data)} bytes")
 
-                        result = MedicalStudyService.upload_file(
+                        result = await MedicalStudyService.upload_file_async(
                             session=session,
                             study_id=study.id,
                             file_content=file_io,
-                            file_name=self.file_name,
-                            file_type=self.file_type,
+                            file_name=file_info["name"],
+                            file_type=file_info["type"],
                         )
                         print(f"✅ DEBUG CREATE: Archivo guardado en: {result.file_path}")
                         self.message = f"Estudio '{self.form_study_name}' creado exitosamente con archivo adjunto"
@@ -559,8 +544,6 @@ class MedicalStudyState(rx.State):
 
                 self.close_new_study_modal()
                 self.load_studies(self.selected_patient_id)
-            finally:
-                session.close()
 
         except Exception as e:
             self.is_uploading = False
@@ -568,7 +551,7 @@ class MedicalStudyState(rx.State):
             self.message = f"Error al crear estudio: {str(e)}"
             self.message_type = "error"
 
-    def update_study(self):
+    async def update_study(self):
         """Actualiza un estudio médico existente"""
         try:
             if not self.editing_study_id:
@@ -585,8 +568,7 @@ class MedicalStudyState(rx.State):
             self.is_uploading = True
             self.upload_progress = "Actualizando estudio..."
 
-            session = next(get_session())
-            try:
+            with session_scope() as session:
                 # Convertir y validar fecha
                 try:
                     study_date = date.fromisoformat(self.form_study_date)
@@ -618,7 +600,6 @@ class MedicalStudyState(rx.State):
 
                 # Subir nuevos archivos si existen (soporte para múltiples archivos)
                 if self.uploaded_files:
-                    import base64
                     from io import BytesIO
 
                     total_files = len(self.uploaded_files)
@@ -631,14 +612,14 @@ class MedicalStudyState(rx.State):
 
                         try:
                             # Decodificar el contenido desde base64
-                            file_data = base64.b64decode(file_info["data"])
+                            file_data = await b64decode_async(file_info["data"])
                             file_io = BytesIO(file_data)
 
                             print(
                                 f"✅ DEBUG UPDATE [{idx + 1}/{total_files}]: Guardando {file_info['name']} ({len(file_data)} bytes)"
                             )
 
-                            result = MedicalStudyService.upload_file(
+                            result = await MedicalStudyService.upload_file_async(
                                 session=session,
                                 study_id=study.id,
                                 file_content=file_io,
@@ -667,9 +648,7 @@ class MedicalStudyState(rx.State):
                 self.upload_progress = ""
 
                 self.close_new_study_modal()
-                self.load_studies(self.selected_patient_id)
-            finally:
-                session.close()
+                self._load_studies_window()
 
         except Exception as e:
             self.is_uploading = False
@@ -677,57 +656,40 @@ class MedicalStudyState(rx.State):
             self.message = f"Error al actualizar estudio: {str(e)}"
             self.message_type = "error"
 
-    def save_study(self):
+    async def save_study(self):
         """Guarda el estudio (crea o actualiza según el modo)"""
         if self.editing_study_id:
-            self.update_study()
+            await self.update_study()
         else:
-            self.create_study()
+            await self.create_study()
 
     def delete_study(self, study_id: int):
         """Elimina un estudio médico"""
         try:
-            session = next(get_session())
-            try:
+            with session_scope() as session:
                 MedicalStudyService.delete_study(session, study_id)
                 self.message = "Estudio eliminado exitosamente"
                 self.message_type = "success"
                 self.load_studies(self.selected_patient_id)
-            finally:
-                session.close()
         except Exception as e:
             self.message = f"Error al eliminar estudio: {str(e)}"
             self.message_type = "error"
 
     def get_patient_name(self, patient_id: int) -> str:
         """Obtiene el nombre del paciente"""
-        session = next(get_session())
-        try:
+        with session_scope() as session:
             patient = session.get(Patient, patient_id)
             return patient.full_name if patient else "Desconocido"
-        finally:
-            session.close()
 
-    def download_file(self, study_id: int):
-        """Descarga el archivo de un estudio"""
-        print(f"🔽 DEBUG: download_file llamado con study_id={study_id}")
-        session = next(get_session())
+    async def download_file(self, study_id: int):
+        """Descarga el archivo de un estudio (la lectura corre en el pool de E/S)"""
         try:
-            result = MedicalStudyService.download_file(session, study_id)
+            with session_scope() as session:
+                result = MedicalStudyService.download_file(session, study_id)
 
             if result:
-                file_path, file_name = result
-                print(f"✓ Archivo encontrado: {file_name}")
-                print(f"✓ Ruta: {file_path}")
-                print(f"✓ Existe: {file_path.exists()}")
-
-                # Leer archivo y enviar bytes directamente (funciona sin endpoint HTTP)
-                with open(file_path, "rb") as f:
-                    file_data = f.read()
-
-                print(f"✓ Leídos {len(file_data)} bytes")
-                print(f"🚀 Descargando: {file_name}")
-
+                file_path, file_name, encoding = result
+                file_data = await read_attachment_async(file_path, encoding)
                 return rx.download(data=file_data, filename=file_name)
             else:
                 print(f"❌ No se encontró archivo para estudio {study_id}")
@@ -739,5 +701,3 @@ class MedicalStudyState(rx.State):
             import traceback
 
             traceback.print_exc()
-        finally:
-            session.close()
@@ -4,9 +4,15 @@ from typing import Optional
 
 import reflex as rx
 
-from app.database import get_session
-from app.models import Consultation, MedicalStudy, Patient
-from app.services import ConsultationService, MedicalStudyService
+from app.database import get_async_session, session_scope
+from app.models import MedicalStudy, Patient
+from app.services import ConsultationService, MedicalStudyService, PatientCacheService
+from app.services.projections import ConsultationRow, PatientStudyRow
+from app.utils.executors import run_in_executor
+from app.utils.file_io import read_attachment_async
+
+# Filas por página en las pestañas de consultas y estudios
+DETAIL_PAGE_SIZE = 20
 
 
 class PatientDetailState(rx.State):
@@ -19,17 +25,35 @@ class PatientDetailState(rx.State):
     patient_full_name: str = ""
     patient_birth_date_str: str = ""
 
-    # Historial
-    consultations: list[Consultation] = []
-    studies: list[MedicalStudy] = []
+    # Historial (filas proyectadas, una página por vez)
+    consultations: list[ConsultationRow] = []
+    studies: list[PatientStudyRow] = []
+    consultations_page: int = 0
+    studies_page: int = 0
+
+    # Pestañas: cada una se carga la primera vez que se muestra
+    active_tab: str = "consultations"
+    consultations_loaded: bool = False
+    studies_loaded: bool = False
+    files_loaded: bool = False
 
     # Estadísticas
     total_consultations: int = 0
     total_studies: int = 0
     last_consultation_date: str = ""
 
-    def load_patient_detail(self):
-        """Carga todos los datos del paciente"""
+    @rx.var
+    def consultations_total_pages(self) -> int:
+        """Cantidad de páginas de consultas según el resumen del paciente"""
+        return max(1, -(-self.total_consultations // DETAIL_PAGE_SIZE))
+
+    @rx.var
+    def studies_total_pages(self) -> int:
+        """Cantidad de páginas de estudios según el resumen del paciente"""
+        return max(1, -(-self.total_studies // DETAIL_PAGE_SIZE))
+
+    async def load_patient_detail(self):
+        """Carga el paciente y su resumen; las pestañas se cargan bajo demanda"""
         # Obtener patient_id de la URL
         router_data = self.router.page.params
         patient_id = router_data.get("patient_id")
@@ -42,10 +66,21 @@ class PatientDetailState(rx.State):
         except (ValueError, TypeError):
             return
 
-        session = next(get_session())
-        try:
-            # Cargar paciente
-            self.patient = session.get(Patient, self.current_patient_id)
+        # Reiniciar pestañas (puede venir de otro paciente)
+        self.consultations = []
+        self.studies = []
+        self.consultations_page = 0
+        self.studies_page = 0
+        self.consultations_loaded = False
+        self.studies_loaded = False
+        self.files_loaded = False
+        self.active_tab = "consultations"
+
+        async with get_async_session() as session:
+            # Cargar paciente (cacheado por paciente, ver PatientCacheService)
+            self.patient = await PatientCacheService.get_patient_async(
+                session, self.current_patient_id
+            )
 
             if not self.patient:
                 return
@@ -55,33 +90,99 @@ class PatientDetailState(rx.State):
             self.patient_full_name = self.patient.full_name
             self.patient_birth_date_str = self.patient.birth_date.strftime("%Y-%m-%d")
 
-            # Cargar consultas del paciente
-            self.consultations = ConsultationService.get_consultations_by_patient(
-                session, self.current_patient_id
+            # Estadísticas desde el resumen materializado (una fila)
+            summary = await PatientCacheService.get_summary_async(session, self.current_patient_id)
+            self.total_consultations = summary.consultation_count if summary else 0
+            self.total_studies = summary.study_count if summary else 0
+            self.last_consultation_date = (
+                summary.last_consultation_date.strftime("%Y-%m-%d")
+                if summary and summary.last_consultation_date
+                else ""
             )
-            self.total_consultations = len(self.consultations)
 
-            # Obtener fecha de última consulta
-            if self.consultations:
-                self.last_consultation_date = self.consultations[0].consultation_date.strftime(
-                    "%Y-%m-%d"
-                )
+        # La pestaña visible se carga después del primer render
+        yield PatientDetailState.load_tab(self.active_tab)
 
-            # Cargar estudios del paciente
-            self.studies = MedicalStudyService.get_studies_by_patient(
-                session, self.current_patient_id
-            )
-            self.total_studies = len(self.studies)
+    def set_active_tab(self, tab: str):
+        """Cambia de pestaña y la carga si todavía no se mostró"""
+        self.active_tab = tab
+        return PatientDetailState.load_tab(tab)
+
+    async def load_tab(self, tab: str):
+        """Carga el contenido de una pestaña la primera vez que se muestra"""
+        if not self.current_patient_id:
+            return
+
+        if tab == "consultations" and not self.consultations_loaded:
+            await self._load_consultations_page()
+        elif tab == "studies" and not self.studies_loaded:
+            await self._load_studies_page()
+        elif tab == "files" and not self.files_loaded:
+            self.files_loaded = True
 
-        finally:
-            session.close()
+            from app.state.patient_files_state import PatientFilesState
 
-        # Cargar archivos unificados del paciente
-        from app.state.patient_files_state import PatientFilesState
+            return PatientFilesState.load_all_files(self.current_patient_id)
 
-        yield PatientFilesState.load_all_files(self.current_patient_id)
+    async def _load_consultations_page(self):
+        """Carga la página actual de consultas con solo las columnas del timeline"""
+        patient_id = self.current_patient_id
+        offset = self.consultations_page * DETAIL_PAGE_SIZE
 
-    def export_patient_pdf(self):
+        async def load() -> list[ConsultationRow]:
+            async with get_async_session() as session:
+                rows = await ConsultationService.get_consultation_rows_by_patient_async(
+                    session, patient_id, offset=offset, limit=DETAIL_PAGE_SIZE
+                )
+            return [ConsultationRow.from_row(row) for row in rows]
+
+        self.consultations = await PatientCacheService.get_or_load_async(
+            patient_id, f"consultation_rows:{offset}:{DETAIL_PAGE_SIZE}", load
+        )
+        self.consultations_loaded = True
+
+    async def _load_studies_page(self):
+        """Carga la página actual de estudios con solo las columnas del listado"""
+        patient_id = self.current_patient_id
+        offset = self.studies_page * DETAIL_PAGE_SIZE
+
+        async def load() -> list[PatientStudyRow]:
+            async with get_async_session() as session:
+                rows = await MedicalStudyService.get_study_rows_by_patient_async(
+                    session, patient_id, offset=offset, limit=DETAIL_PAGE_SIZE
+                )
+            return [PatientStudyRow.from_row(row) for row in rows]
+
+        self.studies = await PatientCacheService.get_or_load_async(
+            patient_id, f"study_rows:{offset}:{DETAIL_PAGE_SIZE}", load
+        )
+        self.studies_loaded = True
+
+    async def next_consultations_page(self):
+        """Avanza a la siguiente página de consultas"""
+        if self.consultations_page + 1 < self.consultations_total_pages:
+            self.consultations_page += 1
+            await self._load_consultations_page()
+
+    async def prev_consultations_page(self):
+        """Retrocede a la página anterior de consultas"""
+        if self.consultations_page > 0:
+            self.consultations_page -= 1
+            await self._load_consultations_page()
+
+    async def next_studies_page(self):
+        """Avanza a la siguiente página de estudios"""
+        if self.studies_page + 1 < self.studies_total_pages:
+            self.studies_page += 1
+            await self._load_studies_page()
+
+    async def prev_studies_page(self):
+        """Retrocede a la página anterior de estudios"""
+        if self.studies_page > 0:
+            self.studies_page -= 1
+            await self._load_studies_page()
+
+    async def export_patient_pdf(self):
         """Exporta el historial del paciente a PDF"""
         if not self.current_patient_id:
             return
@@ -89,7 +190,9 @@ class PatientDetailState(rx.State):
         from app.services import ReportService
 
         try:
-            content = ReportService.generate_patient_history_pdf(self.current_patient_id)
+            content = await run_in_executor(
+                "reports", ReportService.generate_patient_history_pdf, self.current_patient_id
+            )
             filename = f"historial_paciente_{self.current_patient_id}.pdf"
 
             return rx.download(
@@ -100,7 +203,7 @@ class PatientDetailState(rx.State):
         except Exception as e:
             print(f"Error al exportar PDF: {str(e)}")
 
-    def export_patient_excel(self):
+    async def export_patient_excel(self):
         """Exporta el historial del paciente a Excel"""
         if not self.current_patient_id:
             return
@@ -108,7 +211,9 @@ class PatientDetailState(rx.State):
         from app.services import ReportService
 
         try:
-            content = ReportService.generate_patient_history_excel(self.current_patient_id)
+            content = await run_in_executor(
+                "reports", ReportService.generate_patient_history_excel, self.current_patient_id
+            )
             filename = f"historial_paciente_{self.current_patient_id}.xlsx"
 
             return rx.download(
@@ -119,42 +224,25 @@ class PatientDetailState(rx.State):
         except Exception as e:
             print(f"Error al exportar Excel: {str(e)}")
 
-    def download_study_file(self, study_id: int):
+    async def download_study_file(self, study_id: int):
         """Descarga el archivo adjunto asociado a un estudio.
 
-        Busca el estudio en la base de datos, lee el archivo y lo envía al navegador.
+        Busca el estudio en la base de datos, lee el archivo en el pool de E/S
+        (con la sesión ya cerrada) y lo envía al navegador.
         """
-        print(f"🔽 DEBUG: download_study_file llamado con study_id={study_id}")
-        session = next(get_session())
         try:
-            study = session.get(MedicalStudy, study_id)
-            if not study:
-                print(f"❌ Estudio {study_id} no encontrado")
-                return
-
-            print(f"✓ Estudio encontrado: {study.study_name}")
-            print(f"✓ Archivo: {study.file_name}")
-
-            # Usar el servicio para obtener la ruta y nombre del archivo
-            from app.services import MedicalStudyService
-
-            result = MedicalStudyService.download_file(session, study_id)
+            with session_scope() as session:
+                if not session.get(MedicalStudy, study_id):
+                    print(f"❌ Estudio {study_id} no encontrado")
+                    return
+                result = MedicalStudyService.download_file(session, study_id)
 
             if not result:
                 print(f"❌ Estudio {study_id} sin archivo adjunto")
                 return
 
-            file_path, file_name = result
-            print(f"✓ Ruta del archivo: {file_path}")
-            print(f"✓ Archivo existe: {file_path.exists()}")
-
-            # Leer archivo y enviar bytes directamente
-            with open(file_path, "rb") as f:
-                file_data = f.read()
-
-            print(f"✓ Archivo leído: {len(file_data)} bytes")
-            print(f"🚀 Iniciando descarga de: {file_name}")
-
+            file_path, file_name, encoding = result
+            file_data = await read_attachment_async(file_path, encoding)
             return rx.download(data=file_data, filename=file_name)
 
         except Exception as e:
@@ -162,5 +250,3 @@ class PatientDetailState(rx.State):
             import traceback
 
             traceback.print_exc()
-        finally:
-            session.close()
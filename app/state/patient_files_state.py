@@ -5,12 +5,18 @@ from typing import Optional
 import reflex as rx
 from pydantic import BaseModel
 
-from app.database import get_session
+from app.database import session_scope
 from app.services import (
     ConsultationFileService,
     PatientFileService,
+    PatientFilesQueryService,
     StudyFileService,
 )
+from app.state.auth_state import signed_download_url
+from app.utils.file_io import b64decode_async, b64encode_async, read_attachment_async
+
+# Archivos por página en la pestaña de archivos
+FILES_PAGE_SIZE = 50
 
 
 class UnifiedFile(BaseModel):
@@ -33,14 +39,16 @@ class PatientFilesState(rx.State):
     # ID del paciente actual
     current_patient_id: Optional[int] = None
 
-    # Archivos por categoría
-    patient_files: list[UnifiedFile] = []
-    study_files: list[UnifiedFile] = []
-    consultation_files: list[UnifiedFile] = []
+    # Página actual de archivos (ya filtrada por categoría)
+    files: list[UnifiedFile] = []
+    files_page: int = 0
 
     # Estadísticas
     total_files: int = 0
     total_size_mb: float = 0.0
+    patient_files_count: int = 0
+    study_files_count: int = 0
+    consultation_files_count: int = 0
 
     # Filtros
     selected_category: str = "all"  # "all", "patient", "study", "consultation"
@@ -57,139 +65,125 @@ class PatientFilesState(rx.State):
     is_uploading: bool = False
     upload_progress: str = ""  # Texto de progreso como "Subiendo 2 de 5 archivos..."
 
+    async def download_archive(self):
+        """Descarga el ZIP con todos los archivos del paciente (endpoint de streaming)"""
+        url = await signed_download_url(self, f"/api/patients/{self.current_patient_id}/archive")
+        if url is None:
+            return rx.redirect("/")
+        # URL absoluta (api_url): rx.download solo acepta rutas que empiezan con "/".
+        # El endpoint responde con Content-Disposition attachment y la página no cambia.
+        return rx.redirect(url, is_external=True)
+
     @rx.var
     def filtered_files(self) -> list[UnifiedFile]:
-        """Retorna archivos filtrados por categoría seleccionada"""
-        if self.selected_category == "all":
-            return self.patient_files + self.study_files + self.consultation_files
-        elif self.selected_category == "patient":
-            return self.patient_files
+        """Retorna la página de archivos de la categoría seleccionada"""
+        return self.files
+
+    @rx.var
+    def filtered_total(self) -> int:
+        """Cantidad de archivos de la categoría seleccionada"""
+        if self.selected_category == "patient":
+            return self.patient_files_count
         elif self.selected_category == "study":
-            return self.study_files
+            return self.study_files_count
         elif self.selected_category == "consultation":
-            return self.consultation_files
-        return []
+            return self.consultation_files_count
+        return self.total_files
+
+    @rx.var
+    def files_total_pages(self) -> int:
+        """Cantidad de páginas de la categoría seleccionada"""
+        return max(1, -(-self.filtered_total // FILES_PAGE_SIZE))
 
     def load_all_files(self, patient_id: int):
-        """Carga todos los archivos del paciente de todas las fuentes"""
+        """Carga los archivos del paciente desde la primera página"""
         self.current_patient_id = patient_id
-        session = next(get_session())
+        self.files_page = 0
+        self._load_files_page()
 
-        try:
-            # 1. Cargar archivos directos del paciente
-            patient_files_raw = PatientFileService.get_files_by_patient(session, patient_id)
-            self.patient_files = [
-                UnifiedFile(
-                    file_id=f.id,
-                    file_name=f.file_name,
-                    file_size=f.file_size,
-                    file_type=f.file_type,
-                    uploaded_at=f.uploaded_at.strftime("%Y-%m-%d %H:%M"),
-                    description=f.description,
-                    category="patient",
-                    source_id=f.patient_id,
-                    source_name=f.file_category,
-                )
-                for f in patient_files_raw
-            ]
-
-            # 2. Cargar archivos de estudios médicos
-            study_files_raw = StudyFileService.get_files_by_patient(session, patient_id)
-            # Necesitamos obtener el nombre del estudio para cada archivo
-            from app.models import MedicalStudy
-
-            self.study_files = []
-            for f in study_files_raw:
-                study = session.get(MedicalStudy, f.study_id)
-                study_name = study.study_name if study else f"Estudio #{f.study_id}"
-
-                self.study_files.append(
-                    UnifiedFile(
-                        file_id=f.id,
-                        file_name=f.file_name,
-                        file_size=f.file_size,
-                        file_type=f.file_type,
-                        uploaded_at=f.uploaded_at.strftime("%Y-%m-%d %H:%M"),
-                        description=f.description,
-                        category="study",
-                        source_id=f.study_id,
-                        source_name=study_name,
-                    )
-                )
+    def _load_files_page(self):
+        """Carga la página actual con una sola consulta (UNION ALL de las tres fuentes)"""
+        if not self.current_patient_id:
+            return
 
-            # 3. Cargar archivos de consultas
-            consultation_files_raw = ConsultationFileService.get_files_by_patient(
-                session, patient_id
+        with session_scope() as session:
+            rows, totals = PatientFilesQueryService.get_files_page(
+                session,
+                self.current_patient_id,
+                category=None if self.selected_category == "all" else self.selected_category,
+                offset=self.files_page * FILES_PAGE_SIZE,
+                limit=FILES_PAGE_SIZE,
             )
-            from app.models import Consultation
-
-            self.consultation_files = []
-            for f in consultation_files_raw:
-                consultation = session.get(Consultation, f.consultation_id)
-                consultation_name = (
-                    f"Consulta {consultation.consultation_date.strftime('%Y-%m-%d')}"
-                    if consultation
-                    else f"Consulta #{f.consultation_id}"
-                )
-
-                self.consultation_files.append(
-                    UnifiedFile(
-                        file_id=f.id,
-                        file_name=f.file_name,
-                        file_size=f.file_size,
-                        file_type=f.file_type,
-                        uploaded_at=f.uploaded_at.strftime("%Y-%m-%d %H:%M"),
-                        description=f.description,
-                        category="consultation",
-                        source_id=f.consultation_id,
-                        source_name=consultation_name,
-                    )
-                )
 
-            # Calcular estadísticas
-            all_files = self.patient_files + self.study_files + self.consultation_files
-            self.total_files = len(all_files)
-            total_size_bytes = sum(f.file_size for f in all_files)
-            self.total_size_mb = round(total_size_bytes / (1024 * 1024), 2)
-
-        finally:
-            session.close()
-
-    def get_filtered_files(self) -> list[UnifiedFile]:
-        """Retorna archivos filtrados por categoría seleccionada"""
-        if self.selected_category == "all":
-            return self.patient_files + self.study_files + self.consultation_files
-        elif self.selected_category == "patient":
-            return self.patient_files
-        elif self.selected_category == "study":
-            return self.study_files
-        elif self.selected_category == "consultation":
-            return self.consultation_files
-        return []
+        self.files = [
+            UnifiedFile(
+                file_id=file_id,
+                file_name=file_name,
+                file_size=file_size,
+                file_type=file_type,
+                uploaded_at=uploaded_at.strftime("%Y-%m-%d %H:%M"),
+                description=description,
+                category=category,
+                source_id=source_id,
+                source_name=source_name,
+            )
+            for (
+                category,
+                file_id,
+                file_name,
+                file_size,
+                file_type,
+                uploaded_at,
+                description,
+                source_id,
+                source_name,
+            ) in rows
+        ]
+
+        # Calcular estadísticas
+        self.total_files = totals["total"]
+        self.patient_files_count = totals["patient"]
+        self.study_files_count = totals["study"]
+        self.consultation_files_count = totals["consultation"]
+        self.total_size_mb = round(totals["total_bytes"] / (1024 * 1024), 2)
 
     def set_category_filter(self, category: str):
-        """Cambia el filtro de categoría"""
+        """Cambia el filtro de categoría y vuelve a la primera página"""
         self.selected_category = category
-
-    def download_file(self, file_id: int, category: str):
-        """Descarga un archivo según su categoría"""
-        session = next(get_session())
-
+        self.files_page = 0
+        self._load_files_page()
+
+    def next_files_page(self):
+        """Avanza a la siguiente página de archivos"""
+        if self.files_page + 1 < self.files_total_pages:
+            self.files_page += 1
+            self._load_files_page()
+
+    def prev_files_page(self):
+        """Retrocede a la página anterior de archivos"""
+        if self.files_page > 0:
+            self.files_page -= 1
+            self._load_files_page()
+
+    async def download_file(self, file_id: int, category: str):
+        """Descarga un archivo según su categoría (la lectura corre en el pool de E/S)"""
         try:
-            if category == "patient":
-                result = PatientFileService.download_file(session, file_id)
-            elif category == "study":
-                result = StudyFileService.download_file(session, file_id)
-            elif category == "consultation":
-                result = ConsultationFileService.download_file(session, file_id)
-            else:
-                print(f"❌ Categoría inválida: {category}")
-                return
+            # La sesión solo resuelve ruta, nombre y codificación: se cierra (y
+            # devuelve la conexión al pool) antes de leer el archivo
+            with session_scope() as session:
+                if category == "patient":
+                    result = PatientFileService.download_file(session, file_id)
+                elif category == "study":
+                    result = StudyFileService.download_file(session, file_id)
+                elif category == "consultation":
+                    result = ConsultationFileService.download_file(session, file_id)
+                else:
+                    print(f"❌ Categoría inválida: {category}")
+                    return
 
             if result:
-                file_path, file_name = result
-                with open(file_path, "rb") as f:
-                    file_data = f.read()
+                file_path, file_name, encoding = result
+                file_data = await read_attachment_async(file_path, encoding)
 
                 print(f"🚀 Descargando: {file_name} ({len(file_data)} bytes)")
                 return rx.download(data=file_data, filename=file_name)
@@ -201,8 +195,6 @@ class PatientFilesState(rx.State):
             import traceback
 
             traceback.print_exc()
-        finally:
-            session.close()
 
     # Métodos para upload múltiple
     def open_upload_modal(self):
@@ -235,8 +227,6 @@ class PatientFilesState(rx.State):
             print("⚠️ DEBUG UPLOAD: No hay archivos")
             return
 
-        import base64
-
         uploaded_list = []
         for idx, file in enumerate(files):
             print(f"📁 DEBUG UPLOAD [{idx + 1}/{len(files)}]: Procesando {file.filename}")
@@ -247,7 +237,7 @@ class PatientFilesState(rx.State):
 
                 uploaded_list.append(
                     {
-                        "data": base64.b64encode(file_data).decode("utf-8"),
+                        "data": await b64encode_async(file_data),
                         "name": file.filename,
                         "size": file.size or len(file_data),
                         "type": file.content_type or "application/octet-stream",
@@ -268,8 +258,8 @@ class PatientFilesState(rx.State):
             removed = self.uploaded_files.pop(index)
             print(f"🗑️ Archivo eliminado: {removed['name']}")
 
-    def save_uploaded_files(self):
-        """Guarda los archivos subidos en el sistema"""
+    async def save_uploaded_files(self):
+        """Guarda los archivos subidos en el sistema (la escritura corre en el pool de E/S)"""
         print("🚀 DEBUG: Iniciando save_uploaded_files")
         print(f"🚀 DEBUG: current_patient_id = {self.current_patient_id}")
         print(f"🚀 DEBUG: uploaded_files count = {len(self.uploaded_files)}")
@@ -290,74 +280,76 @@ class PatientFilesState(rx.State):
         # Activar indicador de carga
         self.is_uploading = True
         self.upload_progress = "Preparando archivos..."
+        yield
 
-        session = next(get_session())
-        try:
-            import base64
-            from io import BytesIO
-            import traceback
+        with session_scope() as session:
+            try:
+                from io import BytesIO
+                import traceback
+
+                total_files = len(self.uploaded_files)
+                files_saved = 0
+                for idx, file_info in enumerate(self.uploaded_files):
+                    # Actualizar progreso
+                    self.upload_progress = f"Subiendo archivo {idx + 1} de {total_files}..."
+                    yield
+
+                    try:
+                        file_data = await b64decode_async(file_info["data"])
+                        file_io = BytesIO(file_data)
+
+                        print(
+                            f"📤 DEBUG SAVE [{idx + 1}/{total_files}]: Guardando {file_info['name']}"
+                        )
+                        print(f"📤 DEBUG: Tamaño decodificado: {len(file_data)} bytes")
+
+                        await PatientFileService.create_file_async(
+                            session=session,
+                            patient_id=self.current_patient_id,
+                            file_content=file_io,
+                            file_name=file_info["name"],
+                            file_type=file_info["type"],
+                            file_category=self.upload_category,
+                            description=self.upload_description
+                            if self.upload_description
+                            else None,
+                        )
+                        files_saved += 1
+                        print(f"✅ DEBUG SAVE: Archivo {file_info['name']} guardado")
+                    except Exception as e:
+                        print(f"❌ DEBUG SAVE: Error al guardar {file_info['name']}: {e}")
+                        print("❌ DEBUG SAVE: Traceback:")
+                        traceback.print_exc()
+
+                print(f"✅ DEBUG: Archivos guardados: {files_saved}/{total_files}")
+
+                if files_saved == total_files:
+                    self.upload_message = f"✅ {files_saved} archivo(s) subido(s) exitosamente"
+                    self.upload_message_type = "success"
+                elif files_saved > 0:
+                    self.upload_message = f"⚠️ {files_saved}/{total_files} archivos guardados"
+                    self.upload_message_type = "success"
+                else:
+                    self.upload_message = "❌ Error al guardar archivos"
+                    self.upload_message_type = "error"
+
+                # Desactivar indicador de carga
+                self.is_uploading = False
+                self.upload_progress = ""
+
+                # Recargar archivos si se guardó al menos uno
+                if files_saved > 0:
+                    print("🔄 DEBUG: Recargando archivos...")
+                    self.load_all_files(self.current_patient_id)
+                    self.close_upload_modal()
+                    print("✅ DEBUG: Archivos recargados y modal cerrado")
 
-            total_files = len(self.uploaded_files)
-            files_saved = 0
-            for idx, file_info in enumerate(self.uploaded_files):
-                # Actualizar progreso
-                self.upload_progress = f"Subiendo archivo {idx + 1} de {total_files}..."
-
-                try:
-                    file_data = base64.b64decode(file_info["data"])
-                    file_io = BytesIO(file_data)
-
-                    print(f"📤 DEBUG SAVE [{idx + 1}/{total_files}]: Guardando {file_info['name']}")
-                    print(f"📤 DEBUG: Tamaño decodificado: {len(file_data)} bytes")
-
-                    PatientFileService.create_file(
-                        session=session,
-                        patient_id=self.current_patient_id,
-                        file_content=file_io,
-                        file_name=file_info["name"],
-                        file_type=file_info["type"],
-                        file_category=self.upload_category,
-                        description=self.upload_description if self.upload_description else None,
-                    )
-                    files_saved += 1
-                    print(f"✅ DEBUG SAVE: Archivo {file_info['name']} guardado")
-                except Exception as e:
-                    print(f"❌ DEBUG SAVE: Error al guardar {file_info['name']}: {e}")
-                    print("❌ DEBUG SAVE: Traceback:")
-                    traceback.print_exc()
-
-            print(f"✅ DEBUG: Archivos guardados: {files_saved}/{total_files}")
-
-            if files_saved == total_files:
-                self.upload_message = f"✅ {files_saved} archivo(s) subido(s) exitosamente"
-                self.upload_message_type = "success"
-            elif files_saved > 0:
-                self.upload_message = f"⚠️ {files_saved}/{total_files} archivos guardados"
-                self.upload_message_type = "success"
-            else:
-                self.upload_message = "❌ Error al guardar archivos"
+            except Exception as e:
+                self.is_uploading = False
+                self.upload_progress = ""
+                self.upload_message = f"Error: {str(e)}"
                 self.upload_message_type = "error"
+                print(f"❌ Error general: {e}")
+                import traceback
 
-            # Desactivar indicador de carga
-            self.is_uploading = False
-            self.upload_progress = ""
-
-            # Recargar archivos si se guardó al menos uno
-            if files_saved > 0:
-                print("🔄 DEBUG: Recargando archivos...")
-                self.load_all_files(self.current_patient_id)
-                self.close_upload_modal()
-                print("✅ DEBUG: Archivos recargados y modal cerrado")
-
-        except Exception as e:
-            self.is_uploading = False
-            self.upload_progress = ""
-            self.upload_message = f"Error: {str(e)}"
-            self.upload_message_type = "error"
-            print(f"❌ Error general: {e}")
-            import traceback
-
-            traceback.print_exc()
-        finally:
-            session.close()
-            print("🔒 DEBUG: Sesión cerrada")
+                traceback.print_exc()
@@ -1,20 +1,83 @@
 """Estado para gestión de pacientes"""
 
+import asyncio
 from datetime import date
 from typing import Optional
 
 import reflex as rx
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.database import get_session
+from app.config import SEARCH_DEBOUNCE_MS
+from app.database import get_async_session, session_scope
 from app.models import Patient
-from app.services import PatientService
+from app.services import MedicationService, PatientService
+from app.services.projections import PatientRow
+from app.utils.virtual_window import scroll_to_top, window_size, window_start
+
+# Listado virtualizado: tarjetas por fila, alto fijo de cada fila (px) e id del contenedor
+PATIENT_COLUMNS = 3
+PATIENT_ROW_HEIGHT = 350
+PATIENTS_CONTAINER_ID = "patients-list"
+
+
+async def _fetch_patients(
+    session: AsyncSession,
+    search_term: str,
+    gender: Optional[str],
+    include_inactive: bool,
+    offset: int,
+) -> tuple[Optional[list[int]], int, list[PatientRow]]:
+    """
+    Resuelve la búsqueda (o cuenta el listado) y trae la ventana pedida.
+
+    Returns:
+        Tupla (ids_de_búsqueda o None, total, filas_de_la_ventana)
+    """
+    if search_term:
+        # La búsqueda lista solo pacientes activos
+        search_ids = await PatientService.search_patient_ids_async(session, search_term, gender)
+        total = len(search_ids)
+    else:
+        search_ids = None
+        total = await PatientService.count_patient_rows_async(
+            session, include_inactive=include_inactive
+        )
+    rows = await _fetch_patient_window(session, include_inactive, offset, search_ids)
+    return search_ids, total, rows
+
+
+async def _fetch_patient_window(
+    session: AsyncSession,
+    include_inactive: bool,
+    offset: int,
+    search_ids: Optional[list[int]],
+) -> list[PatientRow]:
+    """Filas de la ventana con su medicación en curso (una consulta para toda la ventana)"""
+    rows = await PatientService.get_patient_rows_async(
+        session,
+        include_inactive=include_inactive,
+        offset=offset,
+        limit=window_size(PATIENT_COLUMNS),
+        patient_ids=search_ids,
+    )
+    medications = await MedicationService.get_current_medications_for_patients_async(
+        session, [row.id for row in rows]
+    )
+    for row in rows:
+        row.current_medications = ", ".join(m.name for m in medications[row.id])
+    return rows
 
 
 class PatientState(rx.State):
     """Estado para gestión de la lista de pacientes"""
 
-    # Lista de pacientes
-    patients: list[Patient] = []
+    # Ventana visible del listado (filas compactas, ver PatientService.get_patient_rows)
+    patients: list[PatientRow] = []
+    patients_offset: int = 0
+    patients_total: int = 0
+    # IDs de la búsqueda actual (None = sin búsqueda) y generación de la última pedida
+    _search_ids: Optional[list[int]] = None
+    _search_generation: int = 0
     current_patient: Optional[Patient] = None
 
     # Filtros y búsqueda
@@ -110,49 +173,106 @@ class PatientState(rx.State):
         """Setter para form_notes"""
         self.form_notes = value
 
-    def load_patients(self):
-        """Carga todos los pacientes"""
-        session = next(get_session())
-        try:
-            self.patients = PatientService.get_all_patients(
-                session, include_inactive=self.show_inactive
+    def _search_gender(self) -> Optional[str]:
+        """Filtro de género de la búsqueda (None = todos)"""
+        return self.filter_gender if self.filter_gender != "Todos" else None
+
+    async def _load_patients_window(self, session: AsyncSession):
+        """Carga la ventana visible del listado (o de los resultados de búsqueda)"""
+        self.patients = await _fetch_patient_window(
+            session, self.show_inactive, self.patients_offset, self._search_ids
+        )
+
+    async def _load_patients_list(self, session: AsyncSession):
+        """Resuelve la búsqueda (o cuenta el listado) y carga la ventana actual"""
+        self._search_ids, self.patients_total, self.patients = await _fetch_patients(
+            session,
+            self.search_query.strip(),
+            self._search_gender(),
+            self.show_inactive,
+            self.patients_offset,
+        )
+
+    async def _refresh_patients(self):
+        """Recarga total, estadísticas y la ventana actual (sin mover el scroll)"""
+        async with get_async_session() as session:
+            await self._load_patients_list(session)
+            self.total_patients = await PatientService.get_patient_count_async(
+                session, include_inactive=True
+            )
+            self.active_patients = await PatientService.get_patient_count_async(
+                session, include_inactive=False
             )
-            self.total_patients = PatientService.get_patient_count(session, include_inactive=True)
-            self.active_patients = PatientService.get_patient_count(session, include_inactive=False)
-        finally:
-            session.close()
-
-    def search_patients(self):
-        """Busca pacientes por nombre o DNI"""
-        session = next(get_session())
-        try:
-            if self.search_query.strip():
-                # Buscar por término
-                results = PatientService.search_patients(session, self.search_query)
 
-                # Aplicar filtros adicionales
-                if self.filter_gender != "Todos":
-                    results = [p for p in results if p.gender == self.filter_gender]
+    async def load_patients(self):
+        """Carga el listado de pacientes desde el inicio y las estadísticas"""
+        # Una búsqueda con debounce pendiente queda reemplazada por esta carga
+        self._search_generation += 1
+        self.patients_offset = 0
+        await self._refresh_patients()
+        return scroll_to_top(PATIENTS_CONTAINER_ID)
 
-                if not self.show_inactive:
-                    results = [p for p in results if p.is_active]
+    async def search_patients(self):
+        """Busca pacientes por nombre o DNI (inmediato, sin debounce)"""
+        return await self.load_patients()
 
-                self.patients = results
-            else:
-                # Sin búsqueda, cargar todos con filtros
-                self.load_patients()
-        finally:
-            session.close()
+    def handle_search_change(self, value: str):
+        """Actualiza el término y programa la búsqueda para cuando se deje de escribir"""
+        self.search_query = value
+        self._search_generation += 1
+        return PatientState.run_debounced_search(self._search_generation)
+
+    @rx.event(background=True)
+    async def run_debounced_search(self, generation: int):
+        """
+        Búsqueda mientras se escribe, con debounce y cancelación.
+
+        Cada cambio del término incrementa _search_generation. La tarea espera
+        SEARCH_DEBOUNCE_MS y solo busca si sigue siendo la última generación; si
+        mientras buscaba llegó otra, descarta su resultado en vez de pisar uno
+        más nuevo.
+        """
+        await asyncio.sleep(SEARCH_DEBOUNCE_MS / 1000)
+        async with self:
+            if generation != self._search_generation:
+                return
+            term, gender = self.search_query.strip(), self._search_gender()
+            include_inactive = self.show_inactive
+
+        # Búsqueda, conteo y primera ventana corren fuera del lock del estado:
+        # las teclas siguientes y los demás eventos no esperan a la base.
+        async with get_async_session() as session:
+            search_ids, total, rows = await _fetch_patients(
+                session, term, gender, include_inactive, 0
+            )
 
-    def filter_by_gender(self, gender: str):
+        # El lock solo se toma para publicar el resultado
+        async with self:
+            if generation != self._search_generation:
+                return
+            self.patients_offset = 0
+            self._search_ids = search_ids
+            self.patients_total = total
+            self.patients = rows
+        yield scroll_to_top(PATIENTS_CONTAINER_ID)
+
+    async def scroll_patients(self, scroll_top: int):
+        """Carga la ventana de pacientes correspondiente a la posición de scroll"""
+        offset = window_start(scroll_top, PATIENT_ROW_HEIGHT, PATIENT_COLUMNS)
+        if offset != self.patients_offset:
+            self.patients_offset = offset
+            async with get_async_session() as session:
+                await self._load_patients_window(session)
+
+    async def filter_by_gender(self, gender: str):
         """Filtra pacientes por género"""
         self.filter_gender = gender
-        self.search_patients()
+        return await self.load_patients()
 
-    def toggle_show_inactive(self):
+    async def toggle_show_inactive(self):
         """Alterna mostrar/ocultar pacientes inactivos"""
         self.show_inactive = not self.show_inactive
-        self.search_patients()
+        return await self.load_patients()
 
     def open_new_patient_modal(self):
         """Abre el modal para crear nuevo paciente"""
@@ -162,8 +282,7 @@ class PatientState(rx.State):
 
     def open_edit_patient_modal(self, patient_id: int):
         """Abre el modal para editar paciente existente"""
-        session = next(get_session())
-        try:
+        with session_scope() as session:
             patient = session.get(Patient, patient_id)
             if patient:
                 self.editing_patient_id = patient_id
@@ -181,8 +300,6 @@ class PatientState(rx.State):
                 self.form_family_history = patient.family_history or ""
                 self.form_notes = patient.notes or ""
                 self.show_new_patient_modal = True
-        finally:
-            session.close()
 
     def close_new_patient_modal(self):
         """Cierra el modal de nuevo/editar paciente"""
@@ -207,14 +324,14 @@ class PatientState(rx.State):
         self.form_notes = ""
         self.message = ""
 
-    def save_patient(self):
+    async def save_patient(self):
         """Guarda un paciente (crear o actualizar según editing_patient_id)"""
         if self.editing_patient_id is None:
-            self.create_patient()
+            await self.create_patient()
         else:
-            self.update_patient()
+            await self.update_patient()
 
-    def create_patient(self):
+    async def create_patient(self):
         """Crea un nuevo paciente"""
         try:
             # Validar campos requeridos
@@ -228,8 +345,7 @@ class PatientState(rx.State):
                 self.message_type = "error"
                 return
 
-            session = next(get_session())
-            try:
+            with session_scope() as session:
                 # Verificar que el DNI no exista
                 existing = PatientService.get_patient_by_dni(session, self.form_dni)
                 if existing:
@@ -259,16 +375,13 @@ class PatientState(rx.State):
                 self.message = f"Paciente {patient.full_name} creado exitosamente"
                 self.message_type = "success"
                 self.close_new_patient_modal()
-                self.load_patients()
-
-            finally:
-                session.close()
+                await self._refresh_patients()
 
         except Exception as e:
             self.message = f"Error al crear paciente: {str(e)}"
             self.message_type = "error"
 
-    def update_patient(self):
+    async def update_patient(self):
         """Actualiza un paciente existente"""
         try:
             # Validar campos requeridos
@@ -282,8 +395,7 @@ class PatientState(rx.State):
                 self.message_type = "error"
                 return
 
-            session = next(get_session())
-            try:
+            with session_scope() as session:
                 # Crear diccionario con datos actualizados
                 update_data = {
                     "first_name": self.form_first_name,
@@ -309,37 +421,28 @@ class PatientState(rx.State):
                     self.message = f"Paciente {patient.full_name} actualizado exitosamente"
                     self.message_type = "success"
                     self.close_new_patient_modal()
-                    self.load_patients()
+                    await self._refresh_patients()
                 else:
                     self.message = "No se encontró el paciente"
                     self.message_type = "error"
 
-            finally:
-                session.close()
-
         except Exception as e:
             self.message = f"Error al actualizar paciente: {str(e)}"
             self.message_type = "error"
 
-    def delete_patient(self, patient_id: int):
+    async def delete_patient(self, patient_id: int):
         """Elimina (desactiva) un paciente"""
         try:
-            session = next(get_session())
-            try:
+            with session_scope() as session:
                 PatientService.delete_patient(session, patient_id)
                 self.message = "Paciente desactivado exitosamente"
                 self.message_type = "success"
-                self.load_patients()
-            finally:
-                session.close()
+                await self._refresh_patients()
         except Exception as e:
             self.message = f"Error al desactivar paciente: {str(e)}"
             self.message_type = "error"
 
     def view_patient(self, patient_id: int):
         """Ver detalles de un paciente"""
-        session = next(get_session())
-        try:
+        with session_scope() as session:
             self.current_patient = session.get(Patient, patient_id)
-        finally:
-            session.close()
@@ -8,10 +8,25 @@ from typing import Optional
 import base64
 
 from app.services.report_service import ReportService
-from sqlmodel import Session, select
-from app.database import engine
+from app.utils.executors import run_in_executor
+from sqlmodel import select
+from app.database import read_session_scope
+from app.state.auth_state import signed_download_url
 from app.models.patient import Patient
 
+# Etiquetas de los selectores de exportación para análisis
+EXPORT_DATASET_LABELS = {
+    "Pacientes": "patients",
+    "Consultas": "consultations",
+    "Estudios": "studies",
+    "Medicaciones": "medications",
+}
+EXPORT_FORMAT_LABELS = {
+    "CSV": "csv",
+    "CSV (gzip)": "csv.gz",
+    "Parquet": "parquet",
+}
+
 
 class ReportState(rx.State):
     """Estado para gestionar reportes y exportaciones"""
@@ -24,6 +39,10 @@ class ReportState(rx.State):
     end_date: str = ""
     selected_study_type: str = ""
 
+    # Exportación para análisis (CSV/Parquet)
+    export_dataset: str = "consultations"
+    export_format: str = "csv"
+
     # UI
     is_loading: bool = False
     message: str = ""
@@ -87,13 +106,42 @@ class ReportState(rx.State):
         """Maneja el cambio de tipo de estudio, convirtiendo 'Todos' a cadena vacía"""
         self.selected_study_type = "" if value == "Todos" else value
 
+    def set_export_dataset_from_select(self, value: str):
+        """Convierte la etiqueta del selector al nombre del dataset"""
+        self.export_dataset = EXPORT_DATASET_LABELS.get(value, "consultations")
+
+    def set_export_format_from_select(self, value: str):
+        """Convierte la etiqueta del selector al formato de exportación"""
+        self.export_format = EXPORT_FORMAT_LABELS.get(value, "csv")
+
+    async def export_data(self):
+        """Descarga el dataset seleccionado en streaming desde la API"""
+        self.message = ""
+        params = {"format": self.export_format}
+        try:
+            if self.start_date:
+                params["start_date"] = datetime.strptime(self.start_date, "%Y-%m-%d").date()
+            if self.end_date:
+                params["end_date"] = datetime.strptime(self.end_date, "%Y-%m-%d").date()
+        except ValueError:
+            self.message = "Fechas inválidas"
+            self.message_type = "error"
+            return
+
+        url = await signed_download_url(self, f"/api/reports/export/{self.export_dataset}", params)
+        if url is None:
+            return rx.redirect("/")
+        # URL absoluta: rx.download no la acepta; el endpoint pone el nombre del
+        # archivo en Content-Disposition
+        return rx.redirect(url, is_external=True)
+
     def set_format_from_radio(self, value: str):
         """Convierte el valor del radio (PDF/Excel) a minúsculas"""
         self.selected_format = value.lower()
 
     def load_patients(self):
         """Carga la lista de pacientes activos"""
-        with Session(engine) as session:
+        with read_session_scope() as session:
             patients_db = session.exec(
                 select(Patient)
                 .where(Patient.is_active == True)
@@ -135,7 +183,7 @@ class ReportState(rx.State):
             self.patients_options = opts
             self.patients_map = pmap
 
-    def generate_report(self):
+    async def generate_report(self):
         """Genera el reporte según los parámetros seleccionados"""
         self.is_loading = True
         self.message = ""
@@ -161,21 +209,36 @@ class ReportState(rx.State):
             # Generar reporte
             if self.selected_report_type == "patient_history":
                 if self.selected_format == "pdf":
-                    content = ReportService.generate_patient_history_pdf(self.selected_patient_id)
+                    content = await run_in_executor(
+                        "reports",
+                        ReportService.generate_patient_history_pdf,
+                        self.selected_patient_id,
+                    )
                     filename = f"historial_paciente_{self.selected_patient_id}.pdf"
                     mime_type = "application/pdf"
                 else:
-                    content = ReportService.generate_patient_history_excel(self.selected_patient_id)
+                    content = await run_in_executor(
+                        "reports",
+                        ReportService.generate_patient_history_excel,
+                        self.selected_patient_id,
+                    )
                     filename = f"historial_paciente_{self.selected_patient_id}.xlsx"
                     mime_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
             elif self.selected_report_type == "consultations":
                 if self.selected_format == "pdf":
-                    content = ReportService.generate_consultations_report_pdf(
-                        start_date=start_date_obj, end_date=end_date_obj
-                    )
-                    filename = f"reporte_consultas_{datetime.now().strftime('%Y%m%d')}.pdf"
-                    mime_type = "application/pdf"
+                    # Se genera y descarga en streaming desde la API (rangos grandes)
+                    params = {}
+                    if start_date_obj:
+                        params["start_date"] = start_date_obj.isoformat()
+                    if end_date_obj:
+                        params["end_date"] = end_date_obj.isoformat()
+                    url = await signed_download_url(self, "/api/reports/consultations.pdf", params)
+                    if url is None:
+                        return rx.redirect("/")
+                    # URL absoluta: rx.download no la acepta; el endpoint ya la
+                    # entrega como adjunto (Content-Disposition)
+                    return rx.redirect(url, is_external=True)
                 else:
                     # Por ahora solo PDF para consultas
                     self.message = "Formato Excel no disponible para este reporte"
@@ -185,7 +248,9 @@ class ReportState(rx.State):
 
             elif self.selected_report_type == "studies":
                 if self.selected_format == "excel":
-                    content = ReportService.generate_studies_report_excel(
+                    content = await run_in_executor(
+                        "reports",
+                        ReportService.generate_studies_report_excel,
                         study_type=self.selected_study_type if self.selected_study_type else None,
                         start_date=start_date_obj,
                         end_date=end_date_obj,
@@ -212,12 +277,14 @@ class ReportState(rx.State):
         finally:
             self.is_loading = False
 
-    def export_patient_pdf(self, patient_id: int):
+    async def export_patient_pdf(self, patient_id: int):
         """Exporta el historial de un paciente a PDF (acción rápida)"""
         self.is_loading = True
 
         try:
-            content = ReportService.generate_patient_history_pdf(patient_id)
+            content = await run_in_executor(
+                "reports", ReportService.generate_patient_history_pdf, patient_id
+            )
             filename = f"historial_paciente_{patient_id}.pdf"
 
             return rx.download(
@@ -232,12 +299,14 @@ class ReportState(rx.State):
         finally:
             self.is_loading = False
 
-    def export_patient_excel(self, patient_id: int):
+    async def export_patient_excel(self, patient_id: int):
         """Exporta el historial de un paciente a Excel (acción rápida)"""
         self.is_loading = True
 
         try:
-            content = ReportService.generate_patient_history_excel(patient_id)
+            content = await run_in_executor(
+                "reports", ReportService.generate_patient_history_excel, patient_id
+            )
             filename = f"historial_paciente_{patient_id}.xlsx"
 
             return rx.download(
@@ -2,7 +2,11 @@
 
 import reflex as rx
 
+from app.database import read_session_scope
 from app.services.backup_service import BackupService
+from app.services.storage_service import StorageService
+from app.utils.executors import get_executor_stats
+from app.utils.pool_metrics import get_pool_stats
 
 
 class SettingsState(rx.State):
@@ -12,6 +16,20 @@ class SettingsState(rx.State):
     backups: list[dict] = []
     backup_stats: dict = {}
 
+    # Almacenamiento de archivos adjuntos
+    storage_total_mb: float = 0.0
+    storage_disk_mb: float = 0.0
+    storage_total_files: int = 0
+    storage_by_category: list[dict] = []
+    storage_by_mime: list[dict] = []
+    storage_top_patients: list[dict] = []
+
+    # Pools de trabajo fuera del event loop (del worker que atiende esta sesión)
+    executor_stats: list[dict] = []
+
+    # Pools de conexiones a la base (del worker que atiende esta sesión)
+    pool_stats: list[dict] = []
+
     # Mensajes
     message: str = ""
     message_type: str = ""  # "success" o "error"
@@ -24,6 +42,36 @@ class SettingsState(rx.State):
         self.backups = BackupService.list_backups()
         self.backup_stats = BackupService.get_backup_stats()
 
+    def load_storage(self):
+        """Carga el uso de almacenamiento de archivos adjuntos"""
+        with read_session_scope() as session:
+            usage = StorageService.get_usage(session)
+            self.storage_top_patients = StorageService.get_top_patients(session, limit=5)
+
+        self.storage_total_mb = usage["total_mb"]
+        self.storage_disk_mb = usage["disk_mb"]
+        self.storage_total_files = usage["total_files"]
+        self.storage_by_category = usage["by_category"]
+        self.storage_by_mime = usage["by_mime"]
+
+    def load_executor_stats(self):
+        """Carga las métricas de los pools de trabajo (en curso, cola, promedio)"""
+        self.executor_stats = get_executor_stats()
+
+    def load_pool_stats(self):
+        """Carga las métricas de los pools de conexiones (uso, esperas, fugas)"""
+        self.pool_stats = [
+            {
+                **{key: value for key, value in stats.items() if key != "leaks"},
+                "leaks_now": len(stats["leaks"]),
+                "leak_detail": "\n\n".join(
+                    f"Retenida hace {leak['age_seconds']} s\n{leak['stack']}"
+                    for leak in stats["leaks"]
+                ),
+            }
+            for stats in get_pool_stats()
+        ]
+
     def create_backup(self):
         """Crea un nuevo backup"""
         self.is_loading = True
@@ -5,6 +5,7 @@ from app.utils.validators import (
     normalize_dni,
     normalize_phone,
     normalize_text,
+    parse_blood_pressure,
     validate_dni,
     validate_email,
 )
@@ -15,6 +16,7 @@ __all__ = [
     "normalize_dni",
     "normalize_phone",
     "normalize_text",
+    "parse_blood_pressure",
     "validate_dni",
     "validate_email",
 ]
@@ -0,0 +1,140 @@
+"""
+Backends de cache clave → valor con vencimiento.
+
+- MemoryCache: LRU en memoria del proceso (por defecto).
+- RedisCache: compartido entre workers (CACHE_BACKEND=redis). Necesita el paquete
+  redis y un servidor en CACHE_REDIS_URL; si no están disponibles se usa
+  MemoryCache en su lugar, así la aplicación funciona igual con un solo proceso.
+
+Los valores se guardan tal cual en memoria y serializados con pickle en Redis;
+conviene cachear datos planos (dicts, listas, DTOs) y no objetos con sesión.
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Optional
+
+from app.config import CACHE_BACKEND, CACHE_MAX_ENTRIES, CACHE_REDIS_URL
+
+try:
+    import redis
+except ImportError:  # Dependencia opcional: solo cache en memoria
+    redis = None
+
+
+class MemoryCache:
+    """Cache LRU en memoria con vencimiento por entrada (thread-safe)"""
+
+    # Cada worker tiene la suya: las invalidaciones se propagan por el bus
+    shared = False
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # clave → (vence en, valor)
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        # Contadores (versiones): no vencen ni se desalojan
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Valor vigente de la clave o None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        """Guarda el valor por `ttl` segundos"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Elimina la clave si existe"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_counter(self, key: str) -> int:
+        """Valor actual de un contador (0 si no existe)"""
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        """Incrementa un contador y devuelve el nuevo valor"""
+        with self._lock:
+            value = self._counters.get(key, 0) + 1
+            self._counters[key] = value
+            return value
+
+    def clear(self) -> None:
+        """Vacía el cache (los contadores se conservan)"""
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """Cache compartido entre procesos sobre Redis (valores serializados con pickle)"""
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str = "hc:"):
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Valor vigente de la clave o None"""
+        data = self._client.get(self.prefix + key)
+        return pickle.loads(data) if data is not None else None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        """Guarda el valor por `ttl` segundos"""
+        self._client.setex(self.prefix + key, ttl, pickle.dumps(value))
+
+    def delete(self, key: str) -> None:
+        """Elimina la clave si existe"""
+        self._client.delete(self.prefix + key)
+
+    def get_counter(self, key: str) -> int:
+        """Valor actual de un contador (0 si no existe)"""
+        return int(self._client.get(self.prefix + key) or 0)
+
+    def incr(self, key: str) -> int:
+        """Incrementa un contador (atómico entre workers) y devuelve el nuevo valor"""
+        return int(self._client.incr(self.prefix + key))
+
+    def clear(self) -> None:
+        """Elimina las claves del prefijo de la aplicación"""
+        for key in self._client.scan_iter(f"{self.prefix}*"):
+            self._client.delete(key)
+
+
+@lru_cache(maxsize=1)
+def get_cache():
+    """
+    Backend de cache del proceso según CACHE_BACKEND ("memory" o "redis").
+
+    Si Redis no está instalado o no responde se usa MemoryCache.
+    """
+    if CACHE_BACKEND == "redis":
+        if redis is None:
+            print("⚠️ CACHE_BACKEND=redis pero falta el paquete redis; uso memoria")
+        elif not CACHE_REDIS_URL:
+            print("⚠️ CACHE_BACKEND=redis sin CACHE_REDIS_URL; uso memoria")
+        else:
+            try:
+                cache = RedisCache(CACHE_REDIS_URL)
+                cache._client.ping()
+                return cache
+            except redis.RedisError as e:
+                print(f"⚠️ No se pudo conectar a Redis ({e}); uso memoria")
+    return MemoryCache()
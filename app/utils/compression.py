@@ -0,0 +1,138 @@
+"""Utilidades para comprimir y leer archivos adjuntos comprimidos en disco"""
+
+import gzip
+import os
+import shutil
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+try:
+    import zstandard
+except ImportError:  # Dependencia opcional: se usa gzip
+    zstandard = None
+
+# Sufijo que se agrega al archivo en disco según la codificación
+ENCODING_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+# Marca para archivos evaluados que no conviene comprimir (no se reintentan)
+IDENTITY_ENCODING = "identity"
+
+# Tipos MIME que ya vienen comprimidos: no se ganaría espacio
+COMPRESSED_MIME_TYPES = {
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "image/heic",
+    "application/zip",
+    "application/gzip",
+    "application/x-7z-compressed",
+    "application/x-rar-compressed",
+    "application/zstd",
+}
+COMPRESSED_MIME_PREFIXES = (
+    "video/",
+    "audio/",
+    "application/vnd.openxmlformats-officedocument.",  # docx/xlsx/pptx son ZIP
+)
+
+# Solo se conserva la versión comprimida si ahorra al menos este porcentaje
+MIN_COMPRESSION_SAVINGS = 0.05
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def is_compressible(file_type: Optional[str]) -> bool:
+    """Indica si vale la pena comprimir un archivo según su tipo MIME"""
+    if not file_type:
+        return True
+    file_type = file_type.lower()
+    return file_type not in COMPRESSED_MIME_TYPES and not file_type.startswith(
+        COMPRESSED_MIME_PREFIXES
+    )
+
+
+def default_encoding(preferred: str = "zstd") -> str:
+    """Devuelve la codificación a usar (zstd si está instalado, si no gzip)"""
+    if preferred == "zstd" and zstandard is None:
+        return "gzip"
+    return preferred
+
+
+def compress_file(source: Path, encoding: str) -> Path:
+    """
+    Comprime un archivo en streaming junto al original.
+
+    Escribe en un temporal del mismo directorio, hace fsync y lo renombra, así
+    nunca queda un archivo comprimido a medias con el nombre definitivo. El
+    original no se borra: lo hace quien llama, después de actualizar la base.
+
+    Args:
+        source: Archivo original
+        encoding: "gzip" o "zstd"
+
+    Returns:
+        Path: Ruta del archivo comprimido (original + sufijo)
+    """
+    target = source.with_name(source.name + ENCODING_SUFFIXES[encoding])
+    tmp_target = target.with_name(f".{target.name}.tmp")
+
+    try:
+        with open(source, "rb") as src, open(tmp_target, "wb") as raw:
+            if encoding == "zstd":
+                if zstandard is None:
+                    raise RuntimeError("zstandard no está instalado")
+                compressor = zstandard.ZstdCompressor(level=10)
+                with compressor.stream_writer(raw, closefd=False) as dst:
+                    shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            else:
+                with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as dst:
+                    shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_target, target)
+    except BaseException:
+        tmp_target.unlink(missing_ok=True)
+        raise
+
+    return target
+
+
+def open_attachment(path: Path, encoding: Optional[str] = None) -> BinaryIO:
+    """
+    Abre un adjunto para lectura, descomprimiendo en streaming si corresponde.
+
+    La codificación es la guardada en la fila (content_encoding), no el sufijo
+    del archivo: un adjunto subido como ".gz" se guarda tal cual y se devuelve
+    tal cual.
+
+    Args:
+        path: Ruta devuelta por download_file de los servicios de archivos
+        encoding: content_encoding de la fila ("gzip", "zstd"; otro valor = sin comprimir)
+
+    Returns:
+        Objeto tipo archivo binario con el contenido original
+    """
+    if encoding == "gzip":
+        return gzip.open(path, "rb")
+    if encoding == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard no está instalado")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return open(path, "rb")
+
+
+def iter_attachment(
+    path: Path, encoding: Optional[str] = None, chunk_size: int = 64 * 1024
+) -> Iterator[bytes]:
+    """Itera el contenido original de un adjunto por bloques (para respuestas streaming)"""
+    with open_attachment(path, encoding) as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+def read_attachment(path: Path, encoding: Optional[str] = None) -> bytes:
+    """Lee el contenido original completo de un adjunto (para rx.download)"""
+    with open_attachment(path, encoding) as f:
+        return f.read()
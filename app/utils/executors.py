@@ -0,0 +1,193 @@
+"""
+Pools acotados para sacar del event loop el trabajo bloqueante o de CPU.
+
+Cada tipo de trabajo tiene su pool y su límite de concurrencia, así una ráfaga
+de un tipo (muchos logins, varios reportes a la vez) hace cola en su pool sin
+ocupar los hilos de los demás ni congelar a los clientes conectados:
+
+- "auth": hilos para verificar contraseñas (argon2 libera el GIL).
+- "file_io": hilos para E/S de adjuntos y codificación base64 de subidas.
+- "reports": procesos para generar PDF/Excel (ReportLab y openpyxl son Python
+  puro y no liberan el GIL). Con REPORT_EXECUTOR=thread usa hilos.
+
+Las funciones que van al pool de procesos deben poder serializarse con pickle
+(funciones de módulo o métodos estáticos, argumentos simples) y devolver datos
+planos. A cada proceso se le pasa el momento de la última escritura del worker
+(ver note_write en app/database.py), así un reporte pedido justo después de una
+edición no lee de una réplica que todavía no la tiene; por lo mismo, si el cache
+es en memoria no usan el de pacientes (ver PatientCacheService.bypass_local_cache).
+get_executor_stats() informa trabajos en curso y profundidad de cola.
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, TypeVar
+
+from app.config import (
+    AUTH_WORKERS,
+    EXECUTOR_QUEUE_WARNING,
+    FILE_IO_WORKERS,
+    REPORT_EXECUTOR,
+    REPORT_WORKERS,
+)
+
+T = TypeVar("T")
+
+# tipo → (clase de pool, cantidad de workers)
+EXECUTOR_KINDS = {
+    "auth": ("thread", AUTH_WORKERS),
+    "file_io": ("thread", FILE_IO_WORKERS),
+    "reports": (REPORT_EXECUTOR, REPORT_WORKERS),
+}
+
+_executors: dict[str, Executor] = {}
+_executors_lock = threading.Lock()
+
+# tipo → contadores del pool (ver get_executor_stats)
+_stats: dict[str, dict] = {
+    kind: {
+        "in_flight": 0,
+        "peak_queued": 0,
+        "completed": 0,
+        "failed": 0,
+        "total_seconds": 0.0,
+    }
+    for kind in EXECUTOR_KINDS
+}
+_stats_lock = threading.Lock()
+
+
+def _init_worker_process() -> None:
+    """Arranque de cada proceso del pool: escucha invalidaciones como un worker más"""
+    from app.services.patient_cache_service import PatientCacheService
+    from app.utils import invalidation_bus
+
+    # Las versiones del cache en memoria de este proceso no siguen las ediciones
+    PatientCacheService.bypass_local_cache()
+    invalidation_bus.start()
+
+
+def _run_in_worker_process(last_write: float, func: Callable[..., T], *args, **kwargs) -> T:
+    """Ejecuta func en un proceso del pool con la última escritura del worker que lo pidió"""
+    from app.database import note_write
+
+    note_write(last_write)
+    return func(*args, **kwargs)
+
+
+def get_executor(kind: str) -> Executor:
+    """
+    Pool del tipo de trabajo indicado (se crea en el primer uso).
+
+    Args:
+        kind: "auth", "file_io" o "reports"
+
+    Returns:
+        Executor: Pool de hilos o de procesos acotado
+    """
+    executor = _executors.get(kind)
+    if executor is not None:
+        return executor
+
+    pool_type, workers = EXECUTOR_KINDS[kind]
+    with _executors_lock:
+        if kind not in _executors:
+            if pool_type == "process":
+                # spawn: los procesos no heredan conexiones ni hilos del worker
+                _executors[kind] = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker_process,
+                )
+            else:
+                _executors[kind] = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix=kind.replace("_", "-")
+                )
+        return _executors[kind]
+
+
+async def run_in_executor(kind: str, func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Ejecuta una función en el pool de su tipo sin bloquear el event loop.
+
+    Args:
+        kind: Tipo de trabajo ("auth", "file_io", "reports")
+        func: Función sincrónica a ejecutar
+        *args, **kwargs: Argumentos de la función
+
+    Returns:
+        Lo que devuelva func
+    """
+    executor = get_executor(kind)
+    _, workers = EXECUTOR_KINDS[kind]
+    stats = _stats[kind]
+
+    with _stats_lock:
+        stats["in_flight"] += 1
+        queued = max(0, stats["in_flight"] - workers)
+        stats["peak_queued"] = max(stats["peak_queued"], queued)
+    if queued and queued == EXECUTOR_QUEUE_WARNING:
+        print(f"⚠️ Pool {kind}: {queued} trabajos en cola ({workers} workers)")
+
+    call = functools.partial(func, *args, **kwargs)
+    if isinstance(executor, ProcessPoolExecutor):
+        from app.database import last_write_time
+
+        call = functools.partial(_run_in_worker_process, last_write_time(), call)
+
+    started = time.monotonic()
+    failed = False
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, call)
+    except BrokenProcessPool:
+        # Un proceso murió (ej: sin memoria): el próximo trabajo crea un pool nuevo
+        failed = True
+        with _executors_lock:
+            if _executors.get(kind) is executor:
+                del _executors[kind]
+        raise
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        with _stats_lock:
+            stats["in_flight"] -= 1
+            stats["failed" if failed else "completed"] += 1
+            stats["total_seconds"] += time.monotonic() - started
+
+
+def get_executor_stats() -> list[dict]:
+    """
+    Métricas de cada pool.
+
+    Returns:
+        list[dict]: kind, type, workers, in_flight (en curso + en cola), queued,
+        peak_queued, completed, failed y avg_ms (espera + ejecución promedio)
+    """
+    with _stats_lock:
+        result = []
+        for kind, (pool_type, workers) in EXECUTOR_KINDS.items():
+            stats = _stats[kind]
+            finished = stats["completed"] + stats["failed"]
+            result.append(
+                {
+                    "kind": kind,
+                    "type": pool_type,
+                    "workers": workers,
+                    "in_flight": stats["in_flight"],
+                    "queued": max(0, stats["in_flight"] - workers),
+                    "peak_queued": stats["peak_queued"],
+                    "completed": stats["completed"],
+                    "failed": stats["failed"],
+                    "avg_ms": round(stats["total_seconds"] * 1000 / finished, 1)
+                    if finished
+                    else 0.0,
+                }
+            )
+        return result
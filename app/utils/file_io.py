@@ -0,0 +1,144 @@
+"""Utilidades de E/S de archivos adjuntos: escritura atómica con fsync y pool para código async"""
+
+import base64
+import os
+import shutil
+import uuid
+from concurrent.futures import Executor
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional, TypeVar
+
+from app.config import FILE_FSYNC_POLICY
+from app.utils.compression import read_attachment
+from app.utils.executors import get_executor, run_in_executor
+
+T = TypeVar("T")
+
+FSYNC_POLICIES = ("always", "file", "never")
+CHUNK_SIZE = 1024 * 1024
+
+
+def get_file_executor() -> Executor:
+    """Pool acotado de hilos para E/S de archivos (el "file_io" de app/utils/executors.py)"""
+    return get_executor("file_io")
+
+
+async def run_in_file_pool(func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Ejecuta una función bloqueante en el pool de E/S sin bloquear el event loop.
+
+    Args:
+        func: Función sincrónica a ejecutar
+        *args, **kwargs: Argumentos de la función
+
+    Returns:
+        Lo que devuelva func
+    """
+    return await run_in_executor("file_io", func, *args, **kwargs)
+
+
+def fsync_directory(directory: Path) -> None:
+    """Fuerza a disco la entrada de directorio (necesario para que un archivo nuevo persista)"""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_stream(path: Path, content: BinaryIO, fsync_policy: str = FILE_FSYNC_POLICY) -> None:
+    """
+    Escribe un stream a disco por bloques aplicando la política de fsync.
+
+    Args:
+        path: Ruta destino
+        content: Contenido (se lee desde la posición actual)
+        fsync_policy: "always", "file" o "never" (por defecto FILE_FSYNC_POLICY)
+    """
+    if fsync_policy not in FSYNC_POLICIES:
+        raise ValueError(f"Política de fsync inválida: {fsync_policy}")
+
+    with open(path, "wb") as f:
+        shutil.copyfileobj(content, f, CHUNK_SIZE)
+        if fsync_policy != "never":
+            f.flush()
+            os.fsync(f.fileno())
+
+    if fsync_policy == "always":
+        fsync_directory(path.parent)
+
+
+def attachment_filename(prefix: str, file_name: str) -> str:
+    """
+    Genera un nombre en disco libre de colisiones para un adjunto.
+
+    El timestamp mantiene el orden legible y el sufijo aleatorio evita que dos
+    subidas del mismo nombre en el mismo segundo se pisen.
+
+    Args:
+        prefix: Prefijo del dueño (ej: "patient_12")
+        file_name: Nombre original del archivo
+
+    Returns:
+        str: "<prefix>_<timestamp>_<aleatorio>_<nombre_seguro>"
+    """
+    timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
+    safe_filename = Path(file_name).name.replace(" ", "_") or "archivo"
+    return f"{prefix}_{timestamp}_{uuid.uuid4().hex[:12]}_{safe_filename}"
+
+
+def write_stream_atomic(
+    path: Path, content: BinaryIO, fsync_policy: str = FILE_FSYNC_POLICY
+) -> None:
+    """
+    Escribe un stream en un temporal del mismo directorio y lo renombra a `path`.
+
+    El rename es atómico dentro del mismo filesystem: `path` no existe o tiene el
+    contenido completo, nunca un archivo truncado. Si el proceso muere antes del
+    rename queda un ".tmp" que check_attachments.py limpia como huérfano.
+
+    Args:
+        path: Ruta destino definitiva
+        content: Contenido (se lee desde la posición actual)
+        fsync_policy: "always", "file" o "never" (por defecto FILE_FSYNC_POLICY)
+    """
+    if fsync_policy not in FSYNC_POLICIES:
+        raise ValueError(f"Política de fsync inválida: {fsync_policy}")
+
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        # El directorio se sincroniza una sola vez, después del rename
+        write_stream(tmp_path, content, "never" if fsync_policy == "never" else "file")
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    if fsync_policy == "always":
+        fsync_directory(path.parent)
+
+
+def write_attachment(path: Path, content: BinaryIO) -> None:
+    """Crea el directorio del adjunto si falta y lo escribe en forma atómica"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_stream_atomic(path, content)
+
+
+async def read_attachment_async(path: Path, encoding: Optional[str] = None) -> bytes:
+    """Versión async de read_attachment (lee y descomprime en el pool de E/S)"""
+    return await run_in_file_pool(read_attachment, path, encoding)
+
+
+def _b64encode_text(data: bytes) -> str:
+    return base64.b64encode(data).decode("utf-8")
+
+
+async def b64encode_async(data: bytes) -> str:
+    """Codifica un adjunto subido a base64 (texto para el State) en el pool de E/S"""
+    return await run_in_file_pool(_b64encode_text, data)
+
+
+async def b64decode_async(data: str) -> bytes:
+    """Decodifica un adjunto en base64 del State en el pool de E/S"""
+    return await run_in_file_pool(base64.b64decode, data)
@@ -0,0 +1,285 @@
+"""
+Bus de invalidación de caches entre workers.
+
+En producción corren varios workers del backend de Reflex y cada uno tiene sus
+caches en memoria (agenda, uso de almacenamiento, búsquedas, datos de pacientes).
+Cuando un worker invalida una de sus caches publica un aviso (tema + clave) y los
+demás workers descartan lo mismo en la suya:
+
+- PostgreSQL: NOTIFY/LISTEN sobre el canal CHANNEL; los avisos llegan al instante.
+- Otras bases (SQLite, MySQL): se insertan en la tabla cache_invalidations y cada
+  worker lee las filas nuevas por ID cada INVALIDATION_POLL_SECONDS. Las filas de
+  más de INVALIDATION_RETENTION_SECONDS se borran.
+
+Cada cache registra con subscribe() cómo descartar una clave de su tema; el aviso
+no se vuelve a aplicar en el worker que lo publicó (ya invalidó lo suyo). Los
+avisos se envían desde un hilo aparte, agrupados, así la escritura que invalida
+no espera a la base. Si un aviso se pierde (caída de la conexión) el vencimiento
+de cada cache acota lo desactualizado; al reconectar se vacían todas por las dudas.
+"""
+
+import atexit
+import json
+import select
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, text
+from sqlalchemy.engine import make_url
+from sqlmodel import Session, create_engine, func
+from sqlmodel import select as sql_select
+
+from app.config import (
+    DATABASE_URL,
+    INVALIDATION_BUS,
+    INVALIDATION_POLL_SECONDS,
+    INVALIDATION_RETENTION_SECONDS,
+)
+from app.database import note_write
+from app.models.cache_invalidation import CacheInvalidation
+
+# Canal de NOTIFY en PostgreSQL
+CHANNEL = "cache_invalidation"
+
+# Identificador de este worker (para ignorar los avisos propios)
+WORKER_ID = uuid.uuid4().hex
+
+# Pausa antes de reintentar tras un error de conexión (segundos)
+RECONNECT_DELAY_SECONDS = 5
+
+Handler = Callable[[Optional[str]], None]
+
+# tema → funciones que descartan una clave (None = todo el tema) de la cache local
+_handlers: dict[str, list[Handler]] = {}
+
+# Avisos pendientes de enviar, sin repetidos y en orden de publicación
+_pending: dict[tuple[str, Optional[str]], None] = {}
+_pending_lock = threading.Lock()
+_wakeup = threading.Event()
+
+_started: set[str] = set()
+_start_lock = threading.Lock()
+_engine = None
+
+
+def _backend() -> str:
+    """Transporte según INVALIDATION_BUS: "notify", "table" u "off" ("auto" elige)"""
+    if INVALIDATION_BUS != "auto":
+        return INVALIDATION_BUS
+    if make_url(DATABASE_URL).get_backend_name() == "postgresql":
+        return "notify"
+    return "table"
+
+
+def _get_engine():
+    """
+    Motor propio del bus: una conexión aparte del pool de la aplicación y sin
+    echo, para no llenar el log con el sondeo de la tabla.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_engine(DATABASE_URL, pool_pre_ping=True, pool_size=1, max_overflow=1)
+    return _engine
+
+
+def subscribe(topic: str, handler: Handler) -> None:
+    """
+    Registra cómo descartar claves de una cache local ante avisos de otros workers.
+
+    Args:
+        topic: Tema de la cache (ej: "agenda", "patient")
+        handler: Recibe la clave publicada (None = descartar todo el tema)
+    """
+    _handlers.setdefault(topic, []).append(handler)
+
+
+def publish(topic: str, key: Optional[str] = None) -> None:
+    """
+    Avisa a los demás workers que descarten una clave de su cache.
+
+    No bloquea: el aviso se encola y lo envía el hilo del bus.
+
+    Args:
+        topic: Tema de la cache
+        key: Clave dentro del tema (None = todo el tema)
+    """
+    if _backend() == "off":
+        return
+    with _pending_lock:
+        _pending[(topic, key)] = None
+    _start_thread("publisher", _publish_loop)
+    _wakeup.set()
+
+
+def start() -> None:
+    """
+    Arranca la escucha de avisos de otros workers (idempotente).
+
+    Se registra como tarea de arranque del backend en app/app.py.
+    """
+    backend = _backend()
+    if backend == "notify":
+        _start_thread("listener", _listen_notify)
+    elif backend == "table":
+        _start_thread("listener", _poll_table)
+
+
+def _start_thread(name: str, target: Callable[[], None]) -> None:
+    """Inicia un hilo daemon del bus si todavía no corre"""
+    with _start_lock:
+        if name in _started:
+            return
+        _started.add(name)
+        if name == "publisher":
+            atexit.register(_flush)
+    threading.Thread(target=target, name=f"invalidation-bus-{name}", daemon=True).start()
+
+
+# ============================================================================
+# PUBLICACIÓN
+# ============================================================================
+
+
+def _publish_loop() -> None:
+    """Envía los avisos pendientes en lotes a medida que se publican"""
+    while True:
+        _wakeup.wait()
+        _wakeup.clear()
+        _flush()
+
+
+def _flush() -> None:
+    """Envía en una sola transacción todos los avisos pendientes"""
+    with _pending_lock:
+        batch = list(_pending)
+        _pending.clear()
+    if not batch:
+        return
+
+    try:
+        with _get_engine().begin() as conn:
+            if _backend() == "notify":
+                for topic, key in batch:
+                    payload = json.dumps({"origin": WORKER_ID, "topic": topic, "key": key})
+                    conn.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": CHANNEL, "payload": payload},
+                    )
+            else:
+                now = datetime.now(UTC)
+                conn.execute(
+                    CacheInvalidation.__table__.insert(),
+                    [
+                        {"origin": WORKER_ID, "topic": t, "key": k, "created_at": now}
+                        for t, k in batch
+                    ],
+                )
+    except Exception as e:
+        print(f"⚠️ Bus de invalidación: no se pudieron enviar {len(batch)} avisos ({e})")
+
+
+# ============================================================================
+# RECEPCIÓN
+# ============================================================================
+
+
+def _dispatch(origin: str, topic: str, key: Optional[str]) -> None:
+    """Aplica un aviso recibido en las caches locales suscriptas al tema"""
+    if origin == WORKER_ID:
+        return
+    # Otro worker escribió: hasta que la réplica lo tenga se lee de la primaria
+    note_write()
+    for handler in _handlers.get(topic, []):
+        try:
+            handler(key)
+        except Exception as e:
+            print(f"⚠️ Bus de invalidación: error al invalidar {topic}:{key} ({e})")
+
+
+def _evict_all() -> None:
+    """Vacía todas las caches locales (tras perder avisos por un corte)"""
+    for topic in list(_handlers):
+        _dispatch("", topic, None)
+
+
+def _listen_notify() -> None:
+    """Escucha el canal con LISTEN en una conexión dedicada (PostgreSQL)"""
+    reconnected = False
+    while True:
+        raw = None
+        try:
+            raw = _get_engine().raw_connection()
+            raw.detach()  # Queda fuera del pool: la conexión vive lo que el hilo
+            conn = raw.driver_connection
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            if reconnected:
+                _evict_all()
+
+            while True:
+                if not select.select([conn], [], [], 60)[0]:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    message = json.loads(conn.notifies.pop(0).payload)
+                    _dispatch(message["origin"], message["topic"], message["key"])
+        except Exception as e:
+            print(f"⚠️ Bus de invalidación: se cortó LISTEN ({e}); reintentando")
+            if raw is not None:
+                try:
+                    raw.close()
+                except Exception:
+                    pass
+            reconnected = True
+            time.sleep(RECONNECT_DELAY_SECONDS)
+
+
+def _poll_table() -> None:
+    """Lee las filas nuevas de cache_invalidations por ID (otras bases)"""
+    last_id = None
+    last_cleanup = 0.0
+    failed = False
+    while True:
+        try:
+            with Session(_get_engine()) as session:
+                if last_id is None:
+                    # Solo interesan los avisos posteriores al arranque
+                    last_id = session.exec(sql_select(func.max(CacheInvalidation.id))).one() or 0
+
+                rows = session.exec(
+                    sql_select(
+                        CacheInvalidation.id,
+                        CacheInvalidation.origin,
+                        CacheInvalidation.topic,
+                        CacheInvalidation.key,
+                    )
+                    .where(CacheInvalidation.id > last_id)
+                    .order_by(CacheInvalidation.id)
+                ).all()
+
+                if failed:
+                    _evict_all()
+                    failed = False
+                for row in rows:
+                    _dispatch(row.origin, row.topic, row.key)
+                    last_id = row.id
+
+                if time.monotonic() - last_cleanup > 60:
+                    cutoff = datetime.now(UTC) - timedelta(seconds=INVALIDATION_RETENTION_SECONDS)
+                    session.execute(
+                        delete(CacheInvalidation).where(CacheInvalidation.created_at < cutoff)
+                    )
+                    session.commit()
+                    last_cleanup = time.monotonic()
+        except Exception as e:
+            if not failed:
+                print(f"⚠️ Bus de invalidación: error al leer avisos ({e}); reintentando")
+            failed = True
+            time.sleep(RECONNECT_DELAY_SECONDS)
+            continue
+        time.sleep(INVALIDATION_POLL_SECONDS)
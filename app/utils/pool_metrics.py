@@ -0,0 +1,204 @@
+"""
+Métricas del pool de conexiones de la base de datos.
+
+Para dimensionar DB_POOL_SIZE / DB_MAX_OVERFLOW con datos se mide, por pool:
+
+- Conexiones en uso, libres y en overflow (lo que informa el pool de SQLAlchemy).
+- Espera para obtener una conexión: cantidad de esperas, promedio, máximo y
+  timeouts (el pool se quedó sin conexiones durante DB_POOL_TIMEOUT).
+- Conexiones retenidas más de DB_POOL_LEAK_SECONDS: probablemente una sesión que
+  nunca se cerró. Se avisan una vez por log con el stack del lugar donde se
+  pidió la conexión (si DB_POOL_TRACK_STACKS está activo).
+
+Los pools se crean con InstrumentedQueuePool / InstrumentedAsyncQueuePool (ver
+app/database.py) y se registran con instrument().
+"""
+
+import threading
+import time
+import traceback
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.config import DB_POOL_LEAK_SECONDS, DB_POOL_TRACK_STACKS
+
+# Frames de la aplicación guardados por conexión (los más cercanos al pedido)
+STACK_DEPTH = 8
+
+# Frames que no interesan en el stack (internos del ORM y de este módulo)
+_SKIP_FRAMES = ("sqlalchemy", "sqlmodel", "pool_metrics.py", "contextlib.py")
+
+# Espera mínima que cuenta como "esperó una conexión" (segundos)
+WAIT_THRESHOLD_SECONDS = 0.001
+
+# nombre → motor instrumentado
+_engines: dict[str, Engine] = {}
+
+# nombre → contadores (ver get_pool_stats)
+_stats: dict[str, dict] = {}
+
+# nombre → {id del registro de conexión: [desde, stack, ya avisado]}
+_checked_out: dict[str, dict[int, list]] = {}
+
+_lock = threading.Lock()
+
+
+def _new_stats() -> dict:
+    return {
+        "checkouts": 0,
+        "waits": 0,
+        "wait_seconds": 0.0,
+        "max_wait_seconds": 0.0,
+        "timeouts": 0,
+        "leaks_detected": 0,
+    }
+
+
+class _TimedGetMixin:
+    """Mide cuánto tarda el pool en entregar una conexión"""
+
+    _metrics_name: Optional[str] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            _record_wait(self._metrics_name, time.perf_counter() - started, timeout=True)
+            raise
+        waited = time.perf_counter() - started
+        if waited >= WAIT_THRESHOLD_SECONDS:
+            _record_wait(self._metrics_name, waited)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedGetMixin, QueuePool):
+    """QueuePool que registra el tiempo de espera de cada conexión"""
+
+
+class InstrumentedAsyncQueuePool(_TimedGetMixin, AsyncAdaptedQueuePool):
+    """Pool del motor async que registra el tiempo de espera de cada conexión"""
+
+
+def _record_wait(name: Optional[str], seconds: float, timeout: bool = False) -> None:
+    """Suma una espera (o un timeout) a las métricas del pool"""
+    if name is None:
+        return
+    with _lock:
+        stats = _stats[name]
+        if timeout:
+            stats["timeouts"] += 1
+            return
+        stats["waits"] += 1
+        stats["wait_seconds"] += seconds
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], seconds)
+
+
+def instrument(engine: Engine, name: str) -> None:
+    """
+    Registra las métricas de un motor (para el async, pasar engine.sync_engine).
+
+    Args:
+        engine: Motor creado con un pool instrumentado
+        name: Nombre del pool en las métricas ("sync", "async", ...)
+    """
+    with _lock:
+        _engines[name] = engine
+        _stats[name] = _new_stats()
+        _checked_out[name] = {}
+
+    engine.pool._metrics_name = name
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stack = _caller_stack() if DB_POOL_TRACK_STACKS else None
+        with _lock:
+            _stats[name]["checkouts"] += 1
+            _checked_out[name][id(connection_record)] = [time.monotonic(), stack, False]
+        _check_leaks(name)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        with _lock:
+            _checked_out[name].pop(id(connection_record), None)
+
+    @event.listens_for(engine, "engine_disposed")
+    def _on_disposed(engine):
+        # El pool nuevo también debe reportar con este nombre
+        engine.pool._metrics_name = name
+
+
+def _caller_stack() -> traceback.StackSummary:
+    """Últimos frames de la aplicación que llevaron a pedir la conexión"""
+    frames = [
+        frame
+        for frame in traceback.extract_stack()
+        if not any(skip in frame.filename for skip in _SKIP_FRAMES)
+    ]
+    return traceback.StackSummary.from_list(frames[-STACK_DEPTH:])
+
+
+def _check_leaks(name: str) -> list[dict]:
+    """Conexiones retenidas más de DB_POOL_LEAK_SECONDS; avisa por log las nuevas"""
+    now = time.monotonic()
+    leaks = []
+    new_leaks = []
+    with _lock:
+        for entry in _checked_out[name].values():
+            age = now - entry[0]
+            if age < DB_POOL_LEAK_SECONDS:
+                continue
+            stack = "".join(traceback.format_list(entry[1])) if entry[1] else ""
+            leaks.append({"age_seconds": round(age, 1), "stack": stack})
+            if not entry[2]:
+                entry[2] = True
+                _stats[name]["leaks_detected"] += 1
+                new_leaks.append(leaks[-1])
+
+    for leak in new_leaks:
+        print(
+            f"⚠️ Pool {name}: conexión retenida hace {leak['age_seconds']} s "
+            f"(¿sesión sin cerrar?)\n{leak['stack']}"
+        )
+    return leaks
+
+
+def get_pool_stats() -> list[dict]:
+    """
+    Métricas de cada pool instrumentado.
+
+    Returns:
+        list[dict]: name, size, max_overflow, checked_out, checked_in, overflow,
+        checkouts, waits, avg_wait_ms, max_wait_ms, timeouts, leaks_detected y
+        leaks (conexiones retenidas ahora, con antigüedad y stack)
+    """
+    result = []
+    for name, engine in list(_engines.items()):
+        pool = engine.pool
+        leaks = _check_leaks(name)
+        with _lock:
+            stats = dict(_stats[name])
+        result.append(
+            {
+                "name": name,
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "checkouts": stats["checkouts"],
+                "waits": stats["waits"],
+                "avg_wait_ms": round(stats["wait_seconds"] * 1000 / stats["waits"], 1)
+                if stats["waits"]
+                else 0.0,
+                "max_wait_ms": round(stats["max_wait_seconds"] * 1000, 1),
+                "timeouts": stats["timeouts"],
+                "leaks_detected": stats["leaks_detected"],
+                "leaks": leaks,
+            }
+        )
+    return result
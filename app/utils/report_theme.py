@@ -0,0 +1,139 @@
+"""
+Tema de los reportes PDF (ReportLab): estilos de párrafo y de tabla compartidos.
+
+getSampleStyleSheet(), los ParagraphStyle y los TableStyle se construyen una sola
+vez por proceso y se reutilizan en todos los reportes. Table.setStyle() copia los
+comandos del TableStyle, así que compartir la misma instancia es seguro.
+"""
+
+from functools import lru_cache
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.styles import ParagraphStyle, StyleSheet1, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import TableStyle
+
+# Color de fondo de la columna de etiquetas por sección de la historia clínica
+SECTION_BACKGROUNDS = {
+    "patient": "#e0e7ff",
+    "antecedentes": "#fef3c7",
+    "consultation": "#dbeafe",
+    "study": "#fce7f3",
+}
+
+# Anchos de columna (etiqueta, valor) por sección
+SECTION_COL_WIDTHS = {
+    "patient": [2 * inch, 4 * inch],
+    "antecedentes": [2 * inch, 4 * inch],
+    "consultation": [1.5 * inch, 4.5 * inch],
+    "study": [1.5 * inch, 4.5 * inch],
+}
+
+# Secciones de cabecera (tabla más grande) vs. secciones repetidas por registro
+_HEADER_SECTIONS = ("patient", "antecedentes")
+
+
+@lru_cache(maxsize=1)
+def get_styles() -> StyleSheet1:
+    """
+    Hoja de estilos de los reportes: la de ejemplo de ReportLab más los propios.
+
+    Estilos propios: HistoryTitle, ReportTitle, SectionHeading y Footer.
+    """
+    styles = getSampleStyleSheet()
+    styles.add(
+        ParagraphStyle(
+            "HistoryTitle",
+            parent=styles["Heading1"],
+            fontSize=24,
+            textColor=colors.HexColor("#2563eb"),
+            spaceAfter=30,
+            alignment=TA_CENTER,
+        )
+    )
+    styles.add(
+        ParagraphStyle(
+            "ReportTitle",
+            parent=styles["Heading1"],
+            fontSize=20,
+            textColor=colors.HexColor("#2563eb"),
+            spaceAfter=20,
+            alignment=TA_CENTER,
+        )
+    )
+    styles.add(
+        ParagraphStyle(
+            "SectionHeading",
+            parent=styles["Heading2"],
+            fontSize=16,
+            textColor=colors.HexColor("#1e40af"),
+            spaceAfter=12,
+            spaceBefore=12,
+        )
+    )
+    styles.add(
+        ParagraphStyle(
+            "Footer",
+            parent=styles["Normal"],
+            fontSize=8,
+            textColor=colors.grey,
+            alignment=TA_RIGHT,
+        )
+    )
+    return styles
+
+
+@lru_cache(maxsize=None)
+def section_table_style(section: str) -> TableStyle:
+    """
+    Estilo de las tablas etiqueta/valor de una sección de la historia clínica.
+
+    Args:
+        section: "patient", "antecedentes", "consultation" o "study"
+    """
+    is_header = section in _HEADER_SECTIONS
+    font_size, padding, grid = (10, 8, 1) if is_header else (9, 6, 0.5)
+
+    commands = [
+        ("BACKGROUND", (0, 0), (0, -1), colors.HexColor(SECTION_BACKGROUNDS[section])),
+        ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
+        ("ALIGN", (0, 0), (0, -1), "RIGHT"),
+        ("ALIGN", (1, 0), (1, -1), "LEFT"),
+        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), font_size),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), padding),
+        ("TOPPADDING", (0, 0), (-1, -1), padding),
+        ("GRID", (0, 0), (-1, -1), grid, colors.grey),
+    ]
+    # La tabla de datos del paciente es de una línea por fila
+    if section != "patient":
+        commands.append(("VALIGN", (0, 0), (-1, -1), "TOP"))
+
+    return TableStyle(commands)
+
+
+@lru_cache(maxsize=1)
+def listing_table_style() -> TableStyle:
+    """Estilo de las tablas de listado con fila de encabezado (reporte de consultas)"""
+    return TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2563eb")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, 0), 11),
+            ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+            ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
+            ("GRID", (0, 0), (-1, -1), 1, colors.black),
+            ("FONTSIZE", (0, 1), (-1, -1), 9),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ]
+    )
+
+
+def clear_theme_cache() -> None:
+    """Descarta los estilos cacheados (usado por el benchmark para medir en frío)"""
+    get_styles.cache_clear()
+    section_table_style.cache_clear()
+    listing_table_style.cache_clear()
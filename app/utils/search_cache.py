@@ -0,0 +1,106 @@
+"""
+Cache LRU de búsquedas recientes: término → lista de IDs que coinciden.
+
+Mientras se escribe se repiten los mismos términos (borrar y volver a escribir,
+cambiar de página y volver); con el cache esas búsquedas no vuelven a la base.
+Se guardan solo IDs, ordenados como los muestra el listado, y el listado pide
+las filas de cada ventana por ID.
+
+El cache es por proceso. Los servicios lo invalidan al modificar pacientes o
+consultas y la invalidación se propaga a los demás workers por el bus (ver
+invalidation_bus); el vencimiento (SEARCH_CACHE_TTL) acota lo desactualizado si
+un aviso se pierde.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Optional
+
+from app.config import SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL
+from app.utils import invalidation_bus
+
+# (tipo, clave) → (momento de carga, IDs)
+_entries: OrderedDict[tuple[str, Hashable], tuple[float, list[int]]] = OrderedDict()
+_lock = threading.Lock()
+# Se incrementa en cada invalidación (para no cachear búsquedas que la cruzaron)
+_generation = 0
+
+
+def get_or_search(kind: str, key: Hashable, search: Callable[[], list[int]]) -> list[int]:
+    """
+    Devuelve los IDs cacheados para la búsqueda o la ejecuta y los guarda.
+
+    Args:
+        kind: Tipo de búsqueda ("patients", "consultations")
+        key: Término normalizado más los filtros que cambian el resultado
+        search: Función que ejecuta la búsqueda en la base
+
+    Returns:
+        list[int]: IDs que coinciden, en el orden del listado
+    """
+    cache_key = (kind, key)
+    ids, generation = _lookup(cache_key)
+    if ids is not None:
+        return ids
+
+    # La búsqueda corre fuera del lock: otras búsquedas no esperan a esta
+    ids = search()
+    _store(cache_key, ids, generation)
+    return ids
+
+
+async def get_or_search_async(
+    kind: str, key: Hashable, search: Callable[[], Awaitable[list[int]]]
+) -> list[int]:
+    """Versión de get_or_search para búsquedas async (mismo cache y mismas reglas)"""
+    cache_key = (kind, key)
+    ids, generation = _lookup(cache_key)
+    if ids is not None:
+        return ids
+
+    ids = await search()
+    _store(cache_key, ids, generation)
+    return ids
+
+
+def _lookup(cache_key: tuple[str, Hashable]) -> tuple[Optional[list[int]], int]:
+    """IDs vigentes de la búsqueda (o None) y la generación actual del cache"""
+    with _lock:
+        entry = _entries.get(cache_key)
+        if entry and time.monotonic() - entry[0] < SEARCH_CACHE_TTL:
+            _entries.move_to_end(cache_key)
+            return entry[1], _generation
+        return None, _generation
+
+
+def _store(cache_key: tuple[str, Hashable], ids: list[int], generation: int) -> None:
+    """Guarda el resultado salvo que haya habido una escritura mientras se buscaba"""
+    with _lock:
+        if generation == _generation:
+            _entries[cache_key] = (time.monotonic(), ids)
+            _entries.move_to_end(cache_key)
+            while len(_entries) > SEARCH_CACHE_SIZE:
+                _entries.popitem(last=False)
+
+
+def invalidate(kind: Optional[str] = None) -> None:
+    """Descarta las búsquedas cacheadas de un tipo (o todas), también en los demás workers"""
+    _evict(kind)
+    invalidation_bus.publish("search", kind)
+
+
+def _evict(kind: Optional[str] = None) -> None:
+    """Descarta las búsquedas cacheadas de un tipo (o todas) en este proceso"""
+    global _generation
+    with _lock:
+        _generation += 1
+        if kind is None:
+            _entries.clear()
+            return
+        for cache_key in [k for k in _entries if k[0] == kind]:
+            del _entries[cache_key]
+
+
+invalidation_bus.subscribe("search", _evict)
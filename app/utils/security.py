@@ -1,7 +1,14 @@
 """Utilidades de seguridad y autenticación"""
 
+import hashlib
+import hmac
+import time
+from typing import Optional
+
 from passlib.context import CryptContext
 
+from app.config import DOWNLOAD_TOKEN_TTL, SECRET_KEY
+
 # Contexto de encriptación usando argon2 (más moderno y seguro que bcrypt)
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
@@ -31,3 +38,44 @@ def hash_password(password: str) -> str:
         Hash de la contraseña
     """
     return pwd_context.hash(password)
+
+
+def _sign(payload: str) -> str:
+    """Firma HMAC-SHA256 de un texto con SECRET_KEY"""
+    return hmac.new(SECRET_KEY.encode(), payload.encode(), hashlib.sha256).hexdigest()
+
+
+def create_download_token(path: str, ttl: Optional[int] = None) -> str:
+    """
+    Genera un token de descarga para una ruta de app/api.
+
+    Solo lo emiten los States después de verificar que el usuario inició sesión
+    (ver signed_download_url en app/state/auth_state.py). Vale para esa ruta y
+    vence a los `ttl` segundos.
+
+    Args:
+        path: Ruta del endpoint (ej: "/api/patients/3/archive")
+        ttl: Vigencia en segundos (por defecto DOWNLOAD_TOKEN_TTL)
+
+    Returns:
+        Token "vencimiento.firma"
+    """
+    expires = int(time.time()) + (ttl or DOWNLOAD_TOKEN_TTL)
+    return f"{expires}.{_sign(f'{expires}:{path}')}"
+
+
+def verify_download_token(token: str, path: str) -> bool:
+    """
+    Verifica que el token sea válido para la ruta y no haya vencido.
+
+    Args:
+        token: Token recibido en la URL
+        path: Ruta pedida
+
+    Returns:
+        True si el token es válido, False en caso contrario
+    """
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _sign(f"{expires}:{path}"))
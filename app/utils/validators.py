@@ -127,3 +127,32 @@ def validate_dni(dni: str) -> bool:
     ]
 
     return any(re.match(pattern, normalized) for pattern in patterns)
+
+
+def parse_blood_pressure(blood_pressure: Optional[str]) -> tuple[Optional[int], Optional[int]]:
+    """
+    Extrae los valores sistólico y diastólico de una presión arterial en texto.
+
+    Args:
+        blood_pressure: Presión arterial en formato "sistólica/diastólica"
+
+    Returns:
+        Tupla (sistólica, diastólica) o (None, None) si el formato no es válido
+
+    Examples:
+        >>> parse_blood_pressure("120/80")
+        (120, 80)
+        >>> parse_blood_pressure(" 140 / 90 mmHg")
+        (140, 90)
+        >>> parse_blood_pressure("normal")
+        (None, None)
+    """
+    if not blood_pressure:
+        return None, None
+
+    # (?!\d): "120/8000" no debe leerse como 120/800
+    match = re.match(r"^\s*(\d{2,3})\s*/\s*(\d{2,3})(?!\d)", blood_pressure)
+    if not match:
+        return None, None
+
+    return int(match.group(1)), int(match.group(2))
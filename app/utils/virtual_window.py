@@ -0,0 +1,57 @@
+"""
+Cálculo de la ventana de filas de los listados virtualizados.
+
+El listado se dibuja con alto total (filas * alto de fila) pero solo contiene las
+filas visibles más un margen (overscan) arriba y abajo. Con la posición de scroll
+que envía el navegador se calcula qué ventana pedir al servicio. El inicio se
+alinea a bloques de overscan: mientras el usuario se mueve dentro del margen la
+ventana no cambia y no hay consulta nueva.
+"""
+
+import reflex as rx
+
+# Filas visibles aproximadas en el contenedor de scroll
+VIRTUAL_VISIBLE_ROWS = 8
+
+# Filas extra a cada lado de las visibles
+VIRTUAL_OVERSCAN_ROWS = 4
+
+
+def window_size(
+    columns: int = 1,
+    visible_rows: int = VIRTUAL_VISIBLE_ROWS,
+    overscan_rows: int = VIRTUAL_OVERSCAN_ROWS,
+) -> int:
+    """Cantidad de elementos de una ventana (filas visibles + overscan a ambos lados)"""
+    return (visible_rows + 2 * overscan_rows) * columns
+
+
+def window_start(
+    scroll_top: int,
+    row_height: int,
+    columns: int = 1,
+    overscan_rows: int = VIRTUAL_OVERSCAN_ROWS,
+) -> int:
+    """
+    Índice del primer elemento de la ventana para una posición de scroll.
+
+    Args:
+        scroll_top: Desplazamiento vertical del contenedor (px)
+        row_height: Alto fijo de cada fila (px)
+        columns: Elementos por fila (listados en grilla)
+        overscan_rows: Filas extra a cada lado de las visibles
+
+    Returns:
+        int: Offset (en elementos) a pedir al servicio
+    """
+    first_row = max(0, int(scroll_top)) // row_height
+    start_row = max(0, first_row - overscan_rows)
+    # Alinear a bloques de overscan para no recargar en cada fila
+    if overscan_rows:
+        start_row -= start_row % overscan_rows
+    return start_row * columns
+
+
+def scroll_to_top(container_id: str):
+    """Evento que lleva el contenedor del listado al inicio (al cambiar filtros)"""
+    return rx.call_script(f"document.getElementById('{container_id}')?.scrollTo(0, 0)")
@@ -0,0 +1,130 @@
+"""
+Benchmark de generación del PDF de historia clínica.
+
+Arma en memoria (sin base de datos) un paciente con N consultas y estudios y mide
+el tiempo de ReportService.render_patient_history_pdf en dos modos:
+
+- sin cache: cada tabla construye su TableStyle (comportamiento anterior al tema)
+- con cache: estilos del tema compartido, construidos una vez por proceso
+
+Uso:
+    uv run python benchmark_reports.py
+    uv run python benchmark_reports.py --consultations 500 --studies 50 --runs 5
+"""
+
+import argparse
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from app.models import Consultation, MedicalStudy, Patient
+from app.services import report_service
+from app.services.report_service import ReportService
+from app.utils import report_theme
+
+
+def build_history(consultations: int, studies: int):
+    """Paciente sintético con consultas y estudios (no se guarda en la base)"""
+    patient = Patient(
+        id=1,
+        first_name="Juan",
+        last_name="Pérez",
+        dni="30111222",
+        birth_date=date(1980, 5, 17),
+        gender="M",
+        blood_type="A+",
+        phone="1155550000",
+        email="juan.perez@example.com",
+        address="Av. Siempreviva 742",
+        allergies="Penicilina",
+        chronic_conditions="Hipertensión arterial",
+        family_history="Diabetes tipo 2 (padre)",
+    )
+    start = datetime(2024, 1, 1, 9, 0)
+    consultation_rows = [
+        Consultation(
+            id=i + 1,
+            patient_id=1,
+            consultation_date=start - timedelta(days=i),
+            reason="Control de presión arterial y ajuste de medicación",
+            symptoms="Cefalea ocasional, mareos leves por la mañana",
+            diagnosis="Hipertensión arterial estadio 1",
+            treatment="Enalapril 10 mg cada 12 horas, dieta hiposódica",
+            notes="Paciente refiere buena adherencia al tratamiento",
+            blood_pressure="135/85",
+            heart_rate=72,
+            temperature=36.5,
+            weight=82.0,
+            height=175.0,
+            next_visit=date(2024, 2, 1),
+        )
+        for i in range(consultations)
+    ]
+    study_rows = [
+        MedicalStudy(
+            id=i + 1,
+            patient_id=1,
+            study_type="Análisis de Sangre",
+            study_name="Hemograma completo",
+            study_date=date(2024, 1, 1) - timedelta(days=i * 7),
+            institution="Laboratorio Central",
+            requesting_doctor="Dra. Gómez",
+            results="Valores dentro de parámetros normales",
+            is_pending=False,
+        )
+        for i in range(studies)
+    ]
+    return patient, consultation_rows, study_rows
+
+
+def measure(patient, consultations, studies, runs: int) -> list[float]:
+    """Tiempos (segundos) de `runs` generaciones consecutivas"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        ReportService.render_patient_history_pdf(patient, consultations, studies)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    """Compara la generación con y sin cache de estilos"""
+    parser = argparse.ArgumentParser(description="Benchmark del PDF de historia clínica")
+    parser.add_argument("--consultations", type=int, default=500, help="Consultas")
+    parser.add_argument("--studies", type=int, default=50, help="Estudios")
+    parser.add_argument("--runs", type=int, default=5, help="Repeticiones por modo")
+    args = parser.parse_args()
+
+    patient, consultations, studies = build_history(args.consultations, args.studies)
+    print(
+        f"📄 Historia clínica con {args.consultations} consultas y {args.studies} estudios "
+        f"({args.runs} repeticiones por modo)"
+    )
+
+    # Sin cache: estilos construidos en cada llamada, como antes del tema compartido
+    report_theme.clear_theme_cache()
+    with (
+        mock.patch.object(
+            report_service, "section_table_style", report_theme.section_table_style.__wrapped__
+        ),
+        mock.patch.object(report_service, "get_styles", report_theme.get_styles.__wrapped__),
+    ):
+        before = measure(patient, consultations, studies, args.runs)
+
+    # Con cache: primera llamada en frío, el resto reutiliza los estilos
+    report_theme.clear_theme_cache()
+    after = measure(patient, consultations, studies, args.runs)
+
+    for label, timings in (("Sin cache", before), ("Con cache", after)):
+        print(
+            f"   {label}: mediana {statistics.median(timings) * 1000:.1f} ms | "
+            f"mín {min(timings) * 1000:.1f} ms | máx {max(timings) * 1000:.1f} ms"
+        )
+
+    speedup = statistics.median(before) / statistics.median(after)
+    print(f"✅ Mejora: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
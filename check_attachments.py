@@ -0,0 +1,86 @@
+"""
+Script para verificar la integridad de los archivos adjuntos.
+
+Recorre los directorios de pacientes en tramos (retomando desde el checkpoint),
+informa archivos faltantes, tamaños que no coinciden y archivos huérfanos, y
+opcionalmente los limpia.
+
+Uso:
+    uv run python check_attachments.py                  # un tramo, solo reporte
+    uv run python check_attachments.py --all --hashes   # ciclo completo con SHA-256
+    uv run python check_attachments.py --fix-orphans --fix-dangling
+    uv run python check_attachments.py --reset          # reiniciar el checkpoint
+"""
+
+import argparse
+
+from app.config import INTEGRITY_CHECKPOINT_PATH
+from app.database import session_scope
+from app.services.integrity_service import IntegrityService
+
+
+def print_report(report: dict) -> None:
+    """Muestra el reporte de un tramo"""
+    print(
+        f"   Pacientes: {report['patients_scanned']} | "
+        f"Archivos en disco: {report['files_on_disk']} | "
+        f"Filas verificadas: {report['rows_checked']}"
+    )
+    for entry in report["dangling"]:
+        print(f"   ❌ Falta archivo: {entry['table']}#{entry['id']} -> {entry['path']}")
+    for entry in report["size_mismatch"]:
+        print(
+            f"   ⚠️ Tamaño distinto: {entry['table']}#{entry['id']} -> {entry['path']} "
+            f"(esperado {entry['expected']}, en disco {entry['actual']})"
+        )
+    for entry in report["corrupted"]:
+        print(f"   ⚠️ Hash distinto (posible corrupción): {entry['path']}")
+    for entry in report["orphans"]:
+        print(f"   🗑️ Huérfano: {entry['path']} ({entry['size']} bytes)")
+
+
+def main():
+    """Ejecuta uno o más tramos de verificación"""
+    parser = argparse.ArgumentParser(description="Verifica los archivos adjuntos")
+    parser.add_argument("--patients", type=int, default=500, help="Pacientes por tramo")
+    parser.add_argument("--all", action="store_true", help="Recorrer hasta completar el ciclo")
+    parser.add_argument("--hashes", action="store_true", help="Verificar SHA-256")
+    parser.add_argument("--fix-orphans", action="store_true", help="Borrar archivos huérfanos")
+    parser.add_argument("--fix-dangling", action="store_true", help="Borrar filas sin archivo")
+    parser.add_argument("--reset", action="store_true", help="Reiniciar el checkpoint")
+    args = parser.parse_args()
+
+    if args.reset:
+        INTEGRITY_CHECKPOINT_PATH.unlink(missing_ok=True)
+        print("🔄 Checkpoint reiniciado")
+
+    with session_scope() as session:
+        while True:
+            print("🔍 Verificando tramo de pacientes...")
+            report = IntegrityService.scan(
+                session, max_patients=args.patients, verify_hashes=args.hashes
+            )
+            print_report(report)
+
+            if args.fix_orphans or args.fix_dangling:
+                result = IntegrityService.reconcile(
+                    session,
+                    report,
+                    delete_orphans=args.fix_orphans,
+                    delete_dangling=args.fix_dangling,
+                )
+                print(
+                    f"   ✅ Huérfanos borrados: {result['orphans_deleted']} | "
+                    f"Filas borradas: {result['dangling_deleted']}"
+                )
+
+            if report["cycle_complete"]:
+                print("✅ Ciclo de verificación completo")
+                break
+            if not args.all:
+                print("⏸️ Tramo terminado; la próxima corrida continúa desde el checkpoint")
+                break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Script para comprimir adjuntos poco usados (almacenamiento en frío).
+
+Comprime con zstd (o gzip si zstandard no está instalado) los archivos que no
+se descargan hace más de COLD_STORAGE_DAYS días. Las descargas los descomprimen
+al vuelo, así que se puede correr periódicamente (cron) sin afectar a la app.
+
+Uso:
+    uv run python compress_cold_attachments.py
+    uv run python compress_cold_attachments.py --days 365 --encoding gzip --limit 500
+"""
+
+import argparse
+
+from app.config import COLD_STORAGE_DAYS, COLD_STORAGE_ENCODING
+from app.database import session_scope
+from app.services import StorageTierService
+
+
+def main():
+    """Comprime los adjuntos fríos y muestra el ahorro"""
+    parser = argparse.ArgumentParser(description="Comprime adjuntos poco usados")
+    parser.add_argument("--days", type=int, default=COLD_STORAGE_DAYS, help="Días sin acceso")
+    parser.add_argument("--encoding", choices=["zstd", "gzip"], default=COLD_STORAGE_ENCODING)
+    parser.add_argument("--limit", type=int, default=None, help="Máximo de archivos")
+    args = parser.parse_args()
+
+    print(f"🧊 Comprimiendo adjuntos sin acceso en {args.days} días...")
+
+    with session_scope() as session:
+        try:
+            stats = StorageTierService.compress_cold_files(
+                session, days=args.days, encoding=args.encoding, limit=args.limit
+            )
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Error al comprimir adjuntos: {e}")
+            raise
+
+    saved_mb = (stats["bytes_before"] - stats["bytes_after"]) / (1024 * 1024)
+    print(
+        f"✅ Comprimidos: {stats['compressed']} | Omitidos: {stats['skipped']} | "
+        f"Faltantes: {stats['missing']} | Ahorro: {saved_mb:.2f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
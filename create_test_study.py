@@ -11,7 +11,7 @@ from datetime import date
 # Agregar el directorio raíz al path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.database import get_session
+from app.database import session_scope
 from app.models import MedicalStudy, Patient, StudyType
 from app.services import MedicalStudyService
 
@@ -19,36 +19,35 @@ from app.services import MedicalStudyService
 def create_test_study_with_file():
     """Crea un estudio de prueba con un archivo PDF de ejemplo"""
 
-    session = next(get_session())
+    with session_scope() as session:
+        try:
+            # 1. Obtener el primer paciente activo
+            from sqlmodel import select
 
-    try:
-        # 1. Obtener el primer paciente activo
-        from sqlmodel import select
+            statement = select(Patient).where(Patient.is_active == True).limit(1)
+            patient = session.exec(statement).first()
 
-        statement = select(Patient).where(Patient.is_active == True).limit(1)
-        patient = session.exec(statement).first()
+            if not patient:
+                print("❌ No hay pacientes en la base de datos. Crea un paciente primero.")
+                return
 
-        if not patient:
-            print("❌ No hay pacientes en la base de datos. Crea un paciente primero.")
-            return
+            print(f"✓ Usando paciente: {patient.full_name} (ID: {patient.id})")
 
-        print(f"✓ Usando paciente: {patient.full_name} (ID: {patient.id})")
+            # 2. Crear un estudio de prueba
+            study = MedicalStudyService.create_study(
+                session=session,
+                patient_id=patient.id,
+                study_type=StudyType.LABORATORY,
+                study_name="Análisis de sangre completo (PRUEBA)",
+                study_date=date.today(),
+                institution="Hospital Central",
+                results="Hemoglobina: 14.5 g/dL\nGlucosa: 95 mg/dL\nColesterol: 180 mg/dL",
+            )
 
-        # 2. Crear un estudio de prueba
-        study = MedicalStudyService.create_study(
-            session=session,
-            patient_id=patient.id,
-            study_type=StudyType.LABORATORY,
-            study_name="Análisis de sangre completo (PRUEBA)",
-            study_date=date.today(),
-            institution="Hospital Central",
-            results="Hemoglobina: 14.5 g/dL\nGlucosa: 95 mg/dL\nColesterol: 180 mg/dL",
-        )
+            print(f"✓ Estudio creado: {study.study_name} (ID: {study.id})")
 
-        print(f"✓ Estudio creado: {study.study_name} (ID: {study.id})")
-
-        # 3. Crear un archivo PDF de prueba
-        test_file_content = b"""%PDF-1.4
+            # 3. Crear un archivo PDF de prueba
+            test_file_content = b"""%PDF-1.4
 1 0 obj
 <<
 /Type /Catalog
@@ -107,35 +106,33 @@ startxref
 421
 %%EOF"""
 
-        # 4. Guardar el archivo usando el servicio
-        from io import BytesIO
-
-        file_io = BytesIO(test_file_content)
-
-        study = MedicalStudyService.upload_file(
-            session=session,
-            study_id=study.id,
-            file_content=file_io,
-            file_name="analisis_sangre_prueba.pdf",
-            file_type="application/pdf",
-        )
-
-        print(f"✓ Archivo adjuntado: {study.file_name}")
-        print(f"✓ Ruta: {study.file_path}")
-        print(f"✓ Tamaño: {study.file_size} bytes")
-        print(f"\n✅ LISTO! Ahora puedes probar la descarga desde la interfaz:")
-        print(f"   1. Ve a http://localhost:3000/patients/{patient.id}")
-        print(f"   2. Busca el estudio '{study.study_name}'")
-        print(f"   3. Haz clic en 'Descargar archivo'")
-        print(f"\n   O ve a http://localhost:3000/studies y busca el estudio")
-
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-
-        traceback.print_exc()
-    finally:
-        session.close()
+            # 4. Guardar el archivo usando el servicio
+            from io import BytesIO
+
+            file_io = BytesIO(test_file_content)
+
+            study = MedicalStudyService.upload_file(
+                session=session,
+                study_id=study.id,
+                file_content=file_io,
+                file_name="analisis_sangre_prueba.pdf",
+                file_type="application/pdf",
+            )
+
+            print(f"✓ Archivo adjuntado: {study.file_name}")
+            print(f"✓ Ruta: {study.file_path}")
+            print(f"✓ Tamaño: {study.file_size} bytes")
+            print(f"\n✅ LISTO! Ahora puedes probar la descarga desde la interfaz:")
+            print(f"   1. Ve a http://localhost:3000/patients/{patient.id}")
+            print(f"   2. Busca el estudio '{study.study_name}'")
+            print(f"   3. Haz clic en 'Descargar archivo'")
+            print(f"\n   O ve a http://localhost:3000/studies y busca el estudio")
+
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            import traceback
+
+            traceback.print_exc()
 
 
 if __name__ == "__main__":
@@ -11,16 +11,16 @@ Este script muestra cómo:
 from datetime import date
 from pathlib import Path
 
-from app.database import get_session
+from app.database import session_scope
 from app.models import StudyType
-from app.services import MedicalStudyService
+from app.services import MedicalStudyService, StorageService
 
 
 def ejemplo_crear_estudios():
     """Ejemplo: Crear estudios médicos para un paciente"""
     print("\n=== CREANDO ESTUDIOS MÉDICOS ===\n")
 
-    with get_session() as session:
+    with session_scope() as session:
         # Crear un análisis de laboratorio
         estudio1 = MedicalStudyService.create_study(
             session=session,
@@ -63,7 +63,7 @@ def ejemplo_subir_archivo(study_id: int):
     archivo_temp = Path("/tmp/ejemplo_estudio.txt")
     archivo_temp.write_text(ejemplo_texto)
 
-    with get_session() as session:
+    with session_scope() as session:
         with open(archivo_temp, "rb") as file:
             estudio = MedicalStudyService.upload_file(
                 session=session,
@@ -85,7 +85,7 @@ def ejemplo_consultar_estudios(patient_id: int):
     """Ejemplo: Consultar estudios de un paciente"""
     print("\n=== CONSULTANDO ESTUDIOS ===\n")
 
-    with get_session() as session:
+    with session_scope() as session:
         # Todos los estudios del paciente
         estudios = MedicalStudyService.get_studies_by_patient(session, patient_id)
         print(f"Total de estudios: {len(estudios)}")
@@ -115,21 +115,25 @@ def ejemplo_almacenamiento(patient_id: int):
     """Ejemplo: Consultar almacenamiento usado"""
     print("\n=== ALMACENAMIENTO ===\n")
 
-    with get_session() as session:
+    with session_scope() as session:
         # Por paciente
-        size_patient = MedicalStudyService.get_total_storage_size(session, patient_id)
-        print(f"Espacio usado por paciente {patient_id}: {size_patient / 1024:.2f} KB")
+        usage_patient = StorageService.get_usage(session, patient_id)
+        print(f"Espacio usado por paciente {patient_id}: {usage_patient['total_mb']} MB")
 
-        # Total
-        size_total = MedicalStudyService.get_total_storage_size(session)
-        print(f"Espacio total usado: {size_total / 1024:.2f} KB")
+        # Total, por categoría y por tipo MIME
+        usage_total = StorageService.get_usage(session)
+        print(f"Espacio total usado: {usage_total['total_mb']} MB")
+        for entry in usage_total["by_category"]:
+            print(f"  {entry['label']}: {entry['files']} archivos, {entry['mb']} MB")
+        for entry in usage_total["by_mime"]:
+            print(f"  {entry['file_type']}: {entry['files']} archivos, {entry['mb']} MB")
 
 
 def ejemplo_eliminar(study_id: int):
     """Ejemplo: Eliminar archivo y estudio"""
     print("\n=== ELIMINACIÓN ===\n")
 
-    with get_session() as session:
+    with session_scope() as session:
         # Solo eliminar el archivo (mantener el registro)
         estudio = MedicalStudyService.delete_study_file(session, study_id)
         print(f"✅ Archivo eliminado del estudio: {estudio.study_name}")
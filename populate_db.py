@@ -6,8 +6,9 @@ Genera pacientes, consultas y estudios médicos con datos realistas.
 from datetime import date, datetime, timedelta
 from random import choice, randint, random, uniform
 
-from app.database import get_session
+from app.database import session_scope
 from app.models import Consultation, MedicalStudy, Patient, StudyType
+from app.services import PatientSummaryService
 
 # Datos argentinos realistas
 NOMBRES = [
@@ -314,44 +315,44 @@ def main():
     print("🚀 Iniciando población de base de datos...")
     print("=" * 60)
 
-    session = next(get_session())
+    with session_scope() as session:
+        try:
+            # Verificar si ya hay datos
+            pacientes_existentes = session.query(Patient).count()
 
-    try:
-        # Verificar si ya hay datos
-        pacientes_existentes = session.query(Patient).count()
+            if pacientes_existentes > 0:
+                respuesta = input(
+                    f"\n⚠️  Ya existen {pacientes_existentes} pacientes en la BD. ¿Agregar más datos? (s/N): "
+                )
+                if respuesta.lower() != "s":
+                    print("❌ Operación cancelada")
+                    return
 
-        if pacientes_existentes > 0:
-            respuesta = input(
-                f"\n⚠️  Ya existen {pacientes_existentes} pacientes en la BD. ¿Agregar más datos? (s/N): "
-            )
-            if respuesta.lower() != "s":
-                print("❌ Operación cancelada")
-                return
-
-        print("\n📊 Creando datos de prueba...\n")
-
-        # Crear pacientes
-        pacientes = poblar_pacientes(session, cantidad=20)
-
-        # Crear consultas
-        poblar_consultas(session, pacientes, cantidad_por_paciente=3)
-
-        # Crear estudios médicos
-        poblar_estudios(session, pacientes, cantidad=30)
-
-        print("\n" + "=" * 60)
-        print("✅ ¡Base de datos poblada exitosamente!")
-        print("\n📈 Resumen:")
-        print(f"   - Pacientes: {session.query(Patient).count()}")
-        print(f"   - Consultas: {session.query(Consultation).count()}")
-        print(f"   - Estudios: {session.query(MedicalStudy).count()}")
-        print("\n🌐 Accede a http://localhost:3000 para ver los datos")
-
-    except Exception as e:
-        print(f"\n❌ Error al poblar la base de datos: {e}")
-        session.rollback()
-    finally:
-        session.close()
+            print("\n📊 Creando datos de prueba...\n")
+
+            # Crear pacientes
+            pacientes = poblar_pacientes(session, cantidad=20)
+
+            # Crear consultas
+            poblar_consultas(session, pacientes, cantidad_por_paciente=3)
+
+            # Crear estudios médicos
+            poblar_estudios(session, pacientes, cantidad=30)
+
+            # Los datos se insertan sin pasar por los servicios: regenerar el resumen
+            PatientSummaryService.rebuild_all(session)
+
+            print("\n" + "=" * 60)
+            print("✅ ¡Base de datos poblada exitosamente!")
+            print("\n📈 Resumen:")
+            print(f"   - Pacientes: {session.query(Patient).count()}")
+            print(f"   - Consultas: {session.query(Consultation).count()}")
+            print(f"   - Estudios: {session.query(MedicalStudy).count()}")
+            print("\n🌐 Accede a http://localhost:3000 para ver los datos")
+
+        except Exception as e:
+            print(f"\n❌ Error al poblar la base de datos: {e}")
+            session.rollback()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,30 @@
+"""
+Script para reconstruir la tabla patient_summary desde cero.
+
+Usar después de cargas masivas (populate_db.py), restauración de backups
+o cualquier escritura que no haya pasado por los servicios.
+
+Uso:
+    uv run python rebuild_patient_summary.py
+"""
+
+from app.database import session_scope
+from app.services import PatientSummaryService
+
+
+def main():
+    """Reconstruye el resumen de todos los pacientes"""
+    print("🔄 Reconstruyendo resumen de pacientes...")
+
+    with session_scope() as session:
+        try:
+            total = PatientSummaryService.rebuild_all(session)
+            print(f"✅ Resumen reconstruido para {total} pacientes")
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Error al reconstruir el resumen: {e}")
+            raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Pruebas de AgendaService.get_agenda: de cada paciente cuenta solo el turno de
+su última consulta (ROW_NUMBER), y el rango de fechas se aplica después
+"""
+
+from datetime import date, datetime, timedelta
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models import Consultation, Patient
+from app.services.agenda_service import AgendaService
+
+DAY = date(2030, 1, 15)
+
+
+def _seed() -> Session:
+    """Base SQLite en memoria con pacientes cuyos turnos se movieron o cancelaron"""
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    session = Session(engine)
+
+    def patient(last_name: str, is_active: bool = True) -> int:
+        p = Patient(
+            first_name="Paciente",
+            last_name=last_name,
+            dni=last_name,
+            birth_date=date(1980, 1, 1),
+            gender="F",
+            is_active=is_active,
+        )
+        session.add(p)
+        session.commit()
+        return p.id
+
+    def consultation(patient_id: int, days_ago: int, next_visit):
+        session.add(
+            Consultation(
+                patient_id=patient_id,
+                consultation_date=datetime(2029, 12, 31) - timedelta(days=days_ago),
+                reason=f"Control {days_ago}",
+                next_visit=next_visit,
+            )
+        )
+        session.commit()
+
+    # A: un único turno en el día
+    a = patient("A")
+    consultation(a, 10, DAY)
+    # B: el turno del día se reprogramó 10 días después en una consulta posterior
+    b = patient("B")
+    consultation(b, 20, DAY)
+    consultation(b, 5, DAY + timedelta(days=10))
+    # C: un turno viejo fuera del rango y el último en el día
+    c = patient("C")
+    consultation(c, 30, DAY + timedelta(days=5))
+    consultation(c, 3, DAY)
+    # D: la última consulta ya no tiene turno (cancelado)
+    d = patient("D")
+    consultation(d, 15, DAY)
+    consultation(d, 1, None)
+    # E: paciente inactivo
+    e = patient("E", is_active=False)
+    consultation(e, 10, DAY)
+    # F: dos consultas con la misma fecha: gana la de mayor ID
+    f = patient("F")
+    consultation(f, 7, DAY + timedelta(days=1))
+    consultation(f, 7, DAY)
+    return session
+
+
+def _names(appointments: list[dict]) -> list[str]:
+    return [a["patient_name"].split()[-1] for a in appointments]
+
+
+def test_day_uses_latest_consultation():
+    """El día muestra solo pacientes cuyo último turno cae en él"""
+    with _seed() as session:
+        assert _names(AgendaService.get_agenda(session, DAY, DAY)) == ["A", "C", "F"]
+
+
+def test_rescheduled_visit_moves():
+    """Un turno reprogramado aparece en la nueva fecha y no en la vieja"""
+    with _seed() as session:
+        moved = DAY + timedelta(days=10)
+        appointments = AgendaService.get_agenda(session, moved, moved)
+        assert _names(appointments) == ["B"]
+        assert appointments[0]["next_visit"] == moved.strftime("%Y-%m-%d")
+
+
+def test_old_visit_outside_range_is_ignored():
+    """El turno de una consulta anterior no aparece aunque caiga en el rango"""
+    with _seed() as session:
+        appointments = AgendaService.get_agenda(
+            session, DAY + timedelta(days=1), DAY + timedelta(days=5)
+        )
+        assert appointments == []
+
+
+def test_week_range():
+    """Un rango de varios días ordena por fecha y apellido"""
+    with _seed() as session:
+        appointments = AgendaService.get_agenda(session, DAY, DAY + timedelta(days=10))
+        assert _names(appointments) == ["A", "C", "F", "B"]
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 PRUEBAS DE AGENDA")
+    print("=" * 60)
+
+    tests = [
+        test_day_uses_latest_consultation,
+        test_rescheduled_visit_moves,
+        test_old_visit_outside_range_is_ignored,
+        test_week_range,
+    ]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ PASS: {test.__doc__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ FAIL: {test.__doc__} ({e})")
+
+    print(f"\nTotal: {passed}/{len(tests)} pruebas pasaron")
+    print("=" * 60)
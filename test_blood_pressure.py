@@ -0,0 +1,53 @@
+"""
+Pruebas de parse_blood_pressure (presión arterial en texto → sistólica/diastólica)
+"""
+
+from app.utils.validators import parse_blood_pressure
+
+
+def test_valid_formats():
+    """Formatos válidos, con espacios y con unidad"""
+    assert parse_blood_pressure("120/80") == (120, 80)
+    assert parse_blood_pressure(" 140 / 90") == (140, 90)
+    assert parse_blood_pressure("120/80 mmHg") == (120, 80)
+    assert parse_blood_pressure("90/60mmHg") == (90, 60)
+    assert parse_blood_pressure("200/110") == (200, 110)
+
+
+def test_empty_values():
+    """Valores vacíos o ausentes"""
+    assert parse_blood_pressure(None) == (None, None)
+    assert parse_blood_pressure("") == (None, None)
+    assert parse_blood_pressure("   ") == (None, None)
+
+
+def test_malformed_values():
+    """Texto libre, valores incompletos o con cantidad de dígitos inválida"""
+    assert parse_blood_pressure("normal") == (None, None)
+    assert parse_blood_pressure("120") == (None, None)
+    assert parse_blood_pressure("120/") == (None, None)
+    assert parse_blood_pressure("/80") == (None, None)
+    assert parse_blood_pressure("120-80") == (None, None)
+    assert parse_blood_pressure("1200/80") == (None, None)
+    assert parse_blood_pressure("120/8000") == (None, None)
+    assert parse_blood_pressure("9/6") == (None, None)
+    assert parse_blood_pressure("PA 120/80") == (None, None)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 PRUEBAS DE PRESIÓN ARTERIAL")
+    print("=" * 60)
+
+    tests = [test_valid_formats, test_empty_values, test_malformed_values]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ PASS: {test.__doc__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ FAIL: {test.__doc__} ({e})")
+
+    print(f"\nTotal: {passed}/{len(tests)} pruebas pasaron")
+    print("=" * 60)
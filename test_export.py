@@ -0,0 +1,135 @@
+"""
+Pruebas de ExportService.iter_csv: el CSV comprimido en streaming (gzip) debe
+descomprimirse al mismo contenido que el CSV plano, en varios lotes
+"""
+
+import csv
+import gzip
+import io
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models import Medication
+from app.services import export_service
+from app.services.export_service import EXPORT_DATASETS, ExportService
+
+START = date(2025, 1, 1)
+
+
+@contextmanager
+def _database(rows: int = 5, batch_size: int = 2):
+    """
+    Base SQLite en memoria con medicaciones y lotes chicos para forzar varios bloques.
+
+    ExportService lee de read_session_scope(); durante la prueba se reemplaza
+    por una sesión sobre esta base.
+    """
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            Medication(
+                patient_id=1,
+                name=f'Ibuprofeno {i}, "forte" ñandú',
+                dosage="400mg",
+                frequency="Cada 8 horas",
+                start_date=START + timedelta(days=i),
+                is_chronic=i % 2 == 0,
+            )
+            for i in range(rows)
+        )
+        session.commit()
+
+    @contextmanager
+    def read_session_scope():
+        with Session(engine) as session:
+            yield session
+
+    original = (export_service.read_session_scope, export_service.EXPORT_BATCH_SIZE)
+    export_service.read_session_scope = read_session_scope
+    export_service.EXPORT_BATCH_SIZE = batch_size
+    try:
+        yield
+    finally:
+        export_service.read_session_scope, export_service.EXPORT_BATCH_SIZE = original
+
+
+def _parse(data: bytes) -> list[list[str]]:
+    return list(csv.reader(io.StringIO(data.decode("utf-8"))))
+
+
+def test_gzip_round_trip():
+    """El CSV gzip se descomprime igual al CSV plano"""
+    with _database():
+        chunks = list(ExportService.iter_csv("medications"))
+        compressed = b"".join(ExportService.iter_csv("medications", compress=True))
+
+    # Encabezado + un bloque por lote de 2 filas
+    assert len(chunks) == 4
+    plain = b"".join(chunks)
+    assert gzip.decompress(compressed) == plain
+
+    rows = _parse(plain)
+    assert rows[0] == EXPORT_DATASETS["medications"][1]
+    assert len(rows) == 6
+    assert rows[1][3] == 'Ibuprofeno 0, "forte" ñandú'
+    assert rows[1][7] == "2025-01-01"
+
+
+def test_date_filter():
+    """Las fechas filtran por la columna de fecha del dataset (inclusive)"""
+    with _database():
+        data = b"".join(
+            ExportService.iter_csv(
+                "medications",
+                start_date=START + timedelta(days=1),
+                end_date=START + timedelta(days=3),
+                compress=True,
+            )
+        )
+
+    rows = _parse(gzip.decompress(data))
+    assert [row[7] for row in rows[1:]] == ["2025-01-02", "2025-01-03", "2025-01-04"]
+
+
+def test_empty_export_has_header():
+    """Sin filas, el CSV gzip es válido y trae solo el encabezado"""
+    with _database(rows=0):
+        data = b"".join(ExportService.iter_csv("medications", compress=True))
+
+    assert _parse(gzip.decompress(data)) == [EXPORT_DATASETS["medications"][1]]
+
+
+def test_invalid_dataset():
+    """Un dataset desconocido se rechaza con ValueError"""
+    try:
+        list(ExportService.iter_csv("users"))
+    except ValueError:
+        return
+    raise AssertionError("iter_csv aceptó un dataset inválido")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 PRUEBAS DE EXPORTACIÓN CSV")
+    print("=" * 60)
+
+    tests = [
+        test_gzip_round_trip,
+        test_date_filter,
+        test_empty_export_has_header,
+        test_invalid_dataset,
+    ]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ PASS: {test.__doc__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ FAIL: {test.__doc__} ({e})")
+
+    print(f"\nTotal: {passed}/{len(tests)} pruebas pasaron")
+    print("=" * 60)
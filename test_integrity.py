@@ -0,0 +1,156 @@
+"""
+Pruebas de IntegrityService: clasificación de filas colgadas, tamaños distintos
+y huérfanos (incluidos los referenciados desde otro paciente) y el período de
+gracia de reconcile()
+"""
+
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models import Patient
+from app.models.patient_file import PatientFile
+from app.services import integrity_service
+from app.services.integrity_service import ORPHAN_GRACE_SECONDS, IntegrityService
+
+
+@contextmanager
+def _storage():
+    """
+    Base SQLite en memoria y raíces de almacenamiento temporales.
+
+    patient_1: ok.pdf (correcto), wrong.pdf (tamaño distinto), missing.pdf (sin
+    archivo), stray.tmp (sin fila) y una fila que apunta a patient_2/shared.pdf.
+    patient_99: directorio sin paciente en la base.
+    """
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    original_roots = dict(integrity_service.STORAGE_ROOTS)
+
+    with tempfile.TemporaryDirectory() as tmp, Session(engine) as session:
+        root = Path(tmp)
+        integrity_service.STORAGE_ROOTS.update(
+            {"patients": root / "patients", "studies": root / "studies"}
+        )
+        try:
+            for pid in (1, 2):
+                session.add(
+                    Patient(
+                        id=pid,
+                        first_name="Paciente",
+                        last_name=str(pid),
+                        dni=str(pid),
+                        birth_date=date(1980, 1, 1),
+                        gender="F",
+                    )
+                )
+
+            files = {
+                "patient_1/ok.pdf": (b"abc", 3),
+                "patient_1/wrong.pdf": (b"abc", 10),
+                "patient_1/missing.pdf": (None, 3),
+                "patient_1/stray.tmp": (b"abc", None),
+                "patient_2/shared.pdf": (b"abc", 3),
+                "patient_99/lost.pdf": (b"abc", None),
+            }
+            for relative, (content, file_size) in files.items():
+                if content is not None:
+                    path = root / "patients" / relative
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.write_bytes(content)
+                if file_size is not None:
+                    session.add(
+                        PatientFile(
+                            patient_id=1,
+                            file_path=relative,
+                            file_name=Path(relative).name,
+                            file_type="application/pdf",
+                            file_size=file_size,
+                        )
+                    )
+            session.commit()
+            yield session, root
+        finally:
+            integrity_service.STORAGE_ROOTS.clear()
+            integrity_service.STORAGE_ROOTS.update(original_roots)
+
+
+def _paths(entries: list[dict]) -> set[str]:
+    return {entry["path"] for entry in entries}
+
+
+def test_full_scan_classification():
+    """Un escaneo completo separa colgadas, tamaños distintos y huérfanos"""
+    with _storage() as (session, root):
+        report = IntegrityService.scan(session, checkpoint_path=root / "checkpoint.json")
+        assert report["cycle_complete"]
+        assert report["rows_checked"] == 4
+        assert _paths(report["dangling"]) == {"patients/patient_1/missing.pdf"}
+        assert _paths(report["size_mismatch"]) == {"patients/patient_1/wrong.pdf"}
+        assert report["size_mismatch"][0]["actual"] == 3
+        assert _paths(report["orphans"]) == {
+            "patients/patient_1/stray.tmp",
+            "patients/patient_99/lost.pdf",
+        }
+
+
+def test_sliced_scan_checks_other_patients():
+    """Por tramos, un archivo referenciado desde otro paciente no es huérfano"""
+    with _storage() as (session, root):
+        checkpoint = root / "checkpoint.json"
+        orphans: set[str] = set()
+        scanned = 0
+        for _ in range(10):
+            report = IntegrityService.scan(session, max_patients=1, checkpoint_path=checkpoint)
+            orphans |= _paths(report["orphans"])
+            scanned += report["patients_scanned"]
+            if report["cycle_complete"]:
+                break
+
+        assert report["cycle_complete"]
+        assert scanned == 3
+        assert orphans == {"patients/patient_1/stray.tmp", "patients/patient_99/lost.pdf"}
+        assert IntegrityService.load_checkpoint(checkpoint)["last_patient_id"] == 0
+
+
+def test_reconcile_keeps_recent_orphans():
+    """reconcile() borra huérfanos viejos y conserva los del período de gracia"""
+    with _storage() as (session, root):
+        old = root / "patients" / "patient_99" / "lost.pdf"
+        old_mtime = time.time() - ORPHAN_GRACE_SECONDS - 60
+        os.utime(old, (old_mtime, old_mtime))
+
+        report = IntegrityService.scan(session, checkpoint_path=root / "checkpoint.json")
+        result = IntegrityService.reconcile(session, report, delete_orphans=True)
+
+        assert result == {"orphans_deleted": 1, "dangling_deleted": 0}
+        assert not old.exists()
+        assert (root / "patients" / "patient_1" / "stray.tmp").exists()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 PRUEBAS DE INTEGRIDAD DE ADJUNTOS")
+    print("=" * 60)
+
+    tests = [
+        test_full_scan_classification,
+        test_sliced_scan_checks_other_patients,
+        test_reconcile_keeps_recent_orphans,
+    ]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ PASS: {test.__doc__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ FAIL: {test.__doc__} ({e})")
+
+    print(f"\nTotal: {passed}/{len(tests)} pruebas pasaron")
+    print("=" * 60)
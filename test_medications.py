@@ -0,0 +1,119 @@
+"""
+Pruebas de MedicationService: las consultas en SQL (en curso / por vencer)
+deben coincidir con las propiedades Medication.is_ongoing y days_remaining
+"""
+
+from datetime import date, timedelta
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models import Medication
+from app.services.medication_service import MedicationService
+
+
+def _seed() -> tuple[Session, list[Medication]]:
+    """Base SQLite en memoria con medicación de dos pacientes en todos los casos borde"""
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    session = Session(engine)
+
+    today = date.today()
+    cases = [
+        # (paciente, activo, crónico, fecha de fin)
+        (1, True, False, None),
+        (1, True, True, today - timedelta(days=30)),
+        (1, True, False, today - timedelta(days=1)),
+        (1, True, False, today),
+        (1, True, False, today + timedelta(days=3)),
+        (2, True, False, today + timedelta(days=7)),
+        (2, True, False, today + timedelta(days=8)),
+        (2, False, False, today + timedelta(days=3)),
+        (2, False, True, None),
+    ]
+    medications = [
+        Medication(
+            patient_id=patient_id,
+            name=f"Medicamento {i}",
+            dosage="500mg",
+            frequency="Cada 8 horas",
+            start_date=today - timedelta(days=60),
+            end_date=end_date,
+            is_active=is_active,
+            is_chronic=is_chronic,
+        )
+        for i, (patient_id, is_active, is_chronic, end_date) in enumerate(cases)
+    ]
+    session.add_all(medications)
+    session.commit()
+    for medication in medications:
+        session.refresh(medication)
+    return session, medications
+
+
+def test_ongoing_matches_property():
+    """get_ongoing_medications coincide con Medication.is_ongoing"""
+    session, medications = _seed()
+    with session:
+        for patient_id in (1, 2):
+            expected = {m.id for m in medications if m.patient_id == patient_id and m.is_ongoing}
+            result = MedicationService.get_ongoing_medications(session, patient_id)
+            assert {m.id for m in result} == expected
+
+
+def test_patients_with_ongoing_treatment():
+    """get_patient_ids_with_ongoing_treatment coincide con Medication.is_ongoing"""
+    session, medications = _seed()
+    with session:
+        expected = {m.patient_id for m in medications if m.is_ongoing}
+        result = MedicationService.get_patient_ids_with_ongoing_treatment(session)
+        assert set(result) == expected
+
+
+def test_expiring_matches_days_remaining():
+    """get_expiring_medications coincide con is_ongoing y days_remaining"""
+    session, medications = _seed()
+    with session:
+        for days in (0, 3, 7, 30):
+            expected = {
+                m.id
+                for m in medications
+                if m.is_ongoing and m.days_remaining is not None and m.days_remaining <= days
+            }
+            result = MedicationService.get_expiring_medications(session, days=days)
+            assert {m.id for m in result} == expected, f"days={days}"
+
+
+def test_current_medications_for_patients():
+    """La consulta por lote coincide con la consulta por paciente"""
+    session, _ = _seed()
+    with session:
+        result = MedicationService.get_current_medications_for_patients(session, [1, 2, 3])
+        assert set(result) == {1, 2, 3}
+        assert result[3] == []
+        for patient_id in (1, 2):
+            expected = MedicationService.get_ongoing_medications(session, patient_id)
+            assert {m.id for m in result[patient_id]} == {m.id for m in expected}
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 PRUEBAS DE MEDICACIÓN")
+    print("=" * 60)
+
+    tests = [
+        test_ongoing_matches_property,
+        test_patients_with_ongoing_treatment,
+        test_expiring_matches_days_remaining,
+        test_current_medications_for_patients,
+    ]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ PASS: {test.__doc__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ FAIL: {test.__doc__} ({e})")
+
+    print(f"\nTotal: {passed}/{len(tests)} pruebas pasaron")
+    print("=" * 60)